@@ -3,6 +3,7 @@
 HTTP Proxy for Lambda RIE
 Converts HTTP requests to Lambda invoke format and back
 """
+import base64
 import json
 import os
 import sys
@@ -24,8 +25,9 @@ class LambdaProxyHandler(BaseHTTPRequestHandler):
     def _send_cors_headers(self):
         """Send CORS headers"""
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-MTP-Dev-User')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, PATCH, DELETE, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers',
+                         'Content-Type, Authorization, X-MTP-Dev-User, Idempotency-Key, If-Match')
         self.send_header('Access-Control-Allow-Credentials', 'true')
     
     def _convert_http_to_lambda_event(self):
@@ -84,6 +86,8 @@ class LambdaProxyHandler(BaseHTTPRequestHandler):
         status_code = lambda_response.get('statusCode', 200)
         headers = lambda_response.get('headers', {})
         body = lambda_response.get('body', '')
+        if lambda_response.get('isBase64Encoded'):
+            body = base64.b64decode(body)
         
         self.send_response(status_code)
         
@@ -116,6 +120,12 @@ class LambdaProxyHandler(BaseHTTPRequestHandler):
         lambda_response = self._invoke_lambda(event)
         self._send_lambda_response(lambda_response)
     
+    def do_PATCH(self):
+        """Handle PATCH requests"""
+        event = self._convert_http_to_lambda_event()
+        lambda_response = self._invoke_lambda(event)
+        self._send_lambda_response(lambda_response)
+    
     def do_DELETE(self):
         """Handle DELETE requests"""
         event = self._convert_http_to_lambda_event()
@@ -46,7 +46,9 @@ module "ecr" {
 module "dynamodb" {
   source = "./modules/dynamodb"
 
-  table_name = var.table_name
+  table_name           = var.table_name
+  report_index_enabled = var.enable_report_index
+  stream_enabled       = var.enable_derived_views_stream
 }
 
 # Cognito User Pool
@@ -73,14 +75,55 @@ module "lambda" {
   image_uri = var.lambda_image_uri != "" ? var.lambda_image_uri : "${module.ecr.repository_url}:latest"
 
   environment_variables = {
-    TABLE_NAME = module.dynamodb.table_name
-    DEV_MODE   = var.dev_mode
+    TABLE_NAME            = module.dynamodb.table_name
+    DEV_MODE              = var.dev_mode
+    REPORT_INDEX_NAME     = module.dynamodb.report_index_name
+    DERIVED_VIEWS_MODE    = var.enable_derived_views_stream ? "stream" : "inline"
+    NOTE_GSI1_SHARDS      = tostring(var.note_gsi1_shards)
+    RATE_LIMIT_MODE       = var.rate_limit_mode
+    RATE_LIMIT_PER_MINUTE = tostring(var.rate_limit_per_minute)
+
+    # An abandoned idempotency claim frees up once the request would have timed out
+    IDEMPOTENCY_LEASE_SECONDS = tostring(var.lambda_timeout)
     # AWS_REGION is automatically set by Lambda, don't set it manually
   }
 
   dynamodb_table_arn = module.dynamodb.table_arn
 }
 
+# Derived-views stream consumer: same image, app.main.stream_handler
+module "stream_consumer" {
+  source = "./modules/lambda"
+  count  = var.enable_derived_views_stream ? 1 : 0
+
+  function_name = "${var.lambda_function_name}-stream"
+  handler       = "app.main.stream_handler"
+  timeout       = var.lambda_timeout
+  image_uri     = var.lambda_image_uri != "" ? var.lambda_image_uri : "${module.ecr.repository_url}:latest"
+  image_command = ["app.main.stream_handler"]
+
+  environment_variables = {
+    TABLE_NAME         = module.dynamodb.table_name
+    DERIVED_VIEWS_MODE = "stream"
+  }
+
+  dynamodb_table_arn  = module.dynamodb.table_arn
+  dynamodb_stream_arn = module.dynamodb.stream_arn
+}
+
+resource "aws_lambda_event_source_mapping" "derived_views" {
+  count = var.enable_derived_views_stream ? 1 : 0
+
+  event_source_arn  = module.dynamodb.stream_arn
+  function_name     = module.stream_consumer[0].function_arn
+  starting_position = "TRIM_HORIZON"
+  batch_size        = 100
+  # Retry from the first failed record only (the consumer reports it)
+  function_response_types        = ["ReportBatchItemFailures"]
+  maximum_retry_attempts         = 10
+  bisect_batch_on_function_error = false
+}
+
 # API Gateway
 module "api_gateway" {
   source = "./modules/api_gateway"
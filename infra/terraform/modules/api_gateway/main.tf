@@ -3,6 +3,9 @@ resource "aws_api_gateway_rest_api" "main" {
   name        = var.api_name
   description = "MyTraderPal API"
 
+  # Lets Lambda return gzip payloads (isBase64Encoded) for /v1/dashboard and /v1/export
+  binary_media_types = ["*/*"]
+
   endpoint_configuration {
     types = ["REGIONAL"]
   }
@@ -92,6 +95,10 @@ resource "aws_api_gateway_integration" "options" {
   http_method = aws_api_gateway_method.options.http_method
   type        = "MOCK"
 
+  # With binary_media_types = ["*/*"] every request body counts as binary;
+  # convert it back to text so the mapping template below still applies
+  content_handling = "CONVERT_TO_TEXT"
+
   request_templates = {
     "application/json" = "{\"statusCode\": 200}"
   }
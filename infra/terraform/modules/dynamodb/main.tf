@@ -31,6 +31,30 @@ resource "aws_dynamodb_table" "main" {
     projection_type = "ALL"
   }
 
+  # Optional narrow copy of GSI1 for the notes summary (REPORT_INDEX_NAME):
+  # index reads are billed on the projected item size, so leaving text/dsl
+  # out makes report queries cheaper than projecting them away from GSI1
+  dynamic "global_secondary_index" {
+    for_each = var.report_index_enabled ? [1] : []
+    content {
+      name               = var.report_index_name
+      hash_key           = "GSI1PK"
+      range_key          = "GSI1SK"
+      projection_type    = "INCLUDE"
+      non_key_attributes = var.report_index_attributes
+    }
+  }
+
+  # NEW_AND_OLD_IMAGES feeds the derived-views consumer (app.main.stream_handler)
+  stream_enabled   = var.stream_enabled
+  stream_view_type = var.stream_enabled ? "NEW_AND_OLD_IMAGES" : null
+
+  # Expiring items (e.g. idempotency ledger entries) carry an epoch-seconds expiresAt
+  ttl {
+    attribute_name = "expiresAt"
+    enabled        = true
+  }
+
   tags = {
     Name = var.table_name
   }
@@ -13,3 +13,12 @@ output "table_id" {
   value       = aws_dynamodb_table.main.id
 }
 
+output "report_index_name" {
+  description = "Report GSI name (empty when disabled)"
+  value       = var.report_index_enabled ? var.report_index_name : ""
+}
+
+output "stream_arn" {
+  description = "Table stream ARN (empty when disabled)"
+  value       = var.stream_enabled ? aws_dynamodb_table.main.stream_arn : ""
+}
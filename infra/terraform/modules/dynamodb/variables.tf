@@ -3,3 +3,26 @@ variable "table_name" {
   type        = string
 }
 
+variable "report_index_enabled" {
+  description = "Create a narrow GSI on GSI1PK/GSI1SK for report reads"
+  type        = bool
+  default     = false
+}
+
+variable "report_index_name" {
+  description = "Name of the report GSI"
+  type        = string
+  default     = "GSI1R"
+}
+
+variable "report_index_attributes" {
+  description = "Non-key attributes projected into the report GSI (the fields ReportService aggregates)"
+  type        = list(string)
+  default     = ["date", "hit_miss", "session", "win_amount"]
+}
+
+variable "stream_enabled" {
+  description = "Enable the table stream (NEW_AND_OLD_IMAGES) for derived views"
+  type        = bool
+  default     = false
+}
@@ -8,6 +8,14 @@ resource "aws_lambda_function" "main" {
   # Container image URI (from ECR)
   image_uri = var.image_uri
 
+  # Override the image CMD to run another handler from the same image
+  dynamic "image_config" {
+    for_each = length(var.image_command) > 0 ? [1] : []
+    content {
+      command = var.image_command
+    }
+  }
+
   # Environment variables
   environment {
     variables = var.environment_variables
@@ -73,7 +81,10 @@ resource "aws_iam_role_policy" "lambda_dynamodb" {
           "dynamodb:UpdateItem",
           "dynamodb:DeleteItem",
           "dynamodb:Query",
-          "dynamodb:Scan"
+          "dynamodb:Scan",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:TransactWriteItems"
         ]
         Resource = [
           var.dynamodb_table_arn,
@@ -84,6 +95,29 @@ resource "aws_iam_role_policy" "lambda_dynamodb" {
   })
 }
 
+# IAM Policy for Lambda (DynamoDB Streams), for stream consumers only
+resource "aws_iam_role_policy" "lambda_dynamodb_stream" {
+  count = var.dynamodb_stream_arn != "" ? 1 : 0
+  name  = "${var.function_name}-dynamodb-stream"
+  role  = aws_iam_role.lambda.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect = "Allow"
+        Action = [
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams"
+        ]
+        Resource = var.dynamodb_stream_arn
+      }
+    ]
+  })
+}
+
 # CloudWatch Log Group
 resource "aws_cloudwatch_log_group" "lambda" {
   name              = "/aws/lambda/${var.function_name}"
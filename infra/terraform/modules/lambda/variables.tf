@@ -30,3 +30,15 @@ variable "dynamodb_table_arn" {
   type        = string
 }
 
+
+variable "image_command" {
+  description = "Override for the image CMD (handler), e.g. [\"app.main.stream_handler\"]"
+  type        = list(string)
+  default     = []
+}
+
+variable "dynamodb_stream_arn" {
+  description = "DynamoDB stream ARN this function reads (grants stream read access when set)"
+  type        = string
+  default     = ""
+}
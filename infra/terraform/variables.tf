@@ -83,6 +83,37 @@ variable "dev_mode" {
   default     = "true"
 }
 
+variable "enable_report_index" {
+  description = "Create the narrow report GSI and point REPORT_INDEX_NAME at it"
+  type        = bool
+  default     = false
+}
+
+# Before turning this on, backfill the views: python scripts/admin.py rebuild-views
+variable "enable_derived_views_stream" {
+  description = "Maintain report views and the search index from the table stream instead of inline on writes"
+  type        = bool
+  default     = false
+}
+
+variable "note_gsi1_shards" {
+  description = "Write shards per user for note GSI1 partitions (1 = unsharded; see scripts/migrate_gsi1_shards.py)"
+  type        = number
+  default     = 1
+}
+
+variable "rate_limit_mode" {
+  description = "Per-user API rate limits: off, local (per container) or dynamodb (shared per-minute quota)"
+  type        = string
+  default     = "dynamodb"
+}
+
+variable "rate_limit_per_minute" {
+  description = "Requests per user per minute across all Lambda containers (rate_limit_mode = dynamodb)"
+  type        = number
+  default     = 300
+}
+
 variable "enable_cognito_auth" {
   description = "Enable Cognito authorization on API Gateway"
   type        = bool
@@ -104,14 +135,16 @@ variable "cors_allowed_headers" {
   default = [
     "Content-Type",
     "Authorization",
-    "X-MTP-Dev-User"
+    "X-MTP-Dev-User",
+    "Idempotency-Key",
+    "If-Match"
   ]
 }
 
 variable "cors_allowed_methods" {
   description = "CORS allowed methods"
   type        = list(string)
-  default     = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
+  default     = ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
 }
 
 variable "frontend_bucket_name" {
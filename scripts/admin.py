@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Table-wide maintenance jobs (parallel scan, rate-limited, resumable).
+
+Jobs:
+  migrate-dsl      rewrite strategy dsl values stored as JSON strings as maps
+  purge-users      delete every item of the given users
+  rebuild-rollups  recompute the calendar rollups of every user with notes
+  rebuild-views    recompute the summary and strategy-stats views and the search
+                   index of every user; run it before setting
+                   DERIVED_VIEWS_MODE=stream, as the stream consumer only
+                   applies later changes
+
+Capacity is metered from ConsumedCapacity and held to --rcu/--wcu per second.
+With --checkpoint, progress is saved after every page; rerun the same command
+to resume.
+
+Usage:
+    python scripts/admin.py migrate-dsl [--dry-run] [--segments 8] [--rcu 200] [--wcu 50] [--checkpoint FILE]
+    python scripts/admin.py purge-users --user USER_ID [--user ...] [--dry-run] [options]
+    python scripts/admin.py rebuild-rollups [options]
+    python scripts/admin.py rebuild-views [options]
+"""
+import argparse
+import json
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.services.maintenance_service import (
+    MaintenanceRunner, MigrateDslJob, PurgeUsersJob, RebuildRollupsJob, RebuildViewsJob
+)
+
+
+def print_progress(progress: dict) -> None:
+    consumed = progress['consumed']
+    counts = ', '.join(f'{k}={v}' for k, v in sorted(progress['counts'].items()))
+    print(
+        f"{progress['job']}: segments {progress['segmentsDone']}/{progress['totalSegments']}, {counts}, "
+        f"{consumed['rcu']:.1f} RCU / {consumed['wcu']:.1f} WCU in {progress['elapsedSeconds']}s",
+        file=sys.stderr
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='MyTraderPal table maintenance')
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--segments', type=int, default=8, help='Parallel scan segments (TotalSegments)')
+    common.add_argument('--workers', type=int, help='Worker threads (default: one per segment)')
+    common.add_argument('--rcu', type=float, help='Read capacity budget per second')
+    common.add_argument('--wcu', type=float, help='Write capacity budget per second')
+    common.add_argument('--page-size', type=int, default=500)
+    common.add_argument('--checkpoint', help='Checkpoint file (resumes if it exists)')
+    common.add_argument('--progress-interval', type=float, default=5.0, help='Seconds between progress lines')
+    sub = parser.add_subparsers(dest='job', required=True)
+    dsl = sub.add_parser('migrate-dsl', parents=[common], help='Store strategy dsl as maps')
+    dsl.add_argument('--dry-run', action='store_true')
+    purge = sub.add_parser('purge-users', parents=[common], help='Delete all data of users')
+    purge.add_argument('--user', action='append', required=True, help='User ID (repeatable)')
+    purge.add_argument('--dry-run', action='store_true')
+    sub.add_parser('rebuild-rollups', parents=[common], help='Recompute calendar rollups')
+    sub.add_parser('rebuild-views', parents=[common], help='Backfill derived views before the stream switch')
+    args = parser.parse_args()
+
+    if args.job == 'migrate-dsl':
+        job = MigrateDslJob(dry_run=args.dry_run)
+    elif args.job == 'purge-users':
+        job = PurgeUsersJob(args.user, dry_run=args.dry_run)
+    elif args.job == 'rebuild-rollups':
+        job = RebuildRollupsJob()
+    else:
+        job = RebuildViewsJob()
+
+    runner = MaintenanceRunner(
+        job,
+        segments=args.segments,
+        workers=args.workers,
+        rcu_per_second=args.rcu,
+        wcu_per_second=args.wcu,
+        checkpoint_path=args.checkpoint,
+        page_size=args.page_size,
+        on_progress=print_progress,
+        progress_interval=args.progress_interval
+    )
+    result = runner.run()
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
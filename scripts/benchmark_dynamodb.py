@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Compare item throughput of the boto3 resource API and the low-level client path.
+
+Three measurements:
+  codec  - (de)serialization only: boto3 TypeSerializer/TypeDeserializer vs app.repositories.codec
+  decode - wire item -> API response dict: boto3 or codec + Note.from_item/to_json vs
+           the schema decoder in app.repositories.wire
+  query  - DynamoDBRepository.iter_gsi1 over N seeded notes with DDB_CLIENT_MODE=resource vs client
+
+By default the query benchmark runs against moto (in-process, so it measures
+client-side overhead only). Use --live to run it against TABLE_NAME in AWS.
+
+Usage:
+    python scripts/benchmark_dynamodb.py [--items 2000] [--rounds 5] [--live]
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import nullcontext
+from decimal import Decimal
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tests', 'unit'))
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from app.models.note import Note
+from app.repositories import codec, wire as wire_decoders
+
+
+def sample_note(i: int) -> dict:
+    return {
+        'PK': 'USER#bench', 'SK': f'NOTE#{i:08d}', 'GSI1PK': 'NOTE#bench', 'GSI1SK': f'2024-01-01#{i:08d}',
+        'entityType': 'NOTE', 'noteId': f'{i:08d}', 'userId': 'bench', 'date': '2024-01-01',
+        'text': 'Faded the opening drive, partials at VWAP, runner stopped at breakeven. ' * 3,
+        'direction': 'Short', 'session': 'London', 'risk': Decimal('125.50'), 'win_amount': Decimal('310.25'),
+        'hit_miss': 'Hit', 'createdAt': '2024-01-01T09:30:00+00:00', 'updatedAt': '2024-01-01T09:30:00+00:00',
+    }
+
+
+def rate(count: int, seconds: float) -> str:
+    return f'{count / seconds:>12,.0f} items/s'
+
+
+def bench_codec(items: int, rounds: int) -> None:
+    notes = [sample_note(i) for i in range(items)]
+    ser, deser = TypeSerializer(), TypeDeserializer()
+    wire = [{k: ser.serialize(v) for k, v in n.items()} for n in notes]
+
+    def boto3_roundtrip():
+        for n in notes:
+            {k: ser.serialize(v) for k, v in n.items()}
+        for w in wire:
+            {k: deser.deserialize(v) for k, v in w.items()}
+
+    def fast_roundtrip():
+        for n in notes:
+            codec.serialize_item(n)
+        for w in wire:
+            codec.deserialize_item(w)
+
+    assert [codec.deserialize_item(w) for w in wire] == notes
+    print(f'codec ({items} items x {rounds} rounds, serialize + deserialize)')
+    for name, fn in (('boto3', boto3_roundtrip), ('fast', fast_roundtrip)):
+        best = min(_timed(fn) for _ in range(rounds))
+        print(f'  {name:<10}{rate(items, best)}')
+
+
+def bench_decode(items: int, rounds: int) -> None:
+    ser, deser = TypeSerializer(), TypeDeserializer()
+    wire = [{k: ser.serialize(v) for k, v in sample_note(i).items()} for i in range(items)]
+
+    def boto3_decode():
+        for w in wire:
+            Note.from_item({k: deser.deserialize(v) for k, v in w.items()}).to_json()
+
+    def codec_decode():
+        for w in wire:
+            Note.from_item(codec.deserialize_item(w)).to_json()
+
+    def schema_decode():
+        for w in wire:
+            wire_decoders.note_json_from_wire(w)
+
+    print(f'decode ({items} items x {rounds} rounds, wire -> response dict)')
+    for name, fn in (('boto3', boto3_decode), ('codec', codec_decode), ('schema', schema_decode)):
+        best = min(_timed(fn) for _ in range(rounds))
+        print(f'  {name:<10}{rate(items, best)}')
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_query(items: int, rounds: int, live: bool) -> None:
+    if live:
+        mock = nullcontext()
+    else:
+        from moto import mock_aws
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+        os.environ['TABLE_NAME'] = 'benchmark-table'
+        mock = mock_aws()
+
+    from app.repositories.dynamodb import DynamoDBRepository
+
+    with mock:
+        if not live:
+            from conftest import create_table
+            create_table('benchmark-table')
+        os.environ['DDB_CLIENT_MODE'] = 'resource'
+        DynamoDBRepository().batch_write(puts=(sample_note(i) for i in range(items)))
+
+        print(f'query ({items} items via iter_gsi1 x {rounds} rounds, {"live" if live else "moto"})')
+        for mode in ('resource', 'client'):
+            os.environ['DDB_CLIENT_MODE'] = mode
+            repo = DynamoDBRepository()
+            best = min(_timed(lambda: sum(1 for _ in repo.iter_gsi1('NOTE#bench'))) for _ in range(rounds))
+            print(f'  {mode:<10}{rate(items, best)}')
+
+        if live:
+            os.environ['DDB_CLIENT_MODE'] = 'resource'
+            DynamoDBRepository().batch_write(deletes=((n['PK'], n['SK']) for n in map(sample_note, range(items))))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark DynamoDB resource vs low-level client paths')
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--live', action='store_true', help='Query the real TABLE_NAME instead of moto')
+    args = parser.parse_args()
+
+    bench_codec(args.items, args.rounds)
+    bench_decode(args.items, args.rounds)
+    bench_query(args.items, args.rounds, args.live)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Compare ID generation throughput.
+
+  legacy    - the old app.core.utils.generate_id: `import ulid` inside a try
+              block on every call, falling back to uuid4 (ulid-py, if installed)
+  uuid4     - the fallback on its own
+  single    - app.core.ids.generate_id
+  bulk      - app.core.ids.generate_ids, for imports
+
+Also checks that the new IDs are unique and sorted.
+
+Usage:
+    python scripts/benchmark_ids.py [--count 100000] [--rounds 5]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.core.ids import generate_id, generate_ids
+
+
+def legacy_generate_id(prefix: str) -> str:
+    try:
+        import ulid
+        return f"{prefix}-{ulid.new()}"
+    except ImportError:
+        import uuid
+        return f"{prefix}-{uuid.uuid4()}"
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark ID generation')
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    count = args.count
+
+    try:
+        import ulid  # noqa: F401
+        legacy_backend = 'ulid-py'
+    except ImportError:
+        legacy_backend = 'uuid4 fallback'
+
+    cases = (
+        (f'legacy ({legacy_backend})', lambda: [legacy_generate_id('note') for _ in range(count)]),
+        ('uuid4', lambda: [f'note-{uuid.uuid4()}' for _ in range(count)]),
+        ('single', lambda: [generate_id('note') for _ in range(count)]),
+        ('bulk', lambda: generate_ids('note', count)),
+    )
+    print(f'{count} IDs x {args.rounds} rounds (best)')
+    for name, fn in cases:
+        best = min(_timed(fn) for _ in range(args.rounds))
+        print(f'  {name:<24}{count / best:>12,.0f} ids/s {best / count * 1e9:>8,.0f} ns/id')
+
+    ids = [generate_id('note') for _ in range(count)] + generate_ids('note', count)
+    assert len(set(ids)) == len(ids), 'duplicate IDs'
+    assert ids == sorted(ids), 'IDs out of order'
+    print(f'  {len(ids)} new IDs unique and sorted')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
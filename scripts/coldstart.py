@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Measure cold-start cost: init phase vs first invocation.
+
+Each run is a fresh Python process against moto (so DynamoDB latency is not
+included, and boto3 is already imported by moto before timing starts) that
+times:
+
+  import          importing app.main, which runs the init phase
+                  (lifecycle.init() when pre-initialization is on)
+  first invoke    GET /v1/notes on the new container
+  warm invoke     the same request again
+  restore         lifecycle.after_restore(), as after a SnapStart restore
+  restored invoke the request after the restore hook
+
+Runs are repeated with PREINIT=false and PREINIT=true and the medians
+printed, so the table shows how much of the first request moved into init.
+
+Usage:
+    python scripts/coldstart.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+PHASES = ('import', 'first invoke', 'warm invoke', 'restore', 'restored invoke')
+
+
+def child() -> None:
+    """One container: time the phases and print them as JSON."""
+    sys.path.insert(0, os.path.join(ROOT, 'src'))
+    sys.path.insert(0, os.path.join(ROOT, 'tests', 'unit'))
+    os.environ.update({
+        'AWS_ACCESS_KEY_ID': 'testing', 'AWS_SECRET_ACCESS_KEY': 'testing', 'AWS_REGION': 'us-east-1',
+        'TABLE_NAME': 'coldstart-table', 'DEV_MODE': 'true',
+    })
+    from moto import mock_aws
+
+    with mock_aws():
+        from conftest import create_table
+        create_table('coldstart-table')
+        event = {'httpMethod': 'GET', 'path': '/v1/notes', 'headers': {'X-MTP-Dev-User': 'coldstart'}}
+        timings = {}
+
+        start = time.perf_counter()
+        from app.main import handler
+        from app import lifecycle
+        timings['import'] = time.perf_counter() - start
+        timings.update({f'  init: {name}': seconds for name, seconds in lifecycle.init_timings})
+
+        for phase in ('first invoke', 'warm invoke'):
+            start = time.perf_counter()
+            assert handler(event, None)['statusCode'] == 200
+            timings[phase] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lifecycle.after_restore()
+        timings['restore'] = time.perf_counter() - start
+        start = time.perf_counter()
+        assert handler(event, None)['statusCode'] == 200
+        timings['restored invoke'] = time.perf_counter() - start
+    print(json.dumps(timings))
+
+
+def run(preinit: str) -> dict:
+    env = dict(os.environ, PREINIT=preinit)
+    out = subprocess.run([sys.executable, __file__, '--child'], env=env, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Measure init vs first-invoke time')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return 0
+
+    results = {mode: [run(mode) for _ in range(args.runs)] for mode in ('false', 'true')}
+    rows = list(PHASES)
+    rows += sorted({k for r in results['true'] for k in r if k.startswith('  init:')})
+    print(f'median ms over {args.runs} runs (moto)')
+    print(f"  {'':<24}{'PREINIT=false':>14}{'PREINIT=true':>14}")
+    for row in rows:
+        cells = []
+        for mode in ('false', 'true'):
+            values = [r[row] for r in results[mode] if row in r]
+            cells.append(f'{statistics.median(values) * 1000:>14.1f}' if values else f"{'-':>14}")
+        print(f'  {row:<24}' + ''.join(cells))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
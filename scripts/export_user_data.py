@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Export a user's notes and strategies to a local file.
+
+Streams straight from DynamoDB to disk, so it works for accounts of any size.
+
+Usage:
+    python scripts/export_user_data.py --user USER_ID [--format ndjson|csv] [--gzip] [--out FILE]
+"""
+import argparse
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.services.export_service import export_service, EXPORT_FORMATS, EXPORT_KINDS
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Export a user\'s MyTraderPal data')
+    parser.add_argument('--user', required=True, help='User ID (Cognito sub)')
+    parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='ndjson')
+    parser.add_argument('--gzip', action='store_true', help='gzip-compress the output')
+    parser.add_argument('--include', default=','.join(EXPORT_KINDS),
+                        help='Comma-separated subset of: notes,strategies')
+    parser.add_argument('--out', help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    kinds = tuple(k.strip() for k in args.include.split(','))
+    records = export_service.iter_records(args.user, kinds)
+    if args.out:
+        with open(args.out, 'wb') as out:
+            count = export_service.write(records, out, args.format, args.gzip)
+    else:
+        count = export_service.write(records, sys.stdout.buffer, args.format, args.gzip)
+        sys.stdout.buffer.flush()
+    print(f'Exported {count} records', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Merge per-container metric deltas into global Prometheus metrics.
+
+Reads either the push directory written in METRICS_EXPORT_MODE=push, or
+CloudWatch log lines (e.g. from `aws logs tail`) containing EMF records.
+
+Usage:
+    python scripts/merge_metrics.py [--dir DIR]
+    aws logs tail /aws/lambda/mtp-api --since 1h | python scripts/merge_metrics.py --emf -
+"""
+import argparse
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.core.metrics import merge_snapshots, render_prometheus
+from app.core.metrics_export import load_pushed_snapshots, parse_emf_lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Merge MyTraderPal metric deltas')
+    parser.add_argument('--dir', help='Push directory (default: METRICS_PUSH_DIR)')
+    parser.add_argument('--emf', metavar='FILE', help='Log file with EMF lines, or - for stdin')
+    args = parser.parse_args()
+
+    if args.emf:
+        stream = sys.stdin if args.emf == '-' else open(args.emf)
+        with stream:
+            merged = merge_snapshots(parse_emf_lines(stream))
+    else:
+        merged = merge_snapshots(load_pushed_snapshots(args.dir))
+
+    print(render_prometheus(merged))
+    print(f"Merged deltas from {merged['containers']} containers", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Move existing notes to their sharded GSI1 partitions (NOTE_GSI1_SHARDS).
+
+Rollout:
+  1. Deploy with NOTE_GSI1_SHARDS=N (NOTE_GSI1_LEGACY_READS defaults to true, so
+     reads still cover the unsharded partition)
+  2. Run this script with --shards N for one user or the whole table
+  3. Set NOTE_GSI1_LEGACY_READS=false
+
+Rerunning is safe; notes already in place are skipped. To go back to one
+partition, run with --shards 1 after deploying NOTE_GSI1_SHARDS=1.
+
+Usage:
+    python scripts/migrate_gsi1_shards.py --shards N (--user USER_ID | --all) [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.repositories.dynamodb import db
+from app.repositories.sharding import migrate_note_partitions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Move notes to sharded GSI1 partitions')
+    parser.add_argument('--shards', type=int, required=True, help='Target shard count (1 = unsharded)')
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--user', help='User ID (Cognito sub)')
+    target.add_argument('--all', action='store_true', help='Every note in the table (full scan)')
+    parser.add_argument('--dry-run', action='store_true', help='Count notes to move without writing')
+    args = parser.parse_args()
+
+    if args.user:
+        notes = db.iter_pk(f'USER#{args.user}', 'NOTE#')
+    else:
+        notes = db.iter_scan(entity_type='NOTE')
+    counts = migrate_note_partitions(db, notes, args.shards, dry_run=args.dry_run)
+    verb = 'Would move' if args.dry_run else 'Moved'
+    print(f"{verb} {counts['moved']} of {counts['scanned']} notes ({counts['gone']} deleted meanwhile)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Generate a signed X-MTP-Profile header to profile requests in a warm container.
+
+The API must have PROFILING_SECRET set to the same secret.
+
+Usage:
+    python scripts/profile_header.py --rate 0.25 --ttl 900
+    curl -H "X-MTP-Profile: $(python scripts/profile_header.py)" ...
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.core.profiling import sign_profile_header
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Sign an X-MTP-Profile header')
+    parser.add_argument('--rate', type=float, default=1.0, help='Fraction of requests to profile (0..1)')
+    parser.add_argument('--ttl', type=int, default=900, help='Seconds until the header expires')
+    parser.add_argument('--secret', default=os.getenv('PROFILING_SECRET'), help='Default: PROFILING_SECRET')
+    args = parser.parse_args()
+
+    if not args.secret:
+        print('PROFILING_SECRET is not set', file=sys.stderr)
+        return 1
+    print(sign_profile_header(args.secret, args.rate, int(time.time()) + args.ttl))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
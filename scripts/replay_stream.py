@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Capture DynamoDB stream records to a file and replay them through the
+derived-views consumer.
+
+  capture - read every shard of the table's stream (24h retention) to JSONL,
+            in the Lambda event record shape
+  replay  - feed a captured file through StreamService in batches; records
+            already applied are skipped, so replaying is safe
+
+Usage:
+    python scripts/replay_stream.py capture --out records.jsonl [--stream-arn ARN]
+    python scripts/replay_stream.py replay records.jsonl [--batch-size 100]
+"""
+import argparse
+import json
+import os
+import sys
+
+import boto3
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def capture(args) -> int:
+    region = os.getenv('AWS_REGION', 'us-east-1')
+    stream_arn = args.stream_arn
+    if not stream_arn:
+        table = boto3.client('dynamodb', region_name=region).describe_table(TableName=os.environ['TABLE_NAME'])
+        stream_arn = table['Table'].get('LatestStreamArn')
+        if not stream_arn:
+            print('Table has no stream enabled', file=sys.stderr)
+            return 1
+    streams = boto3.client('dynamodbstreams', region_name=region)
+    shards, start = [], None
+    while True:
+        kwargs = {'StreamArn': stream_arn, **({'ExclusiveStartShardId': start} if start else {})}
+        desc = streams.describe_stream(**kwargs)['StreamDescription']
+        shards.extend(desc['Shards'])
+        start = desc.get('LastEvaluatedShardId')
+        if not start:
+            break
+
+    count = 0
+    with open(args.out, 'w') as out:
+        # Parents before children keeps each item's records in order
+        for shard in sorted(shards, key=lambda s: s['SequenceNumberRange']['StartingSequenceNumber']):
+            iterator = streams.get_shard_iterator(
+                StreamArn=stream_arn, ShardId=shard['ShardId'], ShardIteratorType='TRIM_HORIZON'
+            )['ShardIterator']
+            while iterator:
+                resp = streams.get_records(ShardIterator=iterator, Limit=1000)
+                for record in resp['Records']:
+                    record['dynamodb'].pop('ApproximateCreationDateTime', None)
+                    out.write(json.dumps(record, separators=(',', ':')) + '\n')
+                    count += 1
+                # Open shards return an iterator forever; stop once caught up
+                iterator = resp.get('NextShardIterator') if resp['Records'] else None
+    print(f'Captured {count} records from {len(shards)} shard(s)', file=sys.stderr)
+    return 0
+
+
+def replay(args) -> int:
+    from app.services.stream_service import stream_service
+
+    with open(args.file) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    result = stream_service.replay(records, batch_size=args.batch_size)
+    print(
+        f"Replayed {result['records']} records in {result['batches']} batch(es), {result['failed']} failed",
+        file=sys.stderr
+    )
+    return 1 if result['failed'] else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Capture and replay DynamoDB stream records')
+    sub = parser.add_subparsers(dest='command', required=True)
+    cap = sub.add_parser('capture', help='Read the table stream to a JSONL file')
+    cap.add_argument('--out', required=True, help='Output file')
+    cap.add_argument('--stream-arn', help='Stream ARN (default: the latest stream of TABLE_NAME)')
+    rep = sub.add_parser('replay', help='Apply captured records to the derived views')
+    rep.add_argument('file', help='JSONL file written by capture')
+    rep.add_argument('--batch-size', type=int, default=100)
+    args = parser.parse_args()
+    return capture(args) if args.command == 'capture' else replay(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
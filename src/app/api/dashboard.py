@@ -0,0 +1,30 @@
+"""Dashboard API controller."""
+from typing import Dict, Any, Tuple
+
+from app.api.errors import handles_errors
+from app.services.dashboard_service import dashboard_service
+from app.core.response import compressed_json_response
+
+
+def _params(event: Dict[str, Any]) -> Tuple[int, int, str, str]:
+    qs = event.get('queryStringParameters') or {}
+    return (
+        int(qs.get('notesLimit', '200')),
+        int(qs.get('strategiesLimit', '200')),
+        qs.get('from') or "",
+        qs.get('to') or ""
+    )
+
+
+@handles_errors('Failed to load dashboard')
+def get_dashboard(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """Get notes, strategies and the notes summary in one (gzip-compressed) response."""
+    result = dashboard_service.get_dashboard(user_id, *_params(event))
+    return compressed_json_response(result, event)
+
+
+@handles_errors('Failed to load dashboard')
+async def get_dashboard_async(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """Get the dashboard payload (async path)."""
+    result = await dashboard_service.get_dashboard_async(user_id, *_params(event))
+    return compressed_json_response(result, event)
@@ -0,0 +1,38 @@
+"""Catch-all error handling for controllers."""
+import asyncio
+import functools
+from typing import Any, Callable, Dict
+
+from app.core.response import error_response, get_origin
+from app.repositories.throttling import ThrottlingError
+
+
+def handles_errors(message: str, status: int = 500):
+    """
+    Turn unexpected exceptions from a (sync or async) controller into a
+    `status` response with "{message}: {error}". ThrottlingError is re-raised
+    for the router, which answers 503 with Retry-After on both paths.
+    """
+    def decorate(controller: Callable[..., Any]):
+        def failed(event: Dict[str, Any], e: Exception) -> Dict[str, Any]:
+            if isinstance(e, ThrottlingError):
+                raise e
+            return error_response(status, f'{message}: {str(e)}', get_origin(event))
+
+        if asyncio.iscoroutinefunction(controller):
+            @functools.wraps(controller)
+            async def async_wrapper(event: Dict[str, Any], *args, **kwargs) -> Dict[str, Any]:
+                try:
+                    return await controller(event, *args, **kwargs)
+                except Exception as e:
+                    return failed(event, e)
+            return async_wrapper
+
+        @functools.wraps(controller)
+        def wrapper(event: Dict[str, Any], *args, **kwargs) -> Dict[str, Any]:
+            try:
+                return controller(event, *args, **kwargs)
+            except Exception as e:
+                return failed(event, e)
+        return wrapper
+    return decorate
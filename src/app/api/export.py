@@ -0,0 +1,51 @@
+"""Export API controller."""
+import os
+from typing import Dict, Any
+
+from app.api.errors import handles_errors
+from app.services.export_service import export_service, get_object_store, EXPORT_FORMATS, EXPORT_KINDS
+from app.core.response import success_response, error_response, raw_response, get_origin
+from app.core.utils import now_iso
+
+# Lambda caps synchronous responses at 6 MB; base64 adds a third on top
+DEFAULT_INLINE_MAX_BYTES = 4 * 1024 * 1024
+
+
+@handles_errors('Failed to export data')
+def export_data(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """
+    Export all of a user's notes and strategies as NDJSON or CSV.
+    Small exports are returned inline; large ones are spilled to the export store.
+    """
+    origin = get_origin(event)
+    qs = event.get('queryStringParameters') or {}
+    fmt = (qs.get('format') or 'ndjson').lower()
+    compress = (qs.get('gzip') or '').lower() in ('1', 'true', 'yes')
+    include = qs.get('include')
+    kinds = tuple(k.strip() for k in include.split(',')) if include else EXPORT_KINDS
+
+    if fmt not in EXPORT_FORMATS:
+        return error_response(400, f'Unsupported format: {fmt}', origin)
+    if not kinds or any(k not in EXPORT_KINDS for k in kinds):
+        return error_response(400, f'include must be a subset of {",".join(EXPORT_KINDS)}', origin)
+
+    inline_max = int(os.getenv('EXPORT_INLINE_MAX_BYTES', str(DEFAULT_INLINE_MAX_BYTES)))
+    out, size, count = export_service.export_user(user_id, fmt, compress, kinds)
+    with out:
+        filename = f"mytraderpal-export.{fmt}{'.gz' if compress else ''}"
+        if size > inline_max:
+            key = f"exports/{user_id}/{now_iso().replace(':', '')}-{filename}"
+            location = get_object_store().put_object(key, out)
+            return success_response(
+                {'location': location, 'bytes': size, 'records': count},
+                origin
+            )
+        headers = {
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'X-MTP-Export-Records': str(count),
+        }
+        body = out.read()
+        if compress:
+            headers['Content-Encoding'] = 'gzip'
+            return raw_response(body, EXPORT_FORMATS[fmt], origin, extra_headers=headers)
+        return raw_response(body.decode('utf-8'), EXPORT_FORMATS[fmt], origin, extra_headers=headers)
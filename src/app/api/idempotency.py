@@ -0,0 +1,62 @@
+"""Idempotency-Key handling for POST controllers."""
+from typing import Dict, Any, Callable, Optional
+
+from app.services.idempotency_service import (
+    idempotency_service, IdempotencyConflict, IdempotencyMismatch, MAX_KEY_LENGTH
+)
+from app.core.response import error_response, cors_headers, get_origin
+
+
+def get_idempotency_key(event: Dict[str, Any]) -> Optional[str]:
+    """Extract the Idempotency-Key header (case-insensitive)."""
+    for k, v in (event.get('headers') or {}).items():
+        if k.lower() == 'idempotency-key' and v:
+            return v.strip()
+    return None
+
+
+def with_idempotency(
+    event: Dict[str, Any],
+    user_id: str,
+    controller: Callable[[Dict[str, Any], str], Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Run a POST controller at most once per Idempotency-Key.
+    Retries with the same key and body replay the first response.
+    """
+    key = get_idempotency_key(event)
+    if key is None:
+        return controller(event, user_id)
+
+    origin = get_origin(event)
+    if len(key) > MAX_KEY_LENGTH:
+        return error_response(400, f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters', origin)
+
+    method = event.get('httpMethod') or event.get('requestContext', {}).get('http', {}).get('method', 'POST')
+    scope = f"{method} {event.get('path') or event.get('rawPath', '/')}"
+    fingerprint = idempotency_service.fingerprint(scope, event.get('body'))
+    try:
+        stored = idempotency_service.begin(user_id, scope, key, fingerprint)
+    except IdempotencyMismatch:
+        return error_response(422, 'Idempotency-Key was already used with a different request', origin)
+    except IdempotencyConflict:
+        response = error_response(409, 'A request with this Idempotency-Key is in progress', origin)
+        response['headers']['Retry-After'] = '1'
+        return response
+
+    if stored is not None:
+        headers = cors_headers(origin)
+        headers['Idempotent-Replayed'] = 'true'
+        return {'statusCode': int(stored['statusCode']), 'headers': headers, 'body': stored['body']}
+
+    try:
+        response = controller(event, user_id)
+    except Exception:
+        idempotency_service.release(user_id, scope, key)
+        raise
+    # Server errors are not cached so the client can retry them
+    if response.get('statusCode', 500) >= 500:
+        idempotency_service.release(user_id, scope, key)
+    else:
+        idempotency_service.complete(user_id, scope, key, response)
+    return response
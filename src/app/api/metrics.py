@@ -1,14 +1,23 @@
 """Metrics API controller."""
 from typing import Dict, Any
 
-from app.core.metrics import get_metrics
+from app.core.metrics import get_metrics, render_prometheus
+from app.core.metrics_export import pushed_snapshot
 from app.core.response import get_origin
 
 
 def get_metrics_endpoint(event: Dict[str, Any]) -> Dict[str, Any]:
-    """Expose metrics in Prometheus format."""
-    metrics = get_metrics()
-    prometheus_text = metrics.get_prometheus_format()
+    """
+    Expose metrics in Prometheus format.
+    ?scope=pushed merges the deltas in METRICS_PUSH_DIR (push export mode); they
+    cover every container only if that directory is shared storage.
+    """
+    params = event.get('queryStringParameters') or {}
+    if params.get('scope') == 'pushed':
+        prometheus_text = render_prometheus(pushed_snapshot())
+    else:
+        metrics = get_metrics()
+        prometheus_text = metrics.get_prometheus_format()
     
     # Return as plain text for Prometheus
     return {
@@ -19,5 +28,3 @@ def get_metrics_endpoint(event: Dict[str, Any]) -> Dict[str, Any]:
         },
         'body': prometheus_text
     }
-
-
@@ -2,24 +2,36 @@
 import json
 from typing import Dict, Any
 
+from app.api.errors import handles_errors
 from app.services.note_service import note_service
-from app.core.response import success_response, error_response, get_origin
+from app.services.ingest_service import ingest_service
+from app.models.validation import ValidationError, parse_note_fields, parse_if_match
+from app.core.response import (
+    success_response, versioned_response, error_response, get_origin
+)
+from app.repositories.versioning import VersionConflict
 
 
+@handles_errors('Failed to create note', 400)
 def create_note(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
     """Create a new note."""
     try:
         body = json.loads(event.get('body') or '{}')
+        if ingest_service.enabled:
+            # Write-behind: queued durably, written to DynamoDB by the drainer
+            note_id = ingest_service.enqueue_note(user_id, body)
+            return success_response({'message': 'Note accepted', 'noteId': note_id}, get_origin(event), 202)
         note_id = note_service.create_note(user_id, body)
         return success_response(
             {'message': 'Note created successfully', 'noteId': note_id},
             get_origin(event),
             201
         )
-    except Exception as e:
-        return error_response(400, f'Failed to create note: {str(e)}', get_origin(event))
+    except ValidationError as e:
+        return error_response(400, 'Invalid note', get_origin(event), e.errors)
 
 
+@handles_errors('Failed to list notes')
 def list_notes(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
     """List notes with pagination."""
     try:
@@ -27,46 +39,85 @@ def list_notes(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
         limit = int(qs.get('limit', '50'))
         lek = qs.get('lastKey')
         last_key = json.loads(lek) if lek else None
+        fields = parse_note_fields(qs.get('fields'))
         
-        result = note_service.list_notes(user_id, limit, last_key)
+        result = note_service.list_notes(user_id, limit, last_key, fields)
         return success_response(result, get_origin(event))
-    except Exception as e:
-        return error_response(500, f'Failed to list notes: {str(e)}', get_origin(event))
+    except ValidationError as e:
+        return error_response(400, 'Invalid query', get_origin(event), e.errors)
 
 
+@handles_errors('Failed to list notes')
+async def list_notes_async(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """List notes with pagination (async path)."""
+    try:
+        qs = event.get('queryStringParameters') or {}
+        limit = int(qs.get('limit', '50'))
+        lek = qs.get('lastKey')
+        last_key = json.loads(lek) if lek else None
+        fields = parse_note_fields(qs.get('fields'))
+        
+        result = await note_service.list_notes_async(user_id, limit, last_key, fields)
+        return success_response(result, get_origin(event))
+    except ValidationError as e:
+        return error_response(400, 'Invalid query', get_origin(event), e.errors)
+
+
+@handles_errors('Failed to get note')
 def get_note(event: Dict[str, Any], user_id: str, note_id: str) -> Dict[str, Any]:
     """Get a single note by ID."""
-    try:
-        note = note_service.get_note(user_id, note_id)
-        if not note:
-            return error_response(404, 'Note not found', get_origin(event))
-        return success_response({'note': note}, get_origin(event))
-    except Exception as e:
-        return error_response(500, f'Failed to get note: {str(e)}', get_origin(event))
+    note = note_service.get_note(user_id, note_id)
+    if not note:
+        return error_response(404, 'Note not found', get_origin(event))
+    return versioned_response({'note': note}, note.get('version'), get_origin(event))
 
 
+@handles_errors('Failed to update note')
 def update_note(event: Dict[str, Any], user_id: str, note_id: str) -> Dict[str, Any]:
     """Update an existing note."""
     try:
         body = json.loads(event.get('body') or '{}')
-        updated = note_service.update_note(user_id, note_id, body)
+        expected_version = parse_if_match(event.get('headers'))
+        updated = note_service.update_note(user_id, note_id, body, expected_version)
         if not updated:
             return error_response(404, 'Note not found', get_origin(event))
-        return success_response(
+        return versioned_response(
             {'message': 'Note updated successfully', 'note': updated},
+            updated.get('version'),
             get_origin(event)
         )
-    except Exception as e:
-        return error_response(500, f'Failed to update note: {str(e)}', get_origin(event))
+    except ValidationError as e:
+        return error_response(400, 'Invalid note', get_origin(event), e.errors)
+    except VersionConflict as e:
+        return error_response(409, 'Note was changed by another request', get_origin(event),
+                              {'If-Match': f'note is at version {e.current}'})
 
 
+@handles_errors('Failed to delete note')
 def delete_note(event: Dict[str, Any], user_id: str, note_id: str) -> Dict[str, Any]:
     """Delete a note."""
-    try:
-        if not note_service.delete_note(user_id, note_id):
-            return error_response(404, 'Note not found', get_origin(event))
-        return success_response({'message': 'Note deleted successfully'}, get_origin(event))
-    except Exception as e:
-        return error_response(500, f'Failed to delete note: {str(e)}', get_origin(event))
+    if not note_service.delete_note(user_id, note_id):
+        return error_response(404, 'Note not found', get_origin(event))
+    return success_response({'message': 'Note deleted successfully'}, get_origin(event))
+
+
+@handles_errors('Failed to restore note')
+def restore_note(event: Dict[str, Any], user_id: str, note_id: str) -> Dict[str, Any]:
+    """Restore a deleted note."""
+    note = note_service.restore_note(user_id, note_id)
+    if not note:
+        return error_response(404, 'Deleted note not found', get_origin(event))
+    return success_response({'message': 'Note restored successfully', 'note': note}, get_origin(event))
 
 
+@handles_errors('Failed to search notes')
+def search_notes(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """Full-text search over notes."""
+    qs = event.get('queryStringParameters') or {}
+    query = (qs.get('q') or '').strip()
+    if not query:
+        return error_response(400, 'Query parameter q is required', get_origin(event))
+    limit = min(int(qs.get('limit', '20')), 100)
+    
+    result = note_service.search_notes(user_id, query, limit)
+    return success_response(result, get_origin(event))
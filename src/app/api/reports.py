@@ -1,21 +1,54 @@
 """Reports API controllers."""
 from typing import Dict, Any
 
+from app.api.errors import handles_errors
 from app.services.report_service import report_service
+from app.services.rollup_service import rollup_service
+from app.models.validation import ValidationError, parse_calendar_query
 from app.core.response import success_response, error_response, get_origin
 
 
+@handles_errors('Failed to generate report')
 def get_notes_summary(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
     """Get summary report of notes with filtering."""
+    qs = event.get('queryStringParameters') or {}
+    date_from = qs.get('from') or ""
+    date_to = qs.get('to') or ""
+    limit = int(qs.get('limit', '200'))
+    
+    result = report_service.get_notes_summary(user_id, date_from, date_to, limit)
+    return success_response(result, get_origin(event))
+
+
+@handles_errors('Failed to generate report')
+async def get_notes_summary_async(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """Get summary report of notes (async path; date ranges are read per month, a few at a time)."""
     try:
         qs = event.get('queryStringParameters') or {}
         date_from = qs.get('from') or ""
         date_to = qs.get('to') or ""
-        limit = int(qs.get('limit', '200'))
+        limit = max(1, int(qs.get('limit', '200')))
         
-        result = report_service.get_notes_summary(user_id, date_from, date_to, limit)
+        result = await report_service.get_notes_summary_async(user_id, date_from, date_to, limit)
         return success_response(result, get_origin(event))
-    except Exception as e:
-        return error_response(500, f'Failed to generate report: {str(e)}', get_origin(event))
+    except ValidationError as e:
+        return error_response(400, 'Invalid query', get_origin(event), e.errors)
+
+
+@handles_errors('Failed to generate report')
+def get_strategy_stats(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """Get per-strategy note statistics."""
+    result = report_service.get_strategy_stats(user_id)
+    return success_response(result, get_origin(event))
 
 
+@handles_errors('Failed to generate report')
+def get_calendar(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """Get day/week/month rollups, optionally for one strategy."""
+    try:
+        qs = event.get('queryStringParameters') or {}
+        granularity, date_from, date_to = parse_calendar_query(qs)
+        result = rollup_service.get_calendar(user_id, granularity, date_from, date_to, qs.get('strategyId'))
+        return success_response(result, get_origin(event))
+    except ValidationError as e:
+        return error_response(400, 'Invalid query', get_origin(event), e.errors)
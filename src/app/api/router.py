@@ -1,13 +1,32 @@
 """Route dispatcher for API Gateway events."""
+import asyncio
+import base64
 import time
 import json
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, NamedTuple, Optional, Tuple
 
 from app.core.auth import get_user_id_from_event
-from app.core.response import error_response, get_origin, cors_headers
-from app.core.metrics import get_metrics
+from app.core.response import (
+    error_response, throttled_response, rate_limited_response, get_origin, cors_headers
+)
+from app.core.metrics import get_metrics, set_route
+from app.core.metrics_export import metrics_exporter
+from app.core.tracing import start_trace, span
+from app.core.profiling import maybe_profile, profiled
 from app.core.health import get_health_status
-from app.api import notes, strategies, reports, metrics
+from app.api import notes, strategies, reports, metrics, export, dashboard
+from app.api.idempotency import with_idempotency
+from app.repositories.throttling import ThrottlingError
+from app.services.quota_service import quota_service
+
+
+class RouteTarget(NamedTuple):
+    """A validated, authenticated request ready for dispatch."""
+    path: str
+    http_method: str
+    user_id: Optional[str]
+    origin: str
+    route: str
 
 
 def extract_path_params(path: str) -> Tuple[str, Optional[str]]:
@@ -21,147 +40,304 @@ def extract_path_params(path: str) -> Tuple[str, Optional[str]]:
     return path, None
 
 
+def is_restore_path(path: str) -> bool:
+    """/v1/notes/{id}/restore or /v1/strategies/{id}/restore"""
+    parts = path.strip('/').split('/')
+    return len(parts) == 4 and parts[1] in ('notes', 'strategies') and parts[3] == 'restore'
+
+
 def route_request(event: Dict[str, Any]) -> Dict[str, Any]:
     """
     Route the request to appropriate handler.
     Returns response dict.
     """
-    start_time = time.time()
+    request_context = event.get('requestContext') or {}
+    with start_trace(
+        request_context.get('requestId'),
+        'route_request',
+        **{'http.method': event.get('httpMethod') or request_context.get('http', {}).get('method'),
+           'http.target': event.get('path') or event.get('rawPath')}
+    ) as root:
+        response = maybe_profile(event, lambda: _route_request(event))
+        root.set_attribute('http.status_code', response.get('statusCode', 500))
+        return response
+
+
+async def route_request_async(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Async variant of route_request.
+    Routes with async controllers run on the event loop (independent DynamoDB
+    calls fan out concurrently); all others run the sync controller in a thread.
+    """
+    request_context = event.get('requestContext') or {}
+    with start_trace(
+        request_context.get('requestId'),
+        'route_request',
+        **{'http.method': event.get('httpMethod') or request_context.get('http', {}).get('method'),
+           'http.target': event.get('path') or event.get('rawPath')}
+    ) as root, profiled(event):
+        response = await _route_request_async(event)
+        root.set_attribute('http.status_code', response.get('statusCode', 500))
+        return response
+
+
+def _route_request(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate, authenticate and dispatch a request, recording request metrics."""
+    start_ns = time.perf_counter_ns()
     metrics_collector = get_metrics()
-    is_error = False
+    metrics_exporter.ensure_started()
     
     try:
-        # Extract request details
-        http_method = event.get('httpMethod') or event.get('requestContext', {}).get('http', {}).get('method', 'GET')
-        path = event.get('path') or event.get('rawPath', '/')
-        origin = get_origin(event)
-        
-        # Handle CORS preflight requests
-        if http_method == 'OPTIONS':
-            return {
-                'statusCode': 200,
-                'headers': cors_headers(origin),
-                'body': ''
-            }
-        
-        # Define valid paths and their allowed methods
-        valid_paths = {
-            '/v1/health': ['GET'],
-            '/v1/metrics': ['GET'],
-            '/v1/notes': ['GET', 'POST'],
-            '/v1/strategies': ['GET', 'POST'],
-            '/v1/reports/notes-summary': ['GET']
-        }
-        
-        # Check if path is valid (exact match or starts with valid prefix)
-        is_valid_path = (
-            path in valid_paths or
-            path.startswith('/v1/notes/') or
-            path.startswith('/v1/strategies/')
-        )
-        
-        # Return 404 for invalid paths before authentication
-        if not is_valid_path:
-            return error_response(404, 'Not found', origin)
-        
-        # Check HTTP method for valid paths
-        if path in valid_paths:
-            allowed_methods = valid_paths[path]
-        elif path.startswith('/v1/notes/'):
-            allowed_methods = ['GET', 'PUT', 'PATCH', 'DELETE']
-        elif path.startswith('/v1/strategies/'):
-            allowed_methods = ['GET', 'PUT', 'PATCH', 'DELETE']
-        else:
-            allowed_methods = []
-        
-        if http_method not in allowed_methods:
-            return error_response(405, 'Method not allowed', origin)
-        
-        # Authentication (except for health and metrics endpoints)
-        user_id = None
-        if path not in ['/v1/health', '/v1/metrics']:
-            try:
-                user_id = get_user_id_from_event(event)
-            except PermissionError:
-                return error_response(401, 'Unauthorized', origin)
-            # Any other exception will propagate to outer try-except and return 500
+        early, target = _prepare(event)
+        if early is not None:
+            return early
         
         # Route to appropriate handler
-        if path == '/v1/health' and http_method == 'GET':
-            health_data = get_health_status()
-            response = {
-                'statusCode': 200,
-                'headers': cors_headers(origin),
-                'body': json.dumps(health_data)
-            }
-            return response
+        with span('handler', **{'http.route': target.route}):
+            response = _dispatch(event, target.path, target.http_method, target.user_id, target.origin)
         
-        # Notes routes
-        if path == '/v1/notes' and http_method == 'POST':
-            response = notes.create_note(event, user_id)
-        elif path == '/v1/notes' and http_method == 'GET':
-            response = notes.list_notes(event, user_id)
-        elif path.startswith('/v1/notes/') and http_method in ('GET', 'PUT', 'PATCH', 'DELETE'):
-            base_path, note_id = extract_path_params(path)
-            if not note_id:
-                response = error_response(400, 'Note ID required', origin)
-            elif http_method == 'GET':
-                response = notes.get_note(event, user_id, note_id)
-            elif http_method in ('PUT', 'PATCH'):
-                response = notes.update_note(event, user_id, note_id)
-            elif http_method == 'DELETE':
-                response = notes.delete_note(event, user_id, note_id)
-            else:
-                response = error_response(405, 'Method not allowed', origin)
+        # Record metrics
+        latency_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        metrics_collector.record_request(latency_ms, response.get('statusCode', 500) >= 400)
         
-        # Strategies routes
-        elif path == '/v1/strategies' and http_method == 'POST':
-            response = strategies.create_strategy(event, user_id)
-        elif path == '/v1/strategies' and http_method == 'GET':
-            response = strategies.list_strategies(event, user_id)
-        elif path.startswith('/v1/strategies/') and http_method in ('GET', 'PUT', 'PATCH', 'DELETE'):
-            base_path, strategy_id = extract_path_params(path)
-            if not strategy_id:
-                response = error_response(400, 'Strategy ID required', origin)
-            elif http_method == 'GET':
-                response = strategies.get_strategy(event, user_id, strategy_id)
-            elif http_method in ('PUT', 'PATCH'):
-                response = strategies.update_strategy(event, user_id, strategy_id)
-            elif http_method == 'DELETE':
-                response = strategies.delete_strategy(event, user_id, strategy_id)
-            else:
-                response = error_response(405, 'Method not allowed', origin)
+        return response
         
-        # Reports routes
-        elif path == '/v1/reports/notes-summary' and http_method == 'GET':
-            response = reports.get_notes_summary(event, user_id)
+    except ThrottlingError as e:
+        latency_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        metrics_collector.record_request(latency_ms, is_error=True)
+        return throttled_response(get_origin(event), e.retry_after)
+    except Exception as e:
+        # Record error metric
+        latency_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        metrics_collector.record_request(latency_ms, is_error=True)
         
-        # Metrics route (no auth required for monitoring)
-        elif path == '/v1/metrics' and http_method == 'GET':
-            response = metrics.get_metrics_endpoint(event)
+        # Return error response
+        return error_response(
+            500,
+            f'Internal server error: {str(e)}',
+            get_origin(event)
+        )
+
+
+async def _route_request_async(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Async counterpart of _route_request."""
+    start_ns = time.perf_counter_ns()
+    metrics_collector = get_metrics()
+    metrics_exporter.ensure_started()
+    
+    try:
+        early, target = _prepare(event)
+        if early is not None:
+            return early
         
-        # Not found
-        else:
-            response = error_response(404, 'Not found', origin)
-            is_error = True
+        with span('handler', **{'http.route': target.route}):
+            controller = ASYNC_CONTROLLERS.get((target.http_method, target.path))
+            if controller is not None:
+                response = await controller(event, target.user_id)
+            else:
+                response = await asyncio.to_thread(
+                    _dispatch, event, target.path, target.http_method, target.user_id, target.origin
+                )
         
-        # Record metrics
-        latency_ms = (time.time() - start_time) * 1000
-        status_code = response.get('statusCode', 500)
-        is_error = is_error or (status_code >= 400)
-        metrics_collector.record_request(latency_ms, is_error)
+        latency_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        metrics_collector.record_request(latency_ms, response.get('statusCode', 500) >= 400)
         
         return response
         
+    except ThrottlingError as e:
+        latency_ms = (time.perf_counter_ns() - start_ns) / 1e6
+        metrics_collector.record_request(latency_ms, is_error=True)
+        return throttled_response(get_origin(event), e.retry_after)
     except Exception as e:
-        # Record error metric
-        latency_ms = (time.time() - start_time) * 1000
+        latency_ms = (time.perf_counter_ns() - start_ns) / 1e6
         metrics_collector.record_request(latency_ms, is_error=True)
-        
-        # Return error response
         return error_response(
             500,
             f'Internal server error: {str(e)}',
             get_origin(event)
         )
 
+
+def _prepare(event: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[RouteTarget]]:
+    """
+    Validate the path and method and authenticate the caller.
+    Returns (early_response, None) or (None, target) for a request to dispatch.
+    """
+    # API Gateway base64-encodes request bodies when binary media types are enabled
+    if event.get('isBase64Encoded') and event.get('body'):
+        event['body'] = base64.b64decode(event['body']).decode('utf-8')
+        event['isBase64Encoded'] = False
+    
+    # Extract request details
+    http_method = event.get('httpMethod') or event.get('requestContext', {}).get('http', {}).get('method', 'GET')
+    path = event.get('path') or event.get('rawPath', '/')
+    origin = get_origin(event)
+    
+    # Handle CORS preflight requests
+    if http_method == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': cors_headers(origin),
+            'body': ''
+        }, None
+    
+    # Define valid paths and their allowed methods
+    valid_paths = {
+        '/v1/health': ['GET'],
+        '/v1/metrics': ['GET'],
+        '/v1/notes': ['GET', 'POST'],
+        '/v1/notes/search': ['GET'],
+        '/v1/strategies': ['GET', 'POST'],
+        '/v1/reports/notes-summary': ['GET'],
+        '/v1/reports/strategy-stats': ['GET'],
+        '/v1/reports/calendar': ['GET'],
+        '/v1/dashboard': ['GET'],
+        '/v1/export': ['GET']
+    }
+    
+    # Check if path is valid (exact match or starts with valid prefix)
+    is_valid_path = (
+        path in valid_paths or
+        path.startswith('/v1/notes/') or
+        path.startswith('/v1/strategies/')
+    )
+    
+    # Return 404 for invalid paths before authentication
+    if not is_valid_path:
+        return error_response(404, 'Not found', origin), None
+    
+    # Check HTTP method for valid paths
+    if path in valid_paths:
+        allowed_methods = valid_paths[path]
+    elif is_restore_path(path):
+        allowed_methods = ['POST']
+    elif path.startswith('/v1/notes/'):
+        allowed_methods = ['GET', 'PUT', 'PATCH', 'DELETE']
+    elif path.startswith('/v1/strategies/'):
+        allowed_methods = ['GET', 'PUT', 'PATCH', 'DELETE']
+    else:
+        allowed_methods = []
+    
+    if http_method not in allowed_methods:
+        return error_response(405, 'Method not allowed', origin), None
+    
+    # Label per-route metrics (DynamoDB capacity) with the route template, not the raw ID
+    base_path, resource_id = extract_path_params(path)
+    route = f"{http_method} {base_path}/{{id}}" if resource_id and path not in valid_paths else f"{http_method} {path}"
+    if is_restore_path(path):
+        route += '/restore'
+    set_route(route)
+    
+    # Authentication (except for health and metrics endpoints)
+    user_id = None
+    if path not in ['/v1/health', '/v1/metrics']:
+        try:
+            with span('auth'):
+                user_id = get_user_id_from_event(event)
+        except PermissionError:
+            return error_response(401, 'Unauthorized', origin), None
+        # Any other exception will propagate to outer try-except and return 500
+        
+        # Per-user rate limit and quota, before any controller work
+        retry_after = quota_service.check(user_id, route)
+        if retry_after is not None:
+            return rate_limited_response(origin, retry_after), None
+    
+    return None, RouteTarget(path, http_method, user_id, origin, route)
+
+
+def _dispatch(
+    event: Dict[str, Any],
+    path: str,
+    http_method: str,
+    user_id: Optional[str],
+    origin: str
+) -> Dict[str, Any]:
+    """Call the controller for an authenticated, validated route."""
+    if path == '/v1/health' and http_method == 'GET':
+        health_data = get_health_status()
+        response = {
+            'statusCode': 200,
+            'headers': cors_headers(origin),
+            'body': json.dumps(health_data)
+        }
+        return response
+    
+    # Notes routes
+    if path == '/v1/notes' and http_method == 'POST':
+        response = with_idempotency(event, user_id, notes.create_note)
+    elif path == '/v1/notes' and http_method == 'GET':
+        response = notes.list_notes(event, user_id)
+    elif path == '/v1/notes/search' and http_method == 'GET':
+        response = notes.search_notes(event, user_id)
+    elif is_restore_path(path) and http_method == 'POST':
+        base_path, resource_id = extract_path_params(path)
+        if base_path == '/v1/notes':
+            response = notes.restore_note(event, user_id, resource_id)
+        else:
+            response = strategies.restore_strategy(event, user_id, resource_id)
+    elif path.startswith('/v1/notes/') and http_method in ('GET', 'PUT', 'PATCH', 'DELETE'):
+        base_path, note_id = extract_path_params(path)
+        if not note_id:
+            response = error_response(400, 'Note ID required', origin)
+        elif http_method == 'GET':
+            response = notes.get_note(event, user_id, note_id)
+        elif http_method in ('PUT', 'PATCH'):
+            response = notes.update_note(event, user_id, note_id)
+        elif http_method == 'DELETE':
+            response = notes.delete_note(event, user_id, note_id)
+        else:
+            response = error_response(405, 'Method not allowed', origin)
+    
+    # Strategies routes
+    elif path == '/v1/strategies' and http_method == 'POST':
+        response = with_idempotency(event, user_id, strategies.create_strategy)
+    elif path == '/v1/strategies' and http_method == 'GET':
+        response = strategies.list_strategies(event, user_id)
+    elif path.startswith('/v1/strategies/') and http_method in ('GET', 'PUT', 'PATCH', 'DELETE'):
+        base_path, strategy_id = extract_path_params(path)
+        if not strategy_id:
+            response = error_response(400, 'Strategy ID required', origin)
+        elif http_method == 'GET':
+            response = strategies.get_strategy(event, user_id, strategy_id)
+        elif http_method in ('PUT', 'PATCH'):
+            response = strategies.update_strategy(event, user_id, strategy_id)
+        elif http_method == 'DELETE':
+            response = strategies.delete_strategy(event, user_id, strategy_id)
+        else:
+            response = error_response(405, 'Method not allowed', origin)
+    
+    # Reports routes
+    elif path == '/v1/reports/notes-summary' and http_method == 'GET':
+        response = reports.get_notes_summary(event, user_id)
+    elif path == '/v1/reports/strategy-stats' and http_method == 'GET':
+        response = reports.get_strategy_stats(event, user_id)
+    elif path == '/v1/reports/calendar' and http_method == 'GET':
+        response = reports.get_calendar(event, user_id)
+    
+    # Dashboard route
+    elif path == '/v1/dashboard' and http_method == 'GET':
+        response = dashboard.get_dashboard(event, user_id)
+    
+    # Export route
+    elif path == '/v1/export' and http_method == 'GET':
+        response = export.export_data(event, user_id)
+    
+    # Metrics route (no auth required for monitoring)
+    elif path == '/v1/metrics' and http_method == 'GET':
+        response = metrics.get_metrics_endpoint(event)
+    
+    # Not found
+    else:
+        response = error_response(404, 'Not found', origin)
+    
+    return response
+
+
+# Routes served by async controllers in route_request_async
+ASYNC_CONTROLLERS = {
+    ('GET', '/v1/notes'): notes.list_notes_async,
+    ('GET', '/v1/strategies'): strategies.list_strategies_async,
+    ('GET', '/v1/reports/notes-summary'): reports.get_notes_summary_async,
+    ('GET', '/v1/dashboard'): dashboard.get_dashboard_async,
+}
@@ -2,10 +2,16 @@
 import json
 from typing import Dict, Any
 
+from app.api.errors import handles_errors
 from app.services.strategy_service import strategy_service
-from app.core.response import success_response, error_response, get_origin
+from app.models.validation import ValidationError, parse_strategy_fields, parse_if_match
+from app.core.response import (
+    success_response, versioned_response, error_response, get_origin
+)
+from app.repositories.versioning import VersionConflict
 
 
+@handles_errors('Failed to create strategy', 400)
 def create_strategy(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
     """Create a new strategy."""
     try:
@@ -16,10 +22,11 @@ def create_strategy(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
             get_origin(event),
             201
         )
-    except Exception as e:
-        return error_response(400, f'Failed to create strategy: {str(e)}', get_origin(event))
+    except ValidationError as e:
+        return error_response(400, 'Invalid strategy', get_origin(event), e.errors)
 
 
+@handles_errors('Failed to list strategies')
 def list_strategies(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
     """List strategies with pagination."""
     try:
@@ -27,45 +34,76 @@ def list_strategies(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
         limit = int(qs.get('limit', '50'))
         lek = qs.get('lastKey')
         last_key = json.loads(lek) if lek else None
+        fields = parse_strategy_fields(qs.get('fields'))
         
-        result = strategy_service.list_strategies(user_id, limit, last_key)
+        result = strategy_service.list_strategies(user_id, limit, last_key, fields)
         return success_response(result, get_origin(event))
-    except Exception as e:
-        return error_response(500, f'Failed to list strategies: {str(e)}', get_origin(event))
+    except ValidationError as e:
+        return error_response(400, 'Invalid query', get_origin(event), e.errors)
 
 
+@handles_errors('Failed to list strategies')
+async def list_strategies_async(event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """List strategies with pagination (async path)."""
+    try:
+        qs = event.get('queryStringParameters') or {}
+        limit = int(qs.get('limit', '50'))
+        lek = qs.get('lastKey')
+        last_key = json.loads(lek) if lek else None
+        fields = parse_strategy_fields(qs.get('fields'))
+        
+        result = await strategy_service.list_strategies_async(user_id, limit, last_key, fields)
+        return success_response(result, get_origin(event))
+    except ValidationError as e:
+        return error_response(400, 'Invalid query', get_origin(event), e.errors)
+
+
+@handles_errors('Failed to get strategy')
 def get_strategy(event: Dict[str, Any], user_id: str, strategy_id: str) -> Dict[str, Any]:
     """Get a single strategy by ID."""
-    try:
-        strategy = strategy_service.get_strategy(user_id, strategy_id)
-        if not strategy:
-            return error_response(404, 'Strategy not found', get_origin(event))
-        return success_response({'strategy': strategy}, get_origin(event))
-    except Exception as e:
-        return error_response(500, f'Failed to get strategy: {str(e)}', get_origin(event))
+    strategy = strategy_service.get_strategy(user_id, strategy_id)
+    if not strategy:
+        return error_response(404, 'Strategy not found', get_origin(event))
+    return versioned_response({'strategy': strategy}, strategy.get('version'), get_origin(event))
 
 
+@handles_errors('Failed to update strategy')
 def update_strategy(event: Dict[str, Any], user_id: str, strategy_id: str) -> Dict[str, Any]:
     """Update an existing strategy."""
     try:
         body = json.loads(event.get('body') or '{}')
-        if not strategy_service.update_strategy(user_id, strategy_id, body):
+        expected_version = parse_if_match(event.get('headers'))
+        updated = strategy_service.update_strategy(user_id, strategy_id, body, expected_version)
+        if not updated:
             return error_response(404, 'Strategy not found', get_origin(event))
-        return success_response(
-            {'message': 'Strategy updated successfully'},
+        return versioned_response(
+            {'message': 'Strategy updated successfully', 'strategy': updated},
+            updated.get('version'),
             get_origin(event)
         )
-    except Exception as e:
-        return error_response(500, f'Failed to update strategy: {str(e)}', get_origin(event))
+    except ValidationError as e:
+        return error_response(400, 'Invalid strategy', get_origin(event), e.errors)
+    except VersionConflict as e:
+        return error_response(409, 'Strategy was changed by another request', get_origin(event),
+                              {'If-Match': f'strategy is at version {e.current}'})
 
 
+@handles_errors('Failed to delete strategy')
 def delete_strategy(event: Dict[str, Any], user_id: str, strategy_id: str) -> Dict[str, Any]:
     """Delete a strategy."""
-    try:
-        if not strategy_service.delete_strategy(user_id, strategy_id):
-            return error_response(404, 'Strategy not found', get_origin(event))
-        return success_response({'message': 'Strategy deleted successfully'}, get_origin(event))
-    except Exception as e:
-        return error_response(500, f'Failed to delete strategy: {str(e)}', get_origin(event))
+    if not strategy_service.delete_strategy(user_id, strategy_id):
+        return error_response(404, 'Strategy not found', get_origin(event))
+    return success_response({'message': 'Strategy deleted successfully'}, get_origin(event))
+
+
+@handles_errors('Failed to restore strategy')
+def restore_strategy(event: Dict[str, Any], user_id: str, strategy_id: str) -> Dict[str, Any]:
+    """Restore a deleted strategy."""
+    strategy = strategy_service.restore_strategy(user_id, strategy_id)
+    if not strategy:
+        return error_response(404, 'Deleted strategy not found', get_origin(event))
+    return success_response(
+        {'message': 'Strategy restored successfully', 'strategy': strategy}, get_origin(event)
+    )
 
 
@@ -0,0 +1,24 @@
+"""Event loop management for the async request path."""
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional
+
+
+# One loop per container, reused across warm invocations so async clients
+# (and their connection pools) bound to it stay valid.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        with _loop_lock:
+            if _loop is None or _loop.is_closed():
+                _loop = asyncio.new_event_loop()
+    return _loop
+
+
+def run(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine to completion on the container's event loop."""
+    return get_loop().run_until_complete(coro)
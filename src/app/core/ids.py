@@ -0,0 +1,122 @@
+"""
+Lexicographically sortable IDs (ULIDs).
+
+A ULID is a 48-bit millisecond timestamp followed by 80 random bits, written
+as 26 Crockford base32 characters, so IDs sort by creation time as strings.
+DynamoDB sort keys built from them (NOTE#{id}, STRAT#{id}) keep that order.
+
+This implementation is monotonic: an ID generated in the same millisecond as
+the previous one (or after the clock stepped back) reuses that timestamp and
+increments the random part, so IDs from one container never sort before
+earlier ones. Random bits are read from os.urandom in batches, and encoding
+uses a 10-bit lookup table (13 lookups per ID).
+
+The generator is created once at import. After a fork the child would repeat
+the parent's buffered bytes and counter, so reseed() discards them; it runs
+automatically in forked children and should be called after anything else
+that clones the process (e.g. restoring a snapshot).
+
+- generate_id(prefix) / generate_ids(prefix, n): "{prefix}-{ULID}"
+- new_ulid() / new_ulids(n): bare ULIDs; the bulk forms take the lock once
+"""
+import os
+import threading
+import time
+from typing import Callable, List
+
+
+_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+# Every 10-bit value as two base32 characters
+_PAIRS = tuple(a + b for a in _ALPHABET for b in _ALPHABET)
+_SHIFTS = tuple(range(120, -1, -10))
+
+RANDOM_BYTES = 10
+_RANDOM_MAX = (1 << (RANDOM_BYTES * 8)) - 1
+# Random bytes read per os.urandom call (256 IDs' worth)
+POOL_BYTES = RANDOM_BYTES * 256
+
+
+def encode(value: int) -> str:
+    """128-bit integer -> 26-character ULID string."""
+    return ''.join([_PAIRS[(value >> shift) & 0x3FF] for shift in _SHIFTS])
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+class MonotonicULID:
+    """Thread-safe monotonic ULID generator."""
+
+    def __init__(
+        self,
+        clock: Callable[[], int] = _now_ms,
+        urandom: Callable[[int], bytes] = os.urandom
+    ):
+        self._clock = clock
+        self._urandom = urandom
+        self._lock = threading.Lock()
+        self._pool = b''
+        self._offset = 0
+        self._last_ms = -1
+        self._last_random = 0
+
+    def _random(self) -> int:
+        if self._offset + RANDOM_BYTES > len(self._pool):
+            self._pool = self._urandom(POOL_BYTES)
+            self._offset = 0
+        start = self._offset
+        self._offset = start + RANDOM_BYTES
+        return int.from_bytes(self._pool[start:self._offset], 'big')
+
+    def _next(self) -> int:
+        # Caller holds the lock
+        ms = self._clock()
+        if ms <= self._last_ms:
+            ms = self._last_ms
+            rand = self._last_random + 1
+            if rand > _RANDOM_MAX:
+                # 2**80 IDs in one millisecond: borrow the next one
+                ms += 1
+                rand = self._random()
+        else:
+            rand = self._random()
+        self._last_ms, self._last_random = ms, rand
+        return (ms << 80) | rand
+
+    def new(self) -> str:
+        with self._lock:
+            value = self._next()
+        return encode(value)
+
+    def new_many(self, n: int) -> List[str]:
+        """n IDs in ascending order."""
+        with self._lock:
+            values = [self._next() for _ in range(n)]
+        return [encode(v) for v in values]
+
+    def reseed(self) -> None:
+        """Drop buffered random bytes and restart the counter from fresh randomness."""
+        with self._lock:
+            self._pool = b''
+            self._offset = 0
+            self._last_random = self._random()
+
+
+_generator = MonotonicULID()
+new_ulid = _generator.new
+new_ulids = _generator.new_many
+reseed = _generator.reseed
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=reseed)
+
+
+def generate_id(prefix: str) -> str:
+    """Generate a unique, time-sortable ID with a prefix."""
+    return f'{prefix}-{_generator.new()}'
+
+
+def generate_ids(prefix: str, n: int) -> List[str]:
+    """Generate n IDs at once (e.g. for imports), in ascending order."""
+    return [f'{prefix}-{u}' for u in _generator.new_many(n)]
@@ -1,24 +1,115 @@
 """Metrics collection for Prometheus monitoring."""
-from typing import Dict, Any
+import bisect
+import threading
+import uuid
+from contextvars import ContextVar
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime, timezone
 
 
+# Histogram bucket upper bounds in seconds (+Inf is implicit)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Identifies this container's contribution when snapshots are merged
+CONTAINER_ID = uuid.uuid4().hex[:12]
+
+
+def reset_container_id() -> str:
+    """Pick a new CONTAINER_ID (each process restored from one snapshot is its own container)."""
+    global CONTAINER_ID
+    CONTAINER_ID = uuid.uuid4().hex[:12]
+    return CONTAINER_ID
+
+# Route template of the request being handled (label for per-route metrics)
+_current_route: ContextVar[str] = ContextVar('metrics_route', default='none')
+
+
+def set_route(route: str):
+    """Set the route label for metrics recorded in this context."""
+    return _current_route.set(route)
+
+
+def current_route() -> str:
+    return _current_route.get()
+
+
+def label_key(labels: Optional[Dict[str, str]]) -> str:
+    """Canonical Prometheus label string, e.g. 'op="query",table="x"'."""
+    if not labels:
+        return ''
+    return ','.join(f'{k}="{labels[k]}"' for k in sorted(labels))
+
+
 class MetricsCollector:
     """Simple metrics collector for request tracking."""
-    
+
     def __init__(self):
         self.request_count = 0
         self.error_count = 0
         self.total_latency_ms = 0.0
         self.start_time = datetime.now(timezone.utc)
-    
+        # name -> label key -> value
+        self.counters: Dict[str, Dict[str, float]] = {}
+        # name -> label key -> {'bounds', 'buckets', 'sum', 'count'}
+        self.histograms: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
     def record_request(self, latency_ms: float, is_error: bool = False):
         """Record a request with its latency."""
-        self.request_count += 1
-        self.total_latency_ms += latency_ms
-        if is_error:
-            self.error_count += 1
-    
+        with self._lock:
+            self.request_count += 1
+            self.total_latency_ms += latency_ms
+            if is_error:
+                self.error_count += 1
+        self.observe('request_latency_seconds', latency_ms / 1000.0)
+
+    def inc(self, name: str, value: float = 1, labels: Optional[Dict[str, str]] = None):
+        """Add to a (labelled) counter."""
+        key = label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: Optional[Dict[str, str]] = None,
+        bounds: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        """Record an observation in a (labelled) histogram."""
+        key = label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {
+                    'bounds': list(bounds), 'buckets': [0] * (len(bounds) + 1), 'sum': 0.0, 'count': 0
+                }
+            hist['buckets'][bisect.bisect_left(hist['bounds'], value)] += 1
+            hist['sum'] += value
+            hist['count'] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative counters and histograms as plain data (for export and merging)."""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self.counters.items()}
+            counters['requests_total'] = {'': self.request_count}
+            counters['errors_total'] = {'': self.error_count}
+            histograms = {
+                name: {
+                    key: {'bounds': list(h['bounds']), 'buckets': list(h['buckets']), 'sum': h['sum'], 'count': h['count']}
+                    for key, h in series.items()
+                }
+                for name, series in self.histograms.items()
+            }
+        return {
+            'container_id': CONTAINER_ID,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'counters': counters,
+            'histograms': histograms,
+        }
+
     def get_metrics(self) -> Dict[str, Any]:
         """Get current metrics in Prometheus-compatible format."""
         avg_latency = (
@@ -26,11 +117,11 @@ class MetricsCollector:
             if self.request_count > 0
             else 0.0
         )
-        
+
         uptime_seconds = (
             datetime.now(timezone.utc) - self.start_time
         ).total_seconds()
-        
+
         return {
             'requests_total': self.request_count,
             'errors_total': self.error_count,
@@ -42,18 +133,123 @@ class MetricsCollector:
                 else 0.0
             )
         }
-    
+
     def get_prometheus_format(self) -> str:
         """Get metrics in Prometheus text format."""
         metrics = self.get_metrics()
-        lines = []
-        
-        for key, value in metrics.items():
-            lines.append(f"# HELP {key} {key.replace('_', ' ').title()}")
-            lines.append(f"# TYPE {key} gauge")
-            lines.append(f"{key} {value}")
-        
-        return "\n".join(lines)
+        gauges = {
+            key: value for key, value in metrics.items()
+            if key not in ('requests_total', 'errors_total')
+        }
+        return render_prometheus(self.snapshot(), gauges)
+
+
+def diff_snapshots(current: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per-series increase from previous to current (both from the same container)."""
+    prev_counters = (previous or {}).get('counters', {})
+    prev_hists = (previous or {}).get('histograms', {})
+    counters = {}
+    for name, series in current['counters'].items():
+        delta = {k: v - prev_counters.get(name, {}).get(k, 0) for k, v in series.items()}
+        delta = {k: v for k, v in delta.items() if v}
+        if delta:
+            counters[name] = delta
+    histograms = {}
+    for name, series in current['histograms'].items():
+        out = {}
+        for key, h in series.items():
+            p = prev_hists.get(name, {}).get(key)
+            count = h['count'] - (p['count'] if p else 0)
+            if not count:
+                continue
+            out[key] = {
+                'bounds': h['bounds'],
+                'buckets': [b - (p['buckets'][i] if p else 0) for i, b in enumerate(h['buckets'])],
+                'sum': h['sum'] - (p['sum'] if p else 0.0),
+                'count': count,
+            }
+        if out:
+            histograms[name] = out
+    return {
+        'container_id': current['container_id'],
+        'timestamp': current['timestamp'],
+        'counters': counters,
+        'histograms': histograms,
+    }
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Sum deltas from any number of containers into global totals.
+    Histograms merge bucket-wise, so they must share bucket bounds.
+    """
+    counters: Dict[str, Dict[str, float]] = {}
+    histograms: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    containers = set()
+    for snap in snapshots:
+        # Compacted files list the containers they merged
+        containers.update(snap.get('container_ids') or [snap.get('container_id')])
+        for name, series in snap.get('counters', {}).items():
+            merged = counters.setdefault(name, {})
+            for key, value in series.items():
+                merged[key] = merged.get(key, 0) + value
+        for name, series in snap.get('histograms', {}).items():
+            merged = histograms.setdefault(name, {})
+            for key, h in series.items():
+                m = merged.get(key)
+                if m is None:
+                    merged[key] = {
+                        'bounds': list(h['bounds']), 'buckets': list(h['buckets']),
+                        'sum': h['sum'], 'count': h['count']
+                    }
+                    continue
+                if m['bounds'] != list(h['bounds']):
+                    raise ValueError(f'Histogram {name}{{{key}}} has mismatched bucket bounds')
+                m['buckets'] = [a + b for a, b in zip(m['buckets'], h['buckets'])]
+                m['sum'] += h['sum']
+                m['count'] += h['count']
+    return {
+        'container_id': 'global',
+        'containers': len(containers),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'counters': counters,
+        'histograms': histograms,
+    }
+
+
+def _series(name: str, key: str, extra: str = '') -> str:
+    labels = ','.join(part for part in (key, extra) if part)
+    return f'{name}{{{labels}}}' if labels else name
+
+
+def render_prometheus(snapshot: Dict[str, Any], gauges: Optional[Dict[str, Any]] = None) -> str:
+    """Render a snapshot (local or merged) in Prometheus text format."""
+    lines: List[str] = []
+
+    for key, value in (gauges or {}).items():
+        lines.append(f"# HELP {key} {key.replace('_', ' ').title()}")
+        lines.append(f"# TYPE {key} gauge")
+        lines.append(f"{key} {value}")
+
+    for name in sorted(snapshot.get('counters', {})):
+        lines.append(f"# HELP {name} {name.replace('_', ' ').title()}")
+        lines.append(f"# TYPE {name} counter")
+        for key, value in sorted(snapshot['counters'][name].items()):
+            lines.append(f"{_series(name, key)} {value}")
+
+    for name in sorted(snapshot.get('histograms', {})):
+        lines.append(f"# HELP {name} {name.replace('_', ' ').title()}")
+        lines.append(f"# TYPE {name} histogram")
+        for key, h in sorted(snapshot['histograms'][name].items()):
+            cumulative = 0
+            for bound, count in zip(h['bounds'] + ['+Inf'], h['buckets']):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{_series(name + '_bucket', key, le)} {cumulative}")
+            lines.append(f"{_series(name + '_sum', key)} {h['sum']}")
+            lines.append(f"{_series(name + '_count', key)} {h['count']}")
+
+    return "\n".join(lines)
 
 
 # Global metrics instance (shared across Lambda invocations in same container)
@@ -63,5 +259,3 @@ _metrics = MetricsCollector()
 def get_metrics() -> MetricsCollector:
     """Get the global metrics collector instance."""
     return _metrics
-
-
@@ -0,0 +1,239 @@
+"""
+Cross-container metrics export.
+
+Each Lambda container only sees its own counters, so a Prometheus scrape of
+/v1/metrics is a random sample. With METRICS_EXPORT_MODE set, a background
+thread periodically flushes this container's deltas:
+
+- emf:  one CloudWatch Embedded Metric Format line on stdout per flush
+- push: one JSON delta per flush, POSTed to METRICS_PUSH_URL or written to
+        METRICS_PUSH_DIR (a push-gateway stand-in)
+
+merge_snapshots() then sums the deltas from every container into global
+counters and histograms (see load_pushed_snapshots and scripts/merge_metrics.py).
+
+METRICS_PUSH_DIR defaults to /tmp, which each Lambda container has to itself;
+it only collects every container's deltas when it is shared storage (an EFS
+mount, say). Delta files older than METRICS_PUSH_COMPACT_AGE_SECONDS are
+folded into one compacted file by the exporters, so readers open a bounded
+number of files while the totals stay the same.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from app.core.metrics import MetricsCollector, get_metrics, diff_snapshots, merge_snapshots
+
+logger = logging.getLogger(__name__)
+
+EXPORT_MODES = ('off', 'emf', 'push')
+DEFAULT_FLUSH_INTERVAL_SECONDS = 10.0
+DEFAULT_PUSH_COMPACT_AGE_SECONDS = 300
+# A compaction lock older than this belongs to a process that died
+COMPACT_LOCK_STALE_SECONDS = 60
+EMF_NAMESPACE = 'MyTraderPal'
+
+
+def push_dir() -> str:
+    return os.getenv('METRICS_PUSH_DIR', os.path.join(tempfile.gettempdir(), 'mtp-metrics'))
+
+
+def to_emf(delta: Dict[str, Any], namespace: str = EMF_NAMESPACE) -> Dict[str, Any]:
+    """
+    Build an EMF log record for a delta.
+    Unlabelled counters become CloudWatch metrics; the full delta (labelled
+    series and histogram buckets) rides along under 'mtp_delta' for merging.
+    """
+    ts = int(datetime.fromisoformat(delta['timestamp']).timestamp() * 1000)
+    record: Dict[str, Any] = {'ContainerId': delta['container_id'], 'mtp_delta': delta}
+    metrics = []
+    for name, series in delta['counters'].items():
+        if '' in series:
+            record[name] = series['']
+            metrics.append({'Name': name, 'Unit': 'Count'})
+    for name, series in delta['histograms'].items():
+        if '' in series and name.endswith('_seconds'):
+            h = series['']
+            record[f'{name}_avg_ms'] = h['sum'] / h['count'] * 1000.0
+            metrics.append({'Name': f'{name}_avg_ms', 'Unit': 'Milliseconds'})
+    record['_aws'] = {
+        'Timestamp': ts,
+        'CloudWatchMetrics': [{'Namespace': namespace, 'Dimensions': [[]], 'Metrics': metrics}],
+    }
+    return record
+
+
+def parse_emf_lines(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Extract deltas from log lines, skipping anything that is not an MTP EMF record."""
+    for line in lines:
+        start = line.find('{')
+        if start < 0:
+            continue
+        try:
+            record = json.loads(line[start:])
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict) and 'mtp_delta' in record:
+            yield record['mtp_delta']
+
+
+def compact_age_seconds() -> float:
+    return float(os.getenv('METRICS_PUSH_COMPACT_AGE_SECONDS', str(DEFAULT_PUSH_COMPACT_AGE_SECONDS)))
+
+
+def load_pushed_snapshots(directory: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read every delta (and compacted file) in the push directory."""
+    directory = directory or push_dir()
+    if not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            try:
+                with open(os.path.join(directory, name)) as f:
+                    snapshots.append(json.load(f))
+            except FileNotFoundError:
+                pass  # folded into a compacted file since the listing
+    return snapshots
+
+
+def pushed_snapshot(directory: Optional[str] = None) -> Dict[str, Any]:
+    """Merge the deltas in the push directory into totals."""
+    return merge_snapshots(load_pushed_snapshots(directory))
+
+
+def compact_pushed_snapshots(directory: Optional[str] = None, max_age_seconds: Optional[float] = None) -> int:
+    """
+    Fold the files in the push directory older than max_age_seconds into one
+    compacted file. Returns the number of files folded (0 if there was nothing
+    to do or another process is compacting).
+    """
+    directory = directory or push_dir()
+    max_age = compact_age_seconds() if max_age_seconds is None else max_age_seconds
+    lock = os.path.join(directory, '.compact.lock')
+    try:
+        if time.time() - os.path.getmtime(lock) > COMPACT_LOCK_STALE_SECONDS:
+            os.remove(lock)
+    except FileNotFoundError:
+        pass
+    try:
+        os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        return 0
+    try:
+        # A compaction that died after removing its inputs left its result here
+        for name in os.listdir(directory):
+            if name.startswith('.compacted-') and name.endswith('.tmp'):
+                os.replace(os.path.join(directory, name), os.path.join(directory, name[1:-len('.tmp')]))
+        cutoff = time.time() - max_age
+        paths = [
+            os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.endswith('.json') and os.path.getmtime(os.path.join(directory, name)) < cutoff
+        ]
+        if len(paths) < 2:
+            return 0
+        snapshots = []
+        for path in paths:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        merged = merge_snapshots(snapshots)
+        merged['container_id'] = 'compacted'
+        merged['container_ids'] = sorted({
+            cid for snap in snapshots for cid in snap.get('container_ids') or [snap.get('container_id')]
+        })
+        name = f'compacted-{int(time.time() * 1000)}-{uuid.uuid4().hex[:6]}.json'
+        tmp = os.path.join(directory, f'.{name}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(merged, f)
+        # Remove the inputs before publishing, so a reader never counts a delta twice
+        for path in paths:
+            os.remove(path)
+        os.replace(tmp, os.path.join(directory, name))
+        return len(paths)
+    finally:
+        os.remove(lock)
+
+
+class MetricsExporter:
+    """Flushes per-container metric deltas on a background thread."""
+
+    def __init__(self, collector: Optional[MetricsCollector] = None):
+        self.collector = collector or get_metrics()
+        self._last: Optional[Dict[str, Any]] = None
+        self._seq = 0
+        self._compacted_at = time.time()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def mode(self) -> str:
+        mode = os.getenv('METRICS_EXPORT_MODE', 'off').lower()
+        return mode if mode in EXPORT_MODES else 'off'
+
+    def ensure_started(self) -> None:
+        """Start the flush thread once (cheap no-op afterwards or when export is off)."""
+        if self._thread is not None or self.mode == 'off':
+            return
+        with self._flush_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='metrics-exporter', daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        interval = float(os.getenv('METRICS_FLUSH_INTERVAL_SECONDS', str(DEFAULT_FLUSH_INTERVAL_SECONDS)))
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception:  # never let the exporter thread die
+                logger.exception('Metrics flush failed')
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Emit the delta since the previous flush. Returns it, or None if nothing changed."""
+        mode = self.mode
+        if mode == 'off':
+            return None
+        with self._flush_lock:
+            current = self.collector.snapshot()
+            delta = diff_snapshots(current, self._last)
+            if not delta['counters'] and not delta['histograms']:
+                return None
+            if mode == 'emf':
+                # Lambda forwards stdout to CloudWatch Logs, which extracts EMF records
+                print(json.dumps(to_emf(delta)), flush=True)
+            else:
+                self._push(delta)
+            self._last = current
+            self._seq += 1
+            return delta
+
+    def _push(self, delta: Dict[str, Any]) -> None:
+        body = json.dumps(delta).encode('utf-8')
+        url = os.getenv('METRICS_PUSH_URL')
+        if url:
+            request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request, timeout=2):
+                pass
+            return
+        directory = push_dir()
+        os.makedirs(directory, exist_ok=True)
+        name = f"{delta['container_id']}-{int(time.time() * 1000)}-{self._seq:06d}-{uuid.uuid4().hex[:6]}.json"
+        # Write then rename so readers never see a partial file
+        tmp = os.path.join(directory, f'.{name}.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(body)
+        os.replace(tmp, os.path.join(directory, name))
+        if time.time() - self._compacted_at >= compact_age_seconds():
+            self._compacted_at = time.time()
+            compact_pushed_snapshots(directory)
+
+
+# Exporter for the global metrics collector
+metrics_exporter = MetricsExporter()
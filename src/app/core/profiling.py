@@ -0,0 +1,184 @@
+"""
+Opt-in sampling profiler for warm containers.
+
+A daemon thread samples the request thread's stack with sys._current_frames()
+every PROFILING_INTERVAL_MS and counts collapsed stacks, the input format of
+flamegraph.pl / speedscope ("frame;frame;frame count").
+
+A request is profiled when either:
+- PROFILING_MODE=on, sampled at PROFILING_SAMPLE_RATE (default 1.0), or
+- it carries a valid X-MTP-Profile header, "rate=<0..1>;exp=<epoch>;sig=<hex>"
+  where sig is HMAC-SHA256(PROFILING_SECRET, "<rate>:<exp>") (see
+  scripts/profile_header.py). Without PROFILING_SECRET the header is ignored.
+
+Profiles are written to logs (PROFILING_OUTPUT=log) or as .folded files in
+PROFILING_DIR (default, /tmp/mtp-profiles).
+"""
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+PROFILE_HEADER = 'x-mtp-profile'
+DEFAULT_INTERVAL_MS = 5.0
+MAX_STACK_DEPTH = 128
+
+
+def profile_dir() -> str:
+    return os.getenv('PROFILING_DIR', os.path.join(tempfile.gettempdir(), 'mtp-profiles'))
+
+
+def sign_profile_header(secret: str, rate: float, expires: int) -> str:
+    """Build an X-MTP-Profile header value."""
+    payload = f'{rate}:{expires}'
+    sig = hmac.new(secret.encode('utf-8'), payload.encode('utf-8'), hashlib.sha256).hexdigest()
+    return f'rate={rate};exp={expires};sig={sig}'
+
+
+def header_sample_rate(event: Dict[str, Any]) -> Optional[float]:
+    """Sampling rate from a valid, unexpired X-MTP-Profile header, else None."""
+    secret = os.getenv('PROFILING_SECRET')
+    if not secret:
+        return None
+    value = None
+    for k, v in (event.get('headers') or {}).items():
+        if k.lower() == PROFILE_HEADER:
+            value = v
+            break
+    if not value:
+        return None
+    try:
+        fields = dict(part.split('=', 1) for part in value.split(';'))
+        rate, expires, sig = fields['rate'], fields['exp'], fields['sig']
+        if int(expires) < time.time():
+            return None
+    except (KeyError, ValueError):
+        return None
+    expected = hmac.new(secret.encode('utf-8'), f'{rate}:{expires}'.encode('utf-8'), hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, sig):
+        return None
+    try:
+        return min(max(float(rate), 0.0), 1.0)
+    except ValueError:
+        return None
+
+
+def sample_rate_for(event: Dict[str, Any]) -> float:
+    """Effective probability of profiling this request."""
+    rate = header_sample_rate(event)
+    if rate is not None:
+        return rate
+    if os.getenv('PROFILING_MODE', 'off').lower() == 'on':
+        return min(max(float(os.getenv('PROFILING_SAMPLE_RATE', '1.0')), 0.0), 1.0)
+    return 0.0
+
+
+def _frame_label(code) -> str:
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)})"
+
+
+class SamplingProfiler:
+    """Statistical profiler for one thread."""
+
+    def __init__(self, interval_ms: float = DEFAULT_INTERVAL_MS, thread_id: Optional[int] = None):
+        self.interval = interval_ms / 1000.0
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[Any, str] = {}
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        labels = self._labels
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            label = labels.get(code)
+            if label is None:
+                label = labels[code] = _frame_label(code)
+            stack.append(label)
+            frame = frame.f_back
+        stack.reverse()
+        self.stacks[';'.join(stack)] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> 'SamplingProfiler':
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> 'SamplingProfiler':
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def collapsed(self) -> str:
+        """Collapsed-stack text, hottest stacks first."""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+
+def write_profile(profiler: SamplingProfiler, route: str, duration_ms: float) -> Optional[str]:
+    """Emit a finished profile; returns the file path in dir mode."""
+    if not profiler.samples:
+        return None
+    if os.getenv('PROFILING_OUTPUT', 'dir').lower() == 'log':
+        print(json.dumps({
+            'profile': route, 'samples': profiler.samples,
+            'durationMs': round(duration_ms, 3), 'collapsed': profiler.collapsed()
+        }), flush=True)
+        return None
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'request'
+    path = os.path.join(directory, f'{slug}-{time.time_ns()}.folded')
+    with open(path, 'w') as f:
+        f.write(profiler.collapsed() + '\n')
+    return path
+
+
+@contextmanager
+def profiled(event: Dict[str, Any]) -> Iterator[Optional[SamplingProfiler]]:
+    """Profile the enclosed block if this request is selected (yields the profiler or None)."""
+    rate = sample_rate_for(event)
+    if rate <= 0.0 or random.random() >= rate:
+        yield None
+        return
+
+    interval = float(os.getenv('PROFILING_INTERVAL_MS', str(DEFAULT_INTERVAL_MS)))
+    profiler = SamplingProfiler(interval).start()
+    start_ns = time.perf_counter_ns()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        method = event.get('httpMethod') or (event.get('requestContext') or {}).get('http', {}).get('method', '')
+        route = f"{method} {event.get('path') or event.get('rawPath', '/')}"
+        try:
+            write_profile(profiler, route, (time.perf_counter_ns() - start_ns) / 1e6)
+        except OSError as e:
+            print(f'profile write failed: {e}', file=sys.stderr)
+
+
+def maybe_profile(event: Dict[str, Any], func: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Run func under the sampling profiler if this request is selected."""
+    with profiled(event):
+        return func()
@@ -0,0 +1,86 @@
+"""
+Token-bucket rate limiting.
+
+A TokenBucket refills at `rate` tokens per second up to `capacity`. Two ways
+to spend:
+
+- try_acquire(n): take n tokens if they are available now (non-blocking)
+- acquire(n): take n tokens, going into debt if needed, and sleep until the
+  balance is back to zero. This suits pay-after accounting where the cost is
+  only known once the call has happened (e.g. DynamoDB ConsumedCapacity).
+
+set_rate() changes the rate (and capacity) in place, for adaptive limiters.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """Thread-safe token bucket."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float) -> None:
+        """Change the refill rate; capacity follows it (one second's worth)."""
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        with self._lock:
+            self._refill()
+            self.rate = self.capacity = float(rate)
+            self._tokens = min(self._tokens, self.capacity)
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self, n: float = 1) -> bool:
+        """Take n tokens if available; never blocks."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= n:
+                self._tokens -= n
+                return True
+            return False
+
+    def wait_time(self, n: float = 1) -> float:
+        """Seconds until n tokens would be available (0 if they are now)."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (n - self._tokens) / self.rate)
+
+    def reserve(self, n: float = 1) -> float:
+        """Take n tokens (possibly into debt) without waiting; returns seconds until the balance is non-negative."""
+        with self._lock:
+            self._refill()
+            self._tokens -= n
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, n: float = 1) -> float:
+        """Take n tokens (possibly into debt) and block until the balance is non-negative; returns seconds waited."""
+        wait = self.reserve(n)
+        if wait:
+            self._sleep(wait)
+        return wait
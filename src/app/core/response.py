@@ -1,7 +1,13 @@
 """Response utilities for Lambda handler."""
+import base64
+import gzip
 import json
+import math
+import os
 from decimal import Decimal
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
+
+from app.core.tracing import span
 
 
 def decimal_default(obj: Any) -> Any:
@@ -33,7 +39,7 @@ def cors_headers(origin: Optional[str] = None) -> Dict[str, str]:
         'Content-Type': 'application/json',
         'Access-Control-Allow-Origin': origin,
         'Access-Control-Allow-Methods': 'GET, POST, PUT, PATCH, DELETE, OPTIONS',
-        'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-MTP-Dev-User'
+        'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-MTP-Dev-User, Idempotency-Key, If-Match'
     }
     
     # Add credentials header if origin is not wildcard
@@ -49,22 +55,118 @@ def success_response(
     status_code: int = 200
 ) -> Dict[str, Any]:
     """Create a successful HTTP response."""
+    with span('serialize'):
+        payload = json.dumps(body, default=decimal_default)
     return {
         'statusCode': status_code,
         'headers': cors_headers(origin),
-        'body': json.dumps(body, default=decimal_default)
+        'body': payload
     }
 
 
+def versioned_response(
+    body: Dict[str, Any],
+    version: Optional[int],
+    origin: Optional[str] = None,
+    status_code: int = 200
+) -> Dict[str, Any]:
+    """success_response with an ETag carrying the item version (for If-Match)."""
+    response = success_response(body, origin, status_code)
+    if version is not None:
+        response['headers']['ETag'] = f'"{version}"'
+        response['headers']['Access-Control-Expose-Headers'] = 'ETag'
+    return response
+
+
 def error_response(
     status_code: int,
     message: str,
-    origin: Optional[str] = None
+    origin: Optional[str] = None,
+    errors: Optional[Dict[str, str]] = None
 ) -> Dict[str, Any]:
-    """Create an error HTTP response."""
+    """Create an error HTTP response (with optional per-field errors)."""
+    body = {'message': message}
+    if errors:
+        body['errors'] = errors
     return {
         'statusCode': status_code,
         'headers': cors_headers(origin),
-        'body': json.dumps({'message': message})
+        'body': json.dumps(body)
     }
 
+
+def retry_later_response(
+    status_code: int,
+    message: str,
+    origin: Optional[str] = None,
+    retry_after: float = 1.0
+) -> Dict[str, Any]:
+    """Error response with a Retry-After header (whole seconds, at least 1)."""
+    response = error_response(status_code, message, origin)
+    response['headers']['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    # Not a CORS-safelisted response header
+    response['headers']['Access-Control-Expose-Headers'] = 'Retry-After'
+    return response
+
+
+def throttled_response(origin: Optional[str] = None, retry_after: float = 1.0) -> Dict[str, Any]:
+    """503 for a request the database throttled."""
+    return retry_later_response(503, 'Service is busy, please retry', origin, retry_after)
+
+
+def rate_limited_response(origin: Optional[str] = None, retry_after: float = 1.0) -> Dict[str, Any]:
+    """429 for a caller over their rate limit or quota."""
+    return retry_later_response(429, 'Too many requests', origin, retry_after)
+
+
+def raw_response(
+    body: Union[str, bytes],
+    content_type: str,
+    origin: Optional[str] = None,
+    status_code: int = 200,
+    extra_headers: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Create a non-JSON HTTP response.
+    Bytes bodies (e.g. gzip payloads) are base64-encoded for API Gateway.
+    """
+    headers = cors_headers(origin)
+    headers['Content-Type'] = content_type
+    if extra_headers:
+        headers.update(extra_headers)
+    response = {'statusCode': status_code, 'headers': headers}
+    if isinstance(body, bytes):
+        response['body'] = base64.b64encode(body).decode('ascii')
+        response['isBase64Encoded'] = True
+    else:
+        response['body'] = body
+    return response
+
+
+def accepts_gzip(event: Dict[str, Any]) -> bool:
+    """True if the client sent Accept-Encoding including gzip."""
+    for k, v in (event.get('headers') or {}).items():
+        if k.lower() == 'accept-encoding':
+            return 'gzip' in (v or '').lower()
+    return False
+
+
+def compressed_json_response(
+    body: Dict[str, Any],
+    event: Dict[str, Any],
+    status_code: int = 200
+) -> Dict[str, Any]:
+    """
+    JSON response gzip-compressed when the client accepts it and the payload
+    is at least GZIP_MIN_BYTES (default 1024); small bodies are not worth it.
+    """
+    origin = get_origin(event)
+    with span('serialize'):
+        payload = json.dumps(body, default=decimal_default, separators=(',', ':')).encode('utf-8')
+    if not accepts_gzip(event) or len(payload) < int(os.getenv('GZIP_MIN_BYTES', '1024')):
+        return raw_response(payload.decode('utf-8'), 'application/json', origin, status_code,
+                            {'Vary': 'Accept-Encoding'})
+    with span('compress', bytes=len(payload)):
+        compressed = gzip.compress(payload, compresslevel=6)
+    return raw_response(compressed, 'application/json', origin, status_code,
+                        {'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'})
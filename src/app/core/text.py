@@ -0,0 +1,32 @@
+"""Text tokenization for full-text search."""
+import re
+from typing import Dict, List
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Very common English words that carry no ranking signal
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'if', 'in', 'into',
+    'is', 'it', 'of', 'on', 'or', 'so', 'the', 'to', 'was', 'were', 'with',
+})
+
+# Longer tokens are almost always pasted IDs/hashes; skip them
+MAX_TOKEN_LENGTH = 64
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase alphanumeric terms, dropping stopwords."""
+    if not text:
+        return []
+    return [
+        t for t in _TOKEN_RE.findall(text.casefold())
+        if t not in STOPWORDS and len(t) <= MAX_TOKEN_LENGTH
+    ]
+
+
+def term_positions(tokens: List[str]) -> Dict[str, List[int]]:
+    """Map each term to the token positions where it occurs."""
+    positions: Dict[str, List[int]] = {}
+    for i, term in enumerate(tokens):
+        positions.setdefault(term, []).append(i)
+    return positions
@@ -0,0 +1,290 @@
+"""
+Lightweight request tracing.
+
+Spans are timed with perf_counter_ns and nested through a contextvar, so
+service and repository code can open spans without passing anything around:
+
+    with span('note_service.create_note', user=user_id):
+        ...
+
+Tracing is off unless TRACING_MODE is set:
+
+- log:  one OTLP/JSON document per request on stdout
+- otlp: POST to TRACE_EXPORT_URL (an OTLP/HTTP collector, e.g.
+        http://localhost:4318/v1/traces) or, without a URL, one file per
+        trace in TRACE_EXPORT_DIR (collector stand-in)
+
+A trace is exported when its root span ends, before the response is returned:
+Lambda freezes the container between invocations, so work left on a
+background thread would run during some later request, or never. A POST to
+the collector gives up after TRACE_EXPORT_TIMEOUT_MS (default 2000), and a
+failed export is logged, never raised.
+"""
+import functools
+import inspect
+import json
+import logging
+import os
+import secrets
+import tempfile
+import time
+import urllib.request
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACING_MODES = ('off', 'log', 'otlp')
+SERVICE_NAME = 'mytraderpal-api'
+
+# OTLP span kinds
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+
+def tracing_mode() -> str:
+    mode = os.getenv('TRACING_MODE', 'off').lower()
+    return mode if mode in TRACING_MODES else 'off'
+
+
+def trace_dir() -> str:
+    return os.getenv('TRACE_EXPORT_DIR', os.path.join(tempfile.gettempdir(), 'mtp-traces'))
+
+
+def export_timeout() -> float:
+    return float(os.getenv('TRACE_EXPORT_TIMEOUT_MS', '2000')) / 1000
+
+
+class Trace:
+    """All spans recorded for one request."""
+    __slots__ = ('trace_id', 'request_id', 'spans', '_epoch_ns', '_perf_ns')
+
+    def __init__(self, trace_id: str, request_id: str):
+        self.trace_id = trace_id
+        self.request_id = request_id
+        self.spans: List['Span'] = []
+        # Anchor monotonic span timings to wall-clock time once per trace
+        self._epoch_ns = time.time_ns()
+        self._perf_ns = time.perf_counter_ns()
+
+    def to_unix_nano(self, perf_ns: int) -> int:
+        return self._epoch_ns + (perf_ns - self._perf_ns)
+
+
+class Span:
+    """A timed operation within a trace."""
+    __slots__ = ('trace', 'name', 'span_id', 'parent_id', 'kind', 'attributes', 'start_ns', 'end_ns', 'error', '_token')
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], kind: int, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.perf_counter_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.perf_counter_ns()
+            if error is not None:
+                self.error = f'{type(error).__name__}: {error}'
+            self.trace.spans.append(self)
+
+    def __enter__(self) -> 'Span':
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_span.reset(self._token)
+        self.end(exc)
+        return False
+
+
+class _NoopSpan:
+    """Returned when no trace is active, so instrumentation costs almost nothing."""
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar('current_trace', default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+def _trace_id_for(request_id: Optional[str]) -> str:
+    """Use the API Gateway requestId as the trace ID when it is a UUID."""
+    try:
+        return uuid.UUID(request_id).hex
+    except (TypeError, ValueError):
+        return secrets.token_hex(16)
+
+
+class _TraceScope:
+    """Root span that also owns the trace and hands it to the exporter on exit."""
+
+    def __init__(self, request_id: Optional[str], name: str, attributes: Dict[str, Any]):
+        self.trace = Trace(_trace_id_for(request_id), request_id or '')
+        if request_id:
+            attributes = {'aws.request_id': request_id, **attributes}
+        self.root = Span(self.trace, name, None, SPAN_KIND_SERVER, attributes)
+
+    def __enter__(self) -> Span:
+        self._token = _current_trace.set(self.trace)
+        return self.root.__enter__()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.root.__exit__(exc_type, exc, tb)
+        _current_trace.reset(self._token)
+        trace_exporter.submit(self.trace)
+        return False
+
+
+def start_trace(request_id: Optional[str], name: str, **attributes):
+    """Open the root span for a request (no-op unless TRACING_MODE is set)."""
+    if tracing_mode() == 'off':
+        return NOOP_SPAN
+    return _TraceScope(request_id, name, attributes)
+
+
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """
+    Create a child span of the current span.
+    Use it as a context manager, or call .end() directly when start and finish
+    happen in different callbacks (the span then never becomes current).
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    return Span(trace, name, parent.span_id if parent else None, kind, attributes)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator that wraps a function call in a span."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_trace.get() is None:
+                    return await func(*args, **kwargs)
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---------- OTLP export ----------
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': k, 'value': _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+def to_otlp(trace: Trace) -> Dict[str, Any]:
+    """Render a trace as an OTLP/JSON ExportTraceServiceRequest."""
+    spans = []
+    for s in trace.spans:
+        out = {
+            'traceId': trace.trace_id,
+            'spanId': s.span_id,
+            'name': s.name,
+            'kind': s.kind,
+            'startTimeUnixNano': str(trace.to_unix_nano(s.start_ns)),
+            'endTimeUnixNano': str(trace.to_unix_nano(s.end_ns)),
+            'attributes': _otlp_attributes(s.attributes),
+            'status': {'code': 2, 'message': s.error} if s.error else {'code': 1},
+        }
+        if s.parent_id:
+            out['parentSpanId'] = s.parent_id
+        spans.append(out)
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({'service.name': SERVICE_NAME})},
+            'scopeSpans': [{'scope': {'name': 'app.core.tracing'}, 'spans': spans}],
+        }]
+    }
+
+
+class TraceExporter:
+    """Exports each finished trace before the request returns."""
+
+    def __init__(self):
+        self.failed = 0
+
+    def submit(self, trace: Trace) -> None:
+        try:
+            self.export(trace)
+        except Exception:  # a lost trace must never fail the request
+            self.failed += 1
+            logger.exception('Trace export failed')
+
+    def export(self, trace: Trace) -> None:
+        body = json.dumps(to_otlp(trace))
+        mode = tracing_mode()
+        if mode == 'log':
+            print(body, flush=True)
+            return
+        url = os.getenv('TRACE_EXPORT_URL')
+        if url:
+            request = urllib.request.Request(url, data=body.encode('utf-8'),
+                                             headers={'Content-Type': 'application/json'})
+            with urllib.request.urlopen(request, timeout=export_timeout()):
+                pass
+            return
+        directory = trace_dir()
+        os.makedirs(directory, exist_ok=True)
+        tmp = os.path.join(directory, f'.{trace.trace_id}.tmp')
+        with open(tmp, 'w') as f:
+            f.write(body)
+        os.replace(tmp, os.path.join(directory, f'{trace.trace_id}.json'))
+
+
+trace_exporter = TraceExporter()
@@ -1,6 +1,6 @@
 """General utility functions."""
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Dict, Iterable, Optional
 
 
 def now_iso() -> str:
@@ -8,16 +8,6 @@ def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def generate_id(prefix: str) -> str:
-    """
-    Generate a unique ID with a prefix.
-    Uses ULID if available, otherwise falls back to UUID4.
-    """
-    try:
-        import ulid
-        return f"{prefix}-{ulid.new()}"
-    except ImportError:
-        import uuid
-        return f"{prefix}-{uuid.uuid4()}"
-
-
+def select_fields(item: Dict[str, Any], fields: Iterable[str]) -> Dict[str, Any]:
+    """Keep only the given keys of a response dict (missing keys are skipped)."""
+    return {f: item[f] for f in fields if f in item}
@@ -0,0 +1,182 @@
+"""
+Container lifecycle: pre-initialization and snapshot restore hooks.
+
+Lambda runs the handler module's top-level code once per container, in the
+init phase before the first invocation (with SnapStart, before the snapshot
+that later containers resume from). main.py calls start() there, and init()
+moves the one-off costs of the first request into that phase:
+
+- db: the DynamoDB repository, i.e. the boto3 session, service model and
+  client with its instrumentation and throttle guard (most of a cold start)
+- aio: the event loop and async repository (ASYNC_ROUTING=true only)
+- schemas: the compiled note and strategy validators
+- codecs: one pass through the item codec, wire decoders, model and JSON
+  response encoder, so their lazy imports and caches are filled
+
+After a snapshot restore, every container resumes from the same memory, so
+after_restore():
+
+- reseeds `random` (backoff jitter) and the ULID generator (app.core.ids),
+  which would otherwise repeat the same sequences in every container
+- gives the container a new metrics CONTAINER_ID
+- replaces boto3's default session (its cached credentials are the
+  snapshot's), keeping the loaded service models where boto3 still exposes
+  them (see _data_loader), and drops the DynamoDB, async and ingest queue
+  clients: their connections did not survive the snapshot. The sync
+  repository is rebuilt at once
+
+before_snapshot() flushes pending metric deltas, so they are exported once
+rather than by every restored container.
+
+PREINIT=auto (default) runs init() only inside Lambda
+(AWS_LAMBDA_FUNCTION_NAME is set); true/false force it either way. The hooks
+are registered with snapshot_restore_py, which SnapStart-capable Lambda
+runtimes provide; elsewhere they are not registered, and
+scripts/coldstart.py calls them directly.
+"""
+import logging
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import boto3
+import botocore.session
+
+from app.core import ids
+from app.core.aio import get_loop
+from app.core.metrics import get_metrics, reset_container_id
+from app.core.metrics_export import metrics_exporter
+from app.core.response import success_response
+from app.models.note import Note
+from app.models.validation import compile_schema
+from app.repositories import async_dynamodb, dynamodb, ingest_queue
+from app.repositories.codec import deserialize_item, serialize_item
+from app.repositories.wire import note_json_from_wire
+
+try:
+    from snapshot_restore_py import register_after_restore, register_before_snapshot
+except ImportError:  # only in SnapStart-capable Lambda runtimes
+    register_after_restore = register_before_snapshot = None
+
+
+logger = logging.getLogger(__name__)
+
+# (step, seconds) of the last init() and after_restore()
+init_timings: List[Tuple[str, float]] = []
+restore_timings: List[Tuple[str, float]] = []
+_initialized = False
+
+_SAMPLE_NOTE = {
+    'PK': 'USER#init', 'SK': 'NOTE#init', 'noteId': 'init', 'userId': 'init', 'date': '2024-01-01',
+    'text': 'init', 'risk': 1, 'createdAt': '2024-01-01T00:00:00+00:00',
+    'updatedAt': '2024-01-01T00:00:00+00:00', 'version': 1,
+}
+
+
+def preinit_enabled() -> bool:
+    mode = os.getenv('PREINIT', 'auto').lower()
+    if mode == 'auto':
+        return bool(os.getenv('AWS_LAMBDA_FUNCTION_NAME'))
+    return mode == 'true'
+
+
+def _timed(steps: List[Tuple[str, Callable[[], object]]], timings: List[Tuple[str, float]], phase: str) -> None:
+    timings.clear()
+    metrics = get_metrics()
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        elapsed = time.perf_counter() - start
+        timings.append((name, elapsed))
+        metrics.observe('lifecycle_step_seconds', elapsed, {'phase': phase, 'step': name})
+
+
+def _warm_codecs() -> None:
+    wire = serialize_item(_SAMPLE_NOTE)
+    note = Note.from_item(deserialize_item(wire)).to_json()
+    note_json_from_wire(wire)
+    success_response({'note': note})
+
+
+def _warm_async() -> None:
+    if os.getenv('ASYNC_ROUTING', 'false').lower() == 'true':
+        get_loop()
+        async_dynamodb._get_adb()
+
+
+def init() -> Dict[str, float]:
+    """Create clients, compiled schemas and caches ahead of the first request (once)."""
+    global _initialized
+    if not _initialized:
+        _timed([
+            ('db', dynamodb._get_db),
+            ('aio', _warm_async),
+            ('schemas', lambda: (compile_schema('note'), compile_schema('strategy'))),
+            ('codecs', _warm_codecs),
+        ], init_timings, 'init')
+        _initialized = True
+    return dict(init_timings)
+
+
+def _data_loader(session: Optional[boto3.Session]) -> Optional[Any]:
+    """
+    The botocore data loader (parsed service models) behind a boto3 Session.
+    boto3 has no public accessor for its botocore session, so this reads the
+    private Session._session (present in the pinned boto3==1.34.0); None if a
+    later boto3 drops it, and the new session then reloads the models.
+    """
+    core = getattr(session, '_session', None)
+    if core is None:
+        return None
+    try:
+        return core.get_component('data_loader')
+    except ValueError:  # component not registered
+        return None
+
+
+def refresh_session() -> None:
+    """Replace boto3's default session (and its cached credentials), keeping the loaded service models."""
+    session = botocore.session.get_session()
+    loader = _data_loader(boto3.DEFAULT_SESSION)
+    if loader is not None:
+        # Reusing the loader skips re-reading the service model JSON
+        session.register_component('data_loader', loader)
+    boto3.DEFAULT_SESSION = boto3.Session(botocore_session=session)
+
+
+def _reconnect() -> None:
+    refresh_session()
+    dynamodb.reset_db()
+    async_dynamodb.reset_adb()
+    ingest_queue.reset_queues()
+    if _initialized:
+        dynamodb._get_db()
+
+
+def before_snapshot() -> None:
+    """Runs once before the snapshot is taken."""
+    metrics_exporter.flush()
+
+
+def after_restore() -> Dict[str, float]:
+    """Runs in each container restored from the snapshot, before its first invocation."""
+    _timed([
+        ('reseed', lambda: (random.seed(), ids.reseed())),
+        ('container_id', reset_container_id),
+        ('reconnect', _reconnect),
+    ], restore_timings, 'restore')
+    return dict(restore_timings)
+
+
+def start() -> None:
+    """Init-phase entry point (called at main.py import)."""
+    if preinit_enabled():
+        try:
+            init()
+        except Exception:
+            # Never fail the init phase; the first request creates what is missing
+            logger.exception('Pre-initialization failed')
+    if register_before_snapshot is not None:
+        register_before_snapshot(before_snapshot)
+        register_after_restore(after_restore)
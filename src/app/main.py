@@ -1,5 +1,11 @@
 """Lambda handler entry point for MyTraderPal API."""
-from app.api.router import route_request
+import os
+
+from app import lifecycle
+from app.api.router import route_request, route_request_async
+from app.core.aio import run
+from app.services.ingest_service import ingest_service
+from app.services.stream_service import stream_service
 
 
 def handler(event, context):
@@ -7,7 +13,35 @@ def handler(event, context):
     AWS Lambda handler function.
     
     Routes API Gateway events to appropriate handlers.
+    Set ASYNC_ROUTING=true to use the asyncio request path.
     """
+    if os.getenv('ASYNC_ROUTING', 'false').lower() == 'true':
+        return run(route_request_async(event))
     return route_request(event)
 
 
+def ingest_handler(event, context):
+    """
+    Drainer for write-behind note ingest (NOTE_INGEST_MODE=queue).
+    
+    As the ingest queue's SQS event source it writes the delivered records and
+    reports failed ones in batchItemFailures; invoked on a schedule (no
+    Records) it polls the queue until it is empty.
+    """
+    records = event.get('Records')
+    if records is not None:
+        return ingest_service.process_records(records)
+    return {'written': ingest_service.drain()}
+
+
+def stream_handler(event, context):
+    """
+    DynamoDB Streams consumer that maintains the derived views
+    (DERIVED_VIEWS_MODE=stream). Configure the event source with
+    ReportBatchItemFailures so only unprocessed records are retried.
+    """
+    return stream_service.process_records(event.get('Records', []))
+
+
+# Init phase: pre-create clients and caches, and register the snapshot hooks
+lifecycle.start()
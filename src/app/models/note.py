@@ -1,16 +1,35 @@
 """Note domain model."""
 from typing import Optional, Dict, Any
-from datetime import datetime
 
 
 class Note:
-    """Note domain model."""
-    
-    ALLOWED_FIELDS = {
-        "date", "text", "direction", "session", "risk", 
+    """Note domain model (slotted; built straight from DynamoDB items on the hot path)."""
+
+    __slots__ = (
+        'note_id', 'user_id', 'date', 'text', 'direction', 'session', 'risk',
+        'win_amount', 'strategy_id', 'hit_miss', 'created_at', 'updated_at', 'version'
+    )
+
+    ALLOWED_FIELDS = frozenset({
+        "date", "text", "direction", "session", "risk",
         "win_amount", "strategyId", "hit_miss"
-    }
-    
+    })
+
+    # (API/item attribute, slot) pairs for the optional fields, in response order
+    OPTIONAL_FIELDS = (
+        ('direction', 'direction'),
+        ('session', 'session'),
+        ('risk', 'risk'),
+        ('win_amount', 'win_amount'),
+        ('strategyId', 'strategy_id'),
+        ('hit_miss', 'hit_miss'),
+    )
+
+    # Keys of to_json(); item attributes use the same names, so these double as projections
+    RESPONSE_FIELDS = (
+        ('noteId', 'date', 'text', 'createdAt', 'updatedAt') + tuple(f for f, _ in OPTIONAL_FIELDS) + ('version',)
+    )
+
     def __init__(
         self,
         note_id: str,
@@ -24,7 +43,8 @@ class Note:
         strategy_id: Optional[str] = None,
         hit_miss: Optional[str] = None,
         created_at: Optional[str] = None,
-        updated_at: Optional[str] = None
+        updated_at: Optional[str] = None,
+        version: Optional[int] = None
     ):
         self.note_id = note_id
         self.user_id = user_id
@@ -38,9 +58,31 @@ class Note:
         self.hit_miss = hit_miss
         self.created_at = created_at
         self.updated_at = updated_at
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert note to dictionary."""
+        self.version = version
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> 'Note':
+        """Create note from a DynamoDB item (skips __init__ argument binding)."""
+        get = item.get
+        note = cls.__new__(cls)
+        note.note_id = get('noteId')
+        note.user_id = get('userId')
+        note.date = get('date')
+        note.text = get('text')
+        note.direction = get('direction')
+        note.session = get('session')
+        note.risk = get('risk')
+        note.win_amount = get('win_amount')
+        note.strategy_id = get('strategyId')
+        note.hit_miss = get('hit_miss')
+        note.created_at = get('createdAt')
+        note.updated_at = get('updatedAt')
+        version = get('version')
+        note.version = int(version) if version is not None else None
+        return note
+
+    def to_json(self) -> Dict[str, Any]:
+        """Convert note to its API response shape (optional fields only when set)."""
         result = {
             'noteId': self.note_id,
             'date': self.date,
@@ -48,13 +90,19 @@ class Note:
             'createdAt': self.created_at,
             'updatedAt': self.updated_at,
         }
-        # Add optional fields
-        for field in ["direction", "session", "risk", "win_amount", "strategyId", "hit_miss"]:
-            value = getattr(self, field.replace('Id', '_id').replace('_', ''), None)
+        for field, slot in self.OPTIONAL_FIELDS:
+            value = getattr(self, slot)
             if value is not None:
                 result[field] = value
+        # Unset on notes written before versioning
+        if self.version is not None:
+            result['version'] = self.version
         return result
-    
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert note to dictionary."""
+        return self.to_json()
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Note':
         """Create note from dictionary."""
@@ -70,7 +118,6 @@ class Note:
             strategy_id=data.get('strategyId'),
             hit_miss=data.get('hit_miss'),
             created_at=data.get('createdAt'),
-            updated_at=data.get('updatedAt')
+            updated_at=data.get('updatedAt'),
+            version=data.get('version')
         )
-
-
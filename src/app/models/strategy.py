@@ -1,12 +1,20 @@
 """Strategy domain model."""
+import json
 from typing import Optional, Dict, Any
 
 
 class Strategy:
-    """Strategy domain model."""
-    
-    ALLOWED_FIELDS = {"name", "market", "timeframe", "dsl"}
-    
+    """Strategy domain model (slotted; built straight from DynamoDB items on the hot path)."""
+
+    __slots__ = (
+        'strategy_id', 'user_id', 'name', 'market', 'timeframe', 'dsl', 'created_at', 'updated_at', 'version'
+    )
+
+    ALLOWED_FIELDS = frozenset({"name", "market", "timeframe", "dsl"})
+
+    # Keys of to_json(); item attributes use the same names, so these double as projections
+    RESPONSE_FIELDS = ('strategyId', 'name', 'market', 'timeframe', 'dsl', 'createdAt', 'updatedAt', 'version')
+
     def __init__(
         self,
         strategy_id: str,
@@ -16,7 +24,8 @@ class Strategy:
         timeframe: str,
         dsl: Optional[Dict[str, Any]] = None,
         created_at: Optional[str] = None,
-        updated_at: Optional[str] = None
+        updated_at: Optional[str] = None,
+        version: Optional[int] = None
     ):
         self.strategy_id = strategy_id
         self.user_id = user_id
@@ -26,10 +35,28 @@ class Strategy:
         self.dsl = dsl or {}
         self.created_at = created_at
         self.updated_at = updated_at
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert strategy to dictionary."""
-        return {
+        self.version = version
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> 'Strategy':
+        """Create strategy from a DynamoDB item (dsl may be stored as a JSON string)."""
+        get = item.get
+        strategy = cls.__new__(cls)
+        strategy.strategy_id = get('strategyId')
+        strategy.user_id = get('userId')
+        strategy.name = get('name')
+        strategy.market = get('market')
+        strategy.timeframe = get('timeframe')
+        strategy.dsl = parse_dsl(get('dsl'))
+        strategy.created_at = get('createdAt')
+        strategy.updated_at = get('updatedAt')
+        version = get('version')
+        strategy.version = int(version) if version is not None else None
+        return strategy
+
+    def to_json(self) -> Dict[str, Any]:
+        """Convert strategy to its API response shape (version only once set)."""
+        result = {
             'strategyId': self.strategy_id,
             'name': self.name,
             'market': self.market,
@@ -38,7 +65,14 @@ class Strategy:
             'createdAt': self.created_at,
             'updatedAt': self.updated_at,
         }
-    
+        if self.version is not None:
+            result['version'] = self.version
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert strategy to dictionary."""
+        return self.to_json()
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Strategy':
         """Create strategy from dictionary."""
@@ -50,7 +84,20 @@ class Strategy:
             timeframe=data.get('timeframe', ''),
             dsl=data.get('dsl', {}),
             created_at=data.get('createdAt'),
-            updated_at=data.get('updatedAt')
+            updated_at=data.get('updatedAt'),
+            version=data.get('version')
         )
 
 
+def parse_dsl(dsl_value: Any) -> Dict[str, Any]:
+    """Parse a DSL value from a DynamoDB item (map or JSON string)."""
+    if not dsl_value:
+        return {}
+    if isinstance(dsl_value, dict):
+        return dsl_value
+    if isinstance(dsl_value, str):
+        try:
+            return json.loads(dsl_value)
+        except json.JSONDecodeError:
+            return {}
+    return {}
@@ -0,0 +1,242 @@
+"""Request payload validation for notes and strategies."""
+import json
+import re
+from datetime import date as _date
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from app.models.note import Note
+from app.models.strategy import Strategy
+
+
+class ValidationError(ValueError):
+    """Raised when a request payload does not match its schema."""
+
+    def __init__(self, errors: Dict[str, str]):
+        self.errors = errors
+        super().__init__('; '.join(f'{field}: {msg}' for field, msg in errors.items()))
+
+
+# Field specs: (type, options). Values of None or "" mean "not provided" and are dropped.
+NOTE_SCHEMA = {
+    'date': ('date', {}),
+    'text': ('string', {'max_length': 20000}),
+    'direction': ('enum', {'values': ('Long', 'Short')}),
+    'session': ('enum', {'values': ('Asia', 'London', 'New York')}),
+    'risk': ('decimal', {}),
+    'win_amount': ('decimal', {}),
+    'strategyId': ('string', {'max_length': 128}),
+    'hit_miss': ('enum', {'values': ('Hit', 'Miss')}),
+}
+
+STRATEGY_SCHEMA = {
+    'name': ('string', {'max_length': 200, 'required': True}),
+    'market': ('string', {'max_length': 50}),
+    'timeframe': ('string', {'max_length': 20}),
+    'dsl': ('json_object', {}),
+}
+
+SCHEMAS = {
+    'note': NOTE_SCHEMA,
+    'strategy': STRATEGY_SCHEMA,
+}
+
+# YYYY-MM-DD, optionally followed by an ISO-8601 time and offset
+_DATE_RE = re.compile(
+    r'^(\d{4}-\d{2}-\d{2})(T\d{2}:\d{2}(:\d{2}(\.\d{1,9})?)?(Z|[+-]\d{2}:\d{2})?)?$'
+)
+
+
+def _string(max_length: int = 1000, **_) -> Callable[[Any], Any]:
+    def convert(value):
+        if not isinstance(value, str):
+            raise ValueError('must be a string')
+        if len(value) > max_length:
+            raise ValueError(f'must be at most {max_length} characters')
+        return value
+    return convert
+
+
+def _enum(values: Tuple[str, ...], **_) -> Callable[[Any], Any]:
+    # Case-insensitive match, stored in canonical casing
+    lookup = {v.casefold(): v for v in values}
+    expected = ', '.join(values)
+
+    def convert(value):
+        if isinstance(value, str):
+            canonical = lookup.get(value.strip().casefold())
+            if canonical is not None:
+                return canonical
+        raise ValueError(f'must be one of: {expected}')
+    return convert
+
+
+def _decimal(**_) -> Callable[[Any], Any]:
+    # DynamoDB rejects Python floats; go through str() so 0.1 stays 0.1
+    def convert(value):
+        if isinstance(value, bool) or not isinstance(value, (int, float, str, Decimal)):
+            raise ValueError('must be a number')
+        try:
+            result = Decimal(value) if isinstance(value, (int, Decimal)) else Decimal(str(value).strip())
+        except InvalidOperation:
+            raise ValueError('must be a number') from None
+        if not result.is_finite():
+            raise ValueError('must be a finite number')
+        return result
+    return convert
+
+
+def _date_value(**_) -> Callable[[Any], Any]:
+    def convert(value):
+        match = _DATE_RE.match(value) if isinstance(value, str) else None
+        if not match:
+            raise ValueError('must be an ISO date (YYYY-MM-DD[THH:MM[:SS]][Z])')
+        try:
+            _date.fromisoformat(match.group(1))
+        except ValueError:
+            raise ValueError('is not a valid calendar date') from None
+        return value
+    return convert
+
+
+def _json_object(**_) -> Callable[[Any], Any]:
+    # Accepts a dict or a JSON string; returns a DynamoDB-safe dict (floats as Decimal)
+    def convert(value):
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except json.JSONDecodeError:
+                raise ValueError('must be a JSON object') from None
+        if not isinstance(value, dict):
+            raise ValueError('must be a JSON object')
+        try:
+            return json.loads(json.dumps(value, allow_nan=False), parse_float=Decimal)
+        except (TypeError, ValueError):
+            raise ValueError('must contain only JSON values') from None
+    return convert
+
+
+_CONVERTERS = {
+    'string': _string,
+    'enum': _enum,
+    'decimal': _decimal,
+    'date': _date_value,
+    'json_object': _json_object,
+}
+
+
+@lru_cache(maxsize=None)
+def compile_schema(name: str) -> Callable[..., Dict[str, Any]]:
+    """
+    Compile a named schema into a validator function (cached per schema).
+    The validator returns a cleaned copy of the payload or raises ValidationError.
+    """
+    schema = SCHEMAS[name]
+    converters = {
+        field: _CONVERTERS[kind](**{k: v for k, v in opts.items() if k != 'required'})
+        for field, (kind, opts) in schema.items()
+    }
+    required = tuple(field for field, (_, opts) in schema.items() if opts.get('required'))
+
+    def validate(payload: Any, partial: bool = False) -> Dict[str, Any]:
+        if not isinstance(payload, dict):
+            raise ValidationError({'body': 'must be a JSON object'})
+        cleaned, errors = {}, {}
+        for field, value in payload.items():
+            convert = converters.get(field)
+            if convert is None:
+                errors[field] = 'unknown field'
+                continue
+            if value is None or value == "":
+                continue
+            try:
+                cleaned[field] = convert(value)
+            except ValueError as e:
+                errors[field] = str(e)
+        if not partial:
+            for field in required:
+                if field not in cleaned and field not in errors:
+                    errors[field] = 'is required'
+        if errors:
+            raise ValidationError(errors)
+        return cleaned
+
+    return validate
+
+
+def validate_note(payload: Any, partial: bool = False) -> Dict[str, Any]:
+    """Validate and coerce a note payload."""
+    return compile_schema('note')(payload, partial)
+
+
+def validate_strategy(payload: Any, partial: bool = False) -> Dict[str, Any]:
+    """Validate and coerce a strategy payload."""
+    return compile_schema('strategy')(payload, partial)
+
+
+def parse_fields(raw: Optional[str], allowed: Iterable[str], id_field: str) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated `fields` query parameter into response keys.
+    Returns None when absent; the ID field is always included.
+    """
+    if not raw:
+        return None
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValidationError({'fields': f"unknown field(s): {', '.join(unknown)}"})
+    return tuple(dict.fromkeys((id_field, *fields)))
+
+
+def parse_note_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse `fields` for note listings."""
+    return parse_fields(raw, Note.RESPONSE_FIELDS, 'noteId')
+
+
+def parse_strategy_fields(raw: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse `fields` for strategy listings."""
+    return parse_fields(raw, Strategy.RESPONSE_FIELDS, 'strategyId')
+
+
+def parse_if_match(headers: Optional[Dict[str, Any]]) -> Optional[int]:
+    """
+    Expected item version from an If-Match header ("3", W/"3" or a bare 3).
+    Returns None when the header is absent or `*` (unconditional update).
+    """
+    for k, v in (headers or {}).items():
+        if k.lower() == 'if-match' and v:
+            value = v.strip()
+            break
+    else:
+        return None
+    if value == '*':
+        return None
+    if value.startswith('W/'):
+        value = value[2:]
+    value = value.strip('"')
+    if not (value.isascii() and value.isdigit()):
+        raise ValidationError({'If-Match': 'must be a version ETag from a previous response'})
+    return int(value)
+
+
+CALENDAR_GRANULARITIES = ('day', 'week', 'month')
+
+
+def parse_calendar_query(qs: Dict[str, Any]) -> Tuple[str, str, str]:
+    """Parse `granularity`, `from` and `to` for the calendar report."""
+    errors = {}
+    granularity = (qs.get('granularity') or 'day').lower()
+    if granularity not in CALENDAR_GRANULARITIES:
+        errors['granularity'] = f"must be one of: {', '.join(CALENDAR_GRANULARITIES)}"
+    dates = {}
+    for name in ('from', 'to'):
+        try:
+            dates[name] = _date_value()(qs[name])[:10] if qs.get(name) else ''
+        except ValueError as e:
+            errors[name] = str(e)
+    if not errors and dates['from'] and dates['to'] and dates['from'] > dates['to']:
+        errors['from'] = 'must not be after to'
+    if errors:
+        raise ValidationError(errors)
+    return granularity, dates['from'], dates['to']
@@ -0,0 +1,288 @@
+"""
+Asyncio DynamoDB repository.
+
+Mirrors the read/write primitives of DynamoDBRepository as coroutines so
+services can run independent queries concurrently (asyncio.gather). Two
+backends share the same interface:
+
+- aiobotocore (if installed): non-blocking HTTP on the event loop, using the
+  low-level client with the fast codec (app.repositories.codec)
+- thread (fallback, or ASYNC_DB_BACKEND=thread): each call runs the sync
+  repository in the default executor via asyncio.to_thread
+
+Clients are bound to the event loop that created them, so callers should use
+app.core.aio.run(), which keeps one loop per container.
+
+aiobotocore calls go through the repository's ThrottleGuard (call_async), so
+throttles are retried and surface as ThrottlingError like on the sync
+repository; the thread backend is guarded by the sync repository itself.
+"""
+import asyncio
+import functools
+import os
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from app.repositories import dynamodb as sync_repository
+from app.repositories import sharding
+from app.repositories.codec import serialize_item as _serialize, deserialize_item as _deserialize
+from app.repositories.instrumentation import instrument_client
+from app.repositories.throttling import ThrottleGuard
+
+try:
+    from aiobotocore.session import get_session
+except ImportError:  # optional dependency
+    get_session = None
+
+
+def _key_condition(
+    pk_name: str,
+    pk: str,
+    sk_name: str,
+    sk_begins_with: Optional[str] = None,
+    sk_between: Optional[Tuple[str, str]] = None
+) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+    """KeyConditionExpression string, names and values for the low-level client."""
+    expr = '#pk = :pk'
+    names = {'#pk': pk_name}
+    values = {':pk': pk}
+    if sk_begins_with:
+        expr += ' AND begins_with(#sk, :sk)'
+        names['#sk'] = sk_name
+        values[':sk'] = sk_begins_with
+    elif sk_between:
+        expr += ' AND #sk BETWEEN :lo AND :hi'
+        names['#sk'] = sk_name
+        values[':lo'], values[':hi'] = sk_between
+    return expr, names, values
+
+
+def _guarded(write: bool = False):
+    """Run an aiobotocore primitive under the repository's ThrottleGuard."""
+    def decorate(method):
+        op = method.__name__.lstrip('_')
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            if self.backend == 'thread':
+                return await method(self, *args, **kwargs)
+            return await self.throttle.call_async(op, lambda: method(self, *args, **kwargs), write)
+        return wrapper
+    return decorate
+
+
+class AsyncDynamoDBRepository:
+    """Async DynamoDB repository for concurrent fan-out."""
+
+    def __init__(self):
+        self.table_name = os.getenv('TABLE_NAME', 'mtp_app')
+        self.region = os.getenv('AWS_REGION', 'us-east-1')
+        backend = os.getenv('ASYNC_DB_BACKEND', 'aiobotocore' if get_session else 'thread')
+        self.backend = 'aiobotocore' if backend == 'aiobotocore' and get_session else 'thread'
+        self._client = None
+        self._client_ctx = None
+        self._client_lock: Optional[asyncio.Lock] = None
+        self.throttle = ThrottleGuard.from_env()
+
+    async def _get_client(self):
+        """Create the aiobotocore client once, on the running loop."""
+        if self._client is None:
+            if self._client_lock is None:
+                self._client_lock = asyncio.Lock()
+            async with self._client_lock:
+                if self._client is None:
+                    self._client_ctx = get_session().create_client(
+                        'dynamodb', region_name=self.region, config=sync_repository.client_config()
+                    )
+                    client = await self._client_ctx.__aenter__()
+                    instrument_client(client)
+                    self._client = client
+        return self._client
+
+    async def close(self) -> None:
+        if self._client_ctx is not None:
+            await self._client_ctx.__aexit__(None, None, None)
+            self._client = self._client_ctx = None
+
+    async def _in_thread(self, method: str, *args, **kwargs):
+        # Resolve the sync repository per call so tests can patch _get_db
+        return await asyncio.to_thread(getattr(sync_repository._get_db(), method), *args, **kwargs)
+
+    # ---------- Primitives ----------
+    @_guarded()
+    async def get_item(self, pk: str, sk: str, consistent: bool = False) -> Optional[Dict[str, Any]]:
+        """Get item by primary key."""
+        if self.backend == 'thread':
+            return await self._in_thread('get_item', pk, sk, consistent)
+        client = await self._get_client()
+        resp = await client.get_item(
+            TableName=self.table_name, Key=_serialize({'PK': pk, 'SK': sk}), ConsistentRead=consistent
+        )
+        item = resp.get('Item')
+        return _deserialize(item) if item else None
+
+    @_guarded(write=True)
+    async def put_item(
+        self,
+        item: Dict[str, Any],
+        condition_expression: str = 'attribute_not_exists(PK) AND attribute_not_exists(SK)',
+        expression_values: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Conditional create (by default fails if the item already exists)."""
+        if self.backend == 'thread':
+            return await self._in_thread('put_item', item, condition_expression, expression_values)
+        client = await self._get_client()
+        params = {'TableName': self.table_name, 'Item': _serialize(item), 'ConditionExpression': condition_expression}
+        if expression_values:
+            params['ExpressionAttributeValues'] = _serialize(expression_values)
+        return await client.put_item(**params)
+
+    @_guarded(write=True)
+    async def delete_item(self, pk: str, sk: str) -> Dict[str, Any]:
+        """Delete item by primary key."""
+        if self.backend == 'thread':
+            return await self._in_thread('delete_item', pk, sk)
+        client = await self._get_client()
+        return await client.delete_item(TableName=self.table_name, Key=_serialize({'PK': pk, 'SK': sk}))
+
+    @_guarded()
+    async def batch_get(self, keys: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Get many items by primary key; 100-key chunks are fetched concurrently."""
+        if self.backend == 'thread':
+            return await self._in_thread('batch_get', keys)
+        client = await self._get_client()
+
+        async def fetch(chunk):
+            items = []
+            request = {self.table_name: {'Keys': [_serialize({'PK': pk, 'SK': sk}) for pk, sk in chunk]}}
+            while request:
+                resp = await client.batch_get_item(RequestItems=request)
+                items.extend(_deserialize(it) for it in resp.get('Responses', {}).get(self.table_name, []))
+                request = resp.get('UnprocessedKeys') or None
+            return items
+
+        chunks = [keys[i:i + 100] for i in range(0, len(keys), 100)]
+        results = await asyncio.gather(*(fetch(c) for c in chunks))
+        return [it for items in results for it in items]
+
+    # ---------- Queries ----------
+    @_guarded()
+    async def _query(self, index: Optional[str], pk_name: str, sk_name: str, pk: str, limit: int,
+                     last_evaluated_key: Optional[Dict[str, Any]], scan_forward: bool,
+                     sk_begins_with: Optional[str] = None,
+                     sk_between: Optional[Tuple[str, str]] = None,
+                     projection: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        client = await self._get_client()
+        expr, names, values = _key_condition(pk_name, pk, sk_name, sk_begins_with, sk_between)
+        if projection:
+            projected = sync_repository.projection_params(projection)
+            names.update(projected['ExpressionAttributeNames'])
+        params = {
+            'TableName': self.table_name,
+            'KeyConditionExpression': expr,
+            'ExpressionAttributeNames': names,
+            'ExpressionAttributeValues': _serialize(values),
+            'ScanIndexForward': scan_forward,
+            'Limit': limit
+        }
+        if index:
+            params['IndexName'] = index
+        if projection:
+            params['ProjectionExpression'] = projected['ProjectionExpression']
+        if last_evaluated_key:
+            params['ExclusiveStartKey'] = _serialize(last_evaluated_key)
+        resp = await client.query(**params)
+        result = {'Items': [_deserialize(it) for it in resp.get('Items', [])], 'Count': resp.get('Count', 0)}
+        if resp.get('LastEvaluatedKey'):
+            result['LastEvaluatedKey'] = _deserialize(resp['LastEvaluatedKey'])
+        return result
+
+    async def query_pk(
+        self,
+        pk: str,
+        sk_begins_with: Optional[str] = None,
+        limit: int = 50,
+        last_evaluated_key: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Query by partition key."""
+        if self.backend == 'thread':
+            return await self._in_thread('query_pk', pk, sk_begins_with, limit, last_evaluated_key)
+        return await self._query(None, 'PK', 'SK', pk, limit, last_evaluated_key, True, sk_begins_with=sk_begins_with)
+
+    async def query_gsi1(
+        self,
+        gsi1pk: str,
+        limit: int = 50,
+        last_evaluated_key: Optional[Dict[str, Any]] = None,
+        sk_between: Optional[Tuple[str, str]] = None,
+        projection: Optional[Iterable[str]] = None,
+        index_name: str = 'GSI1'
+    ) -> Dict[str, Any]:
+        """Query by GSI1 partition key (newest first), optionally within a GSI1SK range."""
+        if self.backend == 'thread':
+            return await self._in_thread('query_gsi1', gsi1pk, limit, last_evaluated_key, sk_between,
+                                         projection, index_name)
+        partitions = sharding.read_partitions(gsi1pk)
+        if len(partitions) > 1:
+            # Sharded note partition: query every shard concurrently, heap-merge by GSI1SK
+            starts = sharding.start_keys(partitions, last_evaluated_key)
+            fetch = sharding.with_key_attributes(projection)
+            pages = await asyncio.gather(*(
+                self._query(index_name, 'GSI1PK', 'GSI1SK', p, limit, start, False,
+                            sk_between=sk_between, projection=fetch)
+                for p, start in starts.items()
+            ))
+            result = sharding.merge_pages(
+                dict(zip(starts, pages)), starts, limit,
+                lambda it: it['GSI1SK'], lambda it: {k: it[k] for k in sharding.KEY_ATTRIBUTES}
+            )
+            sharding.strip_attributes(result['Items'], projection)
+            return result
+        return await self._query(index_name, 'GSI1PK', 'GSI1SK', gsi1pk, limit, last_evaluated_key, False,
+                                 sk_between=sk_between, projection=projection)
+
+    async def query_gsi1_all(
+        self,
+        gsi1pk: str,
+        sk_between: Optional[Tuple[str, str]] = None,
+        page_size: int = 100,
+        projection: Optional[Iterable[str]] = None,
+        index_name: str = 'GSI1',
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Every item under a GSI1 partition (and optional range), newest first; at most `limit` if set."""
+        items, last_key = [], None
+        while True:
+            if limit is not None:
+                page_size = min(page_size, limit - len(items))
+            resp = await self.query_gsi1(gsi1pk, page_size, last_key, sk_between, projection, index_name)
+            items.extend(resp.get('Items', []))
+            last_key = resp.get('LastEvaluatedKey')
+            if not last_key or (limit is not None and len(items) >= limit):
+                return items
+
+
+# Lazily created like the sync repository (avoids AWS config at import time)
+_adb_instance = None
+
+
+def _get_adb() -> AsyncDynamoDBRepository:
+    """Get or create the async repository instance."""
+    global _adb_instance
+    if _adb_instance is None:
+        _adb_instance = AsyncDynamoDBRepository()
+    return _adb_instance
+
+
+def reset_adb() -> None:
+    """Drop the async repository instance (its client is rebuilt on next use)."""
+    global _adb_instance
+    _adb_instance = None
+
+
+class _AsyncDBProxy:
+    """Proxy object that lazily initializes the async repository."""
+    def __getattr__(self, name):
+        return getattr(_get_adb(), name)
+
+
+adb = _AsyncDBProxy()
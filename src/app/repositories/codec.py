@@ -0,0 +1,89 @@
+"""
+Fast DynamoDB AttributeValue codec.
+
+Drop-in for boto3's TypeSerializer/TypeDeserializer on the low-level client
+path. Dispatches on exact type via dict lookup instead of a chain of
+isinstance checks, and builds Decimals directly from the wire string.
+Numbers are not re-validated against DynamoDB's 38-digit context here;
+app.models.validation already normalizes Decimals before they reach storage.
+"""
+from decimal import Decimal
+from typing import Any, Callable, Dict
+
+from boto3.dynamodb.types import Binary
+
+
+def _serialize_set(value) -> Dict[str, Any]:
+    if not value:
+        raise ValueError('DynamoDB does not support empty sets')
+    sample = next(iter(value))
+    if isinstance(sample, str):
+        return {'SS': list(value)}
+    if isinstance(sample, (int, Decimal)) and not isinstance(sample, bool):
+        return {'NS': [str(v) for v in value]}
+    if isinstance(sample, (bytes, bytearray, Binary)):
+        return {'BS': [bytes(v) if not isinstance(v, Binary) else v.value for v in value]}
+    raise TypeError(f'Unsupported set element type: {type(sample).__name__}')
+
+
+def _serialize_float(value: float) -> Dict[str, Any]:
+    raise TypeError('Float types are not supported. Use Decimal types instead.')
+
+
+_SERIALIZERS: Dict[type, Callable[[Any], Dict[str, Any]]] = {
+    str: lambda v: {'S': v},
+    Decimal: lambda v: {'N': str(v)},
+    int: lambda v: {'N': str(v)},
+    bool: lambda v: {'BOOL': v},
+    type(None): lambda v: {'NULL': True},
+    dict: lambda v: {'M': {k: serialize(x) for k, x in v.items()}},
+    list: lambda v: {'L': [serialize(x) for x in v]},
+    tuple: lambda v: {'L': [serialize(x) for x in v]},
+    set: _serialize_set,
+    frozenset: _serialize_set,
+    bytes: lambda v: {'B': v},
+    bytearray: lambda v: {'B': bytes(v)},
+    Binary: lambda v: {'B': v.value},
+    float: _serialize_float,
+}
+
+
+def serialize(value: Any) -> Dict[str, Any]:
+    """Python value -> AttributeValue."""
+    fn = _SERIALIZERS.get(type(value))
+    if fn is not None:
+        return fn(value)
+    # Subclasses (e.g. OrderedDict, str enums) take the slow path once
+    for base, fn in _SERIALIZERS.items():
+        if base is not type(None) and isinstance(value, base):
+            return fn(value)
+    raise TypeError(f'Unsupported type "{type(value).__name__}" for value "{value}"')
+
+
+_DESERIALIZERS: Dict[str, Callable[[Any], Any]] = {
+    'S': lambda v: v,
+    'N': Decimal,
+    'BOOL': lambda v: v,
+    'NULL': lambda v: None,
+    'M': lambda v: {k: deserialize(x) for k, x in v.items()},
+    'L': lambda v: [deserialize(x) for x in v],
+    'SS': set,
+    'NS': lambda v: {Decimal(x) for x in v},
+    'B': Binary,
+    'BS': lambda v: {Binary(x) for x in v},
+}
+
+
+def deserialize(value: Dict[str, Any]) -> Any:
+    """AttributeValue -> Python value (numbers as Decimal, like boto3)."""
+    for tag, raw in value.items():
+        return _DESERIALIZERS[tag](raw)
+    raise ValueError('Empty AttributeValue')
+
+
+def serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: serialize(v) for k, v in item.items()}
+
+
+def deserialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: deserialize(v) for k, v in item.items()}
@@ -1,20 +1,65 @@
 """DynamoDB repository implementation."""
+import contextvars
+import functools
 import os
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime, timezone
 
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 from app.models.note import Note
 from app.models.strategy import Strategy
 from app.core.utils import now_iso
+from app.repositories.instrumentation import instrument_client
+from app.repositories.lowlevel import ClientTable, LowLevelTable
+from app.repositories.codec import serialize_item, deserialize_item
+from app.repositories import sharding
+from app.repositories.tombstones import TOMBSTONE_ATTRIBUTE, INDEX_KEY_ATTRIBUTES, live
+from app.repositories.versioning import VERSION_ATTRIBUTE, VersionConflict, item_version
+from app.repositories.throttling import ThrottleGuard
 
 
-ALLOWED_NOTE_FIELDS = {
-    "date", "text", "direction", "session", "risk", "win_amount", "strategyId", "hit_miss"
-}
-ALLOWED_STRATEGY_FIELDS = {"name", "market", "timeframe", "dsl"}
+ALLOWED_NOTE_FIELDS = Note.ALLOWED_FIELDS
+ALLOWED_STRATEGY_FIELDS = Strategy.ALLOWED_FIELDS
+BATCH_WRITE_SIZE = 25
+
+
+def client_config() -> Config:
+    """botocore Config for the DynamoDB client (tunable via DDB_* environment variables)."""
+    return Config(
+        max_pool_connections=int(os.getenv('DDB_MAX_POOL_CONNECTIONS', '50')),
+        connect_timeout=float(os.getenv('DDB_CONNECT_TIMEOUT', '2')),
+        read_timeout=float(os.getenv('DDB_READ_TIMEOUT', '5')),
+        tcp_keepalive=os.getenv('DDB_TCP_KEEPALIVE', 'true').lower() == 'true',
+        retries={
+            'mode': os.getenv('DDB_RETRY_MODE', 'adaptive'),
+            'max_attempts': int(os.getenv('DDB_MAX_ATTEMPTS', '5'))
+        }
+    )
+
+
+def projection_params(attributes: Iterable[str]) -> Dict[str, Any]:
+    """ProjectionExpression with name placeholders (date, session, text... are reserved words)."""
+    names = {f'#p{i}': name for i, name in enumerate(dict.fromkeys(attributes))}
+    return {'ProjectionExpression': ', '.join(names), 'ExpressionAttributeNames': names}
+
+
+def _guarded(write: bool = False, cost: Optional[Callable[..., int]] = None):
+    """
+    Run a repository primitive through self.throttle (write limiter + throttle backoff).
+    cost(*args, **kwargs) is the number of writes the call makes (default 1), i.e. limiter tokens.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            n = cost(*args, **kwargs) if cost is not None else 1
+            return self.throttle.call(method.__name__, lambda: method(self, *args, **kwargs), write, n)
+        return wrapper
+    return decorate
 
 
 class DynamoDBRepository:
@@ -23,35 +68,60 @@ class DynamoDBRepository:
     def __init__(self):
         self.table_name = os.getenv('TABLE_NAME', 'mtp_app')
         region = os.getenv('AWS_REGION', 'us-east-1')
-        self.dynamodb = boto3.resource('dynamodb', region_name=region)
-        self.table = self.dynamodb.Table(self.table_name)
+        # 'resource' (boto3 resource's client) or 'client' (low-level client + fast codec)
+        self.client_mode = os.getenv('DDB_CLIENT_MODE', 'resource').lower()
+        if self.client_mode == 'client':
+            self.client = boto3.client('dynamodb', region_name=region, config=client_config())
+            self.dynamodb = None
+            self.table = LowLevelTable(self.client, self.table_name)
+        else:
+            self.dynamodb = boto3.resource('dynamodb', region_name=region, config=client_config())
+            self.client = self.dynamodb.meta.client
+            # Not dynamodb.Table(): resources are not thread-safe, and fan-out pools call us from worker threads
+            self.table = ClientTable(self.client, self.table_name)
+        self._batch_get_item = self.table.batch_get_item
+        instrument_client(self.client)
+        self.throttle = ThrottleGuard.from_env()
     
     # ---------- Primitives ----------
-    def put_item(self, item: Dict[str, Any]) -> Dict[str, Any]:
-        """Idempotent create (fails if the item already exists)."""
-        return self.table.put_item(
-            Item=item,
-            ConditionExpression='attribute_not_exists(PK) AND attribute_not_exists(SK)'
-        )
+    @_guarded(write=True)
+    def put_item(
+        self,
+        item: Dict[str, Any],
+        condition_expression: str = 'attribute_not_exists(PK) AND attribute_not_exists(SK)',
+        expression_values: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Conditional create (by default fails if the item already exists)."""
+        params = {'Item': item, 'ConditionExpression': condition_expression}
+        if expression_values:
+            params['ExpressionAttributeValues'] = expression_values
+        return self.table.put_item(**params)
     
-    def get_item(self, pk: str, sk: str) -> Optional[Dict[str, Any]]:
+    @_guarded()
+    def get_item(self, pk: str, sk: str, consistent: bool = False) -> Optional[Dict[str, Any]]:
         """Get item by primary key."""
-        resp = self.table.get_item(Key={'PK': pk, 'SK': sk})
+        params = {'Key': {'PK': pk, 'SK': sk}}
+        if consistent:
+            params['ConsistentRead'] = True
+        resp = self.table.get_item(**params)
         return resp.get('Item')
     
+    @_guarded(write=True)
     def delete_item(self, pk: str, sk: str) -> Dict[str, Any]:
         """Delete item by primary key."""
         return self.table.delete_item(Key={'PK': pk, 'SK': sk})
     
+    @_guarded(write=True)
     def update_item(
         self,
         pk: str,
         sk: str,
         update_expression: str,
         expression_values: Dict[str, Any],
-        expression_attribute_names: Optional[Dict[str, str]] = None
+        expression_attribute_names: Optional[Dict[str, str]] = None,
+        condition_expression: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Update item by primary key."""
+        """Update item by primary key (conditionally, if condition_expression is given)."""
         params = {
             'Key': {'PK': pk, 'SK': sk},
             'UpdateExpression': update_expression,
@@ -60,42 +130,375 @@ class DynamoDBRepository:
         }
         if expression_attribute_names:
             params['ExpressionAttributeNames'] = expression_attribute_names
+        if condition_expression:
+            params['ConditionExpression'] = condition_expression
         return self.table.update_item(**params)
     
+    @_guarded(write=True)
+    def soft_delete(self, pk: str, sk: str, deleted_at: str, expires_at: int) -> Optional[Dict[str, Any]]:
+        """
+        Tombstone a live item: set deletedAt and the TTL expiresAt and remove its
+        index keys. Returns the item as it was, or None if it is missing or
+        already deleted.
+        """
+        try:
+            resp = self.table.update_item(
+                Key={'PK': pk, 'SK': sk},
+                UpdateExpression='SET #del = :del, #exp = :exp REMOVE ' + ', '.join(INDEX_KEY_ATTRIBUTES),
+                ConditionExpression='attribute_exists(PK) AND attribute_not_exists(#del)',
+                ExpressionAttributeNames={'#del': TOMBSTONE_ATTRIBUTE, '#exp': 'expiresAt'},
+                ExpressionAttributeValues={':del': deleted_at, ':exp': expires_at},
+                ReturnValues='ALL_OLD'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return None
+            raise
+        return resp.get('Attributes')
+    
+    @_guarded(write=True)
+    def versioned_update(
+        self,
+        pk: str,
+        sk: str,
+        sets: Dict[str, Any],
+        expected_version: Optional[int] = None
+    ) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        SET the given attributes on a live item and increment its version, in one
+        UpdateItem. With expected_version, only if the item is still at that
+        version (VersionConflict otherwise). Returns (old, new) item images, or
+        None if the item is missing or deleted.
+        """
+        names = {'#ver': VERSION_ATTRIBUTE, '#del': TOMBSTONE_ATTRIBUTE}
+        values: Dict[str, Any] = {':zero': 0, ':one': 1}
+        assignments = ['#ver = if_not_exists(#ver, :zero) + :one']
+        for i, (name, value) in enumerate(sets.items()):
+            names[f'#s{i}'], values[f':s{i}'] = name, value
+            assignments.append(f'#s{i} = :s{i}')
+        condition = 'attribute_exists(PK) AND attribute_not_exists(#del)'
+        if expected_version == 0:
+            condition += ' AND attribute_not_exists(#ver)'
+        elif expected_version is not None:
+            condition += ' AND #ver = :expected'
+            values[':expected'] = expected_version
+        try:
+            resp = self.table.update_item(
+                Key={'PK': pk, 'SK': sk},
+                UpdateExpression='SET ' + ', '.join(assignments),
+                ConditionExpression=condition,
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+                ReturnValues='ALL_OLD',
+                ReturnValuesOnConditionCheckFailure='ALL_OLD'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            # The item as the failed condition saw it (wire format, in either client mode)
+            current = live(deserialize_item(e.response['Item'])) if e.response.get('Item') else None
+            if current is None or expected_version is None:
+                return None
+            raise VersionConflict(expected_version, item_version(current)) from None
+        old = resp['Attributes']
+        return old, {**old, **sets, VERSION_ATTRIBUTE: item_version(old) + 1}
+
+    @_guarded(write=True)
+    def restore(self, pk: str, sk: str, index_keys: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Undo soft_delete (index keys from index_keys()). Returns the restored item, or None if not a tombstone."""
+        names = {'#del': TOMBSTONE_ATTRIBUTE, '#exp': 'expiresAt'}
+        values = {}
+        sets = []
+        for i, (name, value) in enumerate(index_keys.items()):
+            names[f'#k{i}'], values[f':k{i}'] = name, value
+            sets.append(f'#k{i} = :k{i}')
+        try:
+            resp = self.table.update_item(
+                Key={'PK': pk, 'SK': sk},
+                UpdateExpression=f"SET {', '.join(sets)} REMOVE #del, #exp",
+                ConditionExpression='attribute_exists(#del)',
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+                ReturnValues='ALL_NEW'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return None
+            raise
+        return resp.get('Attributes')
+    
+    @_guarded(write=True)
+    def increment(self, pk: str, sk: str, deltas: Dict[str, Any]) -> Dict[str, Any]:
+        """Atomically add deltas to numeric attributes, creating the item if needed."""
+        names = {f'#c{i}': name for i, name in enumerate(deltas)}
+        values = {f':c{i}': delta for i, delta in enumerate(deltas.values())}
+        resp = self.table.update_item(
+            Key={'PK': pk, 'SK': sk},
+            UpdateExpression='ADD ' + ', '.join(f'#c{i} :c{i}' for i in range(len(deltas))),
+            ExpressionAttributeNames=names,
+            ExpressionAttributeValues=values,
+            ReturnValues='UPDATED_NEW'
+        )
+        return resp.get('Attributes', {})
+    
+    # ---------- Batches ----------
+    def batch_write(
+        self,
+        puts: Iterable[Dict[str, Any]] = (),
+        deletes: Iterable[Tuple[str, str]] = ()
+    ) -> None:
+        """
+        Write and delete items in 25-item batches (unprocessed items are retried).
+        Each batch goes through the throttle guard on its own, charged one token
+        per item, so a throttled batch is retried without rewriting earlier ones.
+        """
+        actions = [(True, item) for item in puts] + [(False, key) for key in deletes]
+        for start in range(0, len(actions), BATCH_WRITE_SIZE):
+            chunk = actions[start:start + BATCH_WRITE_SIZE]
+            self.throttle.call('batch_write', lambda: self._write_batch(chunk), True, len(chunk))
+
+    def _write_batch(self, actions: List[Tuple[bool, Any]]) -> None:
+        with self.table.batch_writer(overwrite_by_pkeys=['PK', 'SK']) as batch:
+            for is_put, value in actions:
+                if is_put:
+                    batch.put_item(Item=value)
+                else:
+                    batch.delete_item(Key={'PK': value[0], 'SK': value[1]})
+    
+    @_guarded()
+    def batch_get(self, keys: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Get many items by primary key (order is not preserved)."""
+        items = []
+        for start in range(0, len(keys), 100):
+            request = {self.table_name: {'Keys': [{'PK': pk, 'SK': sk} for pk, sk in keys[start:start + 100]]}}
+            while request:
+                resp = self._batch_get_item(RequestItems=request)
+                items.extend(resp.get('Responses', {}).get(self.table_name, []))
+                request = resp.get('UnprocessedKeys') or None
+        return items
+    
+    # ---------- Transactions ----------
+    @_guarded(write=True, cost=lambda updates: len(updates))
+    def transact_update(self, updates: List[Dict[str, Any]]) -> None:
+        """
+        Apply UpdateItem actions atomically (TransactWriteItems, up to 100).
+        Each update: pk, sk, update_expression, expression_values, and optional
+        expression_attribute_names / condition_expression. If any condition
+        fails, nothing is written and TransactionCanceledException is raised.
+        """
+        items = []
+        for u in updates:
+            key, values = {'PK': u['pk'], 'SK': u['sk']}, u['expression_values']
+            if self.client_mode == 'client':
+                key, values = serialize_item(key), serialize_item(values)
+            update = {
+                'TableName': self.table_name,
+                'Key': key,
+                'UpdateExpression': u['update_expression'],
+                'ExpressionAttributeValues': values,
+            }
+            if u.get('expression_attribute_names'):
+                update['ExpressionAttributeNames'] = u['expression_attribute_names']
+            if u.get('condition_expression'):
+                update['ConditionExpression'] = u['condition_expression']
+            items.append({'Update': update})
+        self.client.transact_write_items(TransactItems=items)
+    
     # ---------- Queries ----------
+    @_guarded()
     def query_pk(
         self,
         pk: str,
         sk_begins_with: Optional[str] = None,
         limit: int = 50,
-        last_evaluated_key: Optional[Dict[str, Any]] = None
+        last_evaluated_key: Optional[Dict[str, Any]] = None,
+        sk_between: Optional[Tuple[str, str]] = None
     ) -> Dict[str, Any]:
-        """Query by partition key."""
+        """Query by partition key (optionally an SK prefix or an inclusive SK range)."""
         expr = Key('PK').eq(pk)
         if sk_begins_with:
             expr = expr & Key('SK').begins_with(sk_begins_with)
+        elif sk_between:
+            expr = expr & Key('SK').between(*sk_between)
         
         params = {'KeyConditionExpression': expr, 'Limit': limit}
         if last_evaluated_key:
             params['ExclusiveStartKey'] = last_evaluated_key
         return self.table.query(**params)
     
+    def iter_pk(
+        self,
+        pk: str,
+        sk_begins_with: Optional[str] = None,
+        page_size: int = 500,
+        sk_between: Optional[Tuple[str, str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield every item under a partition key, fetching one page at a time."""
+        last_key = None
+        while True:
+            resp = self.query_pk(pk, sk_begins_with, limit=page_size, last_evaluated_key=last_key,
+                                 sk_between=sk_between)
+            yield from resp.get('Items', [])
+            last_key = resp.get('LastEvaluatedKey')
+            if not last_key:
+                return
+    
+    @_guarded()
     def query_gsi1(
         self,
         gsi1pk: str,
         limit: int = 50,
-        last_evaluated_key: Optional[Dict[str, Any]] = None
+        last_evaluated_key: Optional[Dict[str, Any]] = None,
+        sk_between: Optional[Tuple[str, str]] = None,
+        projection: Optional[Iterable[str]] = None,
+        index_name: str = 'GSI1'
     ) -> Dict[str, Any]:
-        """Query by GSI1 partition key."""
+        """
+        Query by GSI1 partition key (newest first), optionally within a GSI1SK range.
+        projection limits the returned attributes; index_name selects another
+        index on the same keys (e.g. the narrow report index).
+        A sharded note partition (NOTE_GSI1_SHARDS) is read across all its shards.
+        """
+        partitions = sharding.read_partitions(gsi1pk)
+        if len(partitions) > 1:
+            return self._query_shards(self.table.query, partitions, limit, last_evaluated_key, sk_between,
+                                      projection, index_name, wire=False)
+        return self.table.query(
+            **self._gsi1_params(gsi1pk, limit, last_evaluated_key, sk_between, projection, index_name)
+        )
+    
+    @_guarded()
+    def query_gsi1_wire(
+        self,
+        gsi1pk: str,
+        limit: int = 50,
+        last_evaluated_key: Optional[Dict[str, Any]] = None,
+        sk_between: Optional[Tuple[str, str]] = None,
+        projection: Optional[Iterable[str]] = None,
+        index_name: str = 'GSI1'
+    ) -> Dict[str, Any]:
+        """
+        query_gsi1 with Items left in wire format, for the schema decoders in
+        app.repositories.wire. Client mode only: the resource's client
+        converts every AttributeValue before we could see it.
+        """
+        if self.client_mode != 'client':
+            raise RuntimeError('query_gsi1_wire requires DDB_CLIENT_MODE=client')
+        partitions = sharding.read_partitions(gsi1pk)
+        if len(partitions) > 1:
+            return self._query_shards(self.table.query_wire, partitions, limit, last_evaluated_key, sk_between,
+                                      projection, index_name, wire=True)
+        return self.table.query_wire(
+            **self._gsi1_params(gsi1pk, limit, last_evaluated_key, sk_between, projection, index_name)
+        )
+    
+    def _query_shards(
+        self,
+        query: Callable[..., Dict[str, Any]],
+        partitions: List[str],
+        limit: int,
+        last_evaluated_key: Optional[Dict[str, Any]],
+        sk_between: Optional[Tuple[str, str]],
+        projection: Optional[Iterable[str]],
+        index_name: str,
+        wire: bool
+    ) -> Dict[str, Any]:
+        """Scatter one page query over the partitions and heap-merge the results by GSI1SK."""
+        starts = sharding.start_keys(partitions, last_evaluated_key)
+        if not starts:
+            return {'Items': [], 'Count': 0}
+        fetch = sharding.with_key_attributes(projection)
+        with ThreadPoolExecutor(max_workers=len(starts)) as pool:
+            futures = {
+                p: pool.submit(contextvars.copy_context().run, query,
+                               **self._gsi1_params(p, limit, start, sk_between, fetch, index_name))
+                for p, start in starts.items()
+            }
+            pages = {p: f.result() for p, f in futures.items()}
+        if wire:
+            sort_key = lambda it: it['GSI1SK']['S']
+            item_key = lambda it: deserialize_item({k: it[k] for k in sharding.KEY_ATTRIBUTES})
+        else:
+            sort_key = lambda it: it['GSI1SK']
+            item_key = lambda it: {k: it[k] for k in sharding.KEY_ATTRIBUTES}
+        result = sharding.merge_pages(pages, starts, limit, sort_key, item_key)
+        sharding.strip_attributes(result['Items'], projection)
+        return result
+    
+    def _gsi1_params(
+        self,
+        gsi1pk: str,
+        limit: int,
+        last_evaluated_key: Optional[Dict[str, Any]],
+        sk_between: Optional[Tuple[str, str]],
+        projection: Optional[Iterable[str]],
+        index_name: str
+    ) -> Dict[str, Any]:
+        expr = Key('GSI1PK').eq(gsi1pk)
+        if sk_between:
+            expr = expr & Key('GSI1SK').between(*sk_between)
         params = {
-            'IndexName': 'GSI1',
-            'KeyConditionExpression': Key('GSI1PK').eq(gsi1pk),
+            'IndexName': index_name,
+            'KeyConditionExpression': expr,
             'ScanIndexForward': False,
             'Limit': limit
         }
+        if projection:
+            params.update(projection_params(projection))
         if last_evaluated_key:
             params['ExclusiveStartKey'] = last_evaluated_key
-        return self.table.query(**params)
+        return params
+    
+    def iter_gsi1(self, gsi1pk: str, page_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Yield every item under a GSI1 partition, fetching one page at a time."""
+        last_key = None
+        while True:
+            resp = self.query_gsi1(gsi1pk, limit=page_size, last_evaluated_key=last_key)
+            yield from resp.get('Items', [])
+            last_key = resp.get('LastEvaluatedKey')
+            if not last_key:
+                return
+    
+    @_guarded()
+    def scan_page(
+        self,
+        segment: Optional[int] = None,
+        total_segments: Optional[int] = None,
+        last_evaluated_key: Optional[Dict[str, Any]] = None,
+        entity_type: Optional[str] = None,
+        projection: Optional[Iterable[str]] = None,
+        limit: int = 500
+    ) -> Dict[str, Any]:
+        """
+        One page of a table scan, or of one segment of a parallel scan.
+        limit counts items read before the entity_type filter, so pages may be short or empty.
+        """
+        params: Dict[str, Any] = {'Limit': limit}
+        if entity_type:
+            params['FilterExpression'] = Attr('entityType').eq(entity_type)
+        if total_segments:
+            params.update(Segment=segment, TotalSegments=total_segments)
+        if projection:
+            params.update(projection_params(projection))
+        if last_evaluated_key:
+            params['ExclusiveStartKey'] = last_evaluated_key
+        return self.table.scan(**params)
+    
+    def iter_scan(
+        self,
+        entity_type: Optional[str] = None,
+        segment: Optional[int] = None,
+        total_segments: Optional[int] = None,
+        page_size: int = 500
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield every item of the table (or of one parallel-scan segment), optionally of one entity type."""
+        last_key = None
+        while True:
+            resp = self.scan_page(segment, total_segments, last_key, entity_type, limit=page_size)
+            yield from resp.get('Items', [])
+            last_key = resp.get('LastEvaluatedKey')
+            if not last_key:
+                return
     
     # ---------- Note Builders ----------
     def create_note_item(self, user_id: str, note_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -109,13 +512,14 @@ class DynamoDBRepository:
         return {
             'PK': f'USER#{user_id}',
             'SK': f'NOTE#{note_id}',
-            'GSI1PK': f'NOTE#{user_id}',
+            'GSI1PK': sharding.note_gsi1pk(user_id, note_id),
             'GSI1SK': f'{date_val}#{note_id}',
             'entityType': 'NOTE',
             'noteId': note_id,
             'userId': user_id,
             'createdAt': now,
             'updatedAt': now,
+            VERSION_ATTRIBUTE: 1,
             **payload
         }
     
@@ -136,8 +540,20 @@ class DynamoDBRepository:
             'userId': user_id,
             'createdAt': now,
             'updatedAt': now,
+            VERSION_ATTRIBUTE: 1,
             **payload
         }
+    
+    def index_keys(self, item: Dict[str, Any]) -> Dict[str, str]:
+        """GSI1 keys of a note or strategy item, as create_*_item and update_note set them."""
+        user_id = item['userId']
+        if item.get('entityType') == 'NOTE':
+            note_id = item['noteId']
+            return {
+                'GSI1PK': sharding.note_gsi1pk(user_id, note_id),
+                'GSI1SK': f"{item.get('date') or item['createdAt']}#{note_id}",
+            }
+        return {'GSI1PK': f'STRAT#{user_id}', 'GSI1SK': f"{item['createdAt']}#{item['strategyId']}"}
 
 
 # Reusable module-level repository instance (warm Lambda reuse)
@@ -151,6 +567,12 @@ def _get_db():
         _db_instance = DynamoDBRepository()
     return _db_instance
 
+
+def reset_db() -> None:
+    """Drop the repository instance; the next use builds new clients (and connections)."""
+    global _db_instance
+    _db_instance = None
+
 # Create a proxy object for backward compatibility
 class _DBProxy:
     """Proxy object that lazily initializes the database repository."""
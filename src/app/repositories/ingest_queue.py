@@ -0,0 +1,234 @@
+"""
+Durable queues for write-behind ingest.
+
+Both backends share an SQS-shaped interface (send / receive / delete, with a
+visibility timeout so unacknowledged messages are redelivered):
+
+- SQSQueue:    Amazon SQS (INGEST_QUEUE_URL); give the queue a redrive policy
+               (maxReceiveCount) so poison messages move to a dead-letter queue
+- SQLiteQueue: a local file in WAL mode (INGEST_QUEUE_PATH), the stand-in for
+               development and tests; it survives process restarts but is
+               only as shared as the file, i.e. one per container. Inside
+               Lambda (AWS_LAMBDA_FUNCTION_NAME set) it is refused, since
+               queued notes would be lost with the container
+
+A SQLite message received INGEST_MAX_RECEIVES times without being deleted is
+moved to its dead_letters table instead of being delivered again, so a
+message that always fails cannot hold up the head of the queue.
+"""
+import logging
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, NamedTuple
+
+import boto3
+
+from app.repositories.dynamodb import client_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VISIBILITY_TIMEOUT_SECONDS = 30
+DEFAULT_MAX_RECEIVES = 5
+
+
+class QueueNotConfigured(RuntimeError):
+    """Queued ingest was requested without a queue usable in this environment."""
+
+
+class QueueMessage(NamedTuple):
+    receipt: str
+    body: Dict[str, Any]
+
+
+class SQLiteQueue:
+    """SQLite-backed queue; receive() leases messages until delete() or the timeout."""
+
+    def __init__(
+        self,
+        path: str,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT_SECONDS,
+        max_receives: int = DEFAULT_MAX_RECEIVES
+    ):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_receives = max_receives
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS messages ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' body TEXT NOT NULL,'
+            ' visible_at REAL NOT NULL,'
+            ' receipt TEXT,'
+            ' receive_count INTEGER NOT NULL DEFAULT 0)'
+        )
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(messages)')}
+        if 'receive_count' not in columns:  # queue files from before dead-lettering
+            conn.execute('ALTER TABLE messages ADD COLUMN receive_count INTEGER NOT NULL DEFAULT 0')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS dead_letters ('
+            ' id INTEGER PRIMARY KEY,'
+            ' body TEXT NOT NULL,'
+            ' receive_count INTEGER NOT NULL,'
+            ' dead_at REAL NOT NULL)'
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread (sqlite3 connections are not shareable by default)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        return conn
+
+    def send(self, bodies: List[Dict[str, Any]]) -> None:
+        """Append messages (durable once this returns)."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT INTO messages (body, visible_at) VALUES (?, ?)',
+                [(json.dumps(b, separators=(',', ':')), now) for b in bodies]
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def receive(self, max_messages: int = 25) -> List[QueueMessage]:
+        """Lease up to max_messages visible messages, oldest first, dead-lettering exhausted ones."""
+        now = time.time()
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            exhausted = conn.execute(
+                'SELECT id, body, receive_count FROM messages WHERE visible_at <= ? AND receive_count >= ?',
+                (now, self.max_receives)
+            ).fetchall()
+            if exhausted:
+                conn.executemany(
+                    'INSERT INTO dead_letters (id, body, receive_count, dead_at) VALUES (?, ?, ?, ?)',
+                    [(row_id, body, count, now) for row_id, body, count in exhausted]
+                )
+                conn.executemany('DELETE FROM messages WHERE id = ?', [(row[0],) for row in exhausted])
+                logger.warning('Moved %d ingest message(s) to dead_letters after %d receives',
+                               len(exhausted), self.max_receives)
+            rows = conn.execute(
+                'SELECT id, body FROM messages WHERE visible_at <= ? ORDER BY id LIMIT ?', (now, max_messages)
+            ).fetchall()
+            messages = []
+            for row_id, body in rows:
+                receipt = f'{row_id}:{uuid.uuid4().hex}'
+                conn.execute(
+                    'UPDATE messages SET visible_at = ?, receipt = ?, receive_count = receive_count + 1'
+                    ' WHERE id = ?',
+                    (now + self.visibility_timeout, receipt, row_id)
+                )
+                messages.append(QueueMessage(receipt, json.loads(body)))
+            conn.execute('COMMIT')
+            return messages
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def delete(self, receipts: List[str]) -> None:
+        """Acknowledge leased messages (stale receipts are ignored, like SQS)."""
+        if receipts:
+            self._conn().executemany('DELETE FROM messages WHERE receipt = ?', [(r,) for r in receipts])
+
+    def depth(self) -> int:
+        return self._conn().execute('SELECT COUNT(*) FROM messages').fetchone()[0]
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """Bodies of dead-lettered messages, oldest first."""
+        rows = self._conn().execute('SELECT body FROM dead_letters ORDER BY id').fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+
+class SQSQueue:
+    """Amazon SQS queue with the same interface."""
+
+    def __init__(self, url: str, client=None):
+        self.url = url
+        self.client = client or boto3.client(
+            'sqs', region_name=os.getenv('AWS_REGION', 'us-east-1'), config=client_config()
+        )
+
+    def send(self, bodies: List[Dict[str, Any]]) -> None:
+        for start in range(0, len(bodies), 10):
+            chunk = bodies[start:start + 10]
+            resp = self.client.send_message_batch(QueueUrl=self.url, Entries=[
+                {'Id': str(i), 'MessageBody': json.dumps(b, separators=(',', ':'))} for i, b in enumerate(chunk)
+            ])
+            if resp.get('Failed'):
+                raise RuntimeError(f"SQS rejected {len(resp['Failed'])} message(s): {resp['Failed'][0].get('Message')}")
+
+    def receive(self, max_messages: int = 25) -> List[QueueMessage]:
+        messages: List[QueueMessage] = []
+        while len(messages) < max_messages:
+            resp = self.client.receive_message(
+                QueueUrl=self.url, MaxNumberOfMessages=min(10, max_messages - len(messages)), WaitTimeSeconds=0
+            )
+            batch = resp.get('Messages', [])
+            if not batch:
+                break
+            messages.extend(QueueMessage(m['ReceiptHandle'], json.loads(m['Body'])) for m in batch)
+        return messages
+
+    def delete(self, receipts: List[str]) -> None:
+        for start in range(0, len(receipts), 10):
+            self.client.delete_message_batch(QueueUrl=self.url, Entries=[
+                {'Id': str(i), 'ReceiptHandle': r} for i, r in enumerate(receipts[start:start + 10])
+            ])
+
+    def depth(self) -> int:
+        attrs = self.client.get_queue_attributes(
+            QueueUrl=self.url, AttributeNames=['ApproximateNumberOfMessages']
+        )['Attributes']
+        return int(attrs['ApproximateNumberOfMessages'])
+
+
+def queue_path() -> str:
+    return os.getenv('INGEST_QUEUE_PATH', os.path.join(tempfile.gettempdir(), 'mtp-ingest.sqlite3'))
+
+
+_queues: Dict[str, Any] = {}
+_queues_lock = threading.Lock()
+
+
+def local_queue_allowed() -> bool:
+    """The SQLite queue is per container, so it is only used outside Lambda."""
+    return not os.getenv('AWS_LAMBDA_FUNCTION_NAME')
+
+
+def get_queue():
+    """The configured ingest queue (SQS if INGEST_QUEUE_URL is set), one instance per target."""
+    url = os.getenv('INGEST_QUEUE_URL')
+    if not url and not local_queue_allowed():
+        raise QueueNotConfigured('INGEST_QUEUE_URL is required for queued ingest in Lambda')
+    target = url or queue_path()
+    queue = _queues.get(target)
+    if queue is None:
+        with _queues_lock:
+            queue = _queues.get(target)
+            if queue is None:
+                queue = _queues[target] = SQSQueue(url) if url else SQLiteQueue(
+                    target, max_receives=int(os.getenv('INGEST_MAX_RECEIVES', str(DEFAULT_MAX_RECEIVES)))
+                )
+    return queue
+
+
+def reset_queues() -> None:
+    """Forget the queue instances (SQS clients and SQLite connections are reopened on next use)."""
+    with _queues_lock:
+        _queues.clear()
@@ -0,0 +1,152 @@
+"""
+DynamoDB call instrumentation.
+
+Hooks into botocore's event system so every call made by the repository
+(including batch_writer flushes and UnprocessedKeys retries) is measured:
+
+- dynamodb_operation_seconds{op,index}    client-side latency histogram
+- dynamodb_consumed_rcu_total{route,op}   consumed read capacity
+- dynamodb_consumed_wcu_total{route,op}   consumed write capacity
+- dynamodb_retries_total{op}              botocore retry attempts
+- dynamodb_errors_total{op,code}          error responses (throttling, conditional checks...)
+
+The route label comes from app.core.metrics.current_route(), set by the router.
+When a request is being traced, each call also gets a client span. Inside
+metered(), consumed capacity is also added to a CapacityMeter, so a caller
+can see what its own calls cost (e.g. to rate-limit a maintenance job).
+"""
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+from app.core.metrics import get_metrics, current_route
+from app.core.tracing import span, SPAN_KIND_CLIENT
+
+
+# Operations that accept ReturnConsumedCapacity
+CAPACITY_OPERATIONS = frozenset({
+    'GetItem', 'PutItem', 'UpdateItem', 'DeleteItem', 'Query', 'Scan',
+    'BatchGetItem', 'BatchWriteItem', 'TransactGetItems', 'TransactWriteItems',
+})
+
+class CapacityMeter:
+    """Running totals of capacity consumed by the calls made inside metered()."""
+
+    def __init__(self):
+        self.rcu = 0.0
+        self.wcu = 0.0
+
+    def take(self):
+        """(rcu, wcu) consumed since the last take()."""
+        consumed = (self.rcu, self.wcu)
+        self.rcu = self.wcu = 0.0
+        return consumed
+
+
+_meter: ContextVar[Optional[CapacityMeter]] = ContextVar('mtp_capacity_meter', default=None)
+
+
+@contextmanager
+def metered() -> Iterator[CapacityMeter]:
+    """Meter the consumed capacity of DynamoDB calls made in this context."""
+    meter = CapacityMeter()
+    token = _meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _meter.reset(token)
+
+
+_CAMEL = re.compile(r'(?<!^)(?=[A-Z])')
+
+
+def op_label(operation_name: str) -> str:
+    """'BatchGetItem' -> 'batch_get_item' (matches the repository method names)."""
+    return _CAMEL.sub('_', operation_name).lower()
+
+
+def _provide_params(params: Dict[str, Any], model, context: Dict[str, Any], **kwargs) -> None:
+    context['mtp_index'] = params.get('IndexName', '')
+    if model.name in CAPACITY_OPERATIONS:
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+
+
+def _before_call(model, context: Dict[str, Any], **kwargs) -> None:
+    context['mtp_span'] = span(
+        f'dynamodb.{model.name}', SPAN_KIND_CLIENT,
+        **{'db.system': 'dynamodb', 'db.operation': model.name, 'db.index': context.get('mtp_index') or None}
+    )
+    context['mtp_start'] = time.perf_counter()
+    context['mtp_operation'] = model.name
+
+
+def _record(operation_name: str, context: Dict[str, Any], parsed: Dict[str, Any]) -> None:
+    start = context.get('mtp_start')
+    if start is None:
+        return
+    metrics = get_metrics()
+    op = op_label(operation_name)
+    error = parsed.get('Error') or {}
+    call_span = context.pop('mtp_span', None)
+    if call_span is not None:
+        if error.get('Code'):
+            call_span.set_attribute('db.error', error['Code'])
+        call_span.end()
+    labels = {'op': op, 'index': context.get('mtp_index') or 'table'}
+    metrics.observe('dynamodb_operation_seconds', time.perf_counter() - start, labels)
+
+    retries = (parsed.get('ResponseMetadata') or {}).get('RetryAttempts', 0)
+    if retries:
+        metrics.inc('dynamodb_retries_total', retries, {'op': op})
+
+    if error.get('Code'):
+        metrics.inc('dynamodb_errors_total', 1, {'op': op, 'code': error['Code']})
+
+    consumed = parsed.get('ConsumedCapacity')
+    if not consumed:
+        return
+    rcu = wcu = 0.0
+    for entry in consumed if isinstance(consumed, list) else [consumed]:
+        read = entry.get('ReadCapacityUnits')
+        write = entry.get('WriteCapacityUnits')
+        if read is None and write is None:
+            # Only a total is returned; attribute it by operation type
+            total = float(entry.get('CapacityUnits', 0))
+            if operation_name in ('GetItem', 'Query', 'Scan', 'BatchGetItem', 'TransactGetItems'):
+                rcu += total
+            else:
+                wcu += total
+        else:
+            rcu += float(read or 0)
+            wcu += float(write or 0)
+    meter = _meter.get()
+    if meter is not None:
+        meter.rcu += rcu
+        meter.wcu += wcu
+    route_labels = {'route': current_route(), 'op': op}
+    if rcu:
+        metrics.inc('dynamodb_consumed_rcu_total', rcu, route_labels)
+    if wcu:
+        metrics.inc('dynamodb_consumed_wcu_total', wcu, route_labels)
+
+
+def _after_call(model, context: Dict[str, Any], parsed: Dict[str, Any], **kwargs) -> None:
+    _record(model.name, context, parsed or {})
+
+
+def _after_call_error(context: Dict[str, Any], exception: Exception, **kwargs) -> None:
+    # Connection-level failures never produce a parsed response (and the event has no model)
+    operation_name = context.get('mtp_operation')
+    if operation_name:
+        _record(operation_name, context, {'Error': {'Code': type(exception).__name__}})
+
+
+def instrument_client(client) -> None:
+    """Register the metric hooks on a boto3 DynamoDB client."""
+    events = client.meta.events
+    events.register('before-parameter-build.dynamodb', _provide_params)
+    events.register('before-call.dynamodb', _before_call)
+    events.register('after-call.dynamodb', _after_call)
+    events.register('after-call-error.dynamodb', _after_call_error)
@@ -0,0 +1,169 @@
+"""
+Low-level client adapter with the boto3 Table interface.
+
+DynamoDBRepository calls table.get_item/put_item/update_item/delete_item/
+query/scan/batch_writer. LowLevelTable implements that subset on the low-level
+client with the fast codec, skipping the resource layer's per-call
+transformation injection (DDB_CLIENT_MODE=client).
+
+ClientTable is the same subset for resource mode: it calls the resource's own
+client, whose transformation handlers still convert values and conditions.
+boto3 documents resources (and so Table objects) as not thread-safe, while
+clients are, so the repository can be used from fan-out worker threads.
+"""
+from typing import Any, Dict, List, Optional
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+from boto3.dynamodb.table import BatchWriter
+
+from app.repositories.codec import serialize_item, deserialize_item
+
+
+def _expression_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Build condition objects into strings and serialize expression values."""
+    names = dict(params.pop('ExpressionAttributeNames', None) or {})
+    values = dict(params.pop('ExpressionAttributeValues', None) or {})
+    builder = ConditionExpressionBuilder()
+    for field, is_key in (('KeyConditionExpression', True), ('ConditionExpression', False),
+                          ('FilterExpression', False)):
+        condition = params.get(field)
+        if isinstance(condition, ConditionBase):
+            built = builder.build_expression(condition, is_key_condition=is_key)
+            params[field] = built.condition_expression
+            names.update(built.attribute_name_placeholders)
+            values.update(built.attribute_value_placeholders)
+    if names:
+        params['ExpressionAttributeNames'] = names
+    if values:
+        params['ExpressionAttributeValues'] = serialize_item(values)
+    return params
+
+
+class _SerializingBatchWriter:
+    """boto3 BatchWriter (buffering, dedup, unprocessed-item retries) fed pre-serialized items."""
+
+    def __init__(self, writer: BatchWriter):
+        self._writer = writer
+
+    def put_item(self, Item: Dict[str, Any]) -> None:
+        self._writer.put_item(Item=serialize_item(Item))
+
+    def delete_item(self, Key: Dict[str, Any]) -> None:
+        self._writer.delete_item(Key=serialize_item(Key))
+
+    def __enter__(self) -> '_SerializingBatchWriter':
+        self._writer.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._writer.__exit__(exc_type, exc, tb)
+
+
+class LowLevelTable:
+    """Subset of boto3's Table API backed by the low-level client."""
+
+    def __init__(self, client, table_name: str):
+        self.client = client
+        self.name = table_name
+        self.table_name = table_name
+
+    def get_item(self, Key: Dict[str, Any], **params) -> Dict[str, Any]:
+        resp = self.client.get_item(TableName=self.name, Key=serialize_item(Key), **_expression_params(params))
+        if 'Item' in resp:
+            resp['Item'] = deserialize_item(resp['Item'])
+        return resp
+
+    def put_item(self, Item: Dict[str, Any], **params) -> Dict[str, Any]:
+        resp = self.client.put_item(TableName=self.name, Item=serialize_item(Item), **_expression_params(params))
+        if 'Attributes' in resp:
+            resp['Attributes'] = deserialize_item(resp['Attributes'])
+        return resp
+
+    def update_item(self, Key: Dict[str, Any], **params) -> Dict[str, Any]:
+        resp = self.client.update_item(TableName=self.name, Key=serialize_item(Key), **_expression_params(params))
+        if 'Attributes' in resp:
+            resp['Attributes'] = deserialize_item(resp['Attributes'])
+        return resp
+
+    def delete_item(self, Key: Dict[str, Any], **params) -> Dict[str, Any]:
+        resp = self.client.delete_item(TableName=self.name, Key=serialize_item(Key), **_expression_params(params))
+        if 'Attributes' in resp:
+            resp['Attributes'] = deserialize_item(resp['Attributes'])
+        return resp
+
+    def query(self, **params) -> Dict[str, Any]:
+        resp = self.query_wire(**params)
+        resp['Items'] = [deserialize_item(it) for it in resp.get('Items', [])]
+        return resp
+
+    def query_wire(self, **params) -> Dict[str, Any]:
+        """query() that leaves Items in wire format (LastEvaluatedKey is still decoded)."""
+        if params.get('ExclusiveStartKey'):
+            params['ExclusiveStartKey'] = serialize_item(params['ExclusiveStartKey'])
+        resp = self.client.query(TableName=self.name, **_expression_params(params))
+        if 'LastEvaluatedKey' in resp:
+            resp['LastEvaluatedKey'] = deserialize_item(resp['LastEvaluatedKey'])
+        return resp
+
+    def scan(self, **params) -> Dict[str, Any]:
+        if params.get('ExclusiveStartKey'):
+            params['ExclusiveStartKey'] = serialize_item(params['ExclusiveStartKey'])
+        resp = self.client.scan(TableName=self.name, **_expression_params(params))
+        resp['Items'] = [deserialize_item(it) for it in resp.get('Items', [])]
+        if 'LastEvaluatedKey' in resp:
+            resp['LastEvaluatedKey'] = deserialize_item(resp['LastEvaluatedKey'])
+        return resp
+
+    def batch_writer(self, overwrite_by_pkeys: Optional[List[str]] = None) -> _SerializingBatchWriter:
+        return _SerializingBatchWriter(BatchWriter(self.name, self.client, overwrite_by_pkeys=overwrite_by_pkeys))
+
+    def batch_get_item(self, RequestItems: Dict[str, Any]) -> Dict[str, Any]:
+        """Same shape as the resource's batch_get_item (plain Python values in and out)."""
+        request = {
+            table: {**spec, 'Keys': [serialize_item(k) for k in spec['Keys']]}
+            for table, spec in RequestItems.items()
+        }
+        resp = self.client.batch_get_item(RequestItems=request)
+        resp['Responses'] = {
+            table: [deserialize_item(it) for it in items]
+            for table, items in resp.get('Responses', {}).items()
+        }
+        if resp.get('UnprocessedKeys'):
+            resp['UnprocessedKeys'] = {
+                table: {**spec, 'Keys': [deserialize_item(k) for k in spec['Keys']]}
+                for table, spec in resp['UnprocessedKeys'].items()
+            }
+        return resp
+
+
+class ClientTable:
+    """Subset of boto3's Table API on a resource's client (plain Python values in and out, thread-safe)."""
+
+    def __init__(self, client, table_name: str):
+        self.client = client
+        self.name = table_name
+        self.table_name = table_name
+
+    def get_item(self, **params) -> Dict[str, Any]:
+        return self.client.get_item(TableName=self.name, **params)
+
+    def put_item(self, **params) -> Dict[str, Any]:
+        return self.client.put_item(TableName=self.name, **params)
+
+    def update_item(self, **params) -> Dict[str, Any]:
+        return self.client.update_item(TableName=self.name, **params)
+
+    def delete_item(self, **params) -> Dict[str, Any]:
+        return self.client.delete_item(TableName=self.name, **params)
+
+    def query(self, **params) -> Dict[str, Any]:
+        return self.client.query(TableName=self.name, **params)
+
+    def scan(self, **params) -> Dict[str, Any]:
+        return self.client.scan(TableName=self.name, **params)
+
+    def batch_writer(self, overwrite_by_pkeys: Optional[List[str]] = None) -> BatchWriter:
+        return BatchWriter(self.name, self.client, overwrite_by_pkeys=overwrite_by_pkeys)
+
+    def batch_get_item(self, RequestItems: Dict[str, Any]) -> Dict[str, Any]:
+        return self.client.batch_get_item(RequestItems=RequestItems)
@@ -0,0 +1,161 @@
+"""
+Write sharding for note GSI1 partitions.
+
+By default every note of a user shares GSI1PK = NOTE#{userId}, so a very
+active user concentrates all their note writes and list/report reads on one
+GSI partition. With NOTE_GSI1_SHARDS=N (N > 1) each note is written to
+NOTE#{userId}#{shard}, where shard = crc32(noteId) % N. The shard is stable for
+the note's lifetime.
+
+Readers scatter-gather: DynamoDBRepository.query_gsi1 on NOTE#{userId}
+queries every shard concurrently and merges the pages by GSI1SK (newest
+first) with a heap. The merged page is exactly what one unsharded query would
+return. Its LastEvaluatedKey is a composite cursor holding one position per
+shard: {'shards': {partition: start key or None}}; exhausted shards are
+left out.
+
+Until existing notes are moved (scripts/migrate_gsi1_shards.py), readers
+also include the unsharded NOTE#{userId} partition. Set
+NOTE_GSI1_LEGACY_READS=false once the migration has finished.
+"""
+import heapq
+import os
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from app.repositories.tombstones import TOMBSTONE_ATTRIBUTE, is_tombstone
+
+
+# Attributes a GSI1 page needs to be merged and resumed
+KEY_ATTRIBUTES = ('PK', 'SK', 'GSI1PK', 'GSI1SK')
+
+
+def note_gsi1_shards() -> int:
+    """Configured shard count for note GSI1 partitions (1 = unsharded)."""
+    return max(1, int(os.getenv('NOTE_GSI1_SHARDS', '1')))
+
+
+def legacy_reads() -> bool:
+    return os.getenv('NOTE_GSI1_LEGACY_READS', 'true').lower() == 'true'
+
+
+def note_gsi1pk(user_id: str, note_id: str, shards: Optional[int] = None) -> str:
+    """GSI1PK of a note under the given (default: configured) shard count."""
+    shards = note_gsi1_shards() if shards is None else shards
+    if shards <= 1:
+        return f'NOTE#{user_id}'
+    return f'NOTE#{user_id}#{zlib.crc32(note_id.encode()) % shards}'
+
+
+def read_partitions(gsi1pk: str) -> List[str]:
+    """GSI1 partitions a query on gsi1pk covers (itself, unless it is a sharded note partition)."""
+    shards = note_gsi1_shards()
+    if shards <= 1 or not gsi1pk.startswith('NOTE#') or gsi1pk.count('#') != 1:
+        return [gsi1pk]
+    partitions = [f'{gsi1pk}#{i}' for i in range(shards)]
+    if legacy_reads():
+        partitions.append(gsi1pk)
+    return partitions
+
+
+def is_cursor(last_evaluated_key: Optional[Dict[str, Any]]) -> bool:
+    return bool(last_evaluated_key) and 'shards' in last_evaluated_key
+
+
+def start_keys(partitions: List[str], last_evaluated_key: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Partition -> ExclusiveStartKey (None = from the top) for the partitions still to read."""
+    if is_cursor(last_evaluated_key):
+        return {p: k for p, k in last_evaluated_key['shards'].items() if p in partitions}
+    return {p: None for p in partitions}
+
+
+def with_key_attributes(projection: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    """Extend a projection with the attributes merging needs."""
+    if not projection:
+        return None
+    return tuple(dict.fromkeys((*projection, *KEY_ATTRIBUTES)))
+
+
+def merge_pages(
+    pages: Dict[str, Dict[str, Any]],
+    starts: Dict[str, Any],
+    limit: int,
+    sort_key: Callable[[Dict[str, Any]], str],
+    item_key: Callable[[Dict[str, Any]], Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Merge per-partition query pages (each newest first) into one page of at
+    most limit items. The cursor resumes each partition after its last item
+    on this page; a partition whose page was fully used and had no
+    LastEvaluatedKey is exhausted.
+    """
+    tagged = [[(sort_key(it), p, it) for it in resp.get('Items', [])] for p, resp in pages.items()]
+    merged = heapq.merge(*tagged, key=lambda t: t[0], reverse=True)
+    items, consumed = [], {p: 0 for p in pages}
+    last: Dict[str, Dict[str, Any]] = {}
+    for _, partition, item in merged:
+        if len(items) >= limit:
+            break
+        items.append(item)
+        consumed[partition] += 1
+        last[partition] = item
+
+    cursor = {}
+    for partition, resp in pages.items():
+        returned = len(resp.get('Items', []))
+        if consumed[partition] < returned:
+            cursor[partition] = item_key(last[partition]) if partition in last else starts[partition]
+        elif resp.get('LastEvaluatedKey'):
+            cursor[partition] = resp['LastEvaluatedKey']
+    result: Dict[str, Any] = {'Items': items, 'Count': len(items)}
+    if cursor:
+        result['LastEvaluatedKey'] = {'shards': cursor}
+    return result
+
+
+def strip_attributes(items: List[Dict[str, Any]], projection: Optional[Iterable[str]]) -> None:
+    """Drop the key attributes with_key_attributes() added, keeping the projection's shape."""
+    if not projection:
+        return
+    extra = [a for a in KEY_ATTRIBUTES if a not in set(projection)]
+    for item in items:
+        for attr in extra:
+            item.pop(attr, None)
+
+
+def migrate_note_partitions(
+    repo,
+    notes: Iterable[Dict[str, Any]],
+    shards: int,
+    dry_run: bool = False
+) -> Dict[str, int]:
+    """
+    Move notes to the GSI1 partition they belong in under the given shard
+    count (an in-place GSI1PK update; DynamoDB moves the index entry).
+    Safe to rerun: notes already in place are skipped. Tombstones are left
+    out of the index (and counted as gone).
+    """
+    counts = {'scanned': 0, 'moved': 0, 'gone': 0}
+    for note in notes:
+        counts['scanned'] += 1
+        if is_tombstone(note):
+            counts['gone'] += 1
+            continue
+        target = note_gsi1pk(note['userId'], note['noteId'], shards)
+        if note.get('GSI1PK') == target:
+            continue
+        if not dry_run:
+            try:
+                repo.update_item(
+                    note['PK'], note['SK'], 'SET #g = :g', {':g': target}, {'#g': 'GSI1PK'},
+                    condition_expression=f'attribute_exists(PK) AND attribute_not_exists({TOMBSTONE_ATTRIBUTE})'
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                counts['gone'] += 1  # deleted since it was read
+                continue
+        counts['moved'] += 1
+    return counts
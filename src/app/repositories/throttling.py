@@ -0,0 +1,215 @@
+"""
+Client-side throttling control for DynamoDB calls.
+
+botocore already retries throttled calls (DDB_RETRY_MODE/DDB_MAX_ATTEMPTS).
+During a sustained burst those retries run out and the ClientError used to
+surface as a 500. ThrottleGuard adds a second, slower layer around each
+repository primitive:
+
+- writes first take one token per item written (a 25-item batch takes 25)
+  from an AdaptiveRateLimiter. Its rate is halved on every throttle and
+  grows back by a fixed step per success (AIMD), so a container backs off
+  while the table is hot and recovers afterwards
+- a throttled call (ProvisionedThroughputExceededException, ThrottlingException,
+  RequestLimitExceeded, or a transaction cancelled for throttling) is retried
+  after a full-jitter exponential backoff
+- when the retries run out, ThrottlingError is raised. It is distinct from
+  other errors so controllers can answer 503 with Retry-After
+
+Other errors pass through untouched and are never retried here. call_async
+does the same for coroutines (the aiobotocore repository), waiting with
+asyncio.sleep so the event loop keeps running.
+
+Metrics:
+- dynamodb_throttled_total{op}            throttled attempts
+- dynamodb_throttle_retries_total{op}     retries after a backoff
+- dynamodb_throttle_exhausted_total{op}   calls that raised ThrottlingError
+- dynamodb_backoff_seconds{op}            backoff sleep histogram
+- dynamodb_rate_limited_seconds_total     time writes waited for the limiter
+
+Configuration (per container):
+- DDB_WRITE_RATE         starting and maximum writes per second (default 500)
+- DDB_WRITE_RATE_MIN     floor the rate never drops below (default 5)
+- DDB_THROTTLE_RETRIES   retries after a throttle (default 4)
+- DDB_BACKOFF_BASE_MS    first backoff ceiling (default 50)
+- DDB_BACKOFF_MAX_MS     backoff ceiling (default 2000)
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from botocore.exceptions import ClientError
+
+from app.core.metrics import get_metrics
+from app.core.rate_limit import TokenBucket
+
+
+THROTTLE_CODES = frozenset({
+    'ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded',
+})
+
+
+class ThrottlingError(Exception):
+    """DynamoDB kept throttling a call after the repository's retries."""
+
+    def __init__(self, op: str, retry_after: float):
+        super().__init__(f'DynamoDB throttled {op}')
+        self.op = op
+        self.retry_after = retry_after
+
+
+def is_throttle(error: BaseException) -> bool:
+    """True for throttling ClientErrors, including transactions cancelled by throttling."""
+    if not isinstance(error, ClientError):
+        return False
+    code = error.response.get('Error', {}).get('Code')
+    if code in THROTTLE_CODES:
+        return True
+    if code == 'TransactionCanceledException':
+        reasons = error.response.get('CancellationReasons') or []
+        return any(r.get('Code') == 'ThrottlingError' for r in reasons)
+    return False
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rand: Callable[[], float] = random.random) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt))."""
+    return rand() * min(cap, base * (2 ** attempt))
+
+
+class AdaptiveRateLimiter:
+    """Token bucket whose rate is halved on throttles and raised additively on successes."""
+
+    def __init__(
+        self,
+        max_rate: float,
+        min_rate: float = 1.0,
+        decrease: float = 0.5,
+        increase: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.max_rate = float(max_rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.decrease = decrease
+        self.increase = increase
+        self.bucket = TokenBucket(self.max_rate, clock=clock, sleep=sleep)
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.bucket.rate
+
+    def acquire(self, n: float = 1) -> float:
+        """Wait for n tokens; returns seconds waited."""
+        return self.bucket.acquire(n)
+
+    async def acquire_async(self, n: float = 1) -> float:
+        """acquire() without blocking the event loop."""
+        wait = self.bucket.reserve(n)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self.bucket.set_rate(max(self.min_rate, self.bucket.rate * self.decrease))
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self.bucket.rate < self.max_rate:
+                self.bucket.set_rate(min(self.max_rate, self.bucket.rate + self.increase))
+
+
+class ThrottleGuard:
+    """Runs repository calls with the write limiter and throttle backoff."""
+
+    def __init__(
+        self,
+        limiter: Optional[AdaptiveRateLimiter],
+        retries: int = 4,
+        base_delay: float = 0.05,
+        max_delay: float = 2.0,
+        sleep: Callable[[float], None] = time.sleep,
+        rand: Callable[[], float] = random.random,
+        async_sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        self.limiter = limiter
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        self._rand = rand
+
+    @classmethod
+    def from_env(cls) -> 'ThrottleGuard':
+        rate = float(os.getenv('DDB_WRITE_RATE', '500'))
+        limiter = AdaptiveRateLimiter(rate, float(os.getenv('DDB_WRITE_RATE_MIN', '5'))) if rate > 0 else None
+        return cls(
+            limiter,
+            retries=int(os.getenv('DDB_THROTTLE_RETRIES', '4')),
+            base_delay=float(os.getenv('DDB_BACKOFF_BASE_MS', '50')) / 1000,
+            max_delay=float(os.getenv('DDB_BACKOFF_MAX_MS', '2000')) / 1000
+        )
+
+    def call(self, op: str, fn: Callable[[], Any], write: bool = False, cost: float = 1) -> Any:
+        """Call fn() (making `cost` writes), retrying throttles; raises ThrottlingError once the retries run out."""
+        labels = {'op': op}
+        limiter = self.limiter if write else None
+        attempt = 0
+        while True:
+            if limiter is not None:
+                self._waited(limiter.acquire(cost), labels)
+            try:
+                result = fn()
+            except ClientError as e:
+                self._sleep(self._backoff(e, attempt, limiter, labels))
+                attempt += 1
+                continue
+            if limiter is not None:
+                limiter.on_success()
+            return result
+
+    async def call_async(
+        self, op: str, fn: Callable[[], Awaitable[Any]], write: bool = False, cost: float = 1
+    ) -> Any:
+        """Await fn(), retrying throttles like call() but sleeping with asyncio.sleep."""
+        labels = {'op': op}
+        limiter = self.limiter if write else None
+        attempt = 0
+        while True:
+            if limiter is not None:
+                self._waited(await limiter.acquire_async(cost), labels)
+            try:
+                result = await fn()
+            except ClientError as e:
+                await self._async_sleep(self._backoff(e, attempt, limiter, labels))
+                attempt += 1
+                continue
+            if limiter is not None:
+                limiter.on_success()
+            return result
+
+    def _waited(self, waited: float, labels: dict) -> None:
+        if waited:
+            get_metrics().inc('dynamodb_rate_limited_seconds_total', waited, labels)
+
+    def _backoff(self, error: ClientError, attempt: int, limiter: Optional[AdaptiveRateLimiter], labels: dict) -> float:
+        """Delay before retrying a failed attempt; re-raises non-throttles and raises ThrottlingError when exhausted."""
+        if not is_throttle(error):
+            raise error
+        metrics = get_metrics()
+        metrics.inc('dynamodb_throttled_total', 1, labels)
+        if limiter is not None:
+            limiter.on_throttle()
+        if attempt >= self.retries:
+            metrics.inc('dynamodb_throttle_exhausted_total', 1, labels)
+            # Roughly how long the table needs to recover
+            raise ThrottlingError(labels['op'], self.max_delay) from error
+        delay = backoff_delay(attempt, self.base_delay, self.max_delay, self._rand)
+        metrics.observe('dynamodb_backoff_seconds', delay, labels)
+        metrics.inc('dynamodb_throttle_retries_total', 1, labels)
+        return delay
@@ -0,0 +1,39 @@
+"""
+Soft deletes.
+
+Deleting a note or strategy turns it into a tombstone instead of removing it
+(DynamoDBRepository.soft_delete):
+
+- deletedAt is set, and expiresAt (the table's TTL attribute) to
+  DELETED_RETENTION_DAYS later, when DynamoDB TTL purges the item
+- the index keys (GSI1PK/GSI1SK) are removed, so the item drops out of GSI1
+  and the report index; listings need no filter expression
+
+Until the purge, DynamoDBRepository.restore() brings the item back. Reads by
+primary key and stream images pass through live() so tombstones look like
+missing items.
+"""
+import os
+import time
+from typing import Any, Dict, Optional
+
+
+TOMBSTONE_ATTRIBUTE = 'deletedAt'
+INDEX_KEY_ATTRIBUTES = ('GSI1PK', 'GSI1SK')
+DEFAULT_RETENTION_DAYS = 30
+
+
+def is_tombstone(item: Optional[Dict[str, Any]]) -> bool:
+    """True for a soft-deleted item."""
+    return bool(item) and TOMBSTONE_ATTRIBUTE in item
+
+
+def live(item: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The item, or None if it is missing or soft-deleted."""
+    return None if is_tombstone(item) else item
+
+
+def purge_at() -> int:
+    """expiresAt epoch for an item deleted now."""
+    days = float(os.getenv('DELETED_RETENTION_DAYS', str(DEFAULT_RETENTION_DAYS)))
+    return int(time.time() + days * 24 * 3600)
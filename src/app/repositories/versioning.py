@@ -0,0 +1,35 @@
+"""
+Optimistic concurrency for notes and strategies.
+
+Every note and strategy carries a `version` attribute: 1 when created, and
+incremented in the same UpdateItem that applies an edit
+(DynamoDBRepository.versioned_update). A client that sends the version it
+last read (If-Match) gets the update only if nobody else wrote in between;
+otherwise the ConditionExpression fails and VersionConflict carries the
+current version, which DynamoDB returns with the failure
+(ReturnValuesOnConditionCheckFailure), so a conflict costs no extra read.
+
+The same condition also covers existence (attribute_exists(PK) and not a
+tombstone), which replaces the get_item check updates used to start with.
+
+Items written before versioning have no `version`; they count as version 0
+until their first update sets it to 1.
+"""
+from typing import Any, Dict, Optional
+
+
+VERSION_ATTRIBUTE = 'version'
+
+
+class VersionConflict(Exception):
+    """The item was written since the version the caller expected."""
+
+    def __init__(self, expected: int, current: int):
+        super().__init__(f'expected version {expected}, item is at version {current}')
+        self.expected = expected
+        self.current = current
+
+
+def item_version(item: Optional[Dict[str, Any]]) -> int:
+    """An item's version (0 for items written before versioning)."""
+    return int((item or {}).get(VERSION_ATTRIBUTE) or 0)
@@ -0,0 +1,126 @@
+"""
+Schema-specialized decoders for note and strategy items.
+
+The list and report paths only ever read the fixed Note/Strategy schemas, so
+instead of running every attribute through the generic codec (Decimal
+construction included) and then through Model.from_item/to_json, these read
+the wire-format AttributeValue maps straight into response-ready values:
+strings are taken as-is and numbers become floats (what the JSON encoder
+would turn the Decimals into anyway). An attribute stored with an unexpected
+type falls back to the generic codec, so output matches
+Model.from_item(deserialize_item(item)).to_json().
+"""
+from decimal import Decimal
+from typing import Any, Callable, Dict, Tuple
+
+from app.models.note import Note
+from app.models.strategy import parse_dsl
+from app.repositories.codec import deserialize
+
+Decoder = Callable[[Dict[str, Any]], Any]
+
+
+def _generic(av: Dict[str, Any]) -> Any:
+    value = deserialize(av)
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _string(av: Dict[str, Any]) -> Any:
+    value = av.get('S')
+    return value if value is not None else _generic(av)
+
+
+def _number(av: Dict[str, Any]) -> Any:
+    value = av.get('N')
+    return float(value) if value is not None else _generic(av)
+
+
+def _integer(av: Dict[str, Any]) -> Any:
+    value = av.get('N')
+    return int(value) if value is not None else _generic(av)
+
+
+def _dsl(av: Dict[str, Any]) -> Any:
+    return parse_dsl(deserialize(av))
+
+
+# (item attribute, decoder) in Note.to_json order; required fields are always emitted
+_NOTE_REQUIRED: Tuple[Tuple[str, Decoder], ...] = (
+    ('noteId', _string),
+    ('date', _string),
+    ('text', _string),
+    ('createdAt', _string),
+    ('updatedAt', _string),
+)
+_NOTE_OPTIONAL: Tuple[Tuple[str, Decoder], ...] = tuple(
+    (field, _number if field in ('risk', 'win_amount') else _string)
+    for field, _ in Note.OPTIONAL_FIELDS
+)
+_VERSION: Tuple[str, Decoder] = ('version', _integer)
+# Emitted only when present; version is unset on items written before versioning
+_NOTE_PRESENT_ONLY = _NOTE_OPTIONAL + (_VERSION,)
+_STRATEGY_FIELDS: Tuple[Tuple[str, Decoder], ...] = (
+    ('strategyId', _string),
+    ('name', _string),
+    ('market', _string),
+    ('timeframe', _string),
+    ('dsl', _dsl),
+    ('createdAt', _string),
+    ('updatedAt', _string),
+)
+
+_NOTE_SLOTS: Tuple[Tuple[str, str, Decoder], ...] = (
+    ('note_id', 'noteId', _string),
+    ('user_id', 'userId', _string),
+    ('date', 'date', _string),
+    ('text', 'text', _string),
+    ('created_at', 'createdAt', _string),
+    ('updated_at', 'updatedAt', _string),
+) + tuple(
+    (slot, field, decode)
+    for (field, slot), (_, decode) in zip(Note.OPTIONAL_FIELDS, _NOTE_OPTIONAL)
+) + (('version',) + _VERSION,)
+
+
+def note_json_from_wire(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Wire-format note item -> Note.to_json() shape."""
+    get = item.get
+    result = {}
+    for field, decode in _NOTE_REQUIRED:
+        av = get(field)
+        result[field] = decode(av) if av is not None else None
+    if not result['text']:
+        result['text'] = ''
+    for field, decode in _NOTE_PRESENT_ONLY:
+        av = get(field)
+        if av is not None:
+            value = decode(av)
+            if value is not None:
+                result[field] = value
+    return result
+
+
+def note_from_wire(item: Dict[str, Any]) -> Note:
+    """Wire-format note item -> Note (for aggregation)."""
+    get = item.get
+    note = Note.__new__(Note)
+    for slot, field, decode in _NOTE_SLOTS:
+        av = get(field)
+        setattr(note, slot, decode(av) if av is not None else None)
+    return note
+
+
+def strategy_json_from_wire(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Wire-format strategy item -> Strategy.to_json() shape."""
+    get = item.get
+    result = {}
+    for field, decode in _STRATEGY_FIELDS:
+        av = get(field)
+        result[field] = decode(av) if av is not None else None
+    if result['dsl'] is None:
+        result['dsl'] = {}
+    field, decode = _VERSION
+    av = get(field)
+    if av is not None:
+        result[field] = decode(av)
+    return result
@@ -0,0 +1,85 @@
+"""Composite dashboard service (notes, strategies and summary in one call)."""
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional
+
+from app.repositories.dynamodb import db
+from app.repositories.async_dynamodb import adb
+from app.repositories.wire import note_from_wire, strategy_json_from_wire
+from app.models.note import Note
+from app.models.strategy import Strategy
+from app.services.report_service import report_service
+from app.core.tracing import traced
+
+
+class DashboardService:
+    """Service that gathers everything the home/summary pages need."""
+    
+    @traced()
+    def get_dashboard(
+        self,
+        user_id: str,
+        note_limit: int = 200,
+        strategy_limit: int = 200,
+        date_from: str = "",
+        date_to: str = ""
+    ) -> Dict[str, Any]:
+        """Fetch the notes and strategies pages concurrently and summarize the notes page."""
+        wire = db.client_mode == 'client'
+        query = db.query_gsi1_wire if wire else db.query_gsi1
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            notes_future = pool.submit(
+                contextvars.copy_context().run, query, f'NOTE#{user_id}', limit=note_limit
+            )
+            strategies_future = pool.submit(
+                contextvars.copy_context().run, query, f'STRAT#{user_id}', limit=strategy_limit
+            )
+            notes_resp, strategies_resp = notes_future.result(), strategies_future.result()
+        if wire:
+            return self._assemble(notes_resp, strategies_resp, date_from, date_to,
+                                  note_from_wire, strategy_json_from_wire)
+        return self._assemble(notes_resp, strategies_resp, date_from, date_to)
+    
+    @traced()
+    async def get_dashboard_async(
+        self,
+        user_id: str,
+        note_limit: int = 200,
+        strategy_limit: int = 200,
+        date_from: str = "",
+        date_to: str = ""
+    ) -> Dict[str, Any]:
+        """Async variant of get_dashboard."""
+        notes_resp, strategies_resp = await asyncio.gather(
+            adb.query_gsi1(f'NOTE#{user_id}', limit=note_limit),
+            adb.query_gsi1(f'STRAT#{user_id}', limit=strategy_limit)
+        )
+        return self._assemble(notes_resp, strategies_resp, date_from, date_to)
+    
+    def _assemble(
+        self,
+        notes_resp: Dict[str, Any],
+        strategies_resp: Dict[str, Any],
+        date_from: str,
+        date_to: str,
+        note_decoder: Callable[[Dict[str, Any]], Note] = Note.from_item,
+        strategy_decoder: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Build the payload; the summary reuses the notes page instead of querying again."""
+        strategy_decoder = strategy_decoder or (lambda it: Strategy.from_item(it).to_json())
+        notes = [note_decoder(it) for it in notes_resp.get('Items', [])]
+        result = {
+            'notes': [n.to_json() for n in notes],
+            'strategies': [strategy_decoder(it) for it in strategies_resp.get('Items', [])],
+            'summary': report_service.summarize(notes, date_from, date_to)['summary']
+        }
+        if 'LastEvaluatedKey' in notes_resp:
+            result['notesLastKey'] = notes_resp['LastEvaluatedKey']
+        if 'LastEvaluatedKey' in strategies_resp:
+            result['strategiesLastKey'] = strategies_resp['LastEvaluatedKey']
+        return result
+
+
+# Service instance
+dashboard_service = DashboardService()
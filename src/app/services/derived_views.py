@@ -0,0 +1,328 @@
+"""
+Derived read models maintained from item changes.
+
+Each view turns one change (old image -> new image of a NOTE or STRATEGY
+item) into:
+
+- side effects: idempotent writes (puts/deletes keyed by the source item),
+  safe to repeat when a change is redelivered
+- counters: (pk, sk, {attribute: delta}) additions, applied by the stream
+  consumer in one transaction with the item's checkpoint so that each change
+  is counted exactly once
+
+Views live in the main table next to the user's items:
+- USER#{userId} / VIEW#SUMMARY            totalNotes, hitMiss#<v>, session#<v>,
+                                          winSum, winCount, strategyCount
+- USER#{userId} / VIEW#STRAT#{strategyId} notes, hits, misses, winSum, winCount
+- USER#{userId} / ROLLUP#{scope}#{D|W|M}#{period}
+                                          time buckets (see RollupService); scope is
+                                          ALL or a strategy ID
+- the search index (see SearchService)
+
+Rollups are also kept in inline mode (RollupService.record on each write).
+The other views are not, so before switching to DERIVED_VIEWS_MODE=stream run
+rebuild_views for every user (scripts/admin.py rebuild-views); the stream
+consumer only adds the changes made after that.
+"""
+import os
+from datetime import date as _date
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from app.repositories.dynamodb import db
+from app.repositories.tombstones import live
+from app.services.search_service import search_service
+
+
+Counters = Dict[str, Any]
+
+
+def stream_mode() -> bool:
+    """True when the stream consumer maintains the views (DERIVED_VIEWS_MODE=stream)."""
+    return os.getenv('DERIVED_VIEWS_MODE', 'inline').lower() == 'stream'
+
+
+class Change(NamedTuple):
+    """One item change, images already decoded to Python values."""
+    event_name: str                  # INSERT | MODIFY | REMOVE
+    sequence_number: str
+    pk: str
+    sk: str
+    old: Optional[Dict[str, Any]]
+    new: Optional[Dict[str, Any]]
+
+    @property
+    def entity_type(self) -> Optional[str]:
+        if self.sk.startswith('NOTE#'):
+            return 'NOTE'
+        if self.sk.startswith('STRAT#'):
+            return 'STRATEGY'
+        return None
+
+    @property
+    def user_id(self) -> str:
+        return self.pk.split('#', 1)[1]
+
+
+def delta(old: Counters, new: Counters) -> Counters:
+    """new - old per attribute, dropping zeros."""
+    result = {}
+    for name in old.keys() | new.keys():
+        value = new.get(name, 0) - old.get(name, 0)
+        if value:
+            result[name] = value
+    return result
+
+
+def note_summary_counters(note: Optional[Dict[str, Any]]) -> Counters:
+    """A note's contribution to VIEW#SUMMARY (mirrors ReportService.summarize)."""
+    if not note:
+        return {}
+    counters = {
+        'totalNotes': 1,
+        f"hitMiss#{note.get('hit_miss') or 'UNKNOWN'}": 1,
+        f"session#{note.get('session') or 'UNKNOWN'}": 1,
+    }
+    if note.get('win_amount') is not None:
+        counters['winSum'] = Decimal(str(note['win_amount']))
+        counters['winCount'] = 1
+    return counters
+
+
+def note_strategy_counters(note: Optional[Dict[str, Any]]) -> Counters:
+    """A note's contribution to its strategy's VIEW#STRAT# item."""
+    if not note or not note.get('strategyId'):
+        return {}
+    counters = {'notes': 1}
+    if note.get('hit_miss') == 'Hit':
+        counters['hits'] = 1
+    elif note.get('hit_miss') == 'Miss':
+        counters['misses'] = 1
+    if note.get('win_amount') is not None:
+        counters['winSum'] = Decimal(str(note['win_amount']))
+        counters['winCount'] = 1
+    return counters
+
+
+# Rollup granularities: key letter -> period of a date
+ROLLUP_PERIODS = {
+    'D': lambda d: d.isoformat(),
+    'W': lambda d: '{0}-W{1:02d}'.format(*d.isocalendar()),
+    'M': lambda d: d.isoformat()[:7],
+}
+ROLLUP_SCOPE_ALL = 'ALL'
+
+
+def rollup_sk(scope: str, granularity: str, period: str) -> str:
+    return f'ROLLUP#{scope}#{granularity}#{period}'
+
+
+def note_rollup_keys(note: Optional[Dict[str, Any]]) -> List[str]:
+    """SKs of the buckets a note counts in: each granularity, overall and for its strategy."""
+    if not note:
+        return []
+    try:
+        day = _date.fromisoformat(str(note.get('date') or note.get('createdAt') or '')[:10])
+    except ValueError:
+        return []
+    scopes = [ROLLUP_SCOPE_ALL] + ([note['strategyId']] if note.get('strategyId') else [])
+    return [rollup_sk(s, g, period(day)) for s in scopes for g, period in ROLLUP_PERIODS.items()]
+
+
+def note_rollup_counters(note: Optional[Dict[str, Any]]) -> Counters:
+    """A note's contribution to each of its rollup buckets."""
+    if not note:
+        return {}
+    counters = {'notes': 1, f"session#{note.get('session') or 'UNKNOWN'}": 1}
+    if note.get('hit_miss') == 'Hit':
+        counters['hits'] = 1
+    elif note.get('hit_miss') == 'Miss':
+        counters['misses'] = 1
+    if note.get('win_amount') is not None:
+        counters['winSum'] = Decimal(str(note['win_amount']))
+        counters['winCount'] = 1
+    if note.get('risk') is not None:
+        counters['riskSum'] = Decimal(str(note['risk']))
+        counters['riskCount'] = 1
+    return counters
+
+
+def rollup_deltas(
+    pk: str,
+    old: Optional[Dict[str, Any]],
+    new: Optional[Dict[str, Any]]
+) -> List[Tuple[str, str, Counters]]:
+    """(pk, sk, counters) per bucket touched by a note changing from old to new."""
+    totals: Dict[str, Counters] = {}
+    for note, sign in ((old, -1), (new, 1)):
+        counters = note_rollup_counters(note)
+        for sk in note_rollup_keys(note):
+            bucket = totals.setdefault(sk, {})
+            for name, value in counters.items():
+                bucket[name] = bucket.get(name, 0) + sign * value
+    result = []
+    for sk, counters in totals.items():
+        counters = {k: v for k, v in counters.items() if v}
+        if counters:
+            result.append((pk, sk, counters))
+    return result
+
+
+def add_update(pk: str, sk: str, counters: Counters) -> Dict[str, Any]:
+    """An ADD update (for DynamoDBRepository.transact_update) applying counter deltas."""
+    names = {f'#c{i}': name for i, name in enumerate(counters)}
+    values = {f':c{i}': value for i, value in enumerate(counters.values())}
+    return {
+        'pk': pk,
+        'sk': sk,
+        'update_expression': 'ADD ' + ', '.join(f'#c{i} :c{i}' for i in range(len(counters))),
+        'expression_values': values,
+        'expression_attribute_names': names,
+    }
+
+
+class DerivedView:
+    """
+    Base view: no side effects, no counters. prepare() runs once per change and
+    its result is passed to both side_effects() and counters().
+    """
+    name = 'view'
+    entity_types: Tuple[str, ...] = ()
+
+    def prepare(self, change: Change) -> Any:
+        return None
+
+    def side_effects(self, change: Change, prepared: Any = None) -> None:
+        pass
+
+    def counters(self, change: Change, prepared: Any = None) -> List[Tuple[str, str, Counters]]:
+        return []
+
+
+class SummaryView(DerivedView):
+    """Per-user note summary (what GET /v1/reports/notes-summary aggregates)."""
+    name = 'summary'
+    entity_types = ('NOTE', 'STRATEGY')
+
+    def counters(self, change: Change, prepared: Any = None) -> List[Tuple[str, str, Counters]]:
+        if change.entity_type == 'NOTE':
+            counters = delta(note_summary_counters(change.old), note_summary_counters(change.new))
+        else:
+            counters = delta({'strategyCount': 1} if change.old else {}, {'strategyCount': 1} if change.new else {})
+        return [(change.pk, 'VIEW#SUMMARY', counters)] if counters else []
+
+
+class StrategyStatsView(DerivedView):
+    """Per-strategy note statistics."""
+    name = 'strategy_stats'
+    entity_types = ('NOTE',)
+
+    def counters(self, change: Change, prepared: Any = None) -> List[Tuple[str, str, Counters]]:
+        old_sid = (change.old or {}).get('strategyId')
+        new_sid = (change.new or {}).get('strategyId')
+        old_c, new_c = note_strategy_counters(change.old), note_strategy_counters(change.new)
+        if old_sid == new_sid:
+            updates = [(old_sid, delta(old_c, new_c))]
+        else:
+            updates = [(old_sid, delta(old_c, {})), (new_sid, delta({}, new_c))]
+        return [(change.pk, f'VIEW#STRAT#{sid}', c) for sid, c in updates if sid and c]
+
+
+class SearchView(DerivedView):
+    """The full-text index: postings are side effects, STATS are counters."""
+    name = 'search'
+    entity_types = ('NOTE',)
+
+    def prepare(self, change: Change):
+        """The index plan, computed once for both the postings and the STATS deltas."""
+        note_id = (change.new or change.old or {}).get('noteId') or change.sk.split('#', 1)[1]
+        return search_service.plan_index(
+            change.user_id, note_id, (change.old or {}).get('text', ''), (change.new or {}).get('text', '')
+        )
+
+    def side_effects(self, change: Change, prepared: Any = None) -> None:
+        if prepared:
+            puts, deletes, _ = prepared
+            db.batch_write(puts, deletes)
+
+    def counters(self, change: Change, prepared: Any = None) -> List[Tuple[str, str, Counters]]:
+        if not prepared:
+            return []
+        stats = {k: v for k, v in prepared[2].items() if v}
+        return [(f'SEARCH#{change.user_id}', 'STATS', stats)] if stats else []
+
+
+class RollupView(DerivedView):
+    """Day/week/month buckets per user and per strategy."""
+    name = 'rollups'
+    entity_types = ('NOTE',)
+
+    def counters(self, change: Change, prepared: Any = None) -> List[Tuple[str, str, Counters]]:
+        return rollup_deltas(change.pk, change.old, change.new)
+
+
+# Views applied by the stream consumer, in order
+VIEWS: List[DerivedView] = [SummaryView(), StrategyStatsView(), RollupView(), SearchView()]
+
+
+def _add(totals: Counters, counters: Counters) -> None:
+    for name, value in counters.items():
+        totals[name] = totals.get(name, 0) + value
+
+
+def rebuild_views(user_id: str) -> int:
+    """
+    Recompute a user's VIEW#SUMMARY, VIEW#STRAT# items and search index from
+    their current notes and strategies. Writes absolute values, so it is safe
+    to repeat; returns the number of view items written.
+
+    Changes made while it runs are not included. Run it before the stream
+    consumer takes over (with writes paused for exact counts): the consumer
+    then adds each later change on top.
+    """
+    pk = f'USER#{user_id}'
+    summary: Counters = {}
+    by_strategy: Dict[str, Counters] = {}
+    postings: List[Dict[str, Any]] = []
+    stats = {'docCount': 0, 'totalLength': 0}
+    for note in db.iter_gsi1(f'NOTE#{user_id}'):
+        _add(summary, note_summary_counters(note))
+        counters = note_strategy_counters(note)
+        if counters:
+            _add(by_strategy.setdefault(note['strategyId'], {}), counters)
+        plan = search_service.plan_index(user_id, note['noteId'], '', note.get('text', ''))
+        if plan:
+            postings.extend(plan[0])
+            _add(stats, plan[2])
+    strategy_count = sum(1 for it in db.iter_pk(pk, 'STRAT#') if live(it))
+    if strategy_count:
+        summary['strategyCount'] = strategy_count
+
+    views = [{'PK': pk, 'SK': 'VIEW#SUMMARY', **summary}]
+    views += [{'PK': pk, 'SK': f'VIEW#STRAT#{sid}', **counters} for sid, counters in by_strategy.items()]
+    stale = [
+        (pk, it['SK']) for it in db.iter_pk(pk, 'VIEW#STRAT#')
+        if it['SK'][len('VIEW#STRAT#'):] not in by_strategy
+    ]
+    db.batch_write(
+        puts=views + postings + [{'PK': f'SEARCH#{user_id}', 'SK': 'STATS', **stats}],
+        deletes=stale
+    )
+    return len(views)
+
+
+def summary_from_view(item: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """VIEW#SUMMARY item -> the notes-summary payload."""
+    item = item or {}
+    by_hit = {k.split('#', 1)[1]: int(v) for k, v in item.items() if k.startswith('hitMiss#') and v}
+    by_session = {k.split('#', 1)[1]: int(v) for k, v in item.items() if k.startswith('session#') and v}
+    win_count = int(item.get('winCount', 0))
+    avg_win = float(item.get('winSum', 0)) / win_count if win_count > 0 else 0.0
+    return {
+        'summary': {
+            'totalNotes': int(item.get('totalNotes', 0)),
+            'byHitMiss': by_hit,
+            'bySession': by_session,
+            'averageWinAmount': round(avg_win, 2)
+        }
+    }
@@ -0,0 +1,212 @@
+"""Data export service (streaming NDJSON/CSV)."""
+import contextvars
+import csv
+import gzip
+import io
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, IO, Iterable, Iterator, Optional, Tuple
+
+from app.repositories.dynamodb import db
+from app.models.note import Note
+from app.models.strategy import Strategy
+from app.core.response import decimal_default
+from app.core.tracing import traced
+
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+EXPORT_KINDS = ('notes', 'strategies')
+
+# Flat column layout shared by both record types so one CSV can hold both
+CSV_COLUMNS = [
+    'type', 'noteId', 'strategyId', 'date', 'text', 'direction', 'session', 'risk',
+    'win_amount', 'hit_miss', 'name', 'market', 'timeframe', 'dsl', 'createdAt', 'updatedAt'
+]
+
+# Keeps at most this many pages in flight between fetchers and the writer
+_QUEUE_PAGES = 4
+_DONE = object()
+
+
+class LocalObjectStore:
+    """Filesystem stand-in for an S3-compatible bucket."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getenv('EXPORT_STORE_DIR', os.path.join(tempfile.gettempdir(), 'mtp-exports'))
+
+    def put_object(self, key: str, fileobj: IO[bytes]) -> str:
+        """Copy a file-like object under key and return its location."""
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as out:
+            shutil.copyfileobj(fileobj, out)
+        return f'file://{path}'
+
+
+class S3ObjectStore:
+    """S3 bucket store returning presigned download URLs."""
+
+    def __init__(self, bucket: str, expires_in: int = 3600):
+        import boto3
+        self.bucket = bucket
+        self.expires_in = expires_in
+        self.s3 = boto3.client('s3', region_name=os.getenv('AWS_REGION', 'us-east-1'))
+
+    def put_object(self, key: str, fileobj: IO[bytes]) -> str:
+        """Upload a file-like object under key and return a presigned URL."""
+        self.s3.upload_fileobj(fileobj, self.bucket, key)
+        return self.s3.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': self.bucket, 'Key': key},
+            ExpiresIn=self.expires_in
+        )
+
+
+def get_object_store():
+    """Return the configured export store (S3 when EXPORT_BUCKET is set)."""
+    bucket = os.getenv('EXPORT_BUCKET')
+    if bucket:
+        return S3ObjectStore(bucket)
+    return LocalObjectStore()
+
+
+class ExportService:
+    """Service for exporting a user's notes and strategies."""
+
+    def iter_records(
+        self,
+        user_id: str,
+        kinds: Iterable[str] = EXPORT_KINDS,
+        page_size: int = 100
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield export records for a user.
+        Notes and strategies are paged from GSI1 concurrently; records are
+        yielded as pages arrive, so memory is bounded by a few pages.
+        """
+        fetchers = {
+            'notes': lambda: (
+                {'type': 'note', **Note.from_item(it).to_json()}
+                for it in db.iter_gsi1(f'NOTE#{user_id}', page_size=page_size)
+            ),
+            'strategies': lambda: (
+                {'type': 'strategy', **Strategy.from_item(it).to_json()}
+                for it in db.iter_gsi1(f'STRAT#{user_id}', page_size=page_size)
+            ),
+        }
+        selected = [fetchers[k] for k in kinds]
+        if len(selected) == 1:
+            yield from selected[0]()
+            return
+
+        pages: queue.Queue = queue.Queue(maxsize=_QUEUE_PAGES)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            # Bounded put that gives up once the consumer has gone away
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def pump(fetch):
+            try:
+                batch = []
+                for record in fetch():
+                    batch.append(record)
+                    if len(batch) >= page_size:
+                        if not put(batch):
+                            return
+                        batch = []
+                if batch and not put(batch):
+                    return
+                put(_DONE)
+            except Exception as e:  # surfaced to the consumer below
+                put(e)
+
+        with ThreadPoolExecutor(max_workers=len(selected)) as pool:
+            for fetch in selected:
+                pool.submit(contextvars.copy_context().run, pump, fetch)
+            try:
+                remaining = len(selected)
+                while remaining:
+                    page = pages.get()
+                    if page is _DONE:
+                        remaining -= 1
+                    elif isinstance(page, Exception):
+                        raise page
+                    else:
+                        yield from page
+            finally:
+                stop.set()
+
+    def write(
+        self,
+        records: Iterable[Dict[str, Any]],
+        out: IO[bytes],
+        fmt: str = 'ndjson',
+        compress: bool = False
+    ) -> int:
+        """Serialize records incrementally into a binary stream. Returns the record count."""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f'Unsupported export format: {fmt}')
+        sink = gzip.GzipFile(fileobj=out, mode='wb') if compress else out
+        text = io.TextIOWrapper(sink, encoding='utf-8', newline='')
+        count = 0
+        try:
+            if fmt == 'csv':
+                writer = csv.DictWriter(text, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+                writer.writeheader()
+                for record in records:
+                    row = dict(record)
+                    if isinstance(row.get('dsl'), (dict, list)):
+                        row['dsl'] = json.dumps(row['dsl'])
+                    writer.writerow(row)
+                    count += 1
+            else:
+                for record in records:
+                    text.write(json.dumps(record, default=decimal_default))
+                    text.write('\n')
+                    count += 1
+            text.flush()
+        finally:
+            # Detach so closing the wrapper does not close the caller's stream
+            text.detach()
+            if compress:
+                sink.close()
+        return count
+
+    @traced()
+    def export_user(
+        self,
+        user_id: str,
+        fmt: str = 'ndjson',
+        compress: bool = False,
+        kinds: Iterable[str] = EXPORT_KINDS,
+        spool_bytes: int = 1024 * 1024
+    ) -> Tuple[IO[bytes], int, int]:
+        """
+        Export a user's data to a spooled temporary file.
+        The file stays in memory up to spool_bytes and spills to disk beyond.
+        Returns (file positioned at 0, size in bytes, record count).
+        """
+        out = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        count = self.write(self.iter_records(user_id, kinds), out, fmt, compress)
+        size = out.tell()
+        out.seek(0)
+        return out, size, count
+
+
+# Service instance
+export_service = ExportService()
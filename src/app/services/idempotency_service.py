@@ -0,0 +1,114 @@
+"""Idempotency ledger for retried POST requests."""
+import hashlib
+import os
+import time
+from typing import Dict, Any, Optional
+
+from botocore.exceptions import ClientError
+
+from app.repositories.dynamodb import db
+from app.core.utils import now_iso
+from app.core.tracing import traced
+
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+# An unfinished claim outlives its request by at most this long (the Lambda timeout)
+DEFAULT_LEASE_SECONDS = 30
+MAX_KEY_LENGTH = 255
+
+IN_PROGRESS = 'IN_PROGRESS'
+COMPLETED = 'COMPLETED'
+
+
+class IdempotencyConflict(Exception):
+    """Another request with the same key is still being processed."""
+
+
+class IdempotencyMismatch(Exception):
+    """The key was already used for a different request payload."""
+
+
+class IdempotencyService:
+    """
+    Ledger of idempotency keys.
+
+    Layout: PK=IDEMP#{userId}, SK={scope}#{key}, with status, a request
+    fingerprint, the stored response and an expiresAt epoch used as the table TTL.
+
+    A claim is written with a short lease as its expiresAt, so a request that
+    crashed or timed out blocks retries only until the lease runs out;
+    complete() extends expiresAt to the full TTL.
+    """
+
+    def ttl_seconds(self) -> int:
+        return int(os.getenv('IDEMPOTENCY_TTL_SECONDS', str(DEFAULT_TTL_SECONDS)))
+
+    def lease_seconds(self) -> int:
+        return int(os.getenv('IDEMPOTENCY_LEASE_SECONDS', str(DEFAULT_LEASE_SECONDS)))
+
+    def fingerprint(self, scope: str, body: Optional[str]) -> str:
+        """Hash of the request so a reused key with a different payload is caught."""
+        return hashlib.sha256(f'{scope}\n{body or ""}'.encode('utf-8')).hexdigest()
+
+    @traced()
+    def begin(self, user_id: str, scope: str, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Claim a key before running the request.
+        Returns None when the caller should proceed, or the stored response to replay.
+        Raises IdempotencyConflict / IdempotencyMismatch otherwise.
+        """
+        now = int(time.time())
+        pk, sk = f'IDEMP#{user_id}', f'{scope}#{key}'
+        try:
+            # Expired entries (and IN_PROGRESS claims past their lease) may linger
+            # until TTL deletes them; treat them as free
+            db.put_item(
+                {
+                    'PK': pk,
+                    'SK': sk,
+                    'entityType': 'IDEMPOTENCY',
+                    'status': IN_PROGRESS,
+                    'fingerprint': fingerprint,
+                    'createdAt': now_iso(),
+                    'expiresAt': now + self.lease_seconds(),
+                },
+                condition_expression='attribute_not_exists(PK) OR expiresAt < :now',
+                expression_values={':now': now}
+            )
+            return None
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                raise
+
+        entry = db.get_item(pk, sk, consistent=True)
+        if not entry:
+            # Raced with a release; the client can simply retry
+            raise IdempotencyConflict(key)
+        if entry.get('fingerprint') != fingerprint:
+            raise IdempotencyMismatch(key)
+        if entry.get('status') != COMPLETED:
+            raise IdempotencyConflict(key)
+        return entry.get('response')
+
+    @traced()
+    def complete(self, user_id: str, scope: str, key: str, response: Dict[str, Any]) -> None:
+        """Store the first response so retries replay it, for the full TTL."""
+        db.update_item(
+            f'IDEMP#{user_id}',
+            f'{scope}#{key}',
+            'SET #status = :status, #response = :response, expiresAt = :expires',
+            {
+                ':status': COMPLETED,
+                ':response': {'statusCode': response['statusCode'], 'body': response.get('body', '')},
+                ':expires': int(time.time()) + self.ttl_seconds(),
+            },
+            {'#status': 'status', '#response': 'response'}
+        )
+
+    def release(self, user_id: str, scope: str, key: str) -> None:
+        """Forget a key whose request failed, so it can be retried."""
+        db.delete_item(f'IDEMP#{user_id}', f'{scope}#{key}')
+
+
+# Service instance
+idempotency_service = IdempotencyService()
@@ -0,0 +1,166 @@
+"""
+Write-behind note ingest.
+
+With NOTE_INGEST_MODE=queue, POST /v1/notes validates the note, builds its
+item (ID and timestamps included) and appends it to the ingest queue instead
+of writing to DynamoDB; the API answers 202 with the ID. A drainer then
+writes queued notes in 25-item batches:
+
+- SQLite queue (local): a background thread drains every INGEST_DRAIN_INTERVAL_MS
+  (0 disables it; call drain() yourself)
+- SQS queue: app.main.ingest_handler, as the queue's Lambda event source
+  (or on a schedule, where it polls the queue)
+
+Delivery is at-least-once. Notes already in the table are skipped, so a
+redelivered batch is not written or indexed twice. Until a note is drained,
+reads do not see it. When a batch fails, its messages are retried one by one,
+so only the failing ones are redelivered (and eventually dead-lettered).
+
+Inside Lambda queued ingest needs INGEST_QUEUE_URL: without it the mode is
+ignored and notes are written synchronously.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from app.repositories.dynamodb import db
+from app.repositories.codec import serialize_item, deserialize_item
+from app.repositories.ingest_queue import get_queue, local_queue_allowed, SQLiteQueue
+from app.models.validation import validate_note
+from app.services.search_service import search_service
+from app.services.rollup_service import rollup_service
+from app.services.derived_views import stream_mode
+from app.core.metrics import get_metrics
+from app.core.ids import generate_id
+from app.core.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 25  # BatchWriteItem limit
+DEFAULT_DRAIN_INTERVAL_MS = 200
+
+
+class IngestService:
+    """Queues note creations and drains them to DynamoDB in batches."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._warned_unconfigured = False
+
+    @property
+    def enabled(self) -> bool:
+        if os.getenv('NOTE_INGEST_MODE', 'sync').lower() != 'queue':
+            return False
+        if not os.getenv('INGEST_QUEUE_URL') and not local_queue_allowed():
+            # A container-local queue would lose notes with the container
+            if not self._warned_unconfigured:
+                logger.warning('NOTE_INGEST_MODE=queue needs INGEST_QUEUE_URL in Lambda; writing notes synchronously')
+                self._warned_unconfigured = True
+            return False
+        return True
+
+    @traced()
+    def enqueue_note(self, user_id: str, data: Dict[str, Any]) -> str:
+        """Validate and queue a new note; returns its pre-generated ID."""
+        data = validate_note(data)
+        note_id = generate_id("note")
+        item = db.create_note_item(user_id, note_id, data)
+        # Wire format keeps Decimals exact through JSON
+        get_queue().send([{'type': 'note.create', 'item': serialize_item(item)}])
+        get_metrics().inc('ingest_enqueued_total')
+        self.ensure_started()
+        return note_id
+
+    @traced()
+    def drain(self, max_batches: Optional[int] = None) -> int:
+        """Write queued notes until the queue is empty (or max_batches); returns notes written."""
+        queue = get_queue()
+        written, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            messages = queue.receive(BATCH_SIZE)
+            if not messages:
+                break
+            try:
+                written += self.write_batch([m.body for m in messages])
+                queue.delete([m.receipt for m in messages])
+            except Exception:
+                logger.exception('Failed to write ingest batch; retrying its messages one by one')
+                for message in messages:
+                    try:
+                        written += self.write_batch([message.body])
+                        queue.delete([message.receipt])
+                    except Exception:
+                        # Left leased: redelivered after the visibility timeout, then dead-lettered
+                        logger.exception('Failed to write ingest message')
+            batches += 1
+        return written
+
+    def process_records(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Handle an SQS event batch. Records of a failed chunk are retried one by one
+        and only those that still fail are reported in batchItemFailures.
+        """
+        failures = []
+        for start in range(0, len(records), BATCH_SIZE):
+            chunk = records[start:start + BATCH_SIZE]
+            try:
+                self.write_batch([json.loads(r['body']) for r in chunk])
+            except Exception:
+                logger.exception('Failed to write ingest batch; retrying its records one by one')
+                for record in chunk:
+                    try:
+                        self.write_batch([json.loads(record['body'])])
+                    except Exception:
+                        logger.exception('Failed to write ingest record %s', record['messageId'])
+                        failures.append({'itemIdentifier': record['messageId']})
+        return {'batchItemFailures': failures}
+
+    def write_batch(self, bodies: List[Dict[str, Any]]) -> int:
+        """Write one batch of queued notes, skipping any already stored."""
+        items = {}
+        for body in bodies:
+            item = deserialize_item(body['item'])
+            items[(item['PK'], item['SK'])] = item
+        existing = {(it['PK'], it['SK']) for it in db.batch_get(list(items))}
+        new = [item for key, item in items.items() if key not in existing]
+        if new:
+            db.batch_write(puts=new)
+        if not stream_mode():  # otherwise the stream consumer indexes them
+            for item in new:
+                try:
+                    search_service.index_note(item['userId'], item['noteId'], '', item.get('text', ''))
+                except Exception:
+                    logger.exception('Failed to update search index for note %s', item['noteId'])
+        for item in new:
+            rollup_service.record(item['userId'], None, item)
+        get_metrics().inc('ingest_written_total', len(new))
+        return len(new)
+
+    def ensure_started(self) -> None:
+        """Start the background drainer once, for the local (SQLite) queue."""
+        if self._thread is not None or self._drain_interval() <= 0 or not isinstance(get_queue(), SQLiteQueue):
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='ingest-drainer', daemon=True)
+                self._thread.start()
+
+    def _drain_interval(self) -> float:
+        return float(os.getenv('INGEST_DRAIN_INTERVAL_MS', str(DEFAULT_DRAIN_INTERVAL_MS))) / 1000.0
+
+    def _run(self) -> None:
+        interval = self._drain_interval()
+        while True:
+            time.sleep(interval)
+            try:
+                self.drain()
+            except Exception:  # never let the drainer thread die
+                logger.exception('Ingest drain failed')
+
+
+# Service instance
+ingest_service = IngestService()
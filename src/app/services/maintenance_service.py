@@ -0,0 +1,368 @@
+"""
+Table-wide maintenance jobs on DynamoDB parallel scans.
+
+MaintenanceRunner splits a Scan into TotalSegments segments and works them
+on a thread pool. Each page is handled in the same way:
+
+1. scan one page of the segment
+2. job.process(item, batch) for every item, where batch collects the puts
+   and deletes for this page
+3. write the batch with BatchWriteItem
+4. throttle: the capacity that the page actually consumed (ConsumedCapacity,
+   via instrumentation.metered) is charged to shared RCU/WCU token buckets,
+   and the worker sleeps off any debt, so the whole job stays within the
+   budget
+5. checkpoint: each segment's LastEvaluatedKey and the job state are written
+   atomically to the checkpoint file. Rerunning with the same file resumes
+   where the job stopped
+
+A resumed page may be processed twice, so jobs must be idempotent.
+Progress is reported through maintenance_* metrics and an optional
+on_progress callback. The admin CLI is scripts/admin.py.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from botocore.exceptions import ClientError
+
+from app.repositories.dynamodb import db
+from app.repositories.instrumentation import metered
+from app.services.derived_views import rebuild_views
+from app.services.rollup_service import rollup_service
+from app.core.metrics import get_metrics
+from app.core.rate_limit import TokenBucket
+
+
+class PageBatch:
+    """Writes a job queues while processing one page (flushed with BatchWriteItem)."""
+
+    def __init__(self):
+        self.puts: List[Dict[str, Any]] = []
+        self.deletes: List[Tuple[str, str]] = []
+
+    def put(self, item: Dict[str, Any]) -> None:
+        self.puts.append(item)
+
+    def delete(self, pk: str, sk: str) -> None:
+        self.deletes.append((pk, sk))
+
+
+class MaintenanceJob:
+    """A job applied to every scanned item. process() returns an outcome label and must be idempotent."""
+    name = 'job'
+    entity_type: Optional[str] = None
+    projection: Optional[Tuple[str, ...]] = None
+
+    def process(self, item: Dict[str, Any], batch: PageBatch) -> str:
+        raise NotImplementedError
+
+    def state(self) -> Dict[str, Any]:
+        """JSON-serializable state saved with each checkpoint."""
+        return {}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        pass
+
+    def finish(self, runner: 'MaintenanceRunner') -> None:
+        """Runs once every segment is scanned (e.g. to act on what the scan collected)."""
+
+
+class MigrateDslJob(MaintenanceJob):
+    """Rewrite strategy `dsl` values stored as JSON strings as DynamoDB maps."""
+    name = 'migrate-dsl'
+    entity_type = 'STRATEGY'
+    projection = ('PK', 'SK', 'dsl')
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+
+    def process(self, item: Dict[str, Any], batch: PageBatch) -> str:
+        raw = item.get('dsl')
+        if not isinstance(raw, str):
+            return 'skipped'
+        try:
+            value = json.loads(raw, parse_float=Decimal) if raw.strip() else {}
+        except json.JSONDecodeError:
+            return 'invalid'
+        if not isinstance(value, dict):
+            return 'invalid'
+        if self.dry_run:
+            return 'migrated'
+        try:
+            # Only if unchanged since the scan read it
+            db.update_item(item['PK'], item['SK'], 'SET #d = :new', {':new': value, ':old': raw}, {'#d': 'dsl'},
+                           condition_expression='#d = :old')
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+            return 'changed'
+        return 'migrated'
+
+
+# Partition-key prefixes of items owned by a user (PK = {prefix}{userId}[#...])
+USER_PK_PREFIXES = ('USER#', 'SEARCH#', 'IDEMP#', 'QUOTA#')
+
+
+def pk_owner(pk: str) -> Optional[str]:
+    """User ID owning an item's partition, if it is a per-user partition."""
+    for prefix in USER_PK_PREFIXES:
+        if pk.startswith(prefix):
+            return pk[len(prefix):].split('#', 1)[0]
+    return None
+
+
+class PurgeUsersJob(MaintenanceJob):
+    """Delete every item of the given users (notes, strategies, views, search index, ledger)."""
+    name = 'purge-users'
+    projection = ('PK', 'SK')
+
+    def __init__(self, user_ids: Iterable[str], dry_run: bool = False):
+        self.user_ids = frozenset(user_ids)
+        self.dry_run = dry_run
+
+    def process(self, item: Dict[str, Any], batch: PageBatch) -> str:
+        if pk_owner(item['PK']) not in self.user_ids:
+            return 'kept'
+        if not self.dry_run:
+            batch.delete(item['PK'], item['SK'])
+        return 'deleted'
+
+
+class RebuildUsersJob(MaintenanceJob):
+    """Find the users with matching items, then rebuild each one in finish()."""
+    outcome = 'rebuilt'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.users: Set[str] = set()
+        self.rebuilt: Set[str] = set()
+
+    def owner(self, item: Dict[str, Any]) -> Optional[str]:
+        return item['userId']
+
+    def rebuild(self, user_id: str) -> None:
+        raise NotImplementedError
+
+    def process(self, item: Dict[str, Any], batch: PageBatch) -> str:
+        user_id = self.owner(item)
+        if user_id is None:
+            return 'skipped'
+        with self._lock:
+            self.users.add(user_id)
+        return 'seen'
+
+    def state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'users': sorted(self.users), 'rebuilt': sorted(self.rebuilt)}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.users = set(state.get('users', []))
+        self.rebuilt = set(state.get('rebuilt', []))
+
+    def finish(self, runner: 'MaintenanceRunner') -> None:
+        for user_id in sorted(self.users - self.rebuilt):
+            with metered() as meter:
+                self.rebuild(user_id)
+            runner.charge(meter.take())
+            with self._lock:
+                self.rebuilt.add(user_id)
+            runner.count(self.outcome)
+            runner.save()
+
+
+class RebuildRollupsJob(RebuildUsersJob):
+    """Find every user with notes, then recompute their rollup buckets."""
+    name = 'rebuild-rollups'
+    entity_type = 'NOTE'
+    projection = ('userId',)
+
+    def rebuild(self, user_id: str) -> None:
+        rollup_service.rebuild(user_id)
+
+
+class RebuildViewsJob(RebuildUsersJob):
+    """
+    Find every user with notes or strategies, then recompute their summary and
+    strategy-stats views and search index (derived_views.rebuild_views).
+    Run it before switching to DERIVED_VIEWS_MODE=stream.
+    """
+    name = 'rebuild-views'
+    projection = ('PK', 'SK')
+
+    def owner(self, item: Dict[str, Any]) -> Optional[str]:
+        if item['PK'].startswith('USER#') and item['SK'].startswith(('NOTE#', 'STRAT#')):
+            return pk_owner(item['PK'])
+        return None
+
+    def rebuild(self, user_id: str) -> None:
+        rebuild_views(user_id)
+
+
+class MaintenanceRunner:
+    """Runs a MaintenanceJob over a parallel scan within an RCU/WCU budget."""
+
+    def __init__(
+        self,
+        job: MaintenanceJob,
+        segments: int = 8,
+        workers: Optional[int] = None,
+        rcu_per_second: Optional[float] = None,
+        wcu_per_second: Optional[float] = None,
+        checkpoint_path: Optional[str] = None,
+        page_size: int = 500,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        progress_interval: float = 5.0
+    ):
+        self.job = job
+        self.segments = segments
+        self.workers = workers or segments
+        # Capacity up to one second's budget can be spent in a burst
+        self.rcu = TokenBucket(rcu_per_second) if rcu_per_second else None
+        self.wcu = TokenBucket(wcu_per_second) if wcu_per_second else None
+        self.checkpoint_path = checkpoint_path
+        self.page_size = page_size
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self._lock = threading.Lock()
+        self._last_progress = 0.0
+        self._started = time.monotonic()
+        self.checkpoint = self._load()
+
+    # ---------- Checkpoints ----------
+    def _load(self) -> Dict[str, Any]:
+        fresh = {
+            'job': self.job.name,
+            'totalSegments': self.segments,
+            'segments': {str(s): {'lastKey': None, 'done': False} for s in range(self.segments)},
+            'counts': {},
+            'consumed': {'rcu': 0.0, 'wcu': 0.0},
+            'finished': False,
+            'state': {},
+        }
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return fresh
+        with open(self.checkpoint_path) as f:
+            saved = json.load(f)
+        if saved.get('job') != self.job.name or saved.get('totalSegments') != self.segments:
+            raise ValueError(
+                f"checkpoint {self.checkpoint_path} is for job {saved.get('job')!r} with "
+                f"{saved.get('totalSegments')} segments"
+            )
+        self.job.restore(saved.get('state') or {})
+        return saved
+
+    def save(self) -> None:
+        """Write the checkpoint atomically (no-op without a checkpoint path)."""
+        if not self.checkpoint_path:
+            return
+        with self._lock:
+            self.checkpoint['state'] = self.job.state()
+            data = json.dumps(self.checkpoint, default=str)
+            tmp = f'{self.checkpoint_path}.tmp'
+            with open(tmp, 'w') as f:
+                f.write(data)
+            os.replace(tmp, self.checkpoint_path)
+
+    # ---------- Accounting ----------
+    def charge(self, consumed: Tuple[float, float]) -> None:
+        """Record consumed (rcu, wcu) and wait until the budget allows more work."""
+        rcu, wcu = consumed
+        labels = {'job': self.job.name}
+        metrics = get_metrics()
+        with self._lock:
+            self.checkpoint['consumed']['rcu'] += rcu
+            self.checkpoint['consumed']['wcu'] += wcu
+        if rcu:
+            metrics.inc('maintenance_consumed_rcu_total', rcu, labels)
+        if wcu:
+            metrics.inc('maintenance_consumed_wcu_total', wcu, labels)
+        waited = 0.0
+        if self.rcu and rcu:
+            waited += self.rcu.acquire(rcu)
+        if self.wcu and wcu:
+            waited += self.wcu.acquire(wcu)
+        if waited:
+            metrics.inc('maintenance_throttled_seconds_total', waited, labels)
+
+    def count(self, outcome: str, n: int = 1) -> None:
+        with self._lock:
+            counts = self.checkpoint['counts']
+            counts[outcome] = counts.get(outcome, 0) + n
+        get_metrics().inc('maintenance_items_total', n, {'job': self.job.name, 'outcome': outcome})
+
+    def progress(self) -> Dict[str, Any]:
+        with self._lock:
+            segments = self.checkpoint['segments'].values()
+            return {
+                'job': self.job.name,
+                'segmentsDone': sum(1 for s in segments if s['done']),
+                'totalSegments': self.segments,
+                'counts': dict(self.checkpoint['counts']),
+                'consumed': dict(self.checkpoint['consumed']),
+                'elapsedSeconds': round(time.monotonic() - self._started, 1),
+                'finished': self.checkpoint['finished'],
+            }
+
+    def _report(self, force: bool = False) -> None:
+        if not self.on_progress:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_progress < self.progress_interval:
+                return
+            self._last_progress = now
+        self.on_progress(self.progress())
+
+    # ---------- Scan ----------
+    def _run_segment(self, segment: int) -> None:
+        seg = self.checkpoint['segments'][str(segment)]
+        while not seg['done']:
+            batch = PageBatch()
+            outcomes: Dict[str, int] = {}
+            with metered() as meter:
+                resp = db.scan_page(segment, self.segments, seg['lastKey'], self.job.entity_type,
+                                    self.job.projection, self.page_size)
+                for item in resp.get('Items', []):
+                    outcome = self.job.process(item, batch)
+                    outcomes[outcome] = outcomes.get(outcome, 0) + 1
+                if batch.puts or batch.deletes:
+                    db.batch_write(batch.puts, batch.deletes)
+            self.charge(meter.take())
+            for outcome, n in outcomes.items():
+                self.count(outcome, n)
+            scanned = len(resp.get('Items', []))
+            get_metrics().inc('maintenance_pages_total', 1, {'job': self.job.name})
+            with self._lock:
+                seg['lastKey'] = resp.get('LastEvaluatedKey')
+                seg['done'] = not seg['lastKey']
+                self.checkpoint['counts']['scanned'] = self.checkpoint['counts'].get('scanned', 0) + scanned
+            self.save()
+            self._report()
+
+    def run(self) -> Dict[str, Any]:
+        """Scan every unfinished segment, then finish the job; returns the final progress."""
+        pending = [int(s) for s, seg in self.checkpoint['segments'].items() if not seg['done']]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                for future in [pool.submit(self._run_segment, s) for s in pending]:
+                    future.result()
+        if not self.checkpoint['finished']:
+            self.job.finish(self)
+            with self._lock:
+                self.checkpoint['finished'] = True
+            self.save()
+        self._report(force=True)
+        return self.progress()
+
+
+JOBS = {
+    MigrateDslJob.name: MigrateDslJob,
+    PurgeUsersJob.name: PurgeUsersJob,
+    RebuildRollupsJob.name: RebuildRollupsJob,
+    RebuildViewsJob.name: RebuildViewsJob,
+}
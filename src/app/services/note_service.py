@@ -1,93 +1,173 @@
 """Note business logic service."""
 import json
-from typing import Dict, Any, List, Optional
+import logging
+from typing import Dict, Any, List, Optional, Tuple
 
 from app.repositories.dynamodb import db
+from app.repositories.tombstones import is_tombstone, live, purge_at
+from app.repositories.async_dynamodb import adb
+from app.repositories.wire import note_json_from_wire
 from app.models.note import Note
-from app.core.utils import generate_id, now_iso
+from app.models.validation import validate_note
+from app.services.search_service import search_service
+from app.services.rollup_service import rollup_service
+from app.services.derived_views import stream_mode
+from app.core.ids import generate_id
+from app.core.utils import now_iso, select_fields
+from app.core.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 
 class NoteService:
     """Service for note business logic."""
     
+    @traced()
     def create_note(self, user_id: str, data: Dict[str, Any]) -> str:
         """Create a new note and return its ID."""
+        data = validate_note(data)
         note_id = generate_id("note")
         item = db.create_note_item(user_id, note_id, data)
         db.put_item(item)
+        self._reindex(user_id, note_id, '', item.get('text', ''))
+        rollup_service.record(user_id, None, item)
         return note_id
     
+    @traced()
     def get_note(self, user_id: str, note_id: str) -> Optional[Dict[str, Any]]:
         """Get a note by ID."""
         pk, sk = f'USER#{user_id}', f'NOTE#{note_id}'
-        item = db.get_item(pk, sk)
+        item = live(db.get_item(pk, sk))
         if not item:
             return None
-        return self._item_to_note_dict(item)
+        return Note.from_item(item).to_json()
     
+    @traced()
     def list_notes(
         self,
         user_id: str,
         limit: int = 50,
-        last_key: Optional[Dict[str, Any]] = None
+        last_key: Optional[Dict[str, Any]] = None,
+        fields: Optional[Tuple[str, ...]] = None
     ) -> Dict[str, Any]:
-        """List notes with pagination."""
-        resp = db.query_gsi1(gsi1pk=f'NOTE#{user_id}', limit=limit, last_evaluated_key=last_key)
-        
-        items = [self._item_to_note_dict(it) for it in resp.get('Items', [])]
+        """List notes with pagination (only the given response fields, if any)."""
+        query = {'gsi1pk': f'NOTE#{user_id}', 'limit': limit, 'last_evaluated_key': last_key}
+        if fields:
+            query['projection'] = fields
+        if db.client_mode == 'client':
+            # Low-level client: decode the wire items straight into the response shape
+            resp = db.query_gsi1_wire(**query)
+            items = [note_json_from_wire(it) for it in resp.get('Items', [])]
+        else:
+            resp = db.query_gsi1(**query)
+            items = [Note.from_item(it).to_json() for it in resp.get('Items', [])]
+        if fields:
+            items = [select_fields(it, fields) for it in items]
         
         result = {'notes': items}
         if 'LastEvaluatedKey' in resp:
             result['lastKey'] = resp['LastEvaluatedKey']
         return result
     
-    def update_note(self, user_id: str, note_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Update a note."""
-        pk, sk = f'USER#{user_id}', f'NOTE#{note_id}'
-        
-        if not db.get_item(pk, sk):
-            return None
-        
-        update_expression = "SET #updatedAt = :updatedAt"
-        eav = {':updatedAt': now_iso()}
-        ean = {'#updatedAt': 'updatedAt'}
+    @traced()
+    async def list_notes_async(
+        self,
+        user_id: str,
+        limit: int = 50,
+        last_key: Optional[Dict[str, Any]] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of list_notes (for concurrent fan-out)."""
+        resp = await adb.query_gsi1(gsi1pk=f'NOTE#{user_id}', limit=limit, last_evaluated_key=last_key,
+                                    projection=fields)
         
-        for field in ["date", "text", "direction", "session", "risk", "win_amount", "strategyId", "hit_miss"]:
-            if field in data and data[field] not in (None, ""):
-                ean[f'#{field}'] = field
-                eav[f':{field}'] = data[field]
-                update_expression += f", #{field} = :{field}"
+        items = [Note.from_item(it).to_json() for it in resp.get('Items', [])]
+        if fields:
+            items = [select_fields(it, fields) for it in items]
         
+        result = {'notes': items}
+        if 'LastEvaluatedKey' in resp:
+            result['lastKey'] = resp['LastEvaluatedKey']
+        return result
+    
+    @traced()
+    def update_note(
+        self,
+        user_id: str,
+        note_id: str,
+        data: Dict[str, Any],
+        expected_version: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Update a note; None if it does not exist. With expected_version (If-Match),
+        raises VersionConflict if the note changed since that version.
+        """
+        data = validate_note(data, partial=True)
+        sets = {'updatedAt': now_iso(), **data}
         # If date changed, update GSI1SK
-        if 'date' in data and data['date']:
-            ean['#GSI1SK'] = 'GSI1SK'
-            eav[':gsi1sk'] = f"{data['date']}#{note_id}"
-            update_expression += ", #GSI1SK = :gsi1sk"
+        if 'date' in data:
+            sets['GSI1SK'] = f"{data['date']}#{note_id}"
         
-        updated = db.update_item(pk, sk, update_expression, eav, ean)['Attributes']
-        return self._item_to_note_dict(updated)
+        # One conditional write: existence, tombstone and version are all checked by DynamoDB
+        images = db.versioned_update(f'USER#{user_id}', f'NOTE#{note_id}', sets, expected_version)
+        if not images:
+            return None
+        existing, updated = images
+        if 'text' in data:
+            self._reindex(user_id, note_id, existing.get('text', ''), updated.get('text', ''))
+        rollup_service.record(user_id, existing, updated)
+        return Note.from_item(updated).to_json()
     
+    @traced()
     def delete_note(self, user_id: str, note_id: str) -> bool:
-        """Delete a note."""
+        """Soft-delete a note (restorable until TTL purges it)."""
         pk, sk = f'USER#{user_id}', f'NOTE#{note_id}'
-        if not db.get_item(pk, sk):
+        existing = db.soft_delete(pk, sk, now_iso(), purge_at())
+        if not existing:
             return False
-        db.delete_item(pk, sk)
+        self._reindex(user_id, note_id, existing.get('text', ''), '')
+        rollup_service.record(user_id, existing, None)
         return True
     
-    def _item_to_note_dict(self, item: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert DynamoDB item to note dictionary."""
-        note = {
-            'noteId': item.get('noteId'),
-            'date': item.get('date'),
-            'text': item.get('text', ''),
-            'createdAt': item.get('createdAt'),
-            'updatedAt': item.get('updatedAt'),
+    @traced()
+    def restore_note(self, user_id: str, note_id: str) -> Optional[Dict[str, Any]]:
+        """Undo delete_note; None if the note is not deleted (or already purged)."""
+        pk, sk = f'USER#{user_id}', f'NOTE#{note_id}'
+        tombstone = db.get_item(pk, sk)
+        if not is_tombstone(tombstone):
+            return None
+        restored = db.restore(pk, sk, db.index_keys(tombstone))
+        if not restored:
+            return None
+        self._reindex(user_id, note_id, '', restored.get('text', ''))
+        rollup_service.record(user_id, None, restored)
+        return Note.from_item(restored).to_json()
+    
+    @traced()
+    def search_notes(self, user_id: str, query: str, limit: int = 20) -> Dict[str, Any]:
+        """Full-text search over a user's notes, best matches first."""
+        ranked = search_service.search(user_id, query, limit)
+        if not ranked:
+            return {'results': []}
+        items = db.batch_get([(f'USER#{user_id}', f'NOTE#{note_id}') for note_id, _ in ranked])
+        # The index can briefly lag a delete in stream mode
+        by_id = {it.get('noteId'): it for it in items if live(it)}
+        return {
+            'results': [
+                {'noteId': note_id, 'score': round(score, 4), 'note': Note.from_item(by_id[note_id]).to_json()}
+                for note_id, score in ranked
+                if note_id in by_id
+            ]
         }
-        for field in ["direction", "session", "risk", "win_amount", "strategyId", "hit_miss"]:
-            if field in item:
-                note[field] = item[field]
-        return note
+    
+    def _reindex(self, user_id: str, note_id: str, old_text: str, new_text: str) -> None:
+        """Update the search index; failures are logged, never fail the write."""
+        if stream_mode():
+            return  # the stream consumer indexes the change
+        try:
+            search_service.index_note(user_id, note_id, old_text, new_text)
+        except Exception:
+            logger.exception('Failed to update search index for note %s', note_id)
 
 
 # Service instance
@@ -0,0 +1,174 @@
+"""
+Per-user API rate limits and quotas.
+
+The router calls quota_service.check() right after authentication, before any
+controller runs. Two limits apply (RATE_LIMIT_MODE=local|dynamodb; off by
+default):
+
+1. Fast path, in the container: a token bucket per user (RATE_LIMIT_RPS
+   refill, RATE_LIMIT_BURST capacity). A caller over it is rejected with no
+   DynamoDB call at all.
+2. Shared quota, across containers: RATE_LIMIT_PER_MINUTE per user per
+   fixed one-minute window. The counters live in a CounterStore: DynamoDB
+   atomic counters (PK=QUOTA#{userId}, SK=WINDOW#{n}, expired by TTL) in
+   dynamodb mode, or an in-memory stand-in in local mode.
+
+To keep the shared store off the hot path, a container leases
+RATE_LIMIT_LEASE requests at a time from the window counter and spends them
+locally. A container can hold back up to one lease per user, so the shared
+quota is enforced to within that amount per container.
+
+Routes can cost more than one request (ROUTE_COSTS). Rejections are counted
+in rate_limited_total{scope=local|shared}. If the store fails, the request is
+allowed (the fast path still applies) and rate_limit_store_errors_total is
+incremented.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from app.repositories.dynamodb import db
+from app.core.metrics import get_metrics
+from app.core.rate_limit import TokenBucket
+from app.core.tracing import traced
+
+
+logger = logging.getLogger(__name__)
+
+WINDOW_SECONDS = 60
+# Local buckets kept per container (least recently seen users are dropped)
+MAX_LOCAL_USERS = 10000
+
+# Requests that do more work than a single read or write
+ROUTE_COSTS = {
+    'GET /v1/export': 20,
+    'GET /v1/dashboard': 3,
+    'GET /v1/reports/notes-summary': 2,
+    'GET /v1/notes/search': 2,
+}
+
+
+class LocalCounterStore:
+    """In-memory stand-in for the shared window counters (one container, dev and tests)."""
+
+    def __init__(self):
+        self._counts: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, user_id: str, window: int, n: int, limit: int) -> bool:
+        """Add n to the user's window counter unless that would exceed limit."""
+        with self._lock:
+            for key in [k for k in self._counts if k[1] < window]:
+                del self._counts[key]
+            count = self._counts.get((user_id, window), 0)
+            if count + n > limit:
+                return False
+            self._counts[(user_id, window)] = count + n
+            return True
+
+
+class DynamoDBCounterStore:
+    """Window counters as DynamoDB atomic counters (conditional ADD)."""
+
+    def add(self, user_id: str, window: int, n: int, limit: int) -> bool:
+        """Add n to the user's window counter unless that would exceed limit."""
+        try:
+            db.update_item(
+                f'QUOTA#{user_id}',
+                f'WINDOW#{window}',
+                'ADD #c :n SET entityType = :type, expiresAt = :exp',
+                {':n': n, ':max': limit - n, ':type': 'QUOTA', ':exp': (window + 2) * WINDOW_SECONDS},
+                {'#c': 'count'},
+                condition_expression='attribute_not_exists(#c) OR #c <= :max'
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return False
+            raise
+        return True
+
+
+class QuotaService:
+    """Per-user token buckets in front of shared per-minute quotas."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._buckets: 'OrderedDict[str, TokenBucket]' = OrderedDict()
+        self._leases: Dict[str, Tuple[int, int]] = {}
+        self._local_store = LocalCounterStore()
+        self._dynamodb_store = DynamoDBCounterStore()
+        self._lock = threading.Lock()
+
+    def mode(self) -> str:
+        return os.getenv('RATE_LIMIT_MODE', 'off').lower()
+
+    def _bucket(self, user_id: str) -> TokenBucket:
+        rate = float(os.getenv('RATE_LIMIT_RPS', '10'))
+        burst = float(os.getenv('RATE_LIMIT_BURST', '30'))
+        with self._lock:
+            bucket = self._buckets.get(user_id)
+            if bucket is None or bucket.rate != rate or bucket.capacity != burst:
+                bucket = self._buckets[user_id] = TokenBucket(rate, burst, clock=self._clock)
+            self._buckets.move_to_end(user_id)
+            while len(self._buckets) > MAX_LOCAL_USERS:
+                evicted, _ = self._buckets.popitem(last=False)
+                self._leases.pop(evicted, None)
+            return bucket
+
+    def _spend_lease(self, user_id: str, window: int, cost: int) -> bool:
+        with self._lock:
+            lease_window, remaining = self._leases.get(user_id, (window, 0))
+            if lease_window == window and remaining >= cost:
+                self._leases[user_id] = (window, remaining - cost)
+                return True
+            return False
+
+    def _spend_shared(self, user_id: str, cost: int) -> Optional[float]:
+        now = self._clock()
+        window = int(now // WINDOW_SECONDS)
+        if self._spend_lease(user_id, window, cost):
+            return None
+        store = self._dynamodb_store if self.mode() == 'dynamodb' else self._local_store
+        limit = int(os.getenv('RATE_LIMIT_PER_MINUTE', '300'))
+        lease = max(cost, int(os.getenv('RATE_LIMIT_LEASE', '10')))
+        try:
+            # A full lease if the window has room for it, else just this request
+            for n in dict.fromkeys((lease, cost)):
+                if store.add(user_id, window, n, limit):
+                    with self._lock:
+                        lease_window, remaining = self._leases.get(user_id, (window, 0))
+                        carried = remaining if lease_window == window else 0
+                        self._leases[user_id] = (window, carried + n - cost)
+                    return None
+        except Exception:
+            logger.exception('Rate limit store failed for user %s', user_id)
+            get_metrics().inc('rate_limit_store_errors_total')
+            return None
+        return (window + 1) * WINDOW_SECONDS - now
+
+    @traced()
+    def check(self, user_id: str, route: str) -> Optional[float]:
+        """
+        Spend a request's cost from the user's limits.
+        Returns None if it may proceed, else seconds until it could be retried.
+        """
+        if self.mode() not in ('local', 'dynamodb'):
+            return None
+        cost = ROUTE_COSTS.get(route, 1)
+        bucket = self._bucket(user_id)
+        if not bucket.try_acquire(cost):
+            get_metrics().inc('rate_limited_total', 1, {'scope': 'local'})
+            return max(bucket.wait_time(cost), 1 / bucket.rate)
+        retry_after = self._spend_shared(user_id, cost)
+        if retry_after is not None:
+            get_metrics().inc('rate_limited_total', 1, {'scope': 'shared'})
+        return retry_after
+
+
+# Service instance
+quota_service = QuotaService()
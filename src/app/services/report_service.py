@@ -1,12 +1,30 @@
 """Report generation service."""
-from typing import Dict, Any, List
+import asyncio
+import os
+from datetime import date, timedelta
+from typing import Dict, Any, List, Tuple
 
 from app.repositories.dynamodb import db
+from app.repositories.async_dynamodb import adb
+from app.repositories.wire import note_from_wire
+from app.services.derived_views import stream_mode, summary_from_view, note_strategy_counters
+from app.models.note import Note
+from app.models.validation import ValidationError
+from app.core.tracing import traced
+
+
+# The only note attributes summarize() reads; report queries fetch nothing else
+REPORT_FIELDS = ('date', 'hit_miss', 'session', 'win_amount')
+
+# Async summaries: longest date range accepted, and month buckets queried at once
+MAX_SUMMARY_MONTHS = int(os.getenv('REPORT_MAX_MONTHS', '120'))
+BUCKET_CONCURRENCY = int(os.getenv('REPORT_BUCKET_CONCURRENCY', '4'))
 
 
 class ReportService:
     """Service for generating reports."""
     
+    @traced()
     def get_notes_summary(
         self,
         user_id: str,
@@ -15,12 +33,95 @@ class ReportService:
         limit: int = 200
     ) -> Dict[str, Any]:
         """Generate summary report of notes."""
+        if stream_mode() and not date_from and not date_to:
+            # Maintained by the stream consumer: one item instead of a page of notes
+            return summary_from_view(db.get_item(f'USER#{user_id}', 'VIEW#SUMMARY'))
         # Query all notes for user
-        resp = db.query_gsi1(f'NOTE#{user_id}', limit=limit)
-        notes = resp.get('Items', [])
-        
+        if db.client_mode == 'client':
+            resp = db.query_gsi1_wire(f'NOTE#{user_id}', limit=limit, **self._projection())
+            notes = [note_from_wire(it) for it in resp.get('Items', [])]
+        else:
+            resp = db.query_gsi1(f'NOTE#{user_id}', limit=limit, **self._projection())
+            notes = [Note.from_item(it) for it in resp.get('Items', [])]
+        return self.summarize(notes, date_from, date_to)
+    
+    @traced()
+    async def get_notes_summary_async(
+        self,
+        user_id: str,
+        date_from: str = "",
+        date_to: str = "",
+        limit: int = 200
+    ) -> Dict[str, Any]:
+        """
+        Async variant of get_notes_summary.
+        With a full date range the notes are read per month bucket, newest month
+        first, BUCKET_CONCURRENCY buckets at a time, until `limit` notes in the
+        range are collected. Ranges over MAX_SUMMARY_MONTHS raise ValidationError.
+        """
+        if stream_mode() and not date_from and not date_to:
+            return summary_from_view(await adb.get_item(f'USER#{user_id}', 'VIEW#SUMMARY'))
+        buckets = self._month_buckets(date_from, date_to)
+        if len(buckets) > MAX_SUMMARY_MONTHS:
+            raise ValidationError({'from': f'date range must not exceed {MAX_SUMMARY_MONTHS} months'})
+        if buckets:
+            items = []
+            newest_first = buckets[::-1]
+            for i in range(0, len(newest_first), BUCKET_CONCURRENCY):
+                pages = await asyncio.gather(*(
+                    adb.query_gsi1_all(f'NOTE#{user_id}', sk_between=bucket, limit=limit, **self._projection())
+                    for bucket in newest_first[i:i + BUCKET_CONCURRENCY]
+                ))
+                items.extend(it for page in pages for it in page)
+                if len(items) >= limit:
+                    break
+            items = items[:limit]
+        else:
+            resp = await adb.query_gsi1(f'NOTE#{user_id}', limit=limit, **self._projection())
+            items = resp.get('Items', [])
+        return self.summarize([Note.from_item(it) for it in items], date_from, date_to)
+    
+    @traced()
+    def get_strategy_stats(self, user_id: str) -> Dict[str, Any]:
+        """Per-strategy note counts, hit/miss tallies and average win amount."""
+        if stream_mode():
+            stats = {
+                it['SK'][len('VIEW#STRAT#'):]: it
+                for it in db.iter_pk(f'USER#{user_id}', 'VIEW#STRAT#')
+            }
+        else:
+            # Recomputed from every note (projected to the three attributes used)
+            stats, last_key = {}, None
+            while True:
+                resp = db.query_gsi1(f'NOTE#{user_id}', limit=500, last_evaluated_key=last_key,
+                                     projection=('strategyId', 'hit_miss', 'win_amount'))
+                for item in resp.get('Items', []):
+                    counters = note_strategy_counters(item)
+                    if counters:
+                        totals = stats.setdefault(item['strategyId'], {})
+                        for name, value in counters.items():
+                            totals[name] = totals.get(name, 0) + value
+                last_key = resp.get('LastEvaluatedKey')
+                if not last_key:
+                    break
+        return {
+            'strategies': [
+                {
+                    'strategyId': strategy_id,
+                    'notes': int(s.get('notes', 0)),
+                    'hits': int(s.get('hits', 0)),
+                    'misses': int(s.get('misses', 0)),
+                    'averageWinAmount': round(float(s['winSum']) / int(s['winCount']), 2) if s.get('winCount') else 0.0,
+                }
+                for strategy_id, s in sorted(stats.items())
+                if s.get('notes')
+            ]
+        }
+    
+    def summarize(self, notes: List[Note], date_from: str, date_to: str) -> Dict[str, Any]:
+        """Aggregate notes into the summary payload."""
         # Filter by date range if provided
-        filtered = [n for n in notes if self._in_date_range(n.get('date', ''), date_from, date_to)]
+        filtered = [n for n in notes if self._in_date_range(n.date or '', date_from, date_to)]
         
         # Calculate statistics
         total = len(filtered)
@@ -30,17 +131,17 @@ class ReportService:
         
         for note in filtered:
             # Hit/Miss distribution
-            hm = note.get('hit_miss', 'UNKNOWN')
+            hm = note.hit_miss or 'UNKNOWN'
             by_hit[hm] = by_hit.get(hm, 0) + 1
             
             # Session distribution
-            sess = note.get('session', 'UNKNOWN')
+            sess = note.session or 'UNKNOWN'
             by_session[sess] = by_session.get(sess, 0) + 1
             
             # Win amount calculation
-            if 'win_amount' in note:
+            if note.win_amount is not None:
                 try:
-                    win_sum += float(note['win_amount'])
+                    win_sum += float(note.win_amount)
                     win_count += 1
                 except (ValueError, TypeError):
                     pass
@@ -56,6 +157,29 @@ class ReportService:
             }
         }
     
+    def _projection(self) -> Dict[str, Any]:
+        """Query arguments for report reads: project REPORT_FIELDS, on REPORT_INDEX_NAME if set."""
+        params = {'projection': REPORT_FIELDS}
+        index_name = os.getenv('REPORT_INDEX_NAME')
+        if index_name:
+            params['index_name'] = index_name
+        return params
+    
+    def _month_buckets(self, date_from: str, date_to: str) -> List[Tuple[str, str]]:
+        """GSI1SK ranges (one per calendar month) covering [date_from, date_to]; empty if open-ended."""
+        try:
+            start, end = date.fromisoformat(date_from[:10]), date.fromisoformat(date_to[:10])
+        except ValueError:
+            return []
+        buckets = []
+        while start <= end:
+            next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+            last = min(end, next_month - timedelta(days=1))
+            # GSI1SK is "<date>#<noteId>"; '~' sorts after any ID character
+            buckets.append((start.isoformat(), f'{last.isoformat()}~'))
+            start = next_month
+        return buckets
+    
     def _in_date_range(self, date_str: str, date_from: str, date_to: str) -> bool:
         """Check if date is in range."""
         if not date_str:
@@ -0,0 +1,124 @@
+"""
+Time-bucketed note rollups for calendar and heatmap reports.
+
+Every note counts in one day, ISO week and month bucket, both overall and for
+its strategy (USER#{userId} / ROLLUP#{scope}#{D|W|M}#{period}; see
+derived_views). Buckets hold note counts, hit/miss tallies, win and risk sums
+and per-session counts, so a calendar over a date range reads one item per
+bucket instead of every note.
+
+Writes keep them current: inline, each note write adds its deltas in one
+transaction (a failure is logged and counted, and rebuild() repairs the
+user's buckets); with DERIVED_VIEWS_MODE=stream the stream consumer applies
+the same deltas exactly once.
+"""
+import logging
+from datetime import date
+from typing import Dict, Any, Iterable, Optional
+
+from app.repositories.dynamodb import db
+from app.services.derived_views import (
+    stream_mode, add_update, rollup_deltas, rollup_sk, note_rollup_keys, note_rollup_counters,
+    ROLLUP_PERIODS, ROLLUP_SCOPE_ALL,
+)
+from app.core.metrics import get_metrics
+from app.core.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# API granularity -> rollup key letter
+GRANULARITIES = {'day': 'D', 'week': 'W', 'month': 'M'}
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+
+class RollupService:
+    """Maintains and reads the note rollup buckets."""
+
+    def record(self, user_id: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]) -> None:
+        """Apply one note write (old -> new item) to its buckets; never fails the write."""
+        if stream_mode():
+            return  # the stream consumer applies the change
+        deltas = rollup_deltas(f'USER#{user_id}', old, new)
+        if not deltas:
+            return
+        try:
+            db.transact_update([add_update(pk, sk, counters) for pk, sk, counters in deltas])
+        except Exception:
+            logger.exception('Failed to update rollups for user %s', user_id)
+            get_metrics().inc('rollup_errors_total')
+
+    @traced()
+    def get_calendar(
+        self,
+        user_id: str,
+        granularity: str = 'day',
+        date_from: str = '',
+        date_to: str = '',
+        strategy_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Buckets of one granularity between two dates (inclusive), oldest first."""
+        letter = GRANULARITIES[granularity]
+        scope = strategy_id or ROLLUP_SCOPE_ALL
+        period = ROLLUP_PERIODS[letter]
+        low = period(date.fromisoformat(date_from)) if date_from else ''
+        # '~' sorts after every period, so an open end covers the latest bucket
+        high = period(date.fromisoformat(date_to)) if date_to else '~'
+        items = db.iter_pk(
+            f'USER#{user_id}',
+            sk_between=(rollup_sk(scope, letter, low), rollup_sk(scope, letter, high))
+        )
+        buckets = [self._bucket(it) for it in items if it.get('notes')]
+        result: Dict[str, Any] = {'granularity': granularity, 'buckets': buckets}
+        if strategy_id:
+            result['strategyId'] = strategy_id
+        if granularity == 'day':
+            result['byWeekday'] = self._by_weekday(buckets)
+        return result
+
+    @traced()
+    def rebuild(self, user_id: str) -> int:
+        """Recompute a user's buckets from their notes; returns the number of buckets written."""
+        pk = f'USER#{user_id}'
+        totals: Dict[str, Dict[str, Any]] = {}
+        for note in db.iter_gsi1(f'NOTE#{user_id}'):
+            counters = note_rollup_counters(note)
+            for sk in note_rollup_keys(note):
+                bucket = totals.setdefault(sk, {})
+                for name, value in counters.items():
+                    bucket[name] = bucket.get(name, 0) + value
+        stale = [(pk, it['SK']) for it in db.iter_pk(pk, 'ROLLUP#') if it['SK'] not in totals]
+        db.batch_write(
+            puts=[{'PK': pk, 'SK': sk, **counters} for sk, counters in totals.items()],
+            deletes=stale
+        )
+        return len(totals)
+
+    @staticmethod
+    def _bucket(item: Dict[str, Any]) -> Dict[str, Any]:
+        win_count, risk_count = int(item.get('winCount', 0)), int(item.get('riskCount', 0))
+        return {
+            'period': item['SK'].rsplit('#', 1)[1],
+            'notes': int(item['notes']),
+            'hits': int(item.get('hits', 0)),
+            'misses': int(item.get('misses', 0)),
+            'winSum': float(item.get('winSum', 0)),
+            'averageWinAmount': round(float(item.get('winSum', 0)) / win_count, 2) if win_count else 0.0,
+            'riskSum': float(item.get('riskSum', 0)),
+            'averageRisk': round(float(item.get('riskSum', 0)) / risk_count, 2) if risk_count else 0.0,
+            'bySession': {k.split('#', 1)[1]: int(v) for k, v in item.items() if k.startswith('session#') and v},
+        }
+
+    @staticmethod
+    def _by_weekday(day_buckets: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        totals: Dict[str, Dict[str, Any]] = {}
+        for bucket in day_buckets:
+            weekday = WEEKDAYS[date.fromisoformat(bucket['period']).weekday()]
+            t = totals.setdefault(weekday, {'notes': 0, 'hits': 0, 'misses': 0, 'winSum': 0.0})
+            for name in t:
+                t[name] += bucket[name]
+            t['winSum'] = round(t['winSum'], 2)
+        return {day: totals[day] for day in WEEKDAYS if day in totals}
+
+
+# Service instance
+rollup_service = RollupService()
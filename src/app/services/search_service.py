@@ -0,0 +1,137 @@
+"""Full-text search service (per-user inverted index with BM25 ranking)."""
+import contextvars
+import heapq
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.repositories.dynamodb import db
+from app.core.text import tokenize, term_positions
+from app.core.tracing import traced
+
+
+# Standard BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_PHRASE_RE = re.compile(r'"([^"]+)"')
+
+
+class SearchService:
+    """
+    Maintains and queries a per-user inverted index over note text.
+
+    Index layout (same table, outside GSI1 so it never shows up in listings):
+    - Postings: PK=SEARCH#{userId}#{term}, SK={noteId}, positions=[int], dl=int
+    - Stats:    PK=SEARCH#{userId},        SK=STATS,    docCount, totalLength
+    """
+
+    @traced()
+    def index_note(self, user_id: str, note_id: str, old_text: str, new_text: str) -> None:
+        """Apply the index delta for a note whose text changed from old_text to new_text."""
+        plan = self.plan_index(user_id, note_id, old_text, new_text)
+        if plan is None:
+            return
+        puts, deletes, stats_delta = plan
+        db.batch_write(puts, deletes)
+        db.increment(f'SEARCH#{user_id}', 'STATS', stats_delta)
+
+    def plan_index(
+        self, user_id: str, note_id: str, old_text: str, new_text: str
+    ) -> Optional[Tuple[List[Dict[str, Any]], List[Tuple[str, str]], Dict[str, int]]]:
+        """
+        The index delta for a text change: (posting puts, posting deletes, STATS deltas),
+        or None if the indexed terms are unchanged. Posting writes are idempotent;
+        the STATS deltas are not, so callers replaying changes must apply them once.
+        """
+        old = term_positions(tokenize(old_text or ''))
+        new_tokens = tokenize(new_text or '')
+        new = term_positions(new_tokens)
+        if old == new:
+            return None
+
+        old_len = sum(len(p) for p in old.values())
+        new_len = len(new_tokens)
+        # Every posting of the new text is rewritten because dl changes with it
+        puts = [
+            {'PK': self._term_pk(user_id, term), 'SK': note_id, 'positions': positions, 'dl': new_len}
+            for term, positions in new.items()
+        ]
+        deletes = [(self._term_pk(user_id, term), note_id) for term in old if term not in new]
+        return puts, deletes, {
+            'docCount': int(new_len > 0) - int(old_len > 0),
+            'totalLength': new_len - old_len,
+        }
+
+    @traced()
+    def remove_note(self, user_id: str, note_id: str, text: str) -> None:
+        """Remove a note's postings from the index."""
+        self.index_note(user_id, note_id, text, '')
+
+    @traced()
+    def search(self, user_id: str, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """
+        Rank a user's notes against a query with BM25.
+        Quoted phrases in the query must appear verbatim (by term position).
+        Returns [(noteId, score)] best first.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        stats = db.get_item(f'SEARCH#{user_id}', 'STATS') or {}
+        n_docs = int(stats.get('docCount', 0))
+        if n_docs <= 0:
+            return []
+        avgdl = int(stats.get('totalLength', 0)) / n_docs
+
+        postings = self._fetch_postings(user_id, terms)
+        scores: Dict[str, float] = {}
+        for docs in postings.values():
+            df = len(docs)
+            if not df:
+                continue
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for note_id, (positions, dl) in docs.items():
+                tf = len(positions)
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * dl / avgdl)
+                scores[note_id] = scores.get(note_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        for phrase in (tokenize(p) for p in _PHRASE_RE.findall(query)):
+            if len(phrase) > 1:
+                scores = {nid: s for nid, s in scores.items() if self._has_phrase(postings, phrase, nid)}
+
+        return heapq.nlargest(limit, scores.items(), key=lambda kv: kv[1])
+
+    def _fetch_postings(self, user_id: str, terms: List[str]) -> Dict[str, Dict[str, Tuple[set, int]]]:
+        """Load the posting lists for the query terms, one partition per term in parallel."""
+        def load(term):
+            return {
+                it['SK']: ({int(p) for p in it.get('positions', [])}, int(it.get('dl', 0)))
+                for it in db.iter_pk(self._term_pk(user_id, term))
+            }
+
+        if len(terms) == 1:
+            return {terms[0]: load(terms[0])}
+        with ThreadPoolExecutor(max_workers=min(len(terms), 8)) as pool:
+            # Run each load in a copy of this context so DynamoDB metrics keep the route label
+            ctx = contextvars.copy_context()
+            return dict(zip(terms, pool.map(lambda t: ctx.copy().run(load, t), terms)))
+
+    def _has_phrase(self, postings: Dict[str, Dict[str, Any]], phrase: List[str], note_id: str) -> bool:
+        """Check whether the phrase terms occur at consecutive positions in a note."""
+        try:
+            starts = postings[phrase[0]][note_id][0]
+            return any(
+                all(start + i in postings[term][note_id][0] for i, term in enumerate(phrase[1:], 1))
+                for start in starts
+            )
+        except KeyError:
+            return False
+
+    def _term_pk(self, user_id: str, term: str) -> str:
+        return f'SEARCH#{user_id}#{term}'
+
+
+# Service instance
+search_service = SearchService()
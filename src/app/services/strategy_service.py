@@ -1,103 +1,119 @@
 """Strategy business logic service."""
-import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from app.repositories.dynamodb import db
+from app.repositories.tombstones import is_tombstone, live, purge_at
+from app.repositories.async_dynamodb import adb
+from app.repositories.wire import strategy_json_from_wire
 from app.models.strategy import Strategy
-from app.core.utils import generate_id, now_iso
+from app.models.validation import validate_strategy
+from app.core.ids import generate_id
+from app.core.utils import now_iso, select_fields
+from app.core.tracing import traced
 
 
 class StrategyService:
     """Service for strategy business logic."""
     
+    @traced()
     def create_strategy(self, user_id: str, data: Dict[str, Any]) -> str:
         """Create a new strategy and return its ID."""
+        data = validate_strategy(data)
         strategy_id = generate_id("strategy")
         item = db.create_strategy_item(user_id, strategy_id, data)
         db.put_item(item)
         return strategy_id
     
+    @traced()
     def get_strategy(self, user_id: str, strategy_id: str) -> Optional[Dict[str, Any]]:
         """Get a strategy by ID."""
         pk, sk = f'USER#{user_id}', f'STRAT#{strategy_id}'
-        item = db.get_item(pk, sk)
+        item = live(db.get_item(pk, sk))
         if not item:
             return None
-        return self._item_to_strategy_dict(item)
+        return Strategy.from_item(item).to_json()
     
+    @traced()
     def list_strategies(
         self,
         user_id: str,
         limit: int = 50,
-        last_key: Optional[Dict[str, Any]] = None
+        last_key: Optional[Dict[str, Any]] = None,
+        fields: Optional[Tuple[str, ...]] = None
     ) -> Dict[str, Any]:
-        """List strategies with pagination."""
-        resp = db.query_gsi1(gsi1pk=f'STRAT#{user_id}', limit=limit, last_evaluated_key=last_key)
-        
-        items = [self._item_to_strategy_dict(it) for it in resp.get('Items', [])]
+        """List strategies with pagination (only the given response fields, if any)."""
+        query = {'gsi1pk': f'STRAT#{user_id}', 'limit': limit, 'last_evaluated_key': last_key}
+        if fields:
+            query['projection'] = fields
+        if db.client_mode == 'client':
+            # Low-level client: decode the wire items straight into the response shape
+            resp = db.query_gsi1_wire(**query)
+            items = [strategy_json_from_wire(it) for it in resp.get('Items', [])]
+        else:
+            resp = db.query_gsi1(**query)
+            items = [Strategy.from_item(it).to_json() for it in resp.get('Items', [])]
+        if fields:
+            items = [select_fields(it, fields) for it in items]
         
         result = {'strategies': items}
         if 'LastEvaluatedKey' in resp:
             result['lastKey'] = resp['LastEvaluatedKey']
         return result
     
-    def update_strategy(self, user_id: str, strategy_id: str, data: Dict[str, Any]) -> bool:
-        """Update a strategy."""
-        pk, sk = f'USER#{user_id}', f'STRAT#{strategy_id}'
-        
-        if not db.get_item(pk, sk):
-            return False
-        
-        update_expression = "SET #updatedAt = :updatedAt"
-        eav = {':updatedAt': now_iso()}
-        ean = {'#updatedAt': 'updatedAt'}
+    @traced()
+    async def list_strategies_async(
+        self,
+        user_id: str,
+        limit: int = 50,
+        last_key: Optional[Dict[str, Any]] = None,
+        fields: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        """Async variant of list_strategies (for concurrent fan-out)."""
+        resp = await adb.query_gsi1(gsi1pk=f'STRAT#{user_id}', limit=limit, last_evaluated_key=last_key,
+                                    projection=fields)
         
-        for field in ["name", "market", "timeframe", "dsl"]:
-            if field in data and data[field] not in (None, ""):
-                ean[f'#{field}'] = field
-                # Handle DSL serialization
-                if field == 'dsl' and not isinstance(data['dsl'], str):
-                    eav[f':{field}'] = json.dumps(data['dsl'])
-                else:
-                    eav[f':{field}'] = data[field]
-                update_expression += f", #{field} = :{field}"
+        items = [Strategy.from_item(it).to_json() for it in resp.get('Items', [])]
+        if fields:
+            items = [select_fields(it, fields) for it in items]
         
-        db.update_item(pk, sk, update_expression, eav, ean)
-        return True
+        result = {'strategies': items}
+        if 'LastEvaluatedKey' in resp:
+            result['lastKey'] = resp['LastEvaluatedKey']
+        return result
     
+    @traced()
+    def update_strategy(
+        self,
+        user_id: str,
+        strategy_id: str,
+        data: Dict[str, Any],
+        expected_version: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Update a strategy; None if it does not exist. With expected_version
+        (If-Match), raises VersionConflict if the strategy changed since that version.
+        """
+        data = validate_strategy(data, partial=True)
+        # dsl arrives validated as a map, so it is stored natively (not as a JSON string)
+        sets = {'updatedAt': now_iso(), **data}
+        images = db.versioned_update(f'USER#{user_id}', f'STRAT#{strategy_id}', sets, expected_version)
+        return Strategy.from_item(images[1]).to_json() if images else None
+    
+    @traced()
     def delete_strategy(self, user_id: str, strategy_id: str) -> bool:
-        """Delete a strategy."""
+        """Soft-delete a strategy (restorable until TTL purges it)."""
         pk, sk = f'USER#{user_id}', f'STRAT#{strategy_id}'
-        if not db.get_item(pk, sk):
-            return False
-        db.delete_item(pk, sk)
-        return True
-    
-    def _item_to_strategy_dict(self, item: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert DynamoDB item to strategy dictionary."""
-        dsl = self._parse_dsl(item.get('dsl'))
-        return {
-            'strategyId': item.get('strategyId'),
-            'name': item.get('name'),
-            'market': item.get('market'),
-            'timeframe': item.get('timeframe'),
-            'dsl': dsl,
-            'createdAt': item.get('createdAt'),
-            'updatedAt': item.get('updatedAt')
-        }
+        return db.soft_delete(pk, sk, now_iso(), purge_at()) is not None
     
-    def _parse_dsl(self, dsl_value: Any) -> Dict[str, Any]:
-        """Parse DSL value from DynamoDB item."""
-        if not dsl_value:
-            return {}
-        if isinstance(dsl_value, dict):
-            return dsl_value
-        if isinstance(dsl_value, str):
-            try:
-                return json.loads(dsl_value)
-            except json.JSONDecodeError:
-                return {}
-        return {}
+    @traced()
+    def restore_strategy(self, user_id: str, strategy_id: str) -> Optional[Dict[str, Any]]:
+        """Undo delete_strategy; None if the strategy is not deleted (or already purged)."""
+        pk, sk = f'USER#{user_id}', f'STRAT#{strategy_id}'
+        tombstone = db.get_item(pk, sk)
+        if not is_tombstone(tombstone):
+            return None
+        restored = db.restore(pk, sk, db.index_keys(tombstone))
+        return Strategy.from_item(restored).to_json() if restored else None
 
 
 # Service instance
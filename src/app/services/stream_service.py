@@ -0,0 +1,155 @@
+"""
+DynamoDB Streams consumer for derived views (DERIVED_VIEWS_MODE=stream).
+
+app.main.stream_handler receives batches of stream records (NEW_AND_OLD_IMAGES)
+and applies every NOTE/STRATEGY change to the views in
+app.services.derived_views:
+
+1. Read the item's checkpoint (USER#{userId} / CDC#{item SK}). Records at or
+   below the checkpointed sequence number were already applied: skip.
+2. Run the views' idempotent side effects.
+3. In one TransactWriteItems, advance the checkpoint (conditional on it
+   still being lower) and add every view's counter deltas.
+
+So a redelivered or replayed record changes nothing. Records are handled in
+order; on the first failure the rest of the batch is reported in
+batchItemFailures, and Lambda retries from that record.
+"""
+import logging
+import time
+from decimal import Decimal
+from typing import Dict, Any, Iterable, List, Optional
+
+from botocore.exceptions import ClientError
+
+from app.repositories.dynamodb import db
+from app.repositories.codec import deserialize_item, serialize_item
+from app.repositories.tombstones import live
+from app.services.derived_views import Change, VIEWS, add_update
+from app.core.metrics import get_metrics
+from app.core.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# Checkpoints of removed items outlive the stream's 24h retention, then expire
+REMOVED_CHECKPOINT_TTL_SECONDS = 7 * 24 * 3600
+
+
+def parse_record(record: Dict[str, Any]) -> Change:
+    """Lambda stream record -> Change (images decoded)."""
+    data = record['dynamodb']
+    keys = deserialize_item(data['Keys'])
+    old, new = data.get('OldImage'), data.get('NewImage')
+    return Change(
+        event_name=record['eventName'],
+        sequence_number=data['SequenceNumber'],
+        pk=keys['PK'],
+        sk=keys['SK'],
+        # A tombstone counts as no item: soft deletes are removals, and the TTL purge changes nothing
+        old=live(deserialize_item(old)) if old else None,
+        new=live(deserialize_item(new)) if new else None,
+    )
+
+
+def stream_record(
+    event_name: str,
+    old: Optional[Dict[str, Any]],
+    new: Optional[Dict[str, Any]],
+    sequence_number: int
+) -> Dict[str, Any]:
+    """Build a Lambda stream record from item images (for replay fixtures and tests)."""
+    item = new or old
+    data = {
+        'Keys': serialize_item({'PK': item['PK'], 'SK': item['SK']}),
+        'SequenceNumber': str(sequence_number),
+        'StreamViewType': 'NEW_AND_OLD_IMAGES',
+    }
+    if old:
+        data['OldImage'] = serialize_item(old)
+    if new:
+        data['NewImage'] = serialize_item(new)
+    return {'eventName': event_name, 'eventSource': 'aws:dynamodb', 'dynamodb': data}
+
+
+class StreamService:
+    """Applies stream records to the derived views exactly once."""
+
+    def process_records(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply a batch in order; report the first failed record and everything after it."""
+        metrics = get_metrics()
+        for index, record in enumerate(records):
+            try:
+                applied = self.apply(parse_record(record))
+            except Exception:
+                logger.exception('Failed to apply stream record %s', record.get('dynamodb', {}).get('SequenceNumber'))
+                metrics.inc('stream_records_total', len(records) - index, {'outcome': 'failed'})
+                return {'batchItemFailures': [
+                    {'itemIdentifier': r['dynamodb']['SequenceNumber']} for r in records[index:]
+                ]}
+            metrics.inc('stream_records_total', 1, {'outcome': 'applied' if applied else 'skipped'})
+        return {'batchItemFailures': []}
+
+    @traced()
+    def apply(self, change: Change) -> bool:
+        """Apply one change to every view. Returns False if it was already applied or is irrelevant."""
+        entity = change.entity_type
+        if entity is None:
+            return False
+        checkpoint_sk = f'CDC#{change.sk}'
+        seq = Decimal(int(change.sequence_number))
+        checkpoint = db.get_item(change.pk, checkpoint_sk, consistent=True)
+        if checkpoint and checkpoint.get('seq', -1) >= seq:
+            return False
+
+        views = [(v, v.prepare(change)) for v in VIEWS if entity in v.entity_types]
+        for view, prepared in views:
+            view.side_effects(change, prepared)
+
+        values: Dict[str, Any] = {':seq': seq}
+        update = 'SET #seq = :seq'
+        if change.event_name == 'REMOVE':
+            update += ', #exp = :exp'
+            values[':exp'] = int(time.time()) + REMOVED_CHECKPOINT_TTL_SECONDS
+        updates = [{
+            'pk': change.pk,
+            'sk': checkpoint_sk,
+            'update_expression': update,
+            'expression_values': values,
+            'expression_attribute_names': {'#seq': 'seq', **({'#exp': 'expiresAt'} if ':exp' in values else {})},
+            'condition_expression': 'attribute_not_exists(#seq) OR #seq < :seq',
+        }]
+        for view, prepared in views:
+            for pk, sk, counters in view.counters(change, prepared):
+                updates.append(add_update(pk, sk, counters))
+        try:
+            db.transact_update(updates)
+        except ClientError as e:
+            reasons = e.response.get('CancellationReasons') or []
+            if reasons and reasons[0].get('Code') == 'ConditionalCheckFailed':
+                return False  # a concurrent delivery got there first
+            raise
+        return True
+
+    def replay(self, records: Iterable[Dict[str, Any]], batch_size: int = 100, max_attempts: int = 3) -> Dict[str, int]:
+        """
+        Feed captured records through process_records in batches, retrying a
+        batch from its first failure like the Lambda event source does.
+        """
+        records = list(records)
+        batches = failed = 0
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            for _ in range(max_attempts):
+                failures = self.process_records(batch)['batchItemFailures']
+                if not failures:
+                    break
+                first = failures[0]['itemIdentifier']
+                batch = batch[[r['dynamodb']['SequenceNumber'] for r in batch].index(first):]
+            else:
+                failed += len(batch)
+            batches += 1
+        return {'records': len(records), 'batches': batches, 'failed': failed}
+
+
+# Service instance
+stream_service = StreamService()
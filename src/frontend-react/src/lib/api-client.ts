@@ -124,6 +124,15 @@ export class ApiClient {
     })
   }
 
+  // Dashboard API (notes, strategies and summary in one request)
+  async getDashboard(notesLimit = 1000, strategiesLimit = 1000) {
+    const params = new URLSearchParams({
+      notesLimit: notesLimit.toString(),
+      strategiesLimit: strategiesLimit.toString(),
+    })
+    return this.request(`/dashboard?${params}`)
+  }
+
   // Strategies API
   async createStrategy(data: {
     name: string
@@ -1,12 +1,42 @@
+import { useState, useEffect } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { signOut } from 'aws-amplify/auth'
 import { Link } from 'react-router-dom'
+import { apiClient } from '@/lib/api-client'
 import { Button } from '@/components/ui/button'
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card'
 import { FileText, Target, BarChart3 } from 'lucide-react'
 
+interface DashboardCounts {
+  notes: number
+  strategies: number
+  averageWinAmount: number
+}
+
 export default function HomePage() {
   const navigate = useNavigate()
+  const [counts, setCounts] = useState<DashboardCounts | null>(null)
+
+  useEffect(() => {
+    loadCounts()
+  }, [])
+
+  // One /dashboard request instead of separate notes, strategies and summary calls
+  const loadCounts = async () => {
+    try {
+      const dashboard = await apiClient.getDashboard() as {
+        strategies?: unknown[]
+        summary?: { totalNotes?: number; averageWinAmount?: number }
+      }
+      setCounts({
+        notes: dashboard.summary?.totalNotes || 0,
+        strategies: (dashboard.strategies || []).length,
+        averageWinAmount: dashboard.summary?.averageWinAmount || 0,
+      })
+    } catch (error) {
+      console.error('Failed to load dashboard:', error)
+    }
+  }
 
   const handleSignOut = async () => {
     try {
@@ -45,6 +75,7 @@ export default function HomePage() {
                   <CardDescription className="text-base leading-relaxed">
                     Record your trades, analyze performance, and track your progress
                   </CardDescription>
+                  {counts && <p className="text-sm text-muted-foreground">{counts.notes} notes</p>}
                 </div>
                 <FileText className="h-10 w-10 text-muted-foreground ml-4 flex-shrink-0" />
               </CardHeader>
@@ -62,6 +93,7 @@ export default function HomePage() {
                   <CardDescription className="text-base leading-relaxed">
                     Create and manage your trading strategies
                   </CardDescription>
+                  {counts && <p className="text-sm text-muted-foreground">{counts.strategies} strategies</p>}
                 </div>
                 <Target className="h-10 w-10 text-muted-foreground ml-4 flex-shrink-0" />
               </CardHeader>
@@ -79,6 +111,11 @@ export default function HomePage() {
                   <CardDescription className="text-base leading-relaxed">
                     View your trading statistics and profit & loss
                   </CardDescription>
+                  {counts && (
+                    <p className="text-sm text-muted-foreground">
+                      Average win ${counts.averageWinAmount.toFixed(2)}
+                    </p>
+                  )}
                 </div>
                 <BarChart3 className="h-10 w-10 text-muted-foreground ml-4 flex-shrink-0" />
               </CardHeader>
@@ -43,12 +43,12 @@ export default function SummaryPage() {
   const loadData = async () => {
     try {
       setLoading(true)
-      const [notesResponse, strategiesResponse] = await Promise.all([
-        apiClient.getNotes(1000) as Promise<{ notes?: Note[] }>,
-        apiClient.getStrategies(1000) as Promise<{ strategies?: Strategy[] }>,
-      ])
-      setNotes(notesResponse.notes || [])
-      setStrategies(strategiesResponse.strategies || [])
+      const dashboard = await apiClient.getDashboard(1000, 1000) as {
+        notes?: Note[]
+        strategies?: Strategy[]
+      }
+      setNotes(dashboard.notes || [])
+      setStrategies(dashboard.strategies || [])
     } catch (error) {
       console.error('Failed to load data:', error)
     } finally {
@@ -0,0 +1,81 @@
+"""Shared fixtures for unit tests."""
+import sys
+import os
+import json
+from unittest.mock import patch
+import pytest
+from moto import mock_aws
+import boto3
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.repositories.dynamodb import DynamoDBRepository
+
+
+def create_table(table_name='test-table'):
+    """Create the single table (with GSI1) in the active moto mock."""
+    ddb = boto3.client('dynamodb', region_name='us-east-1')
+    ddb.create_table(
+        TableName=table_name,
+        KeySchema=[
+            {'AttributeName': 'PK', 'KeyType': 'HASH'},
+            {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'PK', 'AttributeType': 'S'},
+            {'AttributeName': 'SK', 'AttributeType': 'S'},
+            {'AttributeName': 'GSI1PK', 'AttributeType': 'S'},
+            {'AttributeName': 'GSI1SK', 'AttributeType': 'S'}
+        ],
+        GlobalSecondaryIndexes=[{
+            'IndexName': 'GSI1',
+            'KeySchema': [
+                {'AttributeName': 'GSI1PK', 'KeyType': 'HASH'},
+                {'AttributeName': 'GSI1SK', 'KeyType': 'RANGE'}
+            ],
+            'Projection': {'ProjectionType': 'ALL'},
+            'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+        }],
+        ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+    )
+
+
+@pytest.fixture
+def repo():
+    """A DynamoDBRepository on a moto table, installed as the app-wide db."""
+    env = {'TABLE_NAME': 'test-table', 'AWS_REGION': 'us-east-1', 'DEV_MODE': 'true'}
+    with mock_aws(), patch.dict(os.environ, env):
+        create_table()
+        repository = DynamoDBRepository()
+        with patch('app.repositories.dynamodb._get_db', return_value=repository):
+            yield repository
+
+
+class ApiClient:
+    """Calls the Lambda handler the way API Gateway does, as a DEV_MODE user."""
+
+    def __init__(self, user='trader'):
+        self.user = user
+
+    def raw(self, method, path, body=None, qs=None, user=None, headers=None):
+        """The handler's full response (status, headers and raw body)."""
+        from app.main import handler
+        event = {'httpMethod': method, 'path': path,
+                 'headers': {'X-MTP-Dev-User': user or self.user, **(headers or {})}}
+        if body:
+            event['body'] = json.dumps(body)
+        if qs:
+            event['queryStringParameters'] = qs
+        return handler(event, None)
+
+    def __call__(self, method, path, body=None, qs=None, user=None, headers=None):
+        """(status, decoded JSON body)."""
+        result = self.raw(method, path, body, qs, user, headers)
+        return result['statusCode'], json.loads(result['body'])
+
+
+@pytest.fixture
+def api():
+    """An ApiClient for the handler; pair it with `repo` for the moto table."""
+    return ApiClient()
@@ -0,0 +1,72 @@
+import sys
+import os
+import json
+import gzip
+import base64
+from unittest.mock import patch
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.main import handler
+
+
+def _decode(result):
+    body = result['body']
+    if result.get('isBase64Encoded'):
+        body = base64.b64decode(body)
+        if result['headers'].get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def _seed(api):
+    for day, hm in (('2024-01-02', 'Hit'), ('2024-01-03', 'Miss'), ('2024-01-04', 'Hit')):
+        api('POST', '/v1/notes', {'text': 'x', 'date': day, 'hit_miss': hm, 'session': 'London'})
+    api('POST', '/v1/strategies', {'name': 'ORB'})
+
+
+class TestDashboard:
+    def test_dashboard_combines_notes_strategies_and_summary(self, repo, api):
+        """Test one request returns the lists plus a summary of the same notes page"""
+        _seed(api)
+        query = 'query_gsi1_wire' if repo.client_mode == 'client' else 'query_gsi1'
+        with patch.object(repo, query, wraps=getattr(repo, query)) as spy:
+            result = api.raw('GET', '/v1/dashboard')
+        payload = _decode(result)
+
+        assert result['statusCode'] == 200
+        assert len(payload['notes']) == 3
+        assert [s['name'] for s in payload['strategies']] == ['ORB']
+        assert payload['summary']['totalNotes'] == 3
+        assert payload['summary']['byHitMiss'] == {'Hit': 2, 'Miss': 1}
+        # One notes page shared by list and summary, plus one strategies page
+        assert sorted(c.args[0] for c in spy.call_args_list) == ['NOTE#trader', 'STRAT#trader']
+
+    def test_dashboard_is_gzipped_when_accepted(self, repo, api, monkeypatch):
+        """Test the payload is gzip-compressed for clients sending Accept-Encoding: gzip"""
+        _seed(api)
+        monkeypatch.setenv('GZIP_MIN_BYTES', '0')
+        plain = api.raw('GET', '/v1/dashboard')
+        compressed = api.raw('GET', '/v1/dashboard', headers={'Accept-Encoding': 'gzip, deflate, br'})
+
+        assert 'Content-Encoding' not in plain['headers']
+        assert compressed['headers']['Content-Encoding'] == 'gzip'
+        assert compressed['isBase64Encoded'] is True
+        assert _decode(compressed) == _decode(plain)
+
+    def test_async_path_returns_same_payload(self, repo, api, monkeypatch):
+        """Test the async dashboard gathers the same data"""
+        _seed(api)
+        sync = _decode(api.raw('GET', '/v1/dashboard'))
+        monkeypatch.setenv('ASYNC_ROUTING', 'true')
+        assert _decode(api.raw('GET', '/v1/dashboard')) == sync
+
+    def test_base64_request_bodies_are_decoded(self, repo):
+        """Test bodies base64-encoded by API Gateway are decoded before routing"""
+        event = {
+            'httpMethod': 'POST', 'path': '/v1/notes', 'headers': {'X-MTP-Dev-User': 'trader'},
+            'body': base64.b64encode(json.dumps({'text': 'binary mode'}).encode()).decode(),
+            'isBase64Encoded': True
+        }
+        assert handler(event, None)['statusCode'] == 201
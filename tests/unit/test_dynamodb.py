@@ -359,3 +359,331 @@ class TestDynamoDBRepository:
         assert item['dsl'] == {'rules': 'test'}
         assert 'market' not in item
         assert 'timeframe' not in item
+    
+    @mock_aws
+    @patch.dict(os.environ, {'TABLE_NAME': 'test-table', 'AWS_REGION': 'us-east-1'})
+    def test_iter_gsi1_walks_all_pages(self):
+        """Test iter_gsi1 follows LastEvaluatedKey across pages"""
+        ddb = boto3.client('dynamodb', region_name='us-east-1')
+        ddb.create_table(
+            TableName='test-table',
+            KeySchema=[
+                {'AttributeName': 'PK', 'KeyType': 'HASH'},
+                {'AttributeName': 'SK', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'PK', 'AttributeType': 'S'},
+                {'AttributeName': 'SK', 'AttributeType': 'S'},
+                {'AttributeName': 'GSI1PK', 'AttributeType': 'S'},
+                {'AttributeName': 'GSI1SK', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexes=[{
+                'IndexName': 'GSI1',
+                'KeySchema': [
+                    {'AttributeName': 'GSI1PK', 'KeyType': 'HASH'},
+                    {'AttributeName': 'GSI1SK', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+            }],
+            ProvisionedThroughput={'ReadCapacityUnits': 5, 'WriteCapacityUnits': 5}
+        )
+        
+        client = DynamoDBRepository()
+        for i in range(7):
+            client.put_item(client.create_note_item('u1', f'note-{i}', {'date': f'2025-01-0{i + 1}'}))
+        
+        items = list(client.iter_gsi1('NOTE#u1', page_size=3))
+        assert len(items) == 7
+        assert {it['noteId'] for it in items} == {f'note-{i}' for i in range(7)}
+
+
+class TestClientConfig:
+    @patch.dict(os.environ, {'DDB_MAX_POOL_CONNECTIONS': '64', 'DDB_RETRY_MODE': 'standard', 'DDB_READ_TIMEOUT': '3'})
+    def test_config_from_env(self):
+        """Test botocore Config is tunable via environment variables"""
+        from app.repositories.dynamodb import client_config
+        config = client_config()
+        assert config.max_pool_connections == 64
+        assert config.retries == {'mode': 'standard', 'max_attempts': 5}
+        assert config.read_timeout == 3.0
+        assert config.tcp_keepalive is True
+
+
+
+def _throttle(code='ProvisionedThroughputExceededException'):
+    from botocore.exceptions import ClientError
+    return ClientError({'Error': {'Code': code, 'Message': 'slow down'}}, 'PutItem')
+
+
+class TestThrottling:
+    def test_adaptive_limiter_backs_off_and_recovers(self):
+        """Test the write rate halves on throttles (down to the floor) and grows back on successes"""
+        from app.repositories.throttling import AdaptiveRateLimiter
+        limiter = AdaptiveRateLimiter(100, min_rate=10, increase=20)
+        limiter.on_throttle()
+        assert limiter.rate == 50
+        for _ in range(5):
+            limiter.on_throttle()
+        assert limiter.rate == 10
+        for _ in range(10):
+            limiter.on_success()
+        assert limiter.rate == 100
+
+    def test_throttles_are_retried_with_backoff(self, repo):
+        """Test throttled writes are retried after jittered backoff and other errors are not"""
+        from app.repositories.throttling import is_throttle
+        sleeps = []
+        repo.throttle._sleep = sleeps.append
+        real_put = repo.table.put_item
+        calls = []
+
+        def flaky_put(**kwargs):
+            calls.append(kwargs)
+            if len(calls) <= 2:
+                raise _throttle()
+            return real_put(**kwargs)
+
+        with patch.object(repo.table, 'put_item', side_effect=flaky_put):
+            repo.put_item({'PK': 'P', 'SK': 'S'})
+        assert len(calls) == 3 and len(sleeps) == 2
+        assert sleeps[0] <= 0.05 and sleeps[1] <= 0.1
+        assert repo.throttle.limiter.rate < repo.throttle.limiter.max_rate
+        assert repo.get_item('P', 'S') is not None
+
+        with pytest.raises(Exception) as exc_info:
+            repo.put_item({'PK': 'P', 'SK': 'S'})  # conditional check, not a throttle
+        assert not is_throttle(exc_info.value)
+        assert len(sleeps) == 2
+
+        cancelled = _throttle('TransactionCanceledException')
+        cancelled.response['CancellationReasons'] = [{'Code': 'None'}, {'Code': 'ThrottlingError'}]
+        assert is_throttle(cancelled)
+
+    def test_exhausted_retries_answer_503(self, repo):
+        """Test persistent throttling raises ThrottlingError and the API answers 503 with Retry-After"""
+        import json
+        from app.main import handler
+        from app.repositories.throttling import ThrottlingError
+        repo.throttle._sleep = lambda _: None
+
+        with patch.object(repo.table, 'put_item', side_effect=_throttle('ThrottlingException')) as put:
+            with pytest.raises(ThrottlingError):
+                repo.put_item({'PK': 'P', 'SK': 'S'})
+            assert put.call_count == repo.throttle.retries + 1
+
+            event = {'httpMethod': 'POST', 'path': '/v1/strategies', 'headers': {'X-MTP-Dev-User': 'trader'},
+                     'body': json.dumps({'name': 'ORB'})}
+            result = handler(event, None)
+        assert result['statusCode'] == 503
+        assert int(result['headers']['Retry-After']) >= 1
+        assert 'busy' in json.loads(result['body'])['message']
+
+    def test_batch_write_retries_only_the_throttled_chunk(self, repo):
+        """Test a throttled batch is retried alone and the limiter is charged per item"""
+        repo.throttle._sleep = lambda _: None
+        acquired = []
+        acquire = repo.throttle.limiter.acquire
+        repo.throttle.limiter.acquire = lambda n=1: acquired.append(n) or acquire(n)
+        real_write, chunks = repo._write_batch, []
+
+        def flaky_write(actions):
+            chunks.append(len(actions))
+            if len(chunks) == 2:
+                raise _throttle()
+            return real_write(actions)
+
+        with patch.object(repo, '_write_batch', side_effect=flaky_write):
+            repo.batch_write(puts=({'PK': 'B', 'SK': f'{i:02d}'} for i in range(30)))
+        assert chunks == [25, 5, 5]
+        assert acquired == [25, 5, 5]
+        assert len(repo.query_pk('B', limit=100)['Items']) == 30
+
+        repo.transact_update([{'pk': 'B', 'sk': f'{i:02d}', 'update_expression': 'SET n = :n',
+                               'expression_values': {':n': i}} for i in range(3)])
+        assert acquired[-1] == 3
+
+    def test_async_repository_is_guarded(self, repo, monkeypatch):
+        """Test aiobotocore calls are retried on throttles and exhausted retries answer 503 on the async path"""
+        import json
+        from app.core.aio import run
+        from app.main import handler
+        from app.repositories import async_dynamodb
+        from app.repositories.throttling import ThrottlingError
+        adb = async_dynamodb.AsyncDynamoDBRepository()
+        adb.backend = 'aiobotocore'
+        sleeps = []
+
+        async def no_sleep(delay):
+            sleeps.append(delay)
+
+        adb.throttle._async_sleep = no_sleep
+        calls = []
+
+        class Client:
+            async def get_item(self, **kwargs):
+                calls.append(kwargs)
+                if len(calls) <= 2:
+                    raise _throttle()
+                return {}
+
+            async def query(self, **kwargs):
+                raise _throttle('ThrottlingException')
+
+        async def get_client():
+            return Client()
+
+        adb._get_client = get_client
+        assert run(adb.get_item('P', 'S')) is None
+        assert len(calls) == 3 and len(sleeps) == 2
+        with pytest.raises(ThrottlingError):
+            run(adb.query_pk('P'))
+
+        monkeypatch.setenv('ASYNC_ROUTING', 'true')
+        monkeypatch.setattr(async_dynamodb, '_adb_instance', adb)
+        result = handler({'httpMethod': 'GET', 'path': '/v1/notes', 'headers': {'X-MTP-Dev-User': 'trader'}}, None)
+        assert result['statusCode'] == 503
+        assert 'busy' in json.loads(result['body'])['message']
+
+
+class TestLowLevelClientMode:
+    def test_codec_matches_boto3(self):
+        """Test the fast codec produces the same wire format as boto3"""
+        from decimal import Decimal
+        from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+        from app.repositories import codec
+
+        item = {
+            's': 'x', 'n': Decimal('1.50'), 'i': 3, 'b': True, 'null': None,
+            'm': {'nested': [Decimal('1'), 'a', {'deep': False}]}, 'ss': {'a', 'b'}, 'bin': b'\x00\x01'
+        }
+        ser, deser = TypeSerializer(), TypeDeserializer()
+        expected = {k: ser.serialize(v) for k, v in item.items()}
+        wire = codec.serialize_item(item)
+        assert {k: v for k, v in wire.items() if k != 'ss'} == {k: v for k, v in expected.items() if k != 'ss'}
+        assert sorted(wire['ss']['SS']) == ['a', 'b']
+        assert codec.deserialize_item(expected) == {k: deser.deserialize(v) for k, v in expected.items()}
+        with pytest.raises(TypeError):
+            codec.serialize(1.5)
+
+    def test_repository_operations_in_client_mode(self, repo, monkeypatch):
+        """Test CRUD, queries and batches behave the same on the low-level client path"""
+        from app.repositories.lowlevel import LowLevelTable
+
+        monkeypatch.setenv('DDB_CLIENT_MODE', 'client')
+        repo = DynamoDBRepository()
+        assert isinstance(repo.table, LowLevelTable)
+
+        repo.put_item(repo.create_note_item('u1', 'n1', {'date': '2025-01-01', 'risk': 10}))
+        with pytest.raises(Exception):
+            repo.put_item(repo.create_note_item('u1', 'n1', {}))
+        repo.update_item('USER#u1', 'NOTE#n1', 'SET #t = :t', {':t': 'updated'}, {'#t': 'text'})
+        assert repo.increment('STATS', 'X', {'count': 2})['count'] == 2
+
+        item = repo.get_item('USER#u1', 'NOTE#n1')
+        assert item['text'] == 'updated'
+        assert item['risk'] == 10
+
+        repo.batch_write(puts=[repo.create_note_item('u1', f'b{i}', {'date': f'2025-02-0{i + 1}'}) for i in range(5)])
+        notes = list(repo.iter_gsi1('NOTE#u1', page_size=2))
+        assert {n['noteId'] for n in notes} == {'n1', 'b0', 'b1', 'b2', 'b3', 'b4'}
+        assert len(list(repo.iter_pk('USER#u1', 'NOTE#', page_size=2))) == 6
+        assert len(repo.batch_get([('USER#u1', f'NOTE#b{i}') for i in range(5)])) == 5
+
+        repo.batch_write(deletes=[('USER#u1', 'NOTE#b0')])
+        repo.delete_item('USER#u1', 'NOTE#n1')
+        assert repo.get_item('USER#u1', 'NOTE#n1') is None
+        assert repo.get_item('USER#u1', 'NOTE#b0') is None
+
+
+    def test_repository_is_thread_safe(self, repo):
+        """Test resource mode reads through the (thread-safe) client, not a boto3 Table"""
+        from concurrent.futures import ThreadPoolExecutor
+        from app.repositories.lowlevel import ClientTable, LowLevelTable
+        assert isinstance(repo.table, LowLevelTable if repo.client_mode == 'client' else ClientTable)
+        repo.put_item(repo.create_note_item('u1', 'n1', {'date': '2025-01-01', 'risk': 10}))
+        repo.put_item(repo.create_strategy_item('u1', 's1', {'name': 'ORB'}))
+
+        def read():
+            return (repo.get_item('USER#u1', 'NOTE#n1'), repo.query_gsi1('NOTE#u1')['Items'],
+                    repo.batch_get([('USER#u1', 'STRAT#s1')]))
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = [f.result() for f in [pool.submit(read) for _ in range(8)]]
+        assert all(r == read() for r in results)
+        assert results[0][0]['risk'] == 10
+
+class TestWireDecoders:
+    def test_decoders_match_model_round_trip(self):
+        """Test the schema decoders produce the same JSON as from_item/to_json"""
+        import json
+        from decimal import Decimal
+        from app.core.response import decimal_default
+        from app.models.note import Note
+        from app.models.strategy import Strategy
+        from app.repositories.codec import serialize_item, deserialize_item
+        from app.repositories import wire
+
+        notes = [
+            {'noteId': 'n1', 'userId': 'u1', 'date': '2025-01-01', 'text': 'hi', 'risk': Decimal('0.1'),
+             'win_amount': Decimal('-25'), 'direction': 'LONG', 'hit_miss': 'HIT', 'strategyId': 's1',
+             'createdAt': 'c', 'updatedAt': 'u', 'GSI1PK': 'NOTE#u1', 'version': Decimal('3')},
+            {'noteId': 'n2', 'userId': 'u1', 'text': None, 'session': None, 'createdAt': 'c', 'updatedAt': 'u'},
+            {'noteId': 'n3', 'risk': 'odd-type'},
+        ]
+        strategies = [
+            {'strategyId': 's1', 'name': 'A', 'market': 'ES', 'timeframe': '5m', 'dsl': '{"rules": [1]}',
+             'createdAt': 'c', 'updatedAt': 'u', 'version': Decimal('2')},
+            {'strategyId': 's2', 'name': 'B', 'market': 'NQ', 'timeframe': '1m',
+             'dsl': {'rules': [Decimal('2')]}},
+            {'strategyId': 's3', 'name': 'C', 'market': 'NQ', 'timeframe': '1m'},
+        ]
+
+        def dump(value):
+            return json.dumps(value, default=decimal_default)
+
+        for item in notes:
+            av = serialize_item(item)
+            expected = Note.from_item(deserialize_item(av))
+            assert dump(wire.note_json_from_wire(av)) == dump(expected.to_json())
+            decoded = wire.note_from_wire(av)
+            assert dump({s: getattr(decoded, s) for s in Note.__slots__}) == \
+                dump({s: getattr(expected, s) for s in Note.__slots__})
+        for item in strategies:
+            av = serialize_item(item)
+            expected = Strategy.from_item(deserialize_item(av)).to_json()
+            assert dump(wire.strategy_json_from_wire(av)) == dump(expected)
+
+    def test_list_and_report_paths_in_client_mode(self, repo, monkeypatch):
+        """Test list and report responses are identical on the wire-decoding path"""
+        from app.services.note_service import note_service
+        from app.services.strategy_service import strategy_service
+        from app.services.report_service import report_service
+        from app.services.dashboard_service import dashboard_service
+
+        for i in range(3):
+            note_service.create_note('u1', {'date': f'2025-01-0{i + 1}', 'text': f't{i}', 'risk': 1.5,
+                                            'win_amount': i * 10, 'hit_miss': 'HIT', 'session': 'London'})
+        strategy_service.create_strategy('u1', {'name': 'S', 'market': 'ES', 'timeframe': '5m', 'dsl': {'a': 1}})
+
+        def snapshot():
+            notes = note_service.list_notes('u1', limit=10)['notes']
+            return (
+                sorted(notes, key=lambda n: n['noteId']),
+                strategy_service.list_strategies('u1')['strategies'],
+                report_service.get_notes_summary('u1'),
+                dashboard_service.get_dashboard('u1')['summary'],
+            )
+
+        monkeypatch.setenv('DDB_CLIENT_MODE', 'resource')
+        resource_repo = DynamoDBRepository()
+        with patch('app.repositories.dynamodb._get_db', return_value=resource_repo):
+            expected = snapshot()
+        with pytest.raises(RuntimeError):
+            resource_repo.query_gsi1_wire('NOTE#u1')
+
+        monkeypatch.setenv('DDB_CLIENT_MODE', 'client')
+        client_repo = DynamoDBRepository()
+        with patch('app.repositories.dynamodb._get_db', return_value=client_repo), \
+                patch.object(client_repo, 'query_gsi1', side_effect=AssertionError('generic path used')):
+            assert snapshot() == expected
@@ -0,0 +1,113 @@
+import sys
+import os
+import csv
+import gzip
+import io
+import json
+import base64
+from unittest.mock import patch, MagicMock
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.main import handler
+from app.services.export_service import export_service
+
+
+NOTES = [
+    {'noteId': f'note-{i}', 'text': f'Note {i}', 'date': f'2025-01-{i + 1:02d}', 'hit_miss': 'Hit'}
+    for i in range(5)
+]
+STRATEGIES = [
+    {'strategyId': 'strat-1', 'name': 'ORB', 'market': 'ES', 'timeframe': '5m', 'dsl': '{"rules": "x"}'}
+]
+
+
+def _mock_db():
+    mock_db = MagicMock()
+    mock_db.iter_gsi1.side_effect = lambda pk, page_size=100: iter(
+        NOTES if pk.startswith('NOTE#') else STRATEGIES
+    )
+    return mock_db
+
+
+class TestExport:
+    def setup_method(self, method=None):
+        os.environ['DEV_MODE'] = 'true'
+
+    def teardown_method(self, method=None):
+        os.environ.pop('DEV_MODE', None)
+
+    def _event(self, qs=None):
+        return {
+            'httpMethod': 'GET',
+            'path': '/v1/export',
+            'headers': {'X-MTP-Dev-User': 'test-user'},
+            'queryStringParameters': qs or {}
+        }
+
+    @patch('app.repositories.dynamodb._get_db')
+    def test_iter_records_fetches_notes_and_strategies(self, mock_get_db):
+        """Test both record types are streamed with small pages"""
+        mock_get_db.return_value = _mock_db()
+        records = list(export_service.iter_records('test-user', page_size=2))
+
+        assert sorted(r['noteId'] for r in records if r['type'] == 'note') == [n['noteId'] for n in NOTES]
+        strategies = [r for r in records if r['type'] == 'strategy']
+        assert strategies[0]['dsl'] == {'rules': 'x'}
+
+    @patch('app.repositories.dynamodb._get_db')
+    def test_iter_records_propagates_fetch_errors(self, mock_get_db):
+        """Test a failing fetcher surfaces its exception"""
+        mock_db = _mock_db()
+        mock_db.iter_gsi1.side_effect = Exception('boom')
+        mock_get_db.return_value = mock_db
+        try:
+            list(export_service.iter_records('test-user'))
+            assert False, 'expected exception'
+        except Exception as e:
+            assert str(e) == 'boom'
+
+    @patch('app.repositories.dynamodb._get_db')
+    def test_export_endpoint_ndjson(self, mock_get_db):
+        """Test NDJSON export is returned inline"""
+        mock_get_db.return_value = _mock_db()
+        result = handler(self._event(), None)
+
+        assert result['statusCode'] == 200
+        assert result['headers']['Content-Type'] == 'application/x-ndjson'
+        lines = [json.loads(line) for line in result['body'].splitlines()]
+        assert len(lines) == len(NOTES) + len(STRATEGIES)
+
+    @patch('app.repositories.dynamodb._get_db')
+    def test_export_endpoint_csv_gzip(self, mock_get_db):
+        """Test gzip-compressed CSV export is base64 encoded"""
+        mock_get_db.return_value = _mock_db()
+        result = handler(self._event({'format': 'csv', 'gzip': 'true', 'include': 'notes'}), None)
+
+        assert result['statusCode'] == 200
+        assert result['isBase64Encoded'] is True
+        assert result['headers']['Content-Encoding'] == 'gzip'
+        raw = gzip.decompress(base64.b64decode(result['body'])).decode('utf-8')
+        rows = list(csv.DictReader(io.StringIO(raw)))
+        assert [r['noteId'] for r in rows] == [n['noteId'] for n in NOTES]
+        assert all(r['type'] == 'note' for r in rows)
+
+    @patch('app.repositories.dynamodb._get_db')
+    def test_export_spills_large_exports(self, mock_get_db, tmp_path):
+        """Test exports above the inline limit go to the export store"""
+        mock_get_db.return_value = _mock_db()
+        with patch.dict(os.environ, {'EXPORT_INLINE_MAX_BYTES': '10', 'EXPORT_STORE_DIR': str(tmp_path)}):
+            result = handler(self._event(), None)
+
+        assert result['statusCode'] == 200
+        body = json.loads(result['body'])
+        assert body['records'] == len(NOTES) + len(STRATEGIES)
+        path = body['location'][len('file://'):]
+        with open(path) as f:
+            assert len(f.read().splitlines()) == body['records']
+
+    def test_export_rejects_unknown_format(self):
+        """Test unsupported formats return 400"""
+        result = handler(self._event({'format': 'xml'}), None)
+        assert result['statusCode'] == 400
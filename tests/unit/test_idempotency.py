@@ -0,0 +1,89 @@
+import sys
+import os
+import json
+from unittest.mock import patch
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.services.idempotency_service import idempotency_service
+
+
+def _post(api, path, body, key=None):
+    return api.raw('POST', path, body, headers={'Idempotency-Key': key} if key else None)
+
+
+def _note_count(repo):
+    return len(list(repo.iter_gsi1('NOTE#trader')))
+
+
+class TestIdempotency:
+    def test_retry_replays_first_response(self, repo, api):
+        """Test a retried POST returns the original note ID without a second write"""
+        first = _post(api, '/v1/notes', {'text': 'fill'}, key='k-1')
+        retry = _post(api, '/v1/notes', {'text': 'fill'}, key='k-1')
+
+        assert first['statusCode'] == retry['statusCode'] == 201
+        assert json.loads(retry['body'])['noteId'] == json.loads(first['body'])['noteId']
+        assert retry['headers']['Idempotent-Replayed'] == 'true'
+        assert _note_count(repo) == 1
+
+    def test_without_key_each_post_creates(self, repo, api):
+        """Test requests without a key are not deduplicated"""
+        _post(api, '/v1/notes', {'text': 'fill'})
+        _post(api, '/v1/notes', {'text': 'fill'})
+        assert _note_count(repo) == 2
+
+    def test_key_reuse_with_different_body_is_rejected(self, repo, api):
+        """Test a key reused for another payload returns 422"""
+        _post(api, '/v1/strategies', {'name': 'ORB'}, key='k-2')
+        result = _post(api, '/v1/strategies', {'name': 'VWAP'}, key='k-2')
+        assert result['statusCode'] == 422
+
+    def test_keys_are_scoped_per_route(self, repo, api):
+        """Test the same key on different routes does not collide"""
+        assert _post(api, '/v1/notes', {'text': 'a'}, key='k-3')['statusCode'] == 201
+        assert _post(api, '/v1/strategies', {'name': 'a'}, key='k-3')['statusCode'] == 201
+
+    def test_in_progress_key_returns_409(self, repo, api):
+        """Test a concurrent duplicate gets 409 with Retry-After"""
+        scope = 'POST /v1/notes'
+        body = json.dumps({'text': 'x'})
+        idempotency_service.begin('trader', scope, 'k-4', idempotency_service.fingerprint(scope, body))
+
+        result = _post(api, '/v1/notes', {'text': 'x'}, key='k-4')
+        assert result['statusCode'] == 409
+        assert result['headers']['Retry-After'] == '1'
+
+    def test_client_errors_are_replayed_server_errors_are_not(self, repo, api):
+        """Test 4xx responses are cached but 5xx responses release the key"""
+        assert _post(api, '/v1/notes', {'direction': 'up'}, key='k-5')['statusCode'] == 400
+        assert _post(api, '/v1/notes', {'direction': 'up'}, key='k-5')['headers'].get('Idempotent-Replayed') == 'true'
+
+        with patch('app.api.notes.create_note', return_value={'statusCode': 500, 'headers': {}, 'body': '{}'}):
+            assert _post(api, '/v1/notes', {'text': 'y'}, key='k-6')['statusCode'] == 500
+        assert repo.get_item('IDEMP#trader', 'POST /v1/notes#k-6') is None
+        assert _post(api, '/v1/notes', {'text': 'y'}, key='k-6')['statusCode'] == 201
+
+    def test_expired_entries_can_be_reclaimed(self, repo, api):
+        """Test ledger entries past their TTL no longer block the key"""
+        _post(api, '/v1/notes', {'text': 'old'}, key='k-7')
+        with patch('app.services.idempotency_service.time.time', return_value=10 ** 10):
+            result = _post(api, '/v1/notes', {'text': 'new'}, key='k-7')
+        assert 'Idempotent-Replayed' not in result['headers']
+        assert _note_count(repo) == 2
+
+    def test_abandoned_claim_expires_after_its_lease(self, repo, api, monkeypatch):
+        """Test a claim left IN_PROGRESS blocks retries only until its lease runs out"""
+        monkeypatch.setenv('IDEMPOTENCY_LEASE_SECONDS', '30')
+        scope = 'POST /v1/notes'
+        fingerprint = idempotency_service.fingerprint(scope, json.dumps({'text': 'z'}))
+        with patch('app.services.idempotency_service.time.time', return_value=1000):
+            idempotency_service.begin('trader', scope, 'k-8', fingerprint)
+        with patch('app.services.idempotency_service.time.time', return_value=1010):
+            assert _post(api, '/v1/notes', {'text': 'z'}, key='k-8')['statusCode'] == 409
+        with patch('app.services.idempotency_service.time.time', return_value=1031):
+            assert _post(api, '/v1/notes', {'text': 'z'}, key='k-8')['statusCode'] == 201
+        entry = repo.get_item('IDEMP#trader', 'POST /v1/notes#k-8')
+        assert entry['status'] == 'COMPLETED'
+        assert entry['expiresAt'] == 1031 + idempotency_service.ttl_seconds()
@@ -0,0 +1,83 @@
+import sys
+import os
+import re
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.core.ids import MonotonicULID, encode, generate_id, generate_ids
+
+ULID_RE = re.compile(r'^[0-9A-HJKMNP-TV-Z]{26}$')
+
+
+class _Clock:
+    def __init__(self, ms):
+        self.ms = ms
+
+    def __call__(self):
+        return self.ms
+
+
+class _Random:
+    """Deterministic os.urandom stand-in that counts its calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, n):
+        self.calls += 1
+        return bytes([self.calls % 256]) * n
+
+
+def _decode(value):
+    return int(''.join(f"{'0123456789ABCDEFGHJKMNPQRSTVWXYZ'.index(c):05b}" for c in value), 2)
+
+
+class TestIds:
+    def test_format_and_encoding(self):
+        """Test IDs are 26 Crockford base32 characters with the timestamp in the top 48 bits"""
+        assert encode(0) == '0' * 26
+        assert encode((1 << 128) - 1) == '7' + 'Z' * 25
+        generator = MonotonicULID(clock=_Clock(1_700_000_000_000))
+        value = generator.new()
+        assert ULID_RE.match(value)
+        assert _decode(value) >> 80 == 1_700_000_000_000
+        prefix, ulid = generate_id('note').split('-', 1)
+        assert prefix == 'note' and ULID_RE.match(ulid)
+
+    def test_monotonic_within_a_millisecond(self):
+        """Test IDs in the same millisecond, or after the clock steps back, still increase"""
+        clock = _Clock(1000)
+        generator = MonotonicULID(clock=clock)
+        ids = [generator.new() for _ in range(5)]
+        clock.ms = 900
+        ids += [generator.new() for _ in range(5)]
+        assert ids == sorted(ids) and len(set(ids)) == 10
+        assert {_decode(i) >> 80 for i in ids} == {1000}
+        assert _decode(ids[-1]) == _decode(ids[0]) + 9
+        clock.ms = 1001
+        assert generator.new() > ids[-1]
+
+    def test_bulk_and_batched_randomness(self):
+        """Test bulk IDs are ordered and os.urandom is called once per 256 fresh values"""
+        clock, rand = _Clock(5), _Random()
+        generator = MonotonicULID(clock=clock, urandom=rand)
+        for _ in range(300):
+            clock.ms += 1
+            generator.new()
+        assert rand.calls == 2
+        ids = generator.new_many(1000)
+        assert ids == sorted(ids) and len(set(ids)) == 1000
+        assert rand.calls == 2
+        bulk = generate_ids('strategy', 50)
+        assert bulk == sorted(bulk) and len(set(bulk)) == 50
+
+    def test_reseed_discards_copied_state(self):
+        """Test reseed() draws fresh randomness, so cloned generators diverge"""
+        rand = _Random()
+        generator = MonotonicULID(clock=_Clock(7), urandom=rand)
+        before = generator.new()
+        generator.reseed()
+        after = generator.new()
+        assert rand.calls == 2
+        assert _decode(after) != _decode(before) + 1
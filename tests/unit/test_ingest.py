@@ -0,0 +1,142 @@
+import sys
+import os
+import json
+
+import boto3
+import pytest
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.main import ingest_handler
+from app.repositories.ingest_queue import QueueNotConfigured, SQLiteQueue, SQSQueue, get_queue
+from app.services.ingest_service import ingest_service
+
+
+@pytest.fixture
+def queued(repo, monkeypatch, tmp_path):
+    monkeypatch.setenv('NOTE_INGEST_MODE', 'queue')
+    monkeypatch.setenv('INGEST_QUEUE_PATH', str(tmp_path / 'ingest.sqlite3'))
+    monkeypatch.setenv('INGEST_DRAIN_INTERVAL_MS', '0')
+    return get_queue()
+
+
+class TestSQLiteQueue:
+    def test_lease_redelivery_and_delete(self, tmp_path):
+        """Test leased messages are hidden, redelivered after the timeout and gone once deleted"""
+        path = str(tmp_path / 'q.sqlite3')
+        queue = SQLiteQueue(path, visibility_timeout=0.05)
+        queue.send([{'n': 1}, {'n': 2}])
+
+        first = queue.receive(10)
+        assert [m.body for m in first] == [{'n': 1}, {'n': 2}]
+        assert queue.receive(10) == []
+
+        import time
+        time.sleep(0.06)
+        again = queue.receive(1)
+        assert [m.body for m in again] == [{'n': 1}]
+        queue.delete([first[0].receipt])  # stale receipt: ignored
+        assert queue.depth() == 2
+        queue.delete([again[0].receipt])
+
+        # Durable across instances (e.g. a process restart)
+        assert SQLiteQueue(path).depth() == 1
+
+    def test_exhausted_messages_are_dead_lettered(self, tmp_path):
+        """Test a message received max_receives times is moved aside instead of redelivered"""
+        queue = SQLiteQueue(str(tmp_path / 'q.sqlite3'), visibility_timeout=0, max_receives=2)
+        queue.send([{'n': 'poison'}, {'n': 2}])
+        assert [m.body for m in queue.receive(1)] == [{'n': 'poison'}]
+        assert [m.body for m in queue.receive(1)] == [{'n': 'poison'}]
+        assert [m.body for m in queue.receive(1)] == [{'n': 2}]
+        assert queue.dead_letters() == [{'n': 'poison'}]
+        assert queue.depth() == 1
+
+
+class TestWriteBehindIngest:
+    def test_post_is_accepted_then_drained(self, queued, api):
+        """Test POST returns 202 with the ID and the note appears once drained"""
+        status, body = api('POST', '/v1/notes', {'text': 'filled at vwap', 'date': '2024-01-02', 'risk': 12.5})
+        assert status == 202
+        note_id = body['noteId']
+        assert api('GET', f'/v1/notes/{note_id}')[0] == 404
+        assert queued.depth() == 1
+
+        assert ingest_service.drain() == 1
+        status, body = api('GET', f'/v1/notes/{note_id}')
+        assert status == 200
+        assert body['note']['text'] == 'filled at vwap'
+        assert body['note']['risk'] == 12.5
+        assert queued.depth() == 0
+        assert [r['noteId'] for r in api('GET', '/v1/notes/search', qs={'q': 'vwap'})[1]['results']] == [note_id]
+
+    def test_invalid_notes_are_rejected_before_queueing(self, queued, api):
+        """Test validation still happens synchronously"""
+        status, _ = api('POST', '/v1/notes', {'direction': 'Sideways'})
+        assert status == 400
+        assert queued.depth() == 0
+
+    def test_burst_is_written_in_batches(self, queued, repo, api):
+        """Test a burst drains as 25-item batch writes"""
+        for i in range(30):
+            assert api('POST', '/v1/notes', {'text': f'fill {i}'})[0] == 202
+        writes = []
+        original = repo.batch_write
+
+        def spy(puts=(), deletes=()):
+            puts = list(puts)
+            if any(p['SK'].startswith('NOTE#') for p in puts):
+                writes.append(len(puts))
+            return original(puts, deletes)
+
+        repo.batch_write = spy
+        assert ingest_service.drain() == 30
+        assert writes == [25, 5]
+        assert len(api('GET', '/v1/notes', qs={'limit': '100'})[1]['notes']) == 30
+
+    def test_redelivery_is_idempotent(self, queued, repo, api):
+        """Test a batch delivered twice is written and indexed once"""
+        api('POST', '/v1/notes', {'text': 'once only'})
+        body = queued.receive(1)[0].body
+        assert ingest_service.write_batch([body]) == 1
+        assert ingest_service.write_batch([body]) == 0
+        assert repo.get_item('SEARCH#trader', 'STATS')['docCount'] == 1
+
+    def test_failing_message_does_not_block_its_batch(self, queued, repo, api):
+        """Test a poison message is retried alone while the rest of its batch is written"""
+        api('POST', '/v1/notes', {'text': 'good'})
+        queued.send([{'type': 'note.create', 'item': {}}])
+        api('POST', '/v1/notes', {'text': 'also good'})
+        assert ingest_service.drain() == 2
+        assert len(api('GET', '/v1/notes')[1]['notes']) == 2
+        assert queued.depth() == 1
+
+    def test_lambda_requires_sqs(self, queued, api, monkeypatch):
+        """Test inside Lambda the container-local queue is refused and notes are written synchronously"""
+        monkeypatch.setenv('AWS_LAMBDA_FUNCTION_NAME', 'api')
+        with pytest.raises(QueueNotConfigured):
+            get_queue()
+        assert not ingest_service.enabled
+        assert api('POST', '/v1/notes', {'text': 'direct'})[0] == 201
+
+    def test_sqs_event_handler_reports_failures(self, queued, api):
+        """Test ingest_handler writes SQS records and reports the failed chunk"""
+        api('POST', '/v1/notes', {'text': 'from sqs'})
+        body = queued.receive(1)[0].body
+        result = ingest_handler({'Records': [{'messageId': 'm1', 'body': json.dumps(body)}]}, None)
+        assert result == {'batchItemFailures': []}
+        assert len(api('GET', '/v1/notes')[1]['notes']) == 1
+
+        records = [{'messageId': 'bad', 'body': '{"item": {}}'}, {'messageId': 'm2', 'body': json.dumps(body)}]
+        assert ingest_handler({'Records': records}, None) == {'batchItemFailures': [{'itemIdentifier': 'bad'}]}
+
+    def test_sqs_queue_backend(self, repo):
+        """Test the SQS backend round-trips messages"""
+        url = boto3.client('sqs', region_name='us-east-1').create_queue(QueueName='ingest')['QueueUrl']
+        queue = SQSQueue(url)
+        queue.send([{'n': i} for i in range(12)])
+        messages = queue.receive(25)
+        assert sorted(m.body['n'] for m in messages) == list(range(12))
+        queue.delete([m.receipt for m in messages])
+        assert queue.depth() == 0
@@ -0,0 +1,89 @@
+import sys
+import os
+import json
+
+import boto3
+import pytest
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app import lifecycle
+from app.core import metrics
+from app.core.ids import new_ulid
+from app.repositories import dynamodb, ingest_queue
+
+_get_db = dynamodb._get_db
+
+
+@pytest.fixture
+def container(repo, monkeypatch):
+    """A fresh, un-initialized container on the moto table (real lazy _get_db)."""
+    monkeypatch.setattr(dynamodb, '_get_db', _get_db)
+    monkeypatch.setattr(lifecycle, '_initialized', False)
+    dynamodb.reset_db()
+    yield
+    dynamodb.reset_db()
+
+
+class TestLifecycle:
+    def test_preinit_modes(self, monkeypatch):
+        """Test PREINIT=auto pre-initializes only inside Lambda"""
+        monkeypatch.delenv('PREINIT', raising=False)
+        monkeypatch.delenv('AWS_LAMBDA_FUNCTION_NAME', raising=False)
+        assert not lifecycle.preinit_enabled()
+        monkeypatch.setenv('AWS_LAMBDA_FUNCTION_NAME', 'api')
+        assert lifecycle.preinit_enabled()
+        monkeypatch.setenv('PREINIT', 'false')
+        assert not lifecycle.preinit_enabled()
+
+    def test_init_creates_clients_once(self, container):
+        """Test init() builds the repository up front, once, and records its steps"""
+        timings = lifecycle.init()
+        assert set(timings) == {'db', 'aio', 'schemas', 'codecs'}
+        repository = dynamodb._db_instance
+        assert repository is not None
+        lifecycle.init()
+        assert dynamodb._db_instance is repository
+
+        from app.main import handler
+        event = {'httpMethod': 'GET', 'path': '/v1/notes', 'headers': {'X-MTP-Dev-User': 'u1'}}
+        assert json.loads(handler(event, None)['body'])['notes'] == []
+        assert dynamodb._db_instance is repository
+
+    def test_after_restore_reseeds_and_reconnects(self, container):
+        """Test a restored container gets new randomness, identity, session and clients"""
+        lifecycle.init()
+        repository = dynamodb._db_instance
+        session = boto3.DEFAULT_SESSION
+        container_id = metrics.CONTAINER_ID
+        ingest_queue._queues['x'] = object()
+        last = new_ulid()
+
+        lifecycle.after_restore()
+        assert metrics.CONTAINER_ID != container_id
+        assert boto3.DEFAULT_SESSION is not session
+        # Service models are shared, not reloaded
+        assert boto3.DEFAULT_SESSION._session.get_component('data_loader') is \
+            session._session.get_component('data_loader')
+        assert dynamodb._db_instance is not None and dynamodb._db_instance is not repository
+        assert not ingest_queue._queues
+        # Same millisecond or not, the counter restarted from fresh random bits
+        assert new_ulid()[10:] != last[10:]
+        assert dynamodb.db.get_item('USER#u1', 'NOTE#missing') is None
+
+    def test_refresh_session_without_the_private_botocore_session(self, monkeypatch):
+        """Test the session is still replaced when boto3.Session no longer exposes _session"""
+        monkeypatch.setattr(boto3, 'DEFAULT_SESSION', object())
+        lifecycle.refresh_session()
+        assert isinstance(boto3.DEFAULT_SESSION, boto3.Session)
+        assert boto3.DEFAULT_SESSION.client('dynamodb', region_name='us-east-1').meta.service_model
+
+    def test_start_registers_snapshot_hooks(self, monkeypatch):
+        """Test start() registers the hooks when the runtime provides snapshot_restore_py"""
+        registered = []
+        monkeypatch.setenv('PREINIT', 'false')
+        monkeypatch.setattr(lifecycle, 'register_before_snapshot', registered.append)
+        monkeypatch.setattr(lifecycle, 'register_after_restore', registered.append)
+        lifecycle.start()
+        assert registered == [lifecycle.before_snapshot, lifecycle.after_restore]
@@ -0,0 +1,167 @@
+import sys
+import os
+import json
+import zlib
+
+import pytest
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.core.rate_limit import TokenBucket
+from app.services.maintenance_service import (
+    MaintenanceRunner, MigrateDslJob, PurgeUsersJob, RebuildRollupsJob, pk_owner
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def segmented(repo):
+    """moto ignores Segment/TotalSegments; split the table by PK hash like DynamoDB would."""
+    original = repo.scan_page
+    calls = []
+
+    def scan_page(segment=None, total_segments=None, last_evaluated_key=None, entity_type=None,
+                  projection=None, limit=500):
+        calls.append(segment)
+        resp = original(None, None, last_evaluated_key, entity_type, None, limit)
+        if total_segments:
+            resp['Items'] = [it for it in resp['Items']
+                             if zlib.crc32(it['PK'].encode()) % total_segments == segment]
+        return resp
+
+    repo.scan_page = scan_page
+    repo.scan_calls = calls
+    return repo
+
+
+def _legacy_strategies(repo, count):
+    for i in range(count):
+        repo.put_item({'PK': f'USER#u{i}', 'SK': f'STRAT#s{i}', 'entityType': 'STRATEGY', 'strategyId': f's{i}',
+                       'userId': f'u{i}', 'name': f'S{i}', 'dsl': json.dumps({'entry': 'orb', 'risk': 0.5, 'i': i})})
+
+
+class TestTokenBucket:
+    def test_try_acquire_and_refill(self):
+        """Test tokens are spent, refilled at the rate and capped at capacity"""
+        clock = _Clock()
+        bucket = TokenBucket(10, capacity=5, clock=clock, sleep=clock.sleep)
+        assert bucket.try_acquire(5)
+        assert not bucket.try_acquire(1)
+        clock.now += 0.25
+        assert bucket.try_acquire(2) and not bucket.try_acquire(1)
+        clock.now += 100
+        assert bucket.tokens == 5
+
+    def test_acquire_sleeps_off_debt(self):
+        """Test acquire() goes into debt and waits until it is repaid"""
+        clock = _Clock()
+        bucket = TokenBucket(4, clock=clock, sleep=clock.sleep)
+        assert bucket.acquire(4) == 0
+        assert bucket.acquire(6) == 1.5
+        assert clock.slept == [1.5]
+        assert bucket.wait_time(4) == 1.0
+
+
+class TestMaintenanceJobs:
+    def test_migrate_dsl(self, segmented, api):
+        """Test string dsl values become maps, others are left alone and reruns are no-ops"""
+        _legacy_strategies(segmented, 12)
+        segmented.put_item({'PK': 'USER#x', 'SK': 'STRAT#bad', 'entityType': 'STRATEGY', 'dsl': '{nope'})
+        api('POST', '/v1/strategies', {'name': 'Modern', 'dsl': {'entry': 'vwap'}})
+
+        result = MaintenanceRunner(MigrateDslJob(), segments=4, page_size=5).run()
+        assert result['counts']['migrated'] == 12
+        assert result['counts']['invalid'] == 1
+        assert result['counts']['skipped'] == 1
+        assert result['segmentsDone'] == 4
+        dsl = segmented.get_item('USER#u3', 'STRAT#s3')['dsl']
+        assert dsl == {'entry': 'orb', 'risk': pytest.approx(0.5), 'i': 3}
+        assert api('GET', '/v1/strategies/s3', user='u3')[1]['strategy']['dsl']['entry'] == 'orb'
+
+        again = MaintenanceRunner(MigrateDslJob(), segments=4).run()
+        assert 'migrated' not in again['counts']
+
+    def test_purge_users(self, segmented, api):
+        """Test every item of a purged user goes and other users are untouched"""
+        for user in ('gone', 'kept'):
+            api('POST', '/v1/notes', {'text': 'vwap reclaim', 'date': '2024-01-02'}, user=user)
+            api('POST', '/v1/strategies', {'name': 'ORB'}, user=user)
+        assert pk_owner('SEARCH#gone#vwap') == 'gone'
+
+        dry = MaintenanceRunner(PurgeUsersJob(['gone'], dry_run=True), segments=3).run()
+        deleted = dry['counts']['deleted']
+        assert deleted > 4  # note, strategy, rollups, search postings and stats
+
+        result = MaintenanceRunner(PurgeUsersJob(['gone']), segments=3).run()
+        assert result['counts']['deleted'] == deleted
+        remaining = [it['PK'] for it in segmented.iter_scan()]
+        assert not [pk for pk in remaining if pk_owner(pk) == 'gone']
+        assert len(api('GET', '/v1/notes', user='kept')[1]['notes']) == 1
+
+    def test_checkpoint_resume(self, segmented, tmp_path):
+        """Test a failed run resumes from its checkpoint without rescanning finished segments"""
+        _legacy_strategies(segmented, 20)
+        path = str(tmp_path / 'job.json')
+        job = MigrateDslJob()
+        original = job.process
+        seen = []
+
+        def flaky(item, batch):
+            seen.append(item['SK'])
+            if len(seen) == 11:
+                raise RuntimeError('interrupted')
+            return original(item, batch)
+
+        job.process = flaky
+        with pytest.raises(RuntimeError):
+            MaintenanceRunner(job, segments=2, workers=1, page_size=4, checkpoint_path=path).run()
+        saved = json.load(open(path))
+        assert saved['segments']['0']['done'] and not saved['segments']['1']['done']
+
+        segmented.scan_calls.clear()
+        result = MaintenanceRunner(MigrateDslJob(), segments=2, page_size=4, checkpoint_path=path).run()
+        assert set(segmented.scan_calls) == {1}
+        assert result['finished']
+        assert all(isinstance(it['dsl'], dict) for it in segmented.iter_scan(entity_type='STRATEGY'))
+
+        with pytest.raises(ValueError):
+            MaintenanceRunner(MigrateDslJob(), segments=3, checkpoint_path=path)
+
+    def test_capacity_budget(self, segmented):
+        """Test consumed capacity is metered and throttled to the budget"""
+        _legacy_strategies(segmented, 10)
+        clock = _Clock()
+        runner = MaintenanceRunner(MigrateDslJob(), segments=1, page_size=2)
+        runner.rcu = TokenBucket(1, clock=clock, sleep=clock.sleep)
+        runner.wcu = TokenBucket(2, clock=clock, sleep=clock.sleep)
+        result = runner.run()
+        rcu, wcu = result['consumed']['rcu'], result['consumed']['wcu']
+        assert rcu > 0 and wcu > 0
+        # Waiting covers whichever budget is tighter (the first second's capacity is free)
+        slept = sum(clock.slept)
+        assert max(rcu - 1, (wcu - 2) / 2) - 1e-9 <= slept <= (rcu - 1) + (wcu - 2) / 2 + 1e-9
+        assert slept > 0
+
+    def test_rebuild_rollups(self, segmented, api):
+        """Test rollups are recomputed for every user with notes"""
+        for user in ('a', 'b'):
+            api('POST', '/v1/notes', {'date': '2024-05-01', 'hit_miss': 'Hit'}, user=user)
+        rollups = [(it['PK'], it['SK']) for it in segmented.iter_scan() if it['SK'].startswith('ROLLUP#')]
+        segmented.batch_write(deletes=rollups)
+
+        result = MaintenanceRunner(RebuildRollupsJob(), segments=2).run()
+        assert result['counts']['rebuilt'] == 2
+        assert segmented.get_item('USER#b', 'ROLLUP#ALL#M#2024-05')['notes'] == 1
@@ -0,0 +1,167 @@
+import sys
+import os
+import json
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.core.metrics import MetricsCollector, diff_snapshots, merge_snapshots, render_prometheus
+from app.core.metrics_export import MetricsExporter, compact_pushed_snapshots, parse_emf_lines, pushed_snapshot
+from app.api.metrics import get_metrics_endpoint
+
+
+class TestSnapshots:
+    def test_diff_only_contains_increase(self):
+        """Test deltas drop unchanged series and subtract prior buckets"""
+        collector = MetricsCollector()
+        collector.record_request(20.0)
+        collector.inc('notes_created_total')
+        first = collector.snapshot()
+        collector.record_request(300.0, is_error=True)
+        delta = diff_snapshots(collector.snapshot(), first)
+
+        assert delta['counters'] == {'requests_total': {'': 1}, 'errors_total': {'': 1}}
+        hist = delta['histograms']['request_latency_seconds']['']
+        assert hist['count'] == 1
+        assert sum(hist['buckets']) == 1
+
+    def test_merge_sums_counters_and_histograms(self):
+        """Test merging deltas from two containers yields global totals"""
+        a, b = MetricsCollector(), MetricsCollector()
+        a.record_request(10.0)
+        a.inc('ops_total', labels={'op': 'query'})
+        b.record_request(10.0)
+        b.record_request(2000.0, is_error=True)
+        b.inc('ops_total', 2, labels={'op': 'query'})
+
+        merged = merge_snapshots([a.snapshot(), dict(b.snapshot(), container_id='other')])
+        assert merged['containers'] == 2
+        assert merged['counters']['requests_total'][''] == 3
+        assert merged['counters']['ops_total']['op="query"'] == 3
+        assert merged['histograms']['request_latency_seconds']['']['count'] == 3
+
+        text = render_prometheus(merged)
+        assert 'request_latency_seconds_bucket{le="+Inf"} 3' in text
+        assert 'request_latency_seconds_bucket{le="0.01"} 2' in text
+        assert 'ops_total{op="query"} 3' in text
+
+
+class TestExporter:
+    def test_push_mode_writes_deltas_that_merge_globally(self, tmp_path, monkeypatch):
+        """Test repeated flushes write deltas whose merge equals the cumulative totals"""
+        monkeypatch.setenv('METRICS_EXPORT_MODE', 'push')
+        monkeypatch.setenv('METRICS_PUSH_DIR', str(tmp_path))
+        collector = MetricsCollector()
+        exporter = MetricsExporter(collector)
+
+        collector.record_request(5.0)
+        assert exporter.flush() is not None
+        assert exporter.flush() is None  # nothing new
+        collector.record_request(5.0)
+        collector.record_request(5.0, is_error=True)
+        exporter.flush()
+
+        assert len(list(tmp_path.glob('*.json'))) == 2
+        merged = pushed_snapshot(str(tmp_path))
+        assert merged['counters']['requests_total'][''] == 3
+        assert merged['counters']['errors_total'][''] == 1
+
+    def test_emf_mode_prints_parseable_record(self, capsys, monkeypatch):
+        """Test EMF lines carry CloudWatch metrics and the mergeable delta"""
+        monkeypatch.setenv('METRICS_EXPORT_MODE', 'emf')
+        collector = MetricsCollector()
+        collector.record_request(50.0)
+        MetricsExporter(collector).flush()
+
+        line = capsys.readouterr().out.strip()
+        record = json.loads(line)
+        names = [m['Name'] for m in record['_aws']['CloudWatchMetrics'][0]['Metrics']]
+        assert 'requests_total' in names
+        assert record['requests_total'] == 1
+
+        deltas = list(parse_emf_lines(['START RequestId: abc', f'2024-01-01T00:00:00Z {line}']))
+        assert merge_snapshots(deltas)['counters']['requests_total'][''] == 1
+
+    def test_off_mode_does_nothing(self, monkeypatch):
+        """Test exporter is inert by default"""
+        monkeypatch.delenv('METRICS_EXPORT_MODE', raising=False)
+        collector = MetricsCollector()
+        collector.record_request(1.0)
+        exporter = MetricsExporter(collector)
+        exporter.ensure_started()
+        assert exporter.flush() is None
+        assert exporter._thread is None
+
+    def test_pushed_scope_endpoint(self, tmp_path, monkeypatch):
+        """Test /v1/metrics?scope=pushed renders the merged push directory"""
+        monkeypatch.setenv('METRICS_EXPORT_MODE', 'push')
+        monkeypatch.setenv('METRICS_PUSH_DIR', str(tmp_path))
+        for _ in range(2):
+            collector = MetricsCollector()
+            collector.record_request(5.0)
+            MetricsExporter(collector).flush()
+
+        result = get_metrics_endpoint({'queryStringParameters': {'scope': 'pushed'}, 'headers': {}})
+        assert result['statusCode'] == 200
+        assert 'requests_total 2' in result['body']
+
+    def test_old_deltas_are_compacted(self, tmp_path, monkeypatch):
+        """Test old delta files fold into one compacted file with the same totals"""
+        monkeypatch.setenv('METRICS_EXPORT_MODE', 'push')
+        monkeypatch.setenv('METRICS_PUSH_DIR', str(tmp_path))
+        for _ in range(3):
+            collector = MetricsCollector()
+            collector.record_request(5.0)
+            MetricsExporter(collector).flush()
+        before = pushed_snapshot(str(tmp_path))
+
+        assert compact_pushed_snapshots(str(tmp_path), max_age_seconds=0) == 3
+        files = [p.name for p in tmp_path.glob('*.json')]
+        assert len(files) == 1 and files[0].startswith('compacted-')
+        after = pushed_snapshot(str(tmp_path))
+        assert after['counters'] == before['counters'] and after['histograms'] == before['histograms']
+        assert after['containers'] == before['containers']
+
+        collector = MetricsCollector()
+        collector.record_request(5.0)
+        MetricsExporter(collector).flush()
+        assert compact_pushed_snapshots(str(tmp_path), max_age_seconds=0) == 2
+        assert pushed_snapshot(str(tmp_path))['counters']['requests_total'][''] == 4
+        assert not list(tmp_path.glob('.*'))
+
+
+class TestDynamoDBInstrumentation:
+    def test_calls_record_latency_and_capacity_per_route(self, repo):
+        """Test DynamoDB calls made while handling a route are labelled with it"""
+        from app.main import handler
+        from app.core.metrics import get_metrics
+
+        before = get_metrics().snapshot()
+        event = {'httpMethod': 'POST', 'path': '/v1/notes', 'headers': {'X-MTP-Dev-User': 'trader'},
+                 'body': json.dumps({'text': 'opening drive'})}
+        note_id = json.loads(handler(event, None)['body'])['noteId']
+        handler({'httpMethod': 'GET', 'path': f'/v1/notes/{note_id}', 'headers': {'X-MTP-Dev-User': 'trader'}}, None)
+        delta = diff_snapshots(get_metrics().snapshot(), before)
+
+        ops = delta['histograms']['dynamodb_operation_seconds']
+        assert ops['index="table",op="put_item"']['count'] >= 1
+        assert ops['index="table",op="get_item"']['count'] >= 1
+        wcu = delta['counters']['dynamodb_consumed_wcu_total']
+        rcu = delta['counters']['dynamodb_consumed_rcu_total']
+        assert wcu['op="put_item",route="POST /v1/notes"'] > 0
+        assert rcu['op="get_item",route="GET /v1/notes/{id}"'] > 0
+        assert 'dynamodb_consumed_rcu_total{op="get_item",route="GET /v1/notes/{id}"}' in \
+            get_metrics().get_prometheus_format()
+
+    def test_error_responses_are_counted(self, repo):
+        """Test failed conditional writes show up as DynamoDB errors"""
+        from app.core.metrics import get_metrics
+
+        before = get_metrics().snapshot()
+        repo.put_item({'PK': 'X', 'SK': 'Y'})
+        try:
+            repo.put_item({'PK': 'X', 'SK': 'Y'})
+        except Exception:
+            pass
+        delta = diff_snapshots(get_metrics().snapshot(), before)
+        assert delta['counters']['dynamodb_errors_total']['code="ConditionalCheckFailedException",op="put_item"'] == 1
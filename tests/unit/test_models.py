@@ -0,0 +1,63 @@
+import sys
+import os
+from decimal import Decimal
+import pytest
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.models.note import Note
+from app.models.strategy import Strategy
+
+
+class TestNoteModel:
+    def test_from_item_to_json_round_trip(self):
+        """Test a DynamoDB item maps to the API response shape"""
+        item = {
+            'PK': 'USER#u1', 'SK': 'NOTE#n1', 'noteId': 'n1', 'userId': 'u1',
+            'date': '2025-01-01', 'text': 'Faded the open', 'risk': Decimal('100'),
+            'strategyId': 'strat-1', 'hit_miss': 'Hit',
+            'createdAt': '2025-01-01T00:00:00Z', 'updatedAt': '2025-01-01T00:00:00Z'
+        }
+        assert Note.from_item(item).to_json() == {
+            'noteId': 'n1', 'date': '2025-01-01', 'text': 'Faded the open',
+            'createdAt': '2025-01-01T00:00:00Z', 'updatedAt': '2025-01-01T00:00:00Z',
+            'risk': Decimal('100'), 'strategyId': 'strat-1', 'hit_miss': 'Hit'
+        }
+
+    def test_to_json_omits_unset_optional_fields(self):
+        """Test optional fields are omitted and text defaults to empty"""
+        body = Note.from_item({'noteId': 'n1'}).to_json()
+        assert body['text'] == ''
+        for field, _ in Note.OPTIONAL_FIELDS:
+            assert field not in body
+
+    def test_to_dict_includes_strategy_id(self):
+        """Test to_dict maps strategy_id and win_amount through the field map"""
+        note = Note('n1', 'u1', strategy_id='strat-1', win_amount=50)
+        assert note.to_dict()['strategyId'] == 'strat-1'
+        assert note.to_dict()['win_amount'] == 50
+
+    def test_is_slotted(self):
+        """Test notes have no per-instance __dict__"""
+        note = Note.from_item({'noteId': 'n1'})
+        assert not hasattr(note, '__dict__')
+        with pytest.raises(AttributeError):
+            note.unexpected = 1
+
+
+class TestStrategyModel:
+    def test_from_item_parses_dsl_string(self):
+        """Test JSON-string DSL is parsed into a dict"""
+        strategy = Strategy.from_item({'strategyId': 's1', 'name': 'ORB', 'dsl': '{"rules": "x"}'})
+        assert strategy.to_json()['dsl'] == {'rules': 'x'}
+
+    def test_from_item_handles_bad_dsl(self):
+        """Test invalid DSL strings fall back to an empty dict"""
+        assert Strategy.from_item({'dsl': 'not json'}).dsl == {}
+        assert Strategy.from_item({'dsl': {'rules': 'x'}}).dsl == {'rules': 'x'}
+
+    def test_from_dict_round_trip(self):
+        """Test from_dict/to_dict round trip"""
+        data = {'strategyId': 's1', 'name': 'ORB', 'market': 'ES', 'timeframe': '5m', 'dsl': {}}
+        assert Strategy.from_dict(data).to_dict()['name'] == 'ORB'
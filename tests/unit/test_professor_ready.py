@@ -198,15 +198,16 @@ class TestProfessorReady:
         """Test successful note update"""
         mock_db = MagicMock()
         mock_get_db.return_value = mock_db
-        mock_db.get_item.return_value = {'noteId': 'note-123', 'text': 'Original text'}
-        mock_db.update_item.return_value = {
-            'Attributes': {
+        mock_db.versioned_update.return_value = (
+            {'noteId': 'note-123', 'text': 'Original text', 'version': 1},
+            {
                 'noteId': 'note-123',
                 'text': 'Updated text',
                 'direction': 'SHORT',
-                'updatedAt': '2025-01-01T00:00:00Z'
+                'updatedAt': '2025-01-01T00:00:00Z',
+                'version': 2
             }
-        }
+        )
         
         event = self._make_event('PATCH', '/v1/notes/note-123', 'test-user', {
             'text': 'Updated text',
@@ -219,16 +220,20 @@ class TestProfessorReady:
         assert body['message'] == 'Note updated successfully'
         assert body['note']['text'] == 'Updated text'
         assert body['note']['direction'] == 'SHORT'
+        assert body['note']['version'] == 2
+        assert result['headers']['ETag'] == '"2"'
         
-        mock_db.get_item.assert_called_once_with('USER#test-user', 'NOTE#note-123')
-        mock_db.update_item.assert_called_once()
+        # Existence is checked by the update's condition, not a separate read
+        mock_db.get_item.assert_not_called()
+        mock_db.versioned_update.assert_called_once()
+        assert mock_db.versioned_update.call_args[0][:2] == ('USER#test-user', 'NOTE#note-123')
     
     @patch('app.repositories.dynamodb._get_db')
     def test_notes_update_not_found(self, mock_get_db):
         """Test note update when note doesn't exist"""
         mock_db = MagicMock()
         mock_get_db.return_value = mock_db
-        mock_db.get_item.return_value = None
+        mock_db.versioned_update.return_value = None
         
         event = self._make_event('PATCH', '/v1/notes/nonexistent', 'test-user', {
             'text': 'Updated text'
@@ -239,16 +244,15 @@ class TestProfessorReady:
         body = json.loads(result['body'])
         assert body['message'] == 'Note not found'
         
-        mock_db.get_item.assert_called_once()
-        mock_db.update_item.assert_not_called()
+        mock_db.get_item.assert_not_called()
+        mock_db.versioned_update.assert_called_once()
     
     @patch('app.repositories.dynamodb._get_db')
     def test_notes_delete_success(self, mock_get_db):
         """Test successful note deletion"""
         mock_db = MagicMock()
         mock_get_db.return_value = mock_db
-        mock_db.get_item.return_value = {'noteId': 'note-123'}
-        mock_db.delete_item.return_value = {'ResponseMetadata': {'HTTPStatusCode': 200}}
+        mock_db.soft_delete.return_value = {'noteId': 'note-123'}
         
         event = self._make_event('DELETE', '/v1/notes/note-123', 'test-user')
         result = handler(event, None)
@@ -256,15 +260,16 @@ class TestProfessorReady:
         body = json.loads(result['body'])
         assert body['message'] == 'Note deleted successfully'
         
-        mock_db.get_item.assert_called_once_with('USER#test-user', 'NOTE#note-123')
-        mock_db.delete_item.assert_called_once_with('USER#test-user', 'NOTE#note-123')
+        mock_db.soft_delete.assert_called_once()
+        assert mock_db.soft_delete.call_args[0][:2] == ('USER#test-user', 'NOTE#note-123')
+        mock_db.delete_item.assert_not_called()
     
     @patch('app.repositories.dynamodb._get_db')
     def test_notes_delete_not_found(self, mock_get_db):
         """Test note deletion when note doesn't exist"""
         mock_db = MagicMock()
         mock_get_db.return_value = mock_db
-        mock_db.get_item.return_value = None
+        mock_db.soft_delete.return_value = None
         
         event = self._make_event('DELETE', '/v1/notes/nonexistent', 'test-user')
         result = handler(event, None)
@@ -272,7 +277,7 @@ class TestProfessorReady:
         body = json.loads(result['body'])
         assert body['message'] == 'Note not found'
         
-        mock_db.get_item.assert_called_once()
+        mock_db.soft_delete.assert_called_once()
         mock_db.delete_item.assert_not_called()
     
     # ==================== STRATEGIES CRUD TESTS ====================
@@ -399,14 +404,10 @@ class TestProfessorReady:
         """Test successful strategy update"""
         mock_db = MagicMock()
         mock_get_db.return_value = mock_db
-        mock_db.get_item.return_value = {'strategyId': 'strat-123', 'name': 'Original'}
-        mock_db.update_item.return_value = {
-            'Attributes': {
-                'strategyId': 'strat-123',
-                'name': 'Updated Strategy',
-                'updatedAt': '2025-01-01T00:00:00Z'
-            }
-        }
+        mock_db.versioned_update.return_value = (
+            {'strategyId': 'strat-123', 'name': 'Original', 'version': 3},
+            {'strategyId': 'strat-123', 'name': 'Updated Strategy', 'updatedAt': '2025-01-01T00:00:00Z', 'version': 4}
+        )
         
         event = self._make_event('PATCH', '/v1/strategies/strat-123', 'test-user', {
             'name': 'Updated Strategy',
@@ -417,17 +418,17 @@ class TestProfessorReady:
         assert result['statusCode'] == 200
         body = json.loads(result['body'])
         assert body['message'] == 'Strategy updated successfully'
+        assert body['strategy']['version'] == 4
         
-        mock_db.get_item.assert_called_once()
-        mock_db.update_item.assert_called_once()
+        mock_db.get_item.assert_not_called()
+        mock_db.versioned_update.assert_called_once()
     
     @patch('app.repositories.dynamodb._get_db')
     def test_strategies_delete_success(self, mock_get_db):
         """Test successful strategy deletion"""
         mock_db = MagicMock()
         mock_get_db.return_value = mock_db
-        mock_db.get_item.return_value = {'strategyId': 'strat-123'}
-        mock_db.delete_item.return_value = {'ResponseMetadata': {'HTTPStatusCode': 200}}
+        mock_db.soft_delete.return_value = {'strategyId': 'strat-123'}
         
         event = self._make_event('DELETE', '/v1/strategies/strat-123', 'test-user')
         result = handler(event, None)
@@ -435,8 +436,9 @@ class TestProfessorReady:
         body = json.loads(result['body'])
         assert body['message'] == 'Strategy deleted successfully'
         
-        mock_db.get_item.assert_called_once_with('USER#test-user', 'STRAT#strat-123')
-        mock_db.delete_item.assert_called_once_with('USER#test-user', 'STRAT#strat-123')
+        mock_db.soft_delete.assert_called_once()
+        assert mock_db.soft_delete.call_args[0][:2] == ('USER#test-user', 'STRAT#strat-123')
+        mock_db.delete_item.assert_not_called()
     
     # ==================== REPORTING TESTS ====================
     
@@ -467,7 +469,8 @@ class TestProfessorReady:
         
         mock_db.query_gsi1.assert_called_once_with(
             'NOTE#test-user',
-            limit=200
+            limit=200,
+            projection=('date', 'hit_miss', 'session', 'win_amount')
         )
     
     @patch('app.repositories.dynamodb._get_db')
@@ -559,14 +562,10 @@ class TestProfessorReady:
         """Test strategy update with DSL as object (should be JSON serialized)"""
         mock_db = MagicMock()
         mock_get_db.return_value = mock_db
-        mock_db.get_item.return_value = {'strategyId': 'strat-123', 'name': 'Original'}
-        mock_db.update_item.return_value = {
-            'Attributes': {
-                'strategyId': 'strat-123',
-                'name': 'Updated Strategy',
-                'dsl': '{"rules": "test"}'
-            }
-        }
+        mock_db.versioned_update.return_value = (
+            {'strategyId': 'strat-123', 'name': 'Original'},
+            {'strategyId': 'strat-123', 'name': 'Updated Strategy', 'dsl': '{"rules": "test"}', 'version': 1}
+        )
         
         event = self._make_event('PATCH', '/v1/strategies/strat-123', 'test-user', {
             'name': 'Updated Strategy',
@@ -579,21 +578,17 @@ class TestProfessorReady:
         assert body['message'] == 'Strategy updated successfully'
         
         # Verify the update call was made
-        mock_db.update_item.assert_called_once()
+        mock_db.versioned_update.assert_called_once()
     
     @patch('app.repositories.dynamodb._get_db')
     def test_strategies_update_with_dsl_string(self, mock_get_db):
         """Test strategy update with DSL as string (should pass through)"""
         mock_db = MagicMock()
         mock_get_db.return_value = mock_db
-        mock_db.get_item.return_value = {'strategyId': 'strat-123', 'name': 'Original'}
-        mock_db.update_item.return_value = {
-            'Attributes': {
-                'strategyId': 'strat-123',
-                'name': 'Updated Strategy',
-                'dsl': '{"rules": "test"}'
-            }
-        }
+        mock_db.versioned_update.return_value = (
+            {'strategyId': 'strat-123', 'name': 'Original'},
+            {'strategyId': 'strat-123', 'name': 'Updated Strategy', 'dsl': '{"rules": "test"}', 'version': 1}
+        )
         
         event = self._make_event('PATCH', '/v1/strategies/strat-123', 'test-user', {
             'name': 'Updated Strategy',
@@ -606,4 +601,4 @@ class TestProfessorReady:
         assert body['message'] == 'Strategy updated successfully'
         
         # Verify the update call was made
-        mock_db.update_item.assert_called_once()
+        mock_db.versioned_update.assert_called_once()
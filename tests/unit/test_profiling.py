@@ -0,0 +1,83 @@
+import sys
+import os
+import json
+import time
+from unittest.mock import patch
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.main import handler
+from app.core.profiling import SamplingProfiler, sign_profile_header, header_sample_rate
+
+
+def _slow_report(event, user_id):
+    time.sleep(0.05)
+    return {'statusCode': 200, 'headers': {}, 'body': '{}'}
+
+
+def _get_report(headers=None):
+    headers = {'X-MTP-Dev-User': 'trader', **(headers or {})}
+    return handler({'httpMethod': 'GET', 'path': '/v1/reports/notes-summary', 'headers': headers}, None)
+
+
+class TestSamplingProfiler:
+    def test_collapsed_stacks_include_caller(self):
+        """Test samples are recorded as root-first collapsed stacks"""
+        def busy():
+            end = time.perf_counter() + 0.05
+            while time.perf_counter() < end:
+                pass
+
+        profiler = SamplingProfiler(interval_ms=1).start()
+        busy()
+        profiler.stop()
+
+        assert profiler.samples > 0
+        top_stack, count = profiler.collapsed().splitlines()[0].rsplit(' ', 1)
+        assert int(count) > 0
+        frames = top_stack.split(';')
+        assert frames[-1].startswith('TestSamplingProfiler.test_collapsed_stacks_include_caller.<locals>.busy')
+
+
+class TestProfilingToggle:
+    def test_env_mode_writes_folded_file(self, tmp_path, monkeypatch):
+        """Test PROFILING_MODE=on profiles route_request into PROFILING_DIR"""
+        monkeypatch.setenv('DEV_MODE', 'true')
+        monkeypatch.setenv('PROFILING_MODE', 'on')
+        monkeypatch.setenv('PROFILING_DIR', str(tmp_path))
+        monkeypatch.setenv('PROFILING_INTERVAL_MS', '1')
+        with patch('app.api.reports.get_notes_summary', _slow_report):
+            assert _get_report()['statusCode'] == 200
+
+        files = list(tmp_path.glob('GET_v1_reports_notes_summary-*.folded'))
+        assert len(files) == 1
+        assert '_slow_report' in files[0].read_text()
+
+    def test_signed_header_enables_profiling(self, tmp_path, monkeypatch, capsys):
+        """Test a valid signed header profiles the request and logs the result"""
+        monkeypatch.setenv('DEV_MODE', 'true')
+        monkeypatch.delenv('PROFILING_MODE', raising=False)
+        monkeypatch.setenv('PROFILING_SECRET', 's3cret')
+        monkeypatch.setenv('PROFILING_OUTPUT', 'log')
+        monkeypatch.setenv('PROFILING_INTERVAL_MS', '1')
+        header = sign_profile_header('s3cret', 1.0, int(time.time()) + 60)
+        with patch('app.api.reports.get_notes_summary', _slow_report):
+            _get_report({'X-MTP-Profile': header})
+
+        record = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+        assert record['profile'] == 'GET /v1/reports/notes-summary'
+        assert record['samples'] > 0
+
+    def test_invalid_or_expired_headers_are_ignored(self, monkeypatch):
+        """Test forged and expired headers do not enable profiling"""
+        monkeypatch.setenv('PROFILING_SECRET', 's3cret')
+        future = int(time.time()) + 60
+        forged = sign_profile_header('wrong', 1.0, future)
+        expired = sign_profile_header('s3cret', 1.0, int(time.time()) - 1)
+        valid = sign_profile_header('s3cret', 0.5, future)
+
+        assert header_sample_rate({'headers': {'X-MTP-Profile': forged}}) is None
+        assert header_sample_rate({'headers': {'X-MTP-Profile': expired}}) is None
+        assert header_sample_rate({'headers': {'X-MTP-Profile': 'garbage'}}) is None
+        assert header_sample_rate({'headers': {'x-mtp-profile': valid}}) == 0.5
@@ -0,0 +1,57 @@
+import sys
+import os
+from unittest.mock import patch
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.repositories.dynamodb import DynamoDBRepository
+
+
+def _seed(api):
+    api('POST', '/v1/notes', {'text': 'long text ' * 50, 'date': '2024-01-02', 'hit_miss': 'Hit',
+                              'session': 'London', 'win_amount': 120, 'direction': 'Long'})
+    api('POST', '/v1/notes', {'text': 'short', 'date': '2024-01-03', 'hit_miss': 'Miss'})
+    api('POST', '/v1/strategies', {'name': 'ORB', 'market': 'ES', 'dsl': {'rules': ['x']}})
+
+
+class TestProjection:
+    def test_repository_projects_attributes(self, repo):
+        """Test query_gsi1 returns only the projected attributes"""
+        repo.put_item(repo.create_note_item('u1', 'n1', {'date': '2024-01-02', 'text': 'x', 'session': 'London'}))
+        items = repo.query_gsi1('NOTE#u1', projection=['date', 'session'])['Items']
+        assert items == [{'date': '2024-01-02', 'session': 'London'}]
+
+    def test_list_fields_parameter(self, repo, api, monkeypatch):
+        """Test ?fields= trims list responses (ID always included) and rejects unknown fields"""
+        _seed(api)
+        for mode in ('resource', 'client'):
+            monkeypatch.setenv('DDB_CLIENT_MODE', mode)
+            with patch('app.repositories.dynamodb._get_db', return_value=DynamoDBRepository()):
+                status, body = api('GET', '/v1/notes', qs={'fields': 'date,hit_miss'})
+                assert status == 200
+                assert all(set(n) == {'noteId', 'date', 'hit_miss'} for n in body['notes'])
+                assert sorted((n['date'], n['hit_miss']) for n in body['notes']) == [
+                    ('2024-01-02', 'Hit'), ('2024-01-03', 'Miss')
+                ]
+                status, body = api('GET', '/v1/strategies', qs={'fields': 'name'})
+                assert [set(s) for s in body['strategies']] == [{'strategyId', 'name'}]
+
+        status, body = api('GET', '/v1/notes', qs={'fields': 'date,PK'})
+        assert status == 400
+        assert 'PK' in body['errors']['fields']
+
+    def test_report_reads_only_aggregated_attributes(self, repo, api, monkeypatch):
+        """Test the summary projects its four attributes and can target a narrow index"""
+        _seed(api)
+        full = api('GET', '/v1/reports/notes-summary')[1]
+        query = 'query_gsi1_wire' if repo.client_mode == 'client' else 'query_gsi1'
+        with patch.object(repo, query, wraps=getattr(repo, query)) as spy:
+            assert api('GET', '/v1/reports/notes-summary')[1] == full
+        assert spy.call_args.kwargs['projection'] == ('date', 'hit_miss', 'session', 'win_amount')
+        assert full['summary']['averageWinAmount'] == 120.0
+
+        monkeypatch.setenv('REPORT_INDEX_NAME', 'GSI1R')
+        with patch.object(repo, query, return_value={'Items': []}) as spy:
+            api('GET', '/v1/reports/notes-summary')
+        assert spy.call_args.kwargs['index_name'] == 'GSI1R'
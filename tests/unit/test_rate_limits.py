@@ -0,0 +1,73 @@
+import sys
+import os
+import json
+from unittest.mock import patch
+
+import pytest
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.services.quota_service import QuotaService, quota_service, WINDOW_SECONDS
+
+
+class _Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def limits(repo, monkeypatch):
+    monkeypatch.setattr(quota_service, '_buckets', type(quota_service._buckets)())
+    monkeypatch.setattr(quota_service, '_leases', {})
+    monkeypatch.setenv('RATE_LIMIT_MODE', 'local')
+    monkeypatch.setenv('RATE_LIMIT_RPS', '0.5')
+    monkeypatch.setenv('RATE_LIMIT_BURST', '3')
+    return monkeypatch
+
+
+class TestRateLimits:
+    def test_burst_then_429(self, limits, api):
+        """Test a user over their burst gets 429 with Retry-After while others are unaffected"""
+        assert [api.raw('GET', '/v1/strategies')['statusCode'] for _ in range(3)] == [200, 200, 200]
+        limited = api.raw('GET', '/v1/strategies')
+        assert limited['statusCode'] == 429
+        assert int(limited['headers']['Retry-After']) >= 1
+        assert json.loads(limited['body'])['message'] == 'Too many requests'
+        assert api.raw('GET', '/v1/strategies', user='other')['statusCode'] == 200
+        assert api.raw('GET', '/v1/health')['statusCode'] == 200
+
+    def test_off_by_default(self, repo, api, monkeypatch):
+        """Test no limits apply unless RATE_LIMIT_MODE is set"""
+        monkeypatch.delenv('RATE_LIMIT_MODE', raising=False)
+        monkeypatch.setenv('RATE_LIMIT_BURST', '1')
+        assert {api.raw('GET', '/v1/strategies')['statusCode'] for _ in range(5)} == {200}
+
+    def test_shared_quota_across_containers(self, repo, monkeypatch):
+        """Test the per-minute quota holds across containers sharing DynamoDB counters"""
+        monkeypatch.setenv('RATE_LIMIT_MODE', 'dynamodb')
+        monkeypatch.setenv('RATE_LIMIT_BURST', '100')
+        monkeypatch.setenv('RATE_LIMIT_PER_MINUTE', '5')
+        monkeypatch.setenv('RATE_LIMIT_LEASE', '2')
+        clock = _Clock()
+        containers = [QuotaService(clock), QuotaService(clock)]
+
+        allowed = sum(c.check('u', 'GET /v1/notes') is None for _ in range(6) for c in containers)
+        assert allowed == 5
+        window = int(clock.now // WINDOW_SECONDS)
+        counter = repo.get_item('QUOTA#u', f'WINDOW#{window}')
+        assert counter['count'] == 5 and counter['expiresAt'] > clock.now
+        assert 0 < containers[0].check('u', 'GET /v1/notes') <= WINDOW_SECONDS
+
+        clock.now += WINDOW_SECONDS
+        assert containers[1].check('u', 'GET /v1/notes') is None
+
+    def test_store_failure_fails_open(self, repo, monkeypatch):
+        """Test requests are allowed when the counter store is unavailable"""
+        monkeypatch.setenv('RATE_LIMIT_MODE', 'dynamodb')
+        service = QuotaService(_Clock())
+        with patch.object(repo, 'update_item', side_effect=RuntimeError('down')):
+            assert service.check('u', 'GET /v1/notes') is None
@@ -0,0 +1,88 @@
+import sys
+import os
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.services.rollup_service import rollup_service
+
+
+def _note(api, body):
+    status, created = api('POST', '/v1/notes', body)
+    assert status == 201
+    return created['noteId']
+
+
+def _calendar(api, **qs):
+    status, body = api('GET', '/v1/reports/calendar', qs=qs)
+    assert status == 200
+    return body
+
+
+class TestCalendar:
+    def test_buckets_follow_note_writes(self, repo, api):
+        """Test creates, updates and deletes keep day/week/month buckets current"""
+        sid = api('POST', '/v1/strategies', {'name': 'ORB'})[1]['strategyId']
+        a = _note(api, {'date': '2024-01-01', 'hit_miss': 'Hit', 'win_amount': 100, 'risk': 50,
+                        'session': 'London', 'strategyId': sid})
+        _note(api, {'date': '2024-01-01', 'hit_miss': 'Miss', 'risk': 25, 'session': 'Asia'})
+        b = _note(api, {'date': '2024-01-03', 'hit_miss': 'Hit', 'win_amount': 30.5})
+        _note(api, {'date': '2024-02-05', 'hit_miss': 'Miss'})
+
+        days = _calendar(api, granularity='day', **{'from': '2024-01-01', 'to': '2024-01-31'})
+        assert [(d['period'], d['notes'], d['hits'], d['misses']) for d in days['buckets']] == [
+            ('2024-01-01', 2, 1, 1), ('2024-01-03', 1, 1, 0)
+        ]
+        first = days['buckets'][0]
+        assert (first['winSum'], first['riskSum'], first['averageRisk']) == (100.0, 75.0, 37.5)
+        assert first['bySession'] == {'London': 1, 'Asia': 1}
+        assert days['byWeekday'] == {
+            'Mon': {'notes': 2, 'hits': 1, 'misses': 1, 'winSum': 100.0},
+            'Wed': {'notes': 1, 'hits': 1, 'misses': 0, 'winSum': 30.5},
+        }
+
+        api('PATCH', f'/v1/notes/{b}', {'date': '2024-02-06', 'strategyId': sid})
+        api('DELETE', f'/v1/notes/{a}')
+
+        months = _calendar(api, granularity='month')
+        assert [(m['period'], m['notes'], m['hits']) for m in months['buckets']] == [
+            ('2024-01', 1, 0), ('2024-02', 2, 1)
+        ]
+        weeks = _calendar(api, granularity='week', strategyId=sid)
+        assert weeks['strategyId'] == sid
+        assert [(w['period'], w['notes'], w['winSum']) for w in weeks['buckets']] == [('2024-W06', 1, 30.5)]
+        assert 'byWeekday' not in weeks
+
+    def test_rebuild_matches_incremental_buckets(self, repo, api):
+        """Test rebuild() recomputes the same buckets and drops stale ones"""
+        for i in range(5):
+            _note(api, {'date': f'2024-03-0{i + 1}', 'hit_miss': 'Hit' if i % 2 else 'Miss', 'win_amount': i})
+        before = _calendar(api, granularity='day')
+        repo.put_item({'PK': 'USER#trader', 'SK': 'ROLLUP#ALL#D#2023-12-31', 'notes': 4})
+
+        assert rollup_service.rebuild('trader') == 5 + 2 + 1  # days, ISO weeks 9 and 10, one month
+        assert _calendar(api, granularity='day') == before
+        assert repo.get_item('USER#trader', 'ROLLUP#ALL#D#2023-12-31') is None
+
+    def test_reads_one_item_per_bucket(self, repo, api):
+        """Test the calendar reads buckets, not notes"""
+        for _ in range(30):
+            _note(api, {'date': '2024-04-01', 'hit_miss': 'Hit'})
+        calls = []
+        original = repo.query_pk
+
+        def spy(*args, **kwargs):
+            resp = original(*args, **kwargs)
+            calls.append(len(resp['Items']))
+            return resp
+
+        repo.query_pk = spy
+        assert _calendar(api, granularity='month')['buckets'][0]['notes'] == 30
+        assert calls == [1]
+
+    def test_invalid_query(self, repo, api):
+        """Test bad granularities and ranges are rejected"""
+        assert api('GET', '/v1/reports/calendar', qs={'granularity': 'hour'})[0] == 400
+        status, body = api('GET', '/v1/reports/calendar', qs={'from': '2024-02-01', 'to': '2024-01-01'})
+        assert status == 400
+        assert 'from' in body['errors']
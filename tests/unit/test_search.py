@@ -0,0 +1,63 @@
+import sys
+import os
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.core.text import tokenize, term_positions
+
+
+def _search(api, q):
+    status, body = api('GET', '/v1/notes/search', qs={'q': q})
+    assert status == 200
+    return [r['noteId'] for r in body['results']]
+
+
+class TestTokenizer:
+    def test_tokenize_lowercases_and_drops_stopwords(self):
+        """Test tokenizer normalizes case and removes stopwords"""
+        assert tokenize('Faded the OPEN on ES, took 2R') == ['faded', 'open', 'es', 'took', '2r']
+
+    def test_term_positions(self):
+        """Test positions are recorded per term"""
+        assert term_positions(['gap', 'fill', 'gap']) == {'gap': [0, 2], 'fill': [1]}
+
+
+class TestSearch:
+    def test_search_ranks_by_relevance(self, repo, api):
+        """Test BM25 ranks the note mentioning the term most often first"""
+        _, a = api('POST', '/v1/notes', {'text': 'gap fill gap fill gap on NQ'})
+        _, b = api('POST', '/v1/notes', {'text': 'opening range breakout, small gap'})
+        api('POST', '/v1/notes', {'text': 'choppy day, no trades'})
+
+        assert _search(api, 'gap') == [a['noteId'], b['noteId']]
+        assert _search(api, 'breakout') == [b['noteId']]
+        assert _search(api, 'nonexistent') == []
+
+    def test_search_phrase_requires_adjacent_terms(self, repo, api):
+        """Test quoted phrases match consecutive terms only"""
+        _, a = api('POST', '/v1/notes', {'text': 'range breakout failed'})
+        api('POST', '/v1/notes', {'text': 'breakout above the range'})
+
+        assert _search(api, '"range breakout"') == [a['noteId']]
+
+    def test_index_follows_updates_and_deletes(self, repo, api):
+        """Test the index is maintained on note update and delete"""
+        _, created = api('POST', '/v1/notes', {'text': 'scalped the london open'})
+        note_id = created['noteId']
+        assert _search(api, 'london') == [note_id]
+
+        api('PATCH', f'/v1/notes/{note_id}', {'text': 'swing trade into new york close'})
+        assert _search(api, 'london') == []
+        assert _search(api, 'york') == [note_id]
+
+        api('DELETE', f'/v1/notes/{note_id}')
+        assert _search(api, 'york') == []
+        stats = repo.get_item('SEARCH#trader', 'STATS')
+        assert stats['docCount'] == 0
+        assert stats['totalLength'] == 0
+
+    def test_search_requires_query(self, repo, api):
+        """Test missing q returns 400"""
+        status, body = api('GET', '/v1/notes/search')
+        assert status == 400
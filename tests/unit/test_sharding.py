@@ -0,0 +1,116 @@
+import sys
+import os
+import json
+
+import pytest
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.repositories import sharding
+from app.repositories.sharding import migrate_note_partitions, note_gsi1pk, read_partitions
+
+
+def _create_notes(api, count):
+    for i in range(count):
+        status, _ = api('POST', '/v1/notes', {'date': f'2024-01-{i % 28 + 1:02d}', 'text': f'n{i}',
+                                              'hit_miss': 'Hit' if i % 3 else 'Miss'})
+        assert status == 201
+
+
+@pytest.fixture
+def sharded(repo, monkeypatch):
+    monkeypatch.setenv('NOTE_GSI1_SHARDS', '4')
+    return repo
+
+
+class TestShardedNotes:
+    def test_keys(self, monkeypatch):
+        """Test shard keys are stable and only note partitions fan out"""
+        monkeypatch.setenv('NOTE_GSI1_SHARDS', '4')
+        assert note_gsi1pk('u', 'abc') == note_gsi1pk('u', 'abc')
+        assert note_gsi1pk('u', 'abc', shards=1) == 'NOTE#u'
+        assert read_partitions('NOTE#u') == ['NOTE#u#0', 'NOTE#u#1', 'NOTE#u#2', 'NOTE#u#3', 'NOTE#u']
+        assert read_partitions('STRAT#u') == ['STRAT#u']
+        monkeypatch.setenv('NOTE_GSI1_LEGACY_READS', 'false')
+        assert len(read_partitions('NOTE#u')) == 4
+
+    def test_cursor_pages_through_every_shard(self):
+        """Test merged pages come out newest first with each item exactly once"""
+        # In-memory partitions with DynamoDB's descending Limit/ExclusiveStartKey semantics
+        # (moto's descending queries page from the wrong end)
+        partitions = {
+            f'NOTE#u#{s}': sorted((f'2024-01-{d:02d}#{s}' for d in range(1, 29) if d % 4 == s), reverse=True)
+            for s in range(4)
+        }
+        partitions['NOTE#u'] = ['2024-01-30#legacy', '2024-01-02#legacy']
+
+        def query(partition, start, limit):
+            keys = partitions[partition]
+            offset = keys.index(start['GSI1SK']) + 1 if start else 0
+            page = keys[offset:offset + limit]
+            resp = {'Items': [{'GSI1SK': k, 'GSI1PK': partition} for k in page]}
+            if offset + limit < len(keys):
+                resp['LastEvaluatedKey'] = {'GSI1SK': page[-1], 'GSI1PK': partition}
+            return resp
+
+        seen, last_key = [], None
+        while True:
+            starts = sharding.start_keys(list(partitions), last_key)
+            pages = {p: query(p, start, 5) for p, start in starts.items()}
+            result = sharding.merge_pages(pages, starts, 5, lambda it: it['GSI1SK'],
+                                          lambda it: {k: it[k] for k in ('GSI1SK', 'GSI1PK')})
+            assert len(result['Items']) <= 5
+            seen.extend(it['GSI1SK'] for it in result['Items'])
+            last_key = json.loads(json.dumps(result.get('LastEvaluatedKey')))
+            if not last_key:
+                break
+        expected = sorted((k for keys in partitions.values() for k in keys), reverse=True)
+        assert seen == expected
+
+    def test_sharded_listing(self, sharded, api):
+        """Test notes land in several shards and list and project from all of them"""
+        _create_notes(api, 23)
+        shards = {it['GSI1PK'] for it in sharded.iter_pk('USER#trader', 'NOTE#')}
+        assert len(shards) > 1 and all(s.startswith('NOTE#trader#') for s in shards)
+
+        notes = api('GET', '/v1/notes', qs={'limit': '100'})[1]['notes']
+        keys = [(n['date'], n['noteId']) for n in notes]
+        assert len(keys) == 23 and keys == sorted(keys, reverse=True)
+        projected = api('GET', '/v1/notes', qs={'limit': '100', 'fields': 'date'})[1]['notes']
+        assert projected == [{'noteId': n['noteId'], 'date': n['date']} for n in notes]
+
+    def test_reports_and_updates_cover_all_shards(self, sharded, api):
+        """Test summaries, strategy stats and updates see notes in every shard"""
+        _create_notes(api, 12)
+        summary = api('GET', '/v1/reports/notes-summary', qs={'limit': '100'})[1]['summary']
+        assert summary['totalNotes'] == 12
+        assert summary['byHitMiss'] == {'Hit': 8, 'Miss': 4}
+
+        note = api('GET', '/v1/notes', qs={'limit': '1'})[1]['notes'][0]
+        gsi1pk = sharded.get_item('USER#trader', f"NOTE#{note['noteId']}")['GSI1PK']
+        api('PATCH', f"/v1/notes/{note['noteId']}", {'date': '2025-06-01'})
+        assert sharded.get_item('USER#trader', f"NOTE#{note['noteId']}")['GSI1PK'] == gsi1pk
+
+    def test_migration_moves_legacy_notes(self, repo, api, monkeypatch):
+        """Test legacy notes stay readable during migration and are moved by it"""
+        _create_notes(api, 9)  # unsharded
+        before = api('GET', '/v1/notes', qs={'limit': '100'})[1]['notes']
+
+        monkeypatch.setenv('NOTE_GSI1_SHARDS', '3')
+        _create_notes(api, 3)  # sharded
+        assert len(api('GET', '/v1/notes', qs={'limit': '100'})[1]['notes']) == 12
+
+        notes = list(repo.iter_pk('USER#trader', 'NOTE#'))
+        assert migrate_note_partitions(repo, notes, 3, dry_run=True) == {'scanned': 12, 'moved': 9, 'gone': 0}
+        assert migrate_note_partitions(repo, notes, 3) == {'scanned': 12, 'moved': 9, 'gone': 0}
+        assert migrate_note_partitions(repo, repo.iter_scan(entity_type='NOTE'), 3)['moved'] == 0
+
+        monkeypatch.setenv('NOTE_GSI1_LEGACY_READS', 'false')
+        after = api('GET', '/v1/notes', qs={'limit': '100'})[1]['notes']
+        assert len(after) == 12
+        assert {n['noteId'] for n in before} <= {n['noteId'] for n in after}
+
+        stale = next(n for n in notes if n['GSI1PK'] == 'NOTE#trader')  # as read before migrating
+        repo.delete_item('USER#trader', stale['SK'])
+        assert migrate_note_partitions(repo, [stale], 3) == {'scanned': 1, 'moved': 0, 'gone': 1}
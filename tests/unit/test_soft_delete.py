@@ -0,0 +1,66 @@
+import sys
+import os
+import time
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.repositories.sharding import migrate_note_partitions
+
+
+def _note_ids(api):
+    return [n['noteId'] for n in api('GET', '/v1/notes')[1]['notes']]
+
+
+class TestSoftDelete:
+    def test_note_tombstone_and_restore(self, repo, api):
+        """Test a deleted note leaves listings, reports and search but stays restorable"""
+        note = {'text': 'vwap reclaim', 'hit_miss': 'Hit', 'date': '2024-03-04'}
+        note_id = api('POST', '/v1/notes', note)[1]['noteId']
+        keep = api('POST', '/v1/notes', {'text': 'other', 'hit_miss': 'Miss', 'date': '2024-03-05'})[1]['noteId']
+
+        assert api('DELETE', f'/v1/notes/{note_id}')[0] == 200
+        tombstone = repo.get_item('USER#trader', f'NOTE#{note_id}')
+        assert tombstone['text'] == 'vwap reclaim' and tombstone['deletedAt']
+        assert 'GSI1PK' not in tombstone and 'GSI1SK' not in tombstone
+        assert 29 * 86400 < int(tombstone['expiresAt']) - time.time() <= 30 * 86400
+
+        assert _note_ids(api) == [keep]
+        assert api('GET', f'/v1/notes/{note_id}')[0] == 404
+        assert api('PATCH', f'/v1/notes/{note_id}', {'text': 'x'})[0] == 404
+        assert api('DELETE', f'/v1/notes/{note_id}')[0] == 404
+        assert api('GET', '/v1/reports/notes-summary')[1]['summary']['totalNotes'] == 1
+        assert api('GET', '/v1/notes/search', qs={'q': 'vwap'})[1]['results'] == []
+        assert repo.get_item('USER#trader', 'ROLLUP#ALL#M#2024-03')['notes'] == 1
+
+        status, body = api('POST', f'/v1/notes/{note_id}/restore')
+        assert status == 200 and body['note']['text'] == 'vwap reclaim'
+        assert set(_note_ids(api)) == {note_id, keep}
+        restored = repo.get_item('USER#trader', f'NOTE#{note_id}')
+        assert 'deletedAt' not in restored and 'expiresAt' not in restored
+        assert restored['GSI1SK'] == f'2024-03-04#{note_id}'
+        assert [r['noteId'] for r in api('GET', '/v1/notes/search', qs={'q': 'vwap'})[1]['results']] == [note_id]
+        assert repo.get_item('USER#trader', 'ROLLUP#ALL#M#2024-03')['notes'] == 2
+        assert api('POST', f'/v1/notes/{note_id}/restore')[0] == 404
+        assert api('GET', f'/v1/notes/{note_id}/restore')[0] == 405
+
+    def test_strategy_tombstone_and_restore(self, repo, api, monkeypatch):
+        """Test strategies soft-delete and restore with their original listing position"""
+        monkeypatch.setenv('DELETED_RETENTION_DAYS', '1')
+        ids = [api('POST', '/v1/strategies', {'name': name})[1]['strategyId'] for name in ('A', 'B')]
+        assert api('DELETE', f'/v1/strategies/{ids[0]}')[0] == 200
+        assert int(repo.get_item('USER#trader', f'STRAT#{ids[0]}')['expiresAt']) - time.time() <= 86400
+        assert [s['strategyId'] for s in api('GET', '/v1/strategies')[1]['strategies']] == [ids[1]]
+        assert api('PUT', f'/v1/strategies/{ids[0]}', {'name': 'C'})[0] == 404
+
+        assert api('POST', f'/v1/strategies/{ids[0]}/restore')[1]['strategy']['name'] == 'A'
+        listed = api('GET', '/v1/strategies')[1]['strategies']
+        assert sorted(s['strategyId'] for s in listed) == sorted(ids)
+
+    def test_shard_migration_skips_tombstones(self, repo, api):
+        """Test moving notes between GSI1 shards never re-indexes a tombstone"""
+        note_id = api('POST', '/v1/notes', {'text': 'gone'})[1]['noteId']
+        api('DELETE', f'/v1/notes/{note_id}')
+        notes = list(repo.iter_pk('USER#trader', 'NOTE#'))
+        assert migrate_note_partitions(repo, notes, 4) == {'scanned': 1, 'moved': 0, 'gone': 1}
+        assert 'GSI1PK' not in repo.get_item('USER#trader', f'NOTE#{note_id}')
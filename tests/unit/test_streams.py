@@ -0,0 +1,201 @@
+import sys
+import os
+import itertools
+
+import pytest
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.main import stream_handler
+from app.services.maintenance_service import MaintenanceRunner, RebuildViewsJob
+from app.services.search_service import search_service
+from app.services.stream_service import stream_record, stream_service
+
+
+class _Stream:
+    """Records the table changes made through the API, as a stream would."""
+
+    def __init__(self, repo, api):
+        self.repo = repo
+        self.api = api
+        self.seq = itertools.count(100)
+        self.records = []
+
+    def _image(self, sk):
+        return self.repo.get_item('USER#trader', sk)
+
+    def create(self, kind, body):
+        status, created = self.api('POST', f'/v1/{kind}', body)
+        assert status == 201
+        entity_id = created['noteId'] if kind == 'notes' else created['strategyId']
+        sk = ('NOTE#' if kind == 'notes' else 'STRAT#') + entity_id
+        self.records.append(stream_record('INSERT', None, self._image(sk), next(self.seq)))
+        return entity_id
+
+    def update_note(self, note_id, body):
+        old = self._image(f'NOTE#{note_id}')
+        assert self.api('PATCH', f'/v1/notes/{note_id}', body)[0] == 200
+        self.records.append(stream_record('MODIFY', old, self._image(f'NOTE#{note_id}'), next(self.seq)))
+
+    def delete_note(self, note_id):
+        # A soft delete: the note becomes a tombstone
+        old = self._image(f'NOTE#{note_id}')
+        assert self.api('DELETE', f'/v1/notes/{note_id}')[0] == 200
+        self.records.append(stream_record('MODIFY', old, self._image(f'NOTE#{note_id}'), next(self.seq)))
+
+    def restore_note(self, note_id):
+        old = self._image(f'NOTE#{note_id}')
+        assert self.api('POST', f'/v1/notes/{note_id}/restore')[0] == 200
+        self.records.append(stream_record('MODIFY', old, self._image(f'NOTE#{note_id}'), next(self.seq)))
+
+    def purge_note(self, note_id):
+        # What DynamoDB TTL does once the tombstone expires
+        old = self._image(f'NOTE#{note_id}')
+        self.repo.delete_item('USER#trader', f'NOTE#{note_id}')
+        self.records.append(stream_record('REMOVE', old, None, next(self.seq)))
+
+    def flush(self):
+        records, self.records = self.records, []
+        return stream_handler({'Records': records}, None)
+
+
+@pytest.fixture
+def stream(repo, api, monkeypatch):
+    monkeypatch.setenv('DERIVED_VIEWS_MODE', 'stream')
+    return _Stream(repo, api)
+
+
+def _inline(api, monkeypatch, path):
+    monkeypatch.setenv('DERIVED_VIEWS_MODE', 'inline')
+    try:
+        return api('GET', path)[1]
+    finally:
+        monkeypatch.setenv('DERIVED_VIEWS_MODE', 'stream')
+
+
+class TestDerivedViews:
+    def test_views_match_the_inline_computation(self, stream, api, monkeypatch):
+        """Test INSERT/MODIFY/REMOVE keep the summary and strategy stats equal to recomputing them"""
+        sid = stream.create('strategies', {'name': 'ORB'})
+        other = stream.create('strategies', {'name': 'Fade'})
+        a = stream.create('notes', {'text': 'opening drive vwap', 'session': 'London', 'hit_miss': 'Hit',
+                                    'win_amount': 120.5, 'strategyId': sid})
+        b = stream.create('notes', {'text': 'chopped out', 'session': 'Asia', 'hit_miss': 'Miss',
+                                    'strategyId': sid})
+        stream.create('notes', {'text': 'no setup', 'session': 'London'})
+        assert stream.flush() == {'batchItemFailures': []}
+
+        stream.update_note(b, {'hit_miss': 'Hit', 'win_amount': 40, 'strategyId': other})
+        stream.delete_note(a)
+        assert stream.flush() == {'batchItemFailures': []}
+
+        for path in ('/v1/reports/notes-summary', '/v1/reports/strategy-stats'):
+            assert api('GET', path)[1] == _inline(api, monkeypatch, path)
+        stats = api('GET', '/v1/reports/strategy-stats')[1]['strategies']
+        assert stats == [{'strategyId': other, 'notes': 1, 'hits': 1, 'misses': 0, 'averageWinAmount': 40.0}]
+        calendar = api('GET', '/v1/reports/calendar', qs={'granularity': 'month'})[1]
+        assert sum(bucket['notes'] for bucket in calendar['buckets']) == 2
+
+    def test_soft_delete_restore_and_purge(self, stream, api):
+        """Test tombstoning subtracts from the views, restoring adds back and the TTL purge changes nothing"""
+        note_id = stream.create('notes', {'text': 'vwap reclaim', 'hit_miss': 'Hit', 'date': '2024-03-04'})
+        stream.create('notes', {'text': 'other', 'hit_miss': 'Miss', 'date': '2024-03-05'})
+        stream.delete_note(note_id)
+        stream.flush()
+        summary = api('GET', '/v1/reports/notes-summary')[1]['summary']
+        assert summary['totalNotes'] == 1 and summary['byHitMiss'] == {'Miss': 1}
+        assert api('GET', '/v1/notes/search', qs={'q': 'vwap'})[1]['results'] == []
+
+        stream.restore_note(note_id)
+        stream.flush()
+        assert api('GET', '/v1/reports/notes-summary')[1]['summary']['totalNotes'] == 2
+        assert len(api('GET', '/v1/notes/search', qs={'q': 'vwap'})[1]['results']) == 1
+
+        stream.delete_note(note_id)
+        stream.purge_note(note_id)
+        stream.flush()
+        assert api('GET', '/v1/reports/notes-summary')[1]['summary']['totalNotes'] == 1
+        calendar = api('GET', '/v1/reports/calendar', qs={'granularity': 'month'})[1]
+        assert [b['notes'] for b in calendar['buckets']] == [1]
+        assert stream.repo.get_item('SEARCH#trader', 'STATS')['docCount'] == 1
+
+    def test_search_index_is_maintained_by_the_consumer(self, stream, api, monkeypatch):
+        """Test writes skip inline indexing and the consumer indexes them, planning each change once"""
+        note_id = stream.create('notes', {'text': 'faded the vwap retest'})
+        assert api('GET', '/v1/notes/search', qs={'q': 'vwap'})[1]['results'] == []
+        plans = []
+        original = search_service.plan_index
+        monkeypatch.setattr(search_service, 'plan_index', lambda *args: plans.append(args) or original(*args))
+        stream.flush()
+        assert len(plans) == 1
+        assert [r['noteId'] for r in api('GET', '/v1/notes/search', qs={'q': 'vwap'})[1]['results']] == [note_id]
+
+        stream.update_note(note_id, {'text': 'faded the open'})
+        stream.flush()
+        assert api('GET', '/v1/notes/search', qs={'q': 'vwap'})[1]['results'] == []
+        assert stream.repo.get_item('SEARCH#trader', 'STATS')['docCount'] == 1
+
+    def test_replay_is_idempotent(self, stream, api, monkeypatch):
+        """Test redelivered and replayed records are applied once"""
+        stream.create('notes', {'text': 'one', 'hit_miss': 'Hit'})
+        stream.create('notes', {'text': 'two', 'hit_miss': 'Miss'})
+        records = list(stream.records)
+        stream.flush()
+        before = api('GET', '/v1/reports/notes-summary')[1]
+
+        assert stream_handler({'Records': records}, None) == {'batchItemFailures': []}
+        assert stream_service.replay(records + records, batch_size=1) == {'records': 4, 'batches': 4, 'failed': 0}
+        assert api('GET', '/v1/reports/notes-summary')[1] == before
+        assert before['summary']['totalNotes'] == 2
+        assert stream.repo.get_item('SEARCH#trader', 'STATS')['docCount'] == 2
+
+    def test_partial_failure_reports_the_rest_of_the_batch(self, stream, api, monkeypatch):
+        """Test the first failed record and everything after it are reported for retry"""
+        for text in ('a', 'b', 'c'):
+            stream.create('notes', {'text': text})
+        records = list(stream.records)
+        original = stream_service.apply
+        calls = []
+
+        def flaky(change):
+            calls.append(change.sequence_number)
+            if len(calls) == 2:
+                raise RuntimeError('throttled')
+            return original(change)
+
+        monkeypatch.setattr(stream_service, 'apply', flaky)
+        result = stream_handler({'Records': records}, None)
+        assert result == {'batchItemFailures': [
+            {'itemIdentifier': r['dynamodb']['SequenceNumber']} for r in records[1:]
+        ]}
+
+        # The retry (from the failed record) completes the views
+        monkeypatch.setattr(stream_service, 'apply', original)
+        assert stream_handler({'Records': records[1:]}, None) == {'batchItemFailures': []}
+        assert api('GET', '/v1/reports/notes-summary')[1]['summary']['totalNotes'] == 3
+
+    def test_rebuild_views_backfills_before_the_switch(self, stream, api, monkeypatch):
+        """Test rebuild-views backfills the views of inline-mode data and the consumer adds to them"""
+        monkeypatch.setenv('DERIVED_VIEWS_MODE', 'inline')
+        sid = api('POST', '/v1/strategies', {'name': 'ORB'})[1]['strategyId']
+        for body in ({'text': 'vwap hold', 'hit_miss': 'Hit', 'win_amount': 50, 'strategyId': sid},
+                     {'text': 'late entry', 'hit_miss': 'Miss', 'session': 'Asia', 'strategyId': sid},
+                     {'text': 'skipped'}):
+            assert api('POST', '/v1/notes', body)[0] == 201
+        stream.repo.put_item({'PK': 'USER#trader', 'SK': 'VIEW#STRAT#gone', 'notes': 3})
+        stream.repo.delete_item('SEARCH#trader', 'STATS')
+
+        result = MaintenanceRunner(RebuildViewsJob(), segments=2).run()
+        assert result['counts']['rebuilt'] == 1
+        monkeypatch.setenv('DERIVED_VIEWS_MODE', 'stream')
+        for path in ('/v1/reports/notes-summary', '/v1/reports/strategy-stats'):
+            assert api('GET', path)[1] == _inline(api, monkeypatch, path)
+        assert stream.repo.get_item('USER#trader', 'VIEW#SUMMARY')['strategyCount'] == 1
+        assert stream.repo.get_item('SEARCH#trader', 'STATS')['docCount'] == 3
+
+        stream.create('notes', {'text': 'after the switch', 'hit_miss': 'Hit', 'strategyId': sid})
+        stream.flush()
+        for path in ('/v1/reports/notes-summary', '/v1/reports/strategy-stats'):
+            assert api('GET', path)[1] == _inline(api, monkeypatch, path)
+        assert api('GET', '/v1/reports/notes-summary')[1]['summary']['totalNotes'] == 4
@@ -0,0 +1,85 @@
+import sys
+import os
+import json
+import uuid
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.main import handler
+from app.core.tracing import span, start_trace, traced, trace_exporter, NOOP_SPAN
+
+
+def _spans(tmp_path, request_id):
+    with open(tmp_path / f'{uuid.UUID(request_id).hex}.json') as f:
+        doc = json.load(f)
+    return doc['resourceSpans'][0]['scopeSpans'][0]['spans']
+
+
+class TestTracing:
+    def test_request_spans_are_nested_and_exported(self, repo, tmp_path, monkeypatch):
+        """Test a traced request exports auth, service, DynamoDB and serialization spans"""
+        monkeypatch.setenv('TRACING_MODE', 'otlp')
+        monkeypatch.setenv('TRACE_EXPORT_DIR', str(tmp_path))
+        request_id = str(uuid.uuid4())
+        handler({
+            'httpMethod': 'POST', 'path': '/v1/notes', 'headers': {'X-MTP-Dev-User': 'trader'},
+            'requestContext': {'requestId': request_id}, 'body': json.dumps({'text': 'faded the open'})
+        }, None)
+
+        spans = _spans(tmp_path, request_id)
+        by_name = {s['name']: s for s in spans}
+        root = by_name['route_request']
+        assert 'parentSpanId' not in root
+        assert {'key': 'aws.request_id', 'value': {'stringValue': request_id}} in root['attributes']
+        assert by_name['auth']['parentSpanId'] == root['spanId']
+        assert by_name['handler']['parentSpanId'] == root['spanId']
+        assert by_name['NoteService.create_note']['parentSpanId'] == by_name['handler']['spanId']
+        assert by_name['dynamodb.PutItem']['parentSpanId'] == by_name['NoteService.create_note']['spanId']
+        assert 'serialize' in by_name
+        assert all(s['traceId'] == uuid.UUID(request_id).hex for s in spans)
+        for s in spans:
+            assert int(s['startTimeUnixNano']) <= int(s['endTimeUnixNano'])
+            assert int(root['startTimeUnixNano']) <= int(s['startTimeUnixNano'])
+
+    def test_errors_mark_span_status(self, tmp_path, monkeypatch):
+        """Test an exception inside a span sets an error status"""
+        monkeypatch.setenv('TRACING_MODE', 'otlp')
+        monkeypatch.setenv('TRACE_EXPORT_DIR', str(tmp_path))
+        request_id = str(uuid.uuid4())
+
+        @traced('failing')
+        def fail():
+            raise RuntimeError('boom')
+
+        with start_trace(request_id, 'root'):
+            try:
+                fail()
+            except RuntimeError:
+                pass
+
+        failing = [s for s in _spans(tmp_path, request_id) if s['name'] == 'failing'][0]
+        assert failing['status'] == {'code': 2, 'message': 'RuntimeError: boom'}
+
+    def test_tracing_off_is_noop(self, monkeypatch):
+        """Test spans are no-ops when tracing is disabled"""
+        monkeypatch.delenv('TRACING_MODE', raising=False)
+        with start_trace('req', 'root') as root:
+            assert root is NOOP_SPAN
+            assert span('child') is NOOP_SPAN
+
+    def test_export_finishes_before_the_response(self, repo, tmp_path, monkeypatch):
+        """Test the trace is exported before the handler returns, and a failed export does not fail the request"""
+        monkeypatch.setenv('TRACING_MODE', 'otlp')
+        monkeypatch.setenv('TRACE_EXPORT_DIR', str(tmp_path / 'missing'))
+        event = {'httpMethod': 'GET', 'path': '/v1/notes', 'headers': {'X-MTP-Dev-User': 'trader'}}
+
+        request_id = str(uuid.uuid4())
+        assert handler(dict(event, requestContext={'requestId': request_id}), None)['statusCode'] == 200
+        assert (tmp_path / 'missing' / f'{uuid.UUID(request_id).hex}.json').exists()
+
+        monkeypatch.setenv('TRACE_EXPORT_URL', 'http://127.0.0.1:9/v1/traces')
+        monkeypatch.setenv('TRACE_EXPORT_TIMEOUT_MS', '200')
+        failed = trace_exporter.failed
+        assert handler(event, None)['statusCode'] == 200
+        assert trace_exporter.failed == failed + 1
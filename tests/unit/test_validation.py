@@ -0,0 +1,126 @@
+import sys
+import os
+import json
+from decimal import Decimal
+from unittest.mock import patch, MagicMock
+import pytest
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.main import handler
+from app.models.validation import validate_note, validate_strategy, compile_schema, ValidationError
+
+
+class TestNoteValidation:
+    def test_coerces_numbers_to_decimal(self):
+        """Test floats, ints and numeric strings become Decimal"""
+        cleaned = validate_note({'risk': 0.1, 'win_amount': '150.5'})
+        assert cleaned == {'risk': Decimal('0.1'), 'win_amount': Decimal('150.5')}
+        assert validate_note({'risk': 100})['risk'] == Decimal(100)
+
+    def test_normalizes_enums(self):
+        """Test enum values match case-insensitively and are stored canonically"""
+        cleaned = validate_note({'direction': 'LONG', 'session': 'new york', 'hit_miss': 'hit'})
+        assert cleaned == {'direction': 'Long', 'session': 'New York', 'hit_miss': 'Hit'}
+
+    def test_accepts_dates_and_datetimes(self):
+        """Test plain dates and ISO datetimes are accepted"""
+        assert validate_note({'date': '2025-01-01'})['date'] == '2025-01-01'
+        assert validate_note({'date': '2025-01-01T09:30:00Z'})['date'] == '2025-01-01T09:30:00Z'
+
+    def test_drops_empty_values(self):
+        """Test None and empty strings are treated as not provided"""
+        assert validate_note({'text': '', 'direction': None}) == {}
+
+    def test_collects_all_errors(self):
+        """Test every invalid field is reported at once"""
+        with pytest.raises(ValidationError) as exc:
+            validate_note({
+                'date': '2025-02-30', 'direction': 'Up', 'risk': True,
+                'win_amount': 'lots', 'text': 5, 'tags': ['x']
+            })
+        assert set(exc.value.errors) == {'date', 'direction', 'risk', 'win_amount', 'text', 'tags'}
+        assert exc.value.errors['tags'] == 'unknown field'
+
+    def test_rejects_non_finite_numbers(self):
+        """Test NaN/Infinity are rejected"""
+        with pytest.raises(ValidationError):
+            validate_note({'risk': 'NaN'})
+
+    def test_rejects_non_object_payload(self):
+        """Test a non-dict body is rejected"""
+        with pytest.raises(ValidationError):
+            validate_note(['not', 'an', 'object'])
+
+    def test_validators_are_cached(self):
+        """Test schemas are compiled once"""
+        assert compile_schema('note') is compile_schema('note')
+
+
+class TestStrategyValidation:
+    def test_name_required_on_create_only(self):
+        """Test name is required for create but not for partial updates"""
+        with pytest.raises(ValidationError) as exc:
+            validate_strategy({'market': 'ES'})
+        assert exc.value.errors == {'name': 'is required'}
+        assert validate_strategy({'market': 'ES'}, partial=True) == {'market': 'ES'}
+
+    def test_dsl_string_becomes_map_with_decimals(self):
+        """Test DSL JSON strings are parsed and floats made DynamoDB-safe"""
+        cleaned = validate_strategy({'name': 'ORB', 'dsl': '{"stop": 1.5, "rules": ["a"]}'})
+        assert cleaned['dsl'] == {'stop': Decimal('1.5'), 'rules': ['a']}
+
+    def test_dsl_must_be_object(self):
+        """Test non-object DSL values are rejected"""
+        with pytest.raises(ValidationError):
+            validate_strategy({'name': 'ORB', 'dsl': '[1, 2]'})
+
+
+class TestValidationEndpoints:
+    def setup_method(self, method=None):
+        os.environ['DEV_MODE'] = 'true'
+
+    def teardown_method(self, method=None):
+        os.environ.pop('DEV_MODE', None)
+
+    def _event(self, method, path, body):
+        return {
+            'httpMethod': method,
+            'path': path,
+            'headers': {'X-MTP-Dev-User': 'test-user'},
+            'body': json.dumps(body)
+        }
+
+    @patch('app.repositories.dynamodb._get_db')
+    def test_invalid_create_never_reaches_dynamodb(self, mock_get_db):
+        """Test bad payloads return 400 without any DynamoDB call"""
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+
+        result = handler(self._event('POST', '/v1/notes', {'direction': 'sideways'}), None)
+        assert result['statusCode'] == 400
+        assert json.loads(result['body'])['errors'] == {'direction': 'must be one of: Long, Short'}
+        assert mock_db.method_calls == []
+
+    @patch('app.repositories.dynamodb._get_db')
+    def test_invalid_update_returns_400(self, mock_get_db):
+        """Test bad update payloads return 400 before the existence check"""
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+
+        result = handler(self._event('PATCH', '/v1/strategies/strat-1', {'dsl': 'nope'}), None)
+        assert result['statusCode'] == 400
+        mock_db.get_item.assert_not_called()
+
+    @patch('app.repositories.dynamodb._get_db')
+    def test_valid_create_passes_decimals(self, mock_get_db):
+        """Test the repository receives Decimal numerics"""
+        mock_db = MagicMock()
+        mock_get_db.return_value = mock_db
+        mock_db.create_note_item.return_value = {}
+
+        result = handler(self._event('POST', '/v1/notes', {'risk': 12.5, 'hit_miss': 'Miss'}), None)
+        assert result['statusCode'] == 201
+        data = mock_db.create_note_item.call_args[0][2]
+        assert data == {'risk': Decimal('12.5'), 'hit_miss': 'Miss'}
@@ -0,0 +1,75 @@
+import sys
+import os
+import json
+
+import pytest
+
+# Add src to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
+
+from app.models.validation import ValidationError, parse_if_match
+
+
+class TestOptimisticConcurrency:
+    def test_note_if_match(self, repo, api):
+        """Test a stale If-Match gets 409 while the current version updates and bumps it"""
+        note_id = api('POST', '/v1/notes', {'text': 'orb', 'date': '2024-03-04'})[1]['noteId']
+        result = api.raw('GET', f'/v1/notes/{note_id}')
+        assert json.loads(result['body'])['note']['version'] == 1 and result['headers']['ETag'] == '"1"'
+
+        # Web and mobile both loaded version 1; the first write wins
+        result = api.raw('PATCH', f'/v1/notes/{note_id}', {'text': 'from web'}, headers={'If-Match': '"1"'})
+        assert result['statusCode'] == 200 and result['headers']['ETag'] == '"2"'
+        assert json.loads(result['body'])['note']['version'] == 2
+        status, body = api('PATCH', f'/v1/notes/{note_id}', {'text': 'from mobile'}, headers={'If-Match': '"1"'})
+        assert status == 409
+        assert body['errors'] == {'If-Match': 'note is at version 2'}
+        assert repo.get_item('USER#trader', f'NOTE#{note_id}')['text'] == 'from web'
+
+        status, body = api('PATCH', f'/v1/notes/{note_id}', {'date': '2024-03-05'}, headers={'If-Match': 'W/"2"'})
+        assert status == 200 and body['note']['version'] == 3
+        item = repo.get_item('USER#trader', f'NOTE#{note_id}')
+        assert item['GSI1SK'] == f'2024-03-05#{note_id}' and item['text'] == 'from web'
+
+        # Without If-Match the last write wins, but still bumps the version
+        assert api('PATCH', f'/v1/notes/{note_id}', {'text': 'forced'})[1]['note']['version'] == 4
+        assert api('GET', '/v1/notes')[1]['notes'][0]['version'] == 4
+
+        assert api('PATCH', '/v1/notes/missing', {'text': 'x'}, headers={'If-Match': '"1"'})[0] == 404
+        api('DELETE', f'/v1/notes/{note_id}')
+        assert api('PATCH', f'/v1/notes/{note_id}', {'text': 'x'}, headers={'If-Match': '"4"'})[0] == 404
+        assert api('PATCH', f'/v1/notes/{note_id}', {'text': 'x'}, headers={'If-Match': 'abc'})[0] == 400
+
+    def test_strategy_if_match(self, repo, api):
+        """Test strategies are versioned the same way"""
+        strategy_id = api('POST', '/v1/strategies', {'name': 'ORB'})[1]['strategyId']
+        result = api.raw('PATCH', f'/v1/strategies/{strategy_id}', {'name': 'ORB 2'}, headers={'If-Match': '"1"'})
+        assert result['statusCode'] == 200 and result['headers']['ETag'] == '"2"'
+        assert json.loads(result['body'])['strategy']['name'] == 'ORB 2'
+        status, body = api('PATCH', f'/v1/strategies/{strategy_id}', {'name': 'stale'}, headers={'If-Match': '"1"'})
+        assert status == 409 and body['errors'] == {'If-Match': 'strategy is at version 2'}
+        assert api('GET', f'/v1/strategies/{strategy_id}')[1]['strategy']['name'] == 'ORB 2'
+
+    def test_items_written_before_versioning(self, repo, api):
+        """Test unversioned items are version 0 until their first update"""
+        repo.put_item({'PK': 'USER#trader', 'SK': 'NOTE#old', 'GSI1PK': 'NOTE#trader', 'GSI1SK': '2023-01-01#old',
+                       'entityType': 'NOTE', 'noteId': 'old', 'userId': 'trader', 'text': 'legacy',
+                       'createdAt': 'c', 'updatedAt': 'u'})
+        result = api.raw('GET', '/v1/notes/old')
+        assert 'version' not in json.loads(result['body'])['note'] and 'ETag' not in result['headers']
+
+        assert api('PATCH', '/v1/notes/old', {'text': 'stale'}, headers={'If-Match': '"1"'})[1]['errors'] == {
+            'If-Match': 'note is at version 0'
+        }
+        status, body = api('PATCH', '/v1/notes/old', {'text': 'edited'}, headers={'If-Match': '"0"'})
+        assert status == 200 and body['note']['version'] == 1
+        assert repo.get_item('USER#trader', 'NOTE#old')['version'] == 1
+
+    def test_parse_if_match(self):
+        """Test If-Match values are read case-insensitively; * and absence mean unconditional"""
+        assert parse_if_match({'if-match': ' "7" '}) == 7
+        assert parse_if_match({'If-Match': 'W/"3"'}) == 3
+        assert parse_if_match({'If-Match': '*'}) is None
+        assert parse_if_match({}) is None and parse_if_match(None) is None
+        with pytest.raises(ValidationError):
+            parse_if_match({'If-Match': '"v1"'})